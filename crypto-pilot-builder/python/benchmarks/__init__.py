@@ -0,0 +1 @@
+"""Benchmarks de performance du pipeline de trading."""
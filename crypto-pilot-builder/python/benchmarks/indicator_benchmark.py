@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmark des indicateurs techniques
+Mesure chaque méthode de TechnicalIndicators sur plusieurs tailles d'historique,
+enregistre une baseline JSON et échoue si une méthode régresse au-delà d'un ratio.
+
+Utilisation (depuis crypto-pilot-builder/python):
+    python -m benchmarks.indicator_benchmark --save benchmarks/baselines/indicators.json
+    python -m benchmarks.indicator_benchmark --compare benchmarks/baselines/indicators.json --max-ratio 1.5
+
+La baseline de référence benchmarks/baselines/indicators.json a été produite par la
+première commande (tailles par défaut). Les temps dépendent de la machine: sur une
+autre machine (CI), régénérer la baseline avec --save avant de comparer.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.utils.technical_indicators import TechnicalIndicators
+from pipeline.utils.incremental_indicators import IncrementalIndicators
+from pipeline.utils.batch_indicators import BatchIndicators
+
+DEFAULT_LENGTHS = [20, 100, 1_000, 10_000, 100_000]
+DEFAULT_MAX_RATIO = 1.5
+DEFAULT_MAX_SECONDS = 30.0
+DEFAULT_MIN_TIME = 0.2
+# En dessous de ce delta absolu, un écart est considéré comme du bruit de mesure
+NOISE_FLOOR_SECONDS = 20e-6
+
+
+def _incremental_replay(prices: List[float], volumes: List[float]) -> Dict[str, float]:
+    state = IncrementalIndicators()
+    for price, volume in zip(prices, volumes):
+        state.update(price, volume)
+    return state.snapshot()
+
+
+def _incremental_tick(prices: List[float], volumes: List[float]) -> Callable[[], Any]:
+    """Prépare un état déjà chauffé et mesure uniquement le tick suivant."""
+    state = IncrementalIndicators()
+    for price, volume in zip(prices[:-1], volumes[:-1]):
+        state.update(price, volume)
+    return lambda: state.update(prices[-1], volumes[-1])
+
+
+# Nom -> fabrique (prix, volumes) -> callable mesuré
+BENCHMARKS: Dict[str, Callable[[List[float], List[float]], Callable[[], Any]]] = {
+    "calculate_rsi": lambda p, v: lambda: TechnicalIndicators.calculate_rsi(p),
+    "calculate_moving_averages": lambda p, v: lambda: TechnicalIndicators.calculate_moving_averages(p),
+    "calculate_macd": lambda p, v: lambda: TechnicalIndicators.calculate_macd(p),
+    "calculate_bollinger_bands": lambda p, v: lambda: TechnicalIndicators.calculate_bollinger_bands(p),
+    "calculate_stochastic": lambda p, v: lambda: TechnicalIndicators.calculate_stochastic(p),
+    "calculate_volume_indicators": lambda p, v: lambda: TechnicalIndicators.calculate_volume_indicators(p, v),
+    "calculate_all_indicators": lambda p, v: lambda: TechnicalIndicators.calculate_all_indicators(p, v),
+    "incremental.replay": lambda p, v: lambda: _incremental_replay(p, v),
+    "incremental.tick": _incremental_tick,
+    "batch.calculate_all_indicators": lambda p, v: lambda: BatchIndicators.calculate_all_indicators(p, v),
+}
+
+
+def generate_history(length: int, seed: int = 42):
+    """Génère un historique prix/volumes reproductible."""
+    rng = np.random.default_rng(seed)
+    prices = 50000.0 * np.cumprod(1 + rng.uniform(-0.01, 0.01, length))
+    volumes = rng.uniform(1e5, 1e6, length)
+    return prices.tolist(), volumes.tolist()
+
+
+def time_callable(func: Callable[[], Any], min_time: float) -> Dict[str, Any]:
+    """Répète l'appel jusqu'à `min_time` secondes et retourne le meilleur temps par appel."""
+    best = float("inf")
+    repeats = 0
+    total = 0.0
+    while total < min_time or repeats < 3:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        total += elapsed
+        repeats += 1
+        if elapsed > min_time:
+            break
+    return {"seconds": best, "repeats": repeats}
+
+
+def run_benchmarks(lengths: List[int],
+                   methods: Optional[List[str]] = None,
+                   min_time: float = DEFAULT_MIN_TIME,
+                   max_seconds: float = DEFAULT_MAX_SECONDS) -> Dict[str, Any]:
+    """Exécute les benchmarks et retourne un document JSON-sérialisable."""
+    methods = methods or list(BENCHMARKS.keys())
+    lengths = sorted(lengths)
+    histories = {length: generate_history(length) for length in lengths}
+    results: Dict[str, Dict[str, Any]] = {}
+
+    for method in methods:
+        factory = BENCHMARKS[method]
+        results[method] = {}
+        previous = None  # (longueur, secondes)
+
+        for length in lengths:
+            # Les chemins quadratiques (MACD, %D) exploseraient à 100k: estimation pessimiste O(n²)
+            if previous is not None:
+                estimate = previous[1] * (length / previous[0]) ** 2
+                if estimate > max_seconds:
+                    results[method][str(length)] = {"skipped": True, "estimated_seconds": estimate}
+                    print(f"⏭️  {method:<32} n={length:<7} ignoré (estimation {estimate:.1f}s)")
+                    continue
+
+            prices, volumes = histories[length]
+            measure = time_callable(factory(prices, volumes), min_time)
+            results[method][str(length)] = measure
+            previous = (length, measure["seconds"])
+            print(f"⏱️  {method:<32} n={length:<7} {measure['seconds'] * 1e3:10.3f} ms")
+
+    return {
+        "generated_at": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "lengths": lengths,
+        "results": results
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any], max_ratio: float) -> List[Dict[str, Any]]:
+    """
+    Retourne la liste des régressions (ratio courant / baseline > max_ratio).
+    Un cas mesuré dans la baseline mais désormais ignoré (devenu trop lent) est
+    une régression, évaluée sur son temps estimé.
+    """
+    regressions = []
+    for method, by_length in current["results"].items():
+        for length, measure in by_length.items():
+            reference = baseline.get("results", {}).get(method, {}).get(length)
+            if not reference or reference.get("skipped"):
+                continue
+
+            skipped = bool(measure.get("skipped"))
+            seconds = measure["estimated_seconds"] if skipped else measure["seconds"]
+            ratio = seconds / reference["seconds"] if reference["seconds"] > 0 else float("inf")
+            delta = seconds - reference["seconds"]
+            if skipped or (ratio > max_ratio and delta > NOISE_FLOOR_SECONDS):
+                regressions.append({
+                    "method": method,
+                    "length": int(length),
+                    "baseline_seconds": reference["seconds"],
+                    "current_seconds": seconds,
+                    "ratio": ratio,
+                    "skipped": skipped
+                })
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark des indicateurs techniques")
+    parser.add_argument("--lengths", default=",".join(str(n) for n in DEFAULT_LENGTHS),
+                        help="Tailles d'historique séparées par des virgules")
+    parser.add_argument("--methods", default=None,
+                        help=f"Méthodes à mesurer (défaut: toutes) parmi {', '.join(BENCHMARKS)}")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME,
+                        help="Durée minimale de mesure par cas (secondes)")
+    parser.add_argument("--max-seconds", type=float, default=DEFAULT_MAX_SECONDS,
+                        help="Budget estimé maximal par appel avant d'ignorer un cas")
+    parser.add_argument("--save", help="Fichier JSON où enregistrer les résultats (baseline)")
+    parser.add_argument("--compare", help="Baseline JSON à comparer")
+    parser.add_argument("--max-ratio", type=float, default=DEFAULT_MAX_RATIO,
+                        help="Ratio courant/baseline au-delà duquel une méthode a régressé")
+    args = parser.parse_args(argv)
+
+    lengths = [int(n) for n in args.lengths.split(",") if n.strip()]
+    methods = [m.strip() for m in args.methods.split(",")] if args.methods else None
+    unknown = [m for m in methods or [] if m not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Méthodes inconnues: {', '.join(unknown)}")
+
+    print("🚀 Benchmark des indicateurs techniques")
+    print("=" * 70)
+    current = run_benchmarks(lengths, methods, args.min_time, args.max_seconds)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"💾 Résultats enregistrés dans {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(current, baseline, args.max_ratio)
+
+        print("\n" + "=" * 70)
+        if regressions:
+            print(f"❌ {len(regressions)} régression(s) au-delà de x{args.max_ratio}:")
+            for reg in regressions:
+                status = " [désormais ignoré, temps estimé]" if reg["skipped"] else ""
+                print(f"  - {reg['method']} n={reg['length']}: "
+                      f"{reg['baseline_seconds'] * 1e3:.3f} ms -> {reg['current_seconds'] * 1e3:.3f} ms "
+                      f"(x{reg['ratio']:.2f}){status}")
+            return 1
+        print(f"✅ Aucune régression au-delà de x{args.max_ratio}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
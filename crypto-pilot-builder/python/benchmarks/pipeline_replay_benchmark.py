@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark du PipelineManager hors ligne par record/replay
+Enregistre les réponses amont (CoinGecko, CryptoCompare, ASI:One) pendant
+quelques ticks réels, puis rejoue la bande sans réseau pour mesurer le débit
+du pipeline de façon reproductible.
+
+Utilisation (depuis crypto-pilot-builder/python):
+    python -m benchmarks.pipeline_replay_benchmark --record logs/tapes/pipeline.jsonl --ticks 20
+    python -m benchmarks.pipeline_replay_benchmark --replay logs/tapes/pipeline.jsonl --ticks 20
+    python -m benchmarks.pipeline_replay_benchmark --replay logs/tapes/pipeline.jsonl --speed 1.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Le benchmark ne doit pas écrire dans le journal d'événements du pipeline
+os.environ.setdefault("PIPELINE_EVENT_LOG_DIR", "")
+
+from pipeline.utils.pipeline_manager import PipelineManager
+from pipeline.utils.record_replay import traffic_recorder
+
+
+async def run_ticks(manager: PipelineManager, ticks: int, interval: float) -> List[float]:
+    """Exécute `ticks` cycles sur une seule boucle avec les clients partagés; retourne leurs durées."""
+    durations = []
+    await manager._open_clients()
+    try:
+        for _ in range(ticks):
+            start = time.perf_counter()
+            manager._store_pipeline_data(await manager._execute_pipeline_sequence())
+            durations.append(time.perf_counter() - start)
+            if interval > 0:
+                await asyncio.sleep(interval)
+    finally:
+        await manager._close_clients()
+    return durations
+
+
+def summarize(durations: List[float], results: int) -> Dict[str, Any]:
+    total = sum(durations)
+    ordered = sorted(durations)
+    return {
+        "ticks": len(durations),
+        "results": results,
+        "total_seconds": round(total, 4),
+        "ticks_per_second": round(len(durations) / total, 2) if total else None,
+        "results_per_second": round(results / total, 2) if total else None,
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark du pipeline par record/replay")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--record", help="Bande à enregistrer (appels réseau réels)")
+    mode.add_argument("--replay", help="Bande à rejouer (aucun appel réseau)")
+    parser.add_argument("--ticks", type=int, default=10, help="Nombre de cycles à exécuter")
+    parser.add_argument("--interval", type=float, default=0.0,
+                        help="Pause entre deux cycles à l'enregistrement (secondes)")
+    parser.add_argument("--speed", default="max",
+                        help="Vitesse de rejeu: 'max' ou facteur d'horloge (1.0 = temps réel)")
+    parser.add_argument("--seed", type=int, default=None, help="Graine aléatoire de l'enregistrement")
+    parser.add_argument("--strict", action="store_true",
+                        help="Échouer si une requête rejouée n'a pas de clé exacte dans la bande")
+    parser.add_argument("--save", help="Fichier JSON où enregistrer le résumé")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        traffic_recorder.start_recording(args.record, args.seed)
+        interval = args.interval
+    else:
+        speed = None if args.speed == "max" else float(args.speed)
+        traffic_recorder.start_replay(args.replay, speed=speed, strict=args.strict)
+        interval = 0.0
+
+    # Les agents uAgent exigent une boucle courante à leur création
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    manager = PipelineManager()
+
+    print(f"🚀 Pipeline {'enregistré' if args.record else 'rejoué'} sur {args.ticks} tick(s)")
+    print("=" * 70)
+    try:
+        durations = asyncio.run(run_ticks(manager, args.ticks, interval))
+    finally:
+        tape = traffic_recorder.stop()
+
+    summary = summarize(durations, len(manager.pipeline_data))
+    summary["traffic"] = tape
+    summary["stages_ms"] = manager.last_stage_run.durations_ms() if manager.last_stage_run else {}
+    for name, value in summary.items():
+        print(f"  {name:<20} {value}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(summary, f, indent=2, default=str)
+        print(f"💾 Résumé enregistré dans {args.save}")
+
+    if tape["misses"]:
+        print(f"⚠️ {tape['misses']} requête(s) sans réponse enregistrée")
+        return 1
+    print("✅ Terminé")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+#!/usr/bin/env python3
+"""
+Package de configuration de la pipeline de trading
+"""
@@ -112,6 +112,8 @@ def get_pipeline_config() -> Dict[str, Any]:
         "PIPELINE_MAX_DAILY_LOSS": ("risk_management.max_daily_loss", float),
         "PIPELINE_STOP_LOSS": ("risk_management.stop_loss_percentage", float),
         "PIPELINE_TAKE_PROFIT": ("risk_management.take_profit_percentage", float),
+        "PIPELINE_MAX_DRAWDOWN": ("risk_management.max_drawdown", float),
+        "PIPELINE_CORRELATION_LIMIT": ("risk_management.correlation_limit", float),
         "PIPELINE_PAPER_TRADING": ("trade_execution.paper_trading", lambda x: x.lower() == 'true'),
     }
     
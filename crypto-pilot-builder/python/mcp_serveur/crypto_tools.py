@@ -6,8 +6,13 @@ Crypto tools for MCP agent
 import requests
 import json
 import os
+import sys
 from typing import Dict, List, Optional
 
+# Ajouter le répertoire parent au path Python (limiteur de débit partagé du pipeline)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.utils.rate_limiter import rate_limited_get
+
 def get_crypto_price(crypto_id: str, currency: str = "usd") -> str:
     url = "https://api.coingecko.com/api/v3/simple/price"
     params = {
@@ -15,7 +20,7 @@ def get_crypto_price(crypto_id: str, currency: str = "usd") -> str:
         "vs_currencies": currency.lower()
     }
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = rate_limited_get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         if crypto_id.lower() in data and currency.lower() in data[crypto_id.lower()]:
@@ -124,7 +129,7 @@ def get_lifi_tokens(chains: str = None) -> str:
         params["chains"] = chains
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        response = rate_limited_get(url, params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
 
@@ -210,7 +215,7 @@ def get_swap_quote(from_token: str, to_token: str, amount: str, from_address: st
     }
 
     try:
-        response = requests.get(url, params=params, timeout=30)
+        response = rate_limited_get(url, params=params, timeout=30)
 
         # Handle different response status codes
         if response.status_code == 400:
@@ -535,7 +540,7 @@ def get_all_erc20_tokens(chain_id: str = "11155111") -> str:
             'apikey': etherscan_api_key
         }
         
-        response = requests.get(api_url, params=params, timeout=15)
+        response = rate_limited_get(api_url, params=params, timeout=15)
         response.raise_for_status()
         data = response.json()
         
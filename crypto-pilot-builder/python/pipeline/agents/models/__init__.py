@@ -1,6 +1,6 @@
 """Modèles pour les agents de trading."""
 
-from .market_data import MarketData, OHLCV, NewsRecommendation
+from .market_data import MarketData, OHLCV, OHLCVSeries, NewsRecommendation
 from .news_data import NewsData, NewsItem
 from .prediction import Prediction
 from .signal import Signal, SignalType, TradeSignal
@@ -9,6 +9,7 @@ from .trade import TradeRequest, TradeStatus, TradeType, OrderRequest, OrderResp
 __all__ = [
     "MarketData",
     "OHLCV",
+    "OHLCVSeries",
     "NewsRecommendation",
     "NewsData",
     "NewsItem",
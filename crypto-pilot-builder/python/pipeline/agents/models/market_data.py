@@ -1,7 +1,8 @@
 """Modèles pour les données de marché."""
 
+import numpy as np
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Union
 from datetime import datetime
 
 
@@ -15,6 +16,197 @@ class OHLCV(BaseModel):
     volume: float = Field(..., description="Volume échangé")
 
 
+class OHLCVSeries:
+    """
+    Série OHLCV colonnaire adossée à des tableaux contigus.
+
+    Les timestamps sont stockés en int64 et les prix/volumes en float64, ce qui
+    coûte 8 octets par champ au lieu d'un objet `OHLCV` par bougie. Les colonnes
+    exposées sont des vues (sans copie) en lecture seule; `append` est amorti en
+    O(1) grâce à une capacité doublée à chaque agrandissement. Une tranche partage
+    la mémoire de la série d'origine et ne la modifie jamais: son premier ajout
+    réalloue ses propres tableaux.
+    """
+
+    PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+    COLUMNS = ("timestamp",) + PRICE_COLUMNS
+
+    __slots__ = ("_timestamp", "_open", "_high", "_low", "_close", "_volume", "_length")
+
+    def __init__(self,
+                 timestamp: Optional[Iterable[int]] = None,
+                 open: Optional[Iterable[float]] = None,
+                 high: Optional[Iterable[float]] = None,
+                 low: Optional[Iterable[float]] = None,
+                 close: Optional[Iterable[float]] = None,
+                 volume: Optional[Iterable[float]] = None,
+                 capacity: int = 0):
+        columns = {
+            "timestamp": np.asarray(timestamp if timestamp is not None else [], dtype=np.int64),
+            "open": np.asarray(open if open is not None else [], dtype=np.float64),
+            "high": np.asarray(high if high is not None else [], dtype=np.float64),
+            "low": np.asarray(low if low is not None else [], dtype=np.float64),
+            "close": np.asarray(close if close is not None else [], dtype=np.float64),
+            "volume": np.asarray(volume if volume is not None else [], dtype=np.float64),
+        }
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("Toutes les colonnes OHLCV doivent avoir la même longueur")
+
+        self._length = lengths.pop()
+        size = max(capacity, self._length)
+        for name, values in columns.items():
+            buffer = np.empty(size, dtype=values.dtype)
+            buffer[:self._length] = values
+            setattr(self, f"_{name}", buffer)
+
+    @classmethod
+    def _from_buffers(cls, buffers: Dict[str, np.ndarray], length: int) -> "OHLCVSeries":
+        """Construit une série partageant des tableaux existants (sans copie)."""
+        series = cls.__new__(cls)
+        for name in cls.COLUMNS:
+            setattr(series, f"_{name}", buffers[name])
+        series._length = length
+        return series
+
+    @classmethod
+    def from_candles(cls, candles: Iterable[Union[OHLCV, Dict[str, Any]]]) -> "OHLCVSeries":
+        """Construit une série à partir de bougies `OHLCV` ou de dictionnaires (une passe par colonne)."""
+        candles = list(candles)
+        rows = [candle if isinstance(candle, dict) else candle.__dict__ for candle in candles]
+        buffers = {
+            name: np.fromiter((row[name] for row in rows),
+                              dtype=np.int64 if name == "timestamp" else np.float64,
+                              count=len(rows))
+            for name in cls.COLUMNS
+        }
+        return cls._from_buffers(buffers, len(rows))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[OHLCV, "OHLCVSeries"]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            buffers = {name: getattr(self, f"_{name}")[start:stop:step] for name in self.COLUMNS}
+            return self._from_buffers(buffers, len(buffers["timestamp"]))
+
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("Index hors de la série OHLCV")
+        return OHLCV(**self._row(index))
+
+    def __iter__(self):
+        for index in range(self._length):
+            yield OHLCV(**self._row(index))
+
+    def _row(self, index: int) -> Dict[str, Any]:
+        row = {"timestamp": int(self._timestamp[index])}
+        for name in self.PRICE_COLUMNS:
+            row[name] = float(getattr(self, f"_{name}")[index])
+        return row
+
+    def _column(self, name: str) -> np.ndarray:
+        view = getattr(self, f"_{name}")[:self._length]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._column("timestamp")
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._column("open")
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._column("high")
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._column("low")
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._column("close")
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._column("volume")
+
+    @property
+    def capacity(self) -> int:
+        return len(self._timestamp)
+
+    @property
+    def nbytes(self) -> int:
+        """Mémoire occupée par les données utiles de la série."""
+        return sum(self._column(name).nbytes for name in self.COLUMNS)
+
+    def _grow(self, minimum: int):
+        """Réalloue des tableaux propres d'au moins `minimum` éléments."""
+        size = max(minimum, 2 * self.capacity, 16)
+        for name in self.COLUMNS:
+            old = getattr(self, f"_{name}")
+            buffer = np.empty(size, dtype=old.dtype)
+            buffer[:self._length] = old[:self._length]
+            setattr(self, f"_{name}", buffer)
+
+    def _owns_buffers(self) -> bool:
+        # Une tranche (ou une tranche à pas) ne doit jamais écrire dans la mémoire d'origine
+        return self._timestamp.base is None and self._timestamp.flags.c_contiguous
+
+    def append(self, timestamp: int, open: float, high: float, low: float, close: float, volume: float):
+        """Ajoute une bougie en fin de série (O(1) amorti)."""
+        if self._length >= self.capacity or not self._owns_buffers():
+            self._grow(self._length + 1)
+
+        index = self._length
+        self._timestamp[index] = timestamp
+        self._open[index] = open
+        self._high[index] = high
+        self._low[index] = low
+        self._close[index] = close
+        self._volume[index] = volume
+        self._length += 1
+
+    def extend(self, other: Union["OHLCVSeries", Iterable[OHLCV]]):
+        """Ajoute une autre série (copie vectorisée) ou une liste de bougies."""
+        if not isinstance(other, OHLCVSeries):
+            other = OHLCVSeries.from_candles(other)
+
+        count = len(other)
+        if count == 0:
+            return
+        if self._length + count > self.capacity or not self._owns_buffers():
+            self._grow(self._length + count)
+
+        for name in self.COLUMNS:
+            getattr(self, f"_{name}")[self._length:self._length + count] = other._column(name)
+        self._length += count
+
+    def tail(self, count: int) -> "OHLCVSeries":
+        """Vue sur les `count` dernières bougies."""
+        return self[max(0, self._length - count):]
+
+    def to_candles(self) -> List[OHLCV]:
+        """Reconstruit la liste de bougies attendue par `MarketData.ohlcv`."""
+        return list(self)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Sérialise au format des messages existants (une entrée par bougie)."""
+        columns = {name: self._column(name).tolist() for name in self.COLUMNS}
+        return [
+            {name: columns[name][index] for name in self.COLUMNS}
+            for index in range(self._length)
+        ]
+
+    def __repr__(self) -> str:
+        return f"OHLCVSeries(length={self._length}, capacity={self.capacity})"
+
+
 class NewsRecommendation(BaseModel):
     """Recommandation basée sur l'analyse des news."""
     action: str = Field(..., description="Action recommandée: buy, sell, hold")
@@ -78,3 +270,12 @@ class MarketData(BaseModel):
         json_encoders = {
             datetime: lambda v: v.isoformat()
         }
+
+    @classmethod
+    def from_series(cls, symbol: str, timeframe: str, series: OHLCVSeries, **kwargs) -> "MarketData":
+        """Construit un message à partir d'une série colonnaire."""
+        return cls(symbol=symbol, timeframe=timeframe, ohlcv=series.to_candles(), **kwargs)
+
+    def to_series(self) -> OHLCVSeries:
+        """Convertit les bougies du message en série colonnaire."""
+        return OHLCVSeries.from_candles(self.ohlcv)
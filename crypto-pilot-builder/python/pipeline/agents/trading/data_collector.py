@@ -10,6 +10,8 @@ from uagents.setup import fund_agent_if_low
 
 from ..models.market_data import MarketData, OHLCV
 from ...utils.circuit_breaker import CircuitBreaker
+from ...utils.candle_builder import MultiTimeframeCandleBuilder
+from ...utils.rate_limiter import Priority
 
 logger = structlog.get_logger(__name__)
 
@@ -39,21 +41,28 @@ class DataCollectorAgent(Agent):
         # Plus besoin de client Ethereum pour le trading simple
         logger.info("DEBUG: DataCollector configuré pour prix uniquement")
         
+        # Agrégation des ticks en vraies bougies OHLCV par timeframe
+        self.candle_builder = MultiTimeframeCandleBuilder(("1m", "5m", "15m", "1h"))
+        
+        # Plusieurs ticks par minute pour que les bougies 1m aient un vrai high/low
+        self.collection_interval = 15  # secondes
+        
         # Configuration de la tâche périodique
         logger.info("DEBUG: Configuration de la tâche périodique...")
-        self.periodic_task = self.on_interval(period=60)(self.collect_market_data)
+        self.periodic_task = self.on_interval(period=self.collection_interval)(self.collect_market_data)
         logger.info("DEBUG: Tâche périodique configurée")
         
-        self.collection_interval = 60  # secondes
         logger.info("DEBUG: __init__ DataCollectorAgent terminé", cryptos=list(self.cryptos.keys()))
     
     async def collect_market_data(self, ctx: Context):
         """Collecte périodique des données de marché."""
         logger.info("DEBUG: Début collect_market_data")
         try:
-            for crypto_id, symbol in self.cryptos.items():
-                logger.info("DEBUG: Collecte pour crypto", crypto=crypto_id)
-                await self._collect_crypto_data(ctx, crypto_id, symbol)
+            # Collecte concurrente: les prix sont regroupés en une seule requête CoinGecko
+            await asyncio.gather(*[
+                self._collect_crypto_data(ctx, crypto_id, symbol)
+                for crypto_id, symbol in self.cryptos.items()
+            ])
                     
         except Exception as e:
             logger.error("DEBUG: Erreur lors de la collecte de données", error=str(e))
@@ -62,6 +71,8 @@ class DataCollectorAgent(Agent):
     async def _collect_crypto_data(self, ctx: Context, crypto_id: str, symbol: str):
         """Collecte les données pour une crypto via CoinGecko."""
         logger.info("DEBUG: Début _collect_crypto_data", crypto=crypto_id)
+        pair = f"{symbol}/USD"
+        price = None
         try:
             # Utilisation du circuit breaker
             @self.circuit_breaker
@@ -69,7 +80,7 @@ class DataCollectorAgent(Agent):
                 logger.info("DEBUG: Début fetch_data")
                 # Récupération du prix en temps réel via CoinGecko
                 from ...utils.market_data_service import market_data_service
-                market_data = await market_data_service.get_crypto_price(crypto_id)
+                market_data = await market_data_service.get_crypto_price(crypto_id, priority=Priority.TRADING)
                 logger.info("DEBUG: Prix CoinGecko récupéré", price=market_data)
                 
                 return {
@@ -80,28 +91,41 @@ class DataCollectorAgent(Agent):
             logger.info("DEBUG: Appel fetch_data...")
             data = await fetch_data()
             logger.info("DEBUG: fetch_data terminé", data=data)
+            price = data["price"]
             
-            if not data["price"]:
+            if not price:
                 logger.warning("Aucun prix reçu", crypto=crypto_id)
-                return
-            
-            # Création d'un OHLCV simple
-            ohlcv = OHLCV(
-                timestamp=int(datetime.now().timestamp() * 1000),
-                open=data["price"],
-                high=data["price"] * 1.001,  # +0.1%
-                low=data["price"] * 0.999,   # -0.1%
-                close=data["price"],
-                volume=1000000  # Volume simulé
-            )
             
+        except Exception as e:
+            logger.error("Erreur collecte crypto", 
+                        crypto=crypto_id, 
+                        error=str(e))
+        
+        # Les bougies dont la période est écoulée sont fermées à chaque intervalle,
+        # même quand la collecte échoue ou ne renvoie pas de prix
+        closed_candles = self.candle_builder.close_due(pair)
+        
+        # Intégration du tick; une bougie n'est émise qu'à la fermeture de sa période.
+        # L'endpoint de prix ne fournit pas de volume échangé par tick: volume à 0.
+        if price:
+            closed_candles.update(self.candle_builder.add_tick(pair, price, volume=0.0))
+            logger.info("Données collectées avec succès", 
+                       crypto=crypto_id, 
+                       price=price,
+                       closed_candles=list(closed_candles.keys()))
+        
+        await self._send_closed_candles(ctx, pair, closed_candles)
+    
+    async def _send_closed_candles(self, ctx: Context, pair: str, closed_candles: Dict[str, OHLCV]):
+        """Envoie au Predictor un MarketData par bougie fermée."""
+        for timeframe, ohlcv in closed_candles.items():
             # Calcul des features techniques basiques
             features = self._calculate_features([ohlcv])
             
             # Création de l'objet MarketData
             market_data = MarketData(
-                symbol=f"{symbol}/USD",
-                timeframe="1m",
+                symbol=pair,
+                timeframe=timeframe,
                 ohlcv=[ohlcv],
                 features=features,
                 timestamp=datetime.utcnow()
@@ -109,15 +133,6 @@ class DataCollectorAgent(Agent):
             
             # Envoi au Predictor
             await self._send_to_predictor(ctx, market_data)
-            
-            logger.info("Données collectées avec succès", 
-                       crypto=crypto_id, 
-                       price=data["price"])
-            
-        except Exception as e:
-            logger.error("Erreur collecte crypto", 
-                        crypto=crypto_id, 
-                        error=str(e))
     
     def _calculate_features(self, ohlcv_list: List[OHLCV]) -> Dict[str, Any]:
         """Calcule les features techniques basiques."""
@@ -10,9 +10,15 @@ from uagents.setup import fund_agent_if_low
 from ..models.trade import TradeRequest, TradeStatus
 from ..models.prediction import Prediction
 from ..models.signal import Signal
+from ...utils.performance_stats import PerformanceStats
 
 logger = structlog.get_logger(__name__)
 
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return round(value, digits) if value is not None else None
+
+
 class LoggerAgent(Agent):
     """Agent Logger pour le monitoring et feedback du pipeline."""
     
@@ -29,6 +35,8 @@ class LoggerAgent(Agent):
             "log_retention_days": 30,
             "alert_threshold_execution_rate": 0.7,  # 70% de succès
             "alert_threshold_confidence": 0.5,      # 50% de confiance
+            "alert_threshold_pnl": -500.0,          # P&L total en USD
+            "alert_threshold_winrate": 0.4,         # 40% de trades gagnants
             "performance_update_interval": 300      # 5 minutes
         }
         
@@ -38,6 +46,14 @@ class LoggerAgent(Agent):
         self.prediction_logs: List[Dict[str, Any]] = []
         self.strategy_logs: List[Dict[str, Any]] = []
         self.trader_logs: List[Dict[str, Any]] = []
+        self.trade_logs: List[Dict[str, Any]] = []
+        self.signal_logs: List[Dict[str, Any]] = []
+        # Journal persistant optionnel (EventLog), branché par le PipelineManager
+        self.event_log = None
+        
+        # Performance de trading en flux (global et par symbole)
+        self.performance = PerformanceStats()
+        self.symbol_performance: Dict[str, PerformanceStats] = {}
         
         # Alertes basées sur les vraies données
         self.alerts: List[Dict[str, Any]] = []
@@ -91,15 +107,21 @@ class LoggerAgent(Agent):
             }
             
             self.trade_logs.append(trade_log)
+            self._persist("trade_result", trade_log)
+            
+            # Limiter la taille des logs (les statistiques ne les relisent pas)
+            if len(self.trade_logs) > 1000:
+                self.trade_logs = self.trade_logs[-1000:]
             
-            # Mise à jour des statistiques
-            await self._update_statistics(trade_log)
+            # Mise à jour des statistiques sur les trades clôturés
+            if msg.realized_pnl is not None:
+                await self._update_statistics(trade_log)
             
             # Vérification des alertes
             await self._check_alerts()
             
-            # Feedback au Predictor si nécessaire
-            if msg.signal_data:
+            # Feedback au Predictor une fois le trade clôturé (P&L connu)
+            if msg.signal_data and msg.realized_pnl is not None:
                 await self._send_feedback_to_predictor(ctx, msg)
             
             logger.info("Trade enregistré et statistiques mises à jour")
@@ -123,6 +145,7 @@ class LoggerAgent(Agent):
             }
             
             self.prediction_logs.append(prediction_log)
+            self._persist("prediction", prediction_log)
             
             # Limiter la taille des logs
             if len(self.prediction_logs) > 1000:
@@ -148,6 +171,7 @@ class LoggerAgent(Agent):
             }
             
             self.signal_logs.append(signal_log)
+            self._persist("signal", signal_log)
             
             # Limiter la taille des logs
             if len(self.signal_logs) > 1000:
@@ -202,38 +226,32 @@ class LoggerAgent(Agent):
         except Exception as e:
             logger.error("Erreur mise à jour statistiques pipeline", error=str(e))
     
-    async def _calculate_drawdown(self):
-        """Calcule le drawdown actuel et maximum."""
+    async def _update_statistics(self, trade_log: Dict[str, Any]):
+        """Intègre un trade clôturé aux accumulateurs (P&L, drawdown, Sharpe...) en O(1)."""
         try:
-            if len(self.trade_logs) < 2:
-                return
-            
-            # Calcul du drawdown
-            cumulative_pnl = 0.0
-            peak_pnl = 0.0
-            current_drawdown = 0.0
-            max_drawdown = 0.0
-            
-            for trade in self.trade_logs:
-                cumulative_pnl += trade["realized_pnl"]
-                
-                if cumulative_pnl > peak_pnl:
-                    peak_pnl = cumulative_pnl
-                
-                current_drawdown = peak_pnl - cumulative_pnl
-                
-                if current_drawdown > max_drawdown:
-                    max_drawdown = current_drawdown
+            pnl = trade_log["realized_pnl"]
+            self.performance.add(pnl)
             
-            self.stats["current_drawdown"] = current_drawdown
-            self.stats["max_drawdown"] = max_drawdown
+            symbol = trade_log["symbol"]
+            if symbol not in self.symbol_performance:
+                self.symbol_performance[symbol] = PerformanceStats()
+            self.symbol_performance[symbol].add(pnl)
             
         except Exception as e:
-            logger.error("Erreur calcul drawdown", error=str(e))
+            logger.error("Erreur mise à jour statistiques", error=str(e))
+    
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques de trading courantes (lues dans les accumulateurs)."""
+        return self.performance.as_dict()
     
     async def _check_alerts(self):
         """Vérifie et génère des alertes si nécessaire."""
         try:
+            # Sans trade clôturé, win rate et P&L ne sont pas significatifs
+            if self.performance.total_trades == 0:
+                return
+            
             # Alerte P&L négatif
             if self.stats["total_pnl"] < self.monitoring_config["alert_threshold_pnl"]:
                 alert = {
@@ -328,47 +346,35 @@ class LoggerAgent(Agent):
     def get_performance_report(self) -> Dict[str, Any]:
         """Génère un rapport de performance complet."""
         try:
-            # Calculs supplémentaires
-            avg_trade_pnl = (
-                self.stats["total_pnl"] / self.stats["total_trades"]
-                if self.stats["total_trades"] > 0 else 0.0
-            )
+            # Lecture directe des accumulateurs: coût indépendant du nombre de trades
+            stats = self.performance
             
             # Performance par symbole
-            symbol_performance = {}
-            for trade in self.trade_logs:
-                symbol = trade["symbol"]
-                if symbol not in symbol_performance:
-                    symbol_performance[symbol] = {
-                        "trades": 0,
-                        "pnl": 0.0,
-                        "wins": 0
-                    }
-                
-                symbol_performance[symbol]["trades"] += 1
-                symbol_performance[symbol]["pnl"] += trade["realized_pnl"]
-                if trade["realized_pnl"] > 0:
-                    symbol_performance[symbol]["wins"] += 1
-            
-            # Calcul des win rates par symbole
-            for symbol in symbol_performance:
-                perf = symbol_performance[symbol]
-                perf["win_rate"] = (
-                    perf["wins"] / perf["trades"] * 100
-                    if perf["trades"] > 0 else 0.0
-                )
+            symbol_performance = {
+                symbol: {
+                    "trades": perf.total_trades,
+                    "pnl": perf.total_pnl,
+                    "wins": perf.successful_trades,
+                    "win_rate": perf.win_rate * 100
+                }
+                for symbol, perf in self.symbol_performance.items()
+            }
             
             return {
                 "summary": {
-                    "total_trades": self.stats["total_trades"],
-                    "successful_trades": self.stats["successful_trades"],
-                    "win_rate": round(self.stats["win_rate"] * 100, 2),
-                    "total_pnl": round(self.stats["total_pnl"], 2),
-                    "avg_trade_pnl": round(avg_trade_pnl, 2),
-                    "best_trade": round(self.stats["best_trade"], 2),
-                    "worst_trade": round(self.stats["worst_trade"], 2),
-                    "current_drawdown": round(self.stats["current_drawdown"], 2),
-                    "max_drawdown": round(self.stats["max_drawdown"], 2)
+                    "total_trades": stats.total_trades,
+                    "successful_trades": stats.successful_trades,
+                    "win_rate": round(stats.win_rate * 100, 2),
+                    "total_pnl": round(stats.total_pnl, 2),
+                    "avg_trade_pnl": round(stats.avg_trade_pnl, 2),
+                    "best_trade": round(stats.best_trade, 2),
+                    "worst_trade": round(stats.worst_trade, 2),
+                    "current_drawdown": round(stats.current_drawdown, 2),
+                    "max_drawdown": round(stats.max_drawdown, 2),
+                    "profit_factor": _round(stats.profit_factor),
+                    "sharpe": _round(stats.sharpe, 4),
+                    "sortino": _round(stats.sortino, 4),
+                    "expectancy": round(stats.expectancy, 2)
                 },
                 "symbol_performance": symbol_performance,
                 "recent_alerts": self.alerts[-10:],  # 10 dernières alertes
@@ -474,6 +480,15 @@ class LoggerAgent(Agent):
             self.alerts.pop(0)  # Supprimer la plus ancienne
         self.alerts.append(alert)
     
+    def _persist(self, kind: str, entry: Dict[str, Any]):
+        """Écrit une entrée de monitoring dans le journal sur disque s'il est configuré."""
+        if self.event_log is None:
+            return
+        try:
+            self.event_log.append(kind, entry, entry.get("timestamp"))
+        except Exception as e:
+            logger.error("Erreur écriture journal logger", kind=kind, error=str(e))
+    
     async def analyze_pipeline_health(self, ctx: Context):
         """Analyse périodique de la santé du pipeline."""
         try:
@@ -1,6 +1,7 @@
 """Agent NewsCollector - Collecte et analyse des news crypto."""
 
 import asyncio
+import aiohttp
 import structlog
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
@@ -9,6 +10,7 @@ from uagents.setup import fund_agent_if_low
 
 from ..models.news_data import NewsData, NewsItem, NewsRecommendation
 from ...utils.circuit_breaker import CircuitBreaker
+from ...utils.rate_limiter import Priority
 
 # Import des services existants
 import sys
@@ -48,9 +50,18 @@ class NewsCollectorAgent(Agent):
         self.news_cache: Dict[str, List[NewsItem]] = {}
         self.last_collection = {}
         
+        # Client HTTP asynchrone: session aiohttp (pool de connexions) ouverte à la
+        # première collecte sur la boucle de l'agent, qui continue de traiter ses
+        # messages pendant les appels
+        self.fetch_timeout = 10  # secondes, appel complet (rate limiting compris)
+        self.http_pool_size = 4
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        
         # Configuration de la tâche périodique
         logger.info("DEBUG: Configuration de la tâche périodique...")
         self.periodic_task = self.on_interval(period=self.collection_interval)(self.collect_news_data)
+        self.on_event("shutdown")(self._on_shutdown)
         logger.info("DEBUG: Tâche périodique configurée")
         
         logger.info("DEBUG: __init__ NewsCollectorAgent terminé", 
@@ -60,16 +71,13 @@ class NewsCollectorAgent(Agent):
         """Collecte périodique des news et génère des recommandations."""
         logger.info("DEBUG: Début collect_news_data")
         try:
-            # Récupérer les news récentes
-            recent_news = await self._fetch_recent_news()
+            # Récupérer les news récentes, groupées par symbole crypto
+            news_by_symbol = await self._fetch_news_by_symbol()
             
-            if not recent_news:
+            if not news_by_symbol:
                 logger.warning("Aucune news récupérée")
                 return
             
-            # Grouper les news par symbole crypto
-            news_by_symbol = self._group_news_by_symbol(recent_news)
-            
             # Traiter chaque symbole
             for symbol, news_items in news_by_symbol.items():
                 if news_items:
@@ -79,54 +87,72 @@ class NewsCollectorAgent(Agent):
             logger.error("DEBUG: Erreur lors de la collecte de news", error=str(e))
             logger.error("DEBUG: Stack trace collect_news_data", exc_info=True)
     
-    async def _fetch_recent_news(self) -> List[NewsItem]:
-        """Récupère les news récentes via le NewsService."""
-        try:
-            # Utilisation du circuit breaker
-            @self.circuit_breaker
-            def fetch_news():
-                return news_service.get_recent_news(hours=1)
-            
-            logger.info("DEBUG: Récupération des news...")
-            news_items = fetch_news()
-            logger.info(f"DEBUG: {len(news_items)} news récupérées")
-            
-            # Convertir en NewsItem
-            converted_news = []
-            for news in news_items:
-                news_item = NewsItem(
-                    id=news.id,
-                    title=news.title,
-                    content=news.content,
-                    source=news.source,
-                    published_at=news.published_at,
-                    url=news.url,
-                    sentiment_score=news.sentiment_score,
-                    relevance_score=news.relevance_score,
-                    crypto_mentions=news.crypto_mentions or [],
-                    impact_level=news.impact_level
-                )
-                converted_news.append(news_item)
-            
-            return converted_news
-            
-        except Exception as e:
-            logger.error("Erreur récupération news", error=str(e))
-            return []
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Session aiohttp de l'agent, recréée si fermée ou ouverte sur une autre boucle."""
+        loop = asyncio.get_running_loop()
+        if self.http_session is None or self.http_session.closed or self._session_loop is not loop:
+            self.http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.http_pool_size, ttl_dns_cache=300),
+                timeout=aiohttp.ClientTimeout(total=self.fetch_timeout, connect=5),
+                headers={"User-Agent": "TradingBot/1.0"}
+            )
+            self._session_loop = loop
+        return self.http_session
     
-    def _group_news_by_symbol(self, news_items: List[NewsItem]) -> Dict[str, List[NewsItem]]:
-        """Groupe les news par symbole crypto."""
-        grouped = {}
+    async def _refresh_news(self, session: Optional[aiohttp.ClientSession] = None):
+        """Fusionne les nouvelles news dans le magasin du NewsService, sans bloquer la boucle."""
+        # Utilisation du circuit breaker (échecs et timeouts comptés, annulation propagée)
+        @self.circuit_breaker
+        async def fetch_news():
+            return await asyncio.wait_for(
+                news_service.fetch_crypto_news_async(session or self._get_session(), priority=Priority.DEFAULT),
+                timeout=self.fetch_timeout
+            )
         
-        for news in news_items:
-            if news.crypto_mentions:
-                for symbol in news.crypto_mentions:
-                    if symbol in self.crypto_symbols:
-                        if symbol not in grouped:
-                            grouped[symbol] = []
-                        grouped[symbol].append(news)
+        logger.info("DEBUG: Récupération des news...")
+        new_items = await fetch_news()
+        logger.info(f"DEBUG: {len(new_items)} nouvelles news")
+    
+    async def _fetch_news_by_symbol(self, session: Optional[aiohttp.ClientSession] = None) -> Dict[str, List[NewsItem]]:
+        """
+        Récupère les news récentes des symboles surveillés (index par symbole du NewsService).
+        `session` permet de réutiliser la session HTTP de l'appelant (PipelineManager).
+        En cas d'échec du rafraîchissement, les news déjà en magasin sont servies.
+        """
+        if news_service.needs_refresh():
+            try:
+                await self._refresh_news(session)
+            except Exception as e:
+                logger.error("Erreur récupération news", error=str(e) or type(e).__name__)
+        
+        grouped = news_service.get_recent_news_by_symbol(hours=1, symbols=self.crypto_symbols, refresh=False)
         
-        return grouped
+        # Convertir en NewsItem (une seule fois par article, même s'il mentionne plusieurs symboles)
+        converted: Dict[str, NewsItem] = {}
+        news_by_symbol = {}
+        for symbol, news_items in grouped.items():
+            for news in news_items:
+                if news.id not in converted:
+                    converted[news.id] = self._convert_news(news)
+            news_by_symbol[symbol] = [converted[news.id] for news in news_items]
+        
+        return news_by_symbol
+    
+    @staticmethod
+    def _convert_news(news) -> NewsItem:
+        """Convertit un article du NewsService en NewsItem du pipeline."""
+        return NewsItem(
+            id=news.id,
+            title=news.title,
+            content=news.content,
+            source=news.source,
+            published_at=news.published_at,
+            url=news.url,
+            sentiment_score=news.sentiment_score,
+            relevance_score=news.relevance_score,
+            crypto_mentions=news.crypto_mentions or [],
+            impact_level=news.impact_level
+        )
     
     async def _process_news_for_symbol(self, ctx: Context, symbol: str, news_items: List[NewsItem]):
         """Traite les news pour un symbole et génère des recommandations."""
@@ -276,7 +302,14 @@ class NewsCollectorAgent(Agent):
     
     async def cleanup(self):
         """Nettoyage des ressources."""
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
+        self.http_session = None
+        self._session_loop = None
         logger.info("DEBUG: Nettoyage NewsCollector terminé")
+    
+    async def _on_shutdown(self, ctx: Context):
+        await self.cleanup()
 
 if __name__ == "__main__":
     agent = NewsCollectorAgent()
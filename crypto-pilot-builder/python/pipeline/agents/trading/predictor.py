@@ -13,6 +13,9 @@ from ..models.prediction import Prediction
 from ..models.signal import Signal
 from ...utils.asi_model import ASIOneModel
 from ...utils.technical_indicators import TechnicalIndicators
+from ...utils.incremental_indicators import IndicatorEngine
+from ...utils.price_history import price_history_store
+from ...utils.record_replay import traffic_recorder
 
 logger = structlog.get_logger(__name__)
 
@@ -32,11 +35,14 @@ class PredictorAgent(Agent):
         self.prediction_horizon = 5  # minutes
         self.confidence_threshold = 0.6
         
-        # Cache pour les données historiques
-        self.price_history: Dict[str, List[float]] = {}
-        self.volume_history: Dict[str, List[float]] = {}
+        # Historique partagé (buffers circulaires par symbole)
+        self.history_store = price_history_store
         self.max_history_length = 100
         
+        # Indicateurs techniques mis à jour bougie par bougie, un état par (symbole, timeframe):
+        # une clôture 1h ne doit pas être repliée dans l'état alimenté par les bougies 1m
+        self.indicator_engine = IndicatorEngine()
+        
         # Modèle ASI:One
         self.asi_model = ASIOneModel(model="asi1-mini")
         
@@ -65,19 +71,21 @@ class PredictorAgent(Agent):
                        ohlcv_count=len(msg.ohlcv),
                        news_integrated=msg.news_count > 0 if msg.news_count else False)
             
-            # Extraction des prix de clôture
-            prices = [candle.close for candle in msg.ohlcv]
+            # Colonnes NumPy de la série, transmises sans conversion en listes
+            series = msg.to_series()
             symbol = msg.symbol
             
-            # Mise à jour de l'historique
-            if symbol not in self.price_history:
-                self.price_history[symbol] = []
-            
-            self.price_history[symbol].extend(prices)
+            # Mise à jour de l'historique (copies de blocs, sans objet par bougie)
+            self.history_store.extend_arrays(
+                symbol,
+                series.close,
+                volumes=series.volume,
+                timestamps=series.timestamp / 1000,
+                timeframe=msg.timeframe
+            )
             
-            # Garder seulement les dernières données
-            if len(self.price_history[symbol]) > self.max_history_length:
-                self.price_history[symbol] = self.price_history[symbol][-self.max_history_length:]
+            # Mise à jour incrémentale des indicateurs (O(1) par bougie, instantané calculé une fois)
+            self.indicator_engine.update_many((symbol, msg.timeframe), series.close, series.volume)
             
             # Extraire les données de news si disponibles
             news_data = None
@@ -91,7 +99,9 @@ class PredictorAgent(Agent):
                 }
             
             # Génération de la prédiction avec intégration des news
-            prediction = await self._generate_prediction(symbol, prices, msg.features, news_data)
+            history = self.history_store.last_prices(symbol, self.max_history_length, msg.timeframe).tolist()
+            prediction = await self._generate_prediction(symbol, history, msg.features, news_data,
+                                                         timeframe=msg.timeframe)
             
             if prediction:
                 # Envoi au Strategy
@@ -108,7 +118,7 @@ class PredictorAgent(Agent):
                         symbol=msg.symbol,
                         error=str(e))
     
-    async def _generate_prediction(self, symbol: str, prices: List[float], features: Dict[str, Any], news_data: Optional[Dict[str, Any]] = None) -> Optional[Prediction]:
+    async def _generate_prediction(self, symbol: str, prices: List[float], features: Dict[str, Any], news_data: Optional[Dict[str, Any]] = None, timeframe: str = "1m") -> Optional[Prediction]:
         """Génère une prédiction basée sur les données historiques avec ASI:One et les news."""
         try:
             if len(prices) < 20:
@@ -117,11 +127,15 @@ class PredictorAgent(Agent):
                               data_points=len(prices))
                 return None
             
-            # Calculer les indicateurs techniques
-            technical_indicators = TechnicalIndicators.calculate_all_indicators(prices)
+            # Indicateurs techniques maintenus par le moteur incrémental
+            technical_indicators = self._get_technical_indicators(symbol, prices, timeframe)
             
-            # Récupérer l'historique des volumes si disponible
-            volumes = self.volume_history.get(symbol, [1000000] * len(prices))  # Volume par défaut
+            # Récupérer l'historique des volumes si disponible (volume par défaut sinon)
+            volumes = np.nan_to_num(
+                self.history_store.last_volumes(symbol, len(prices), timeframe), nan=1000000
+            ).tolist()
+            if len(volumes) != len(prices):
+                volumes = [1000000] * len(prices)
             
             # Générer la prédiction avec ASI:One
             prediction_result = await self.asi_model.predict_price_direction(
@@ -175,7 +189,14 @@ class PredictorAgent(Agent):
                         symbol=symbol,
                         error=str(e))
             # Fallback vers simulation
-            return await self._generate_simulation_prediction(symbol, prices, features, news_data)
+            return await self._generate_simulation_prediction(symbol, prices, features, news_data, timeframe)
+    
+    def _get_technical_indicators(self, symbol: str, prices: List[float], timeframe: str = "1m") -> Dict[str, float]:
+        """Retourne les indicateurs du moteur incrémental, ou les recalcule si le couple symbole/timeframe est inconnu."""
+        indicators = self.indicator_engine.snapshot((symbol, timeframe))
+        if indicators:
+            return indicators
+        return TechnicalIndicators.calculate_all_indicators(prices)
     
     async def _adjust_confidence_with_news(self, base_confidence: float, news_data: Optional[Dict[str, Any]], symbol: str) -> float:
         """Ajuste la confiance de la prédiction selon les données de news."""
@@ -278,11 +299,11 @@ class PredictorAgent(Agent):
             logger.error("Erreur détermination action dominante", error=str(e))
             return "hold"
 
-    async def _generate_simulation_prediction(self, symbol: str, prices: List[float], features: Dict[str, Any], news_data: Optional[Dict[str, Any]] = None) -> Optional[Prediction]:
+    async def _generate_simulation_prediction(self, symbol: str, prices: List[float], features: Dict[str, Any], news_data: Optional[Dict[str, Any]] = None, timeframe: str = "1m") -> Optional[Prediction]:
         """Génère une prédiction de simulation en cas d'échec ASI:One."""
         try:
-            # Calculer les indicateurs techniques
-            technical_indicators = TechnicalIndicators.calculate_all_indicators(prices)
+            # Indicateurs techniques maintenus par le moteur incrémental
+            technical_indicators = self._get_technical_indicators(symbol, prices, timeframe)
             
             # Logique de simulation basée sur les indicateurs
             current_price = prices[-1]
@@ -305,11 +326,11 @@ class PredictorAgent(Agent):
                 base_prob -= 0.1
             
             # Ajouter du bruit
-            import random
-            direction_prob = base_prob + random.uniform(-0.05, 0.05)
+            rng = traffic_recorder.rng
+            direction_prob = base_prob + rng.uniform(-0.05, 0.05)
             direction_prob = max(0.0, min(1.0, direction_prob))
             
-            confidence = random.uniform(0.6, 0.9)
+            confidence = rng.uniform(0.6, 0.9)
             
             prediction = Prediction(
                 symbol=symbol,
@@ -9,7 +9,10 @@ from uagents.setup import fund_agent_if_low
 
 from ..models.prediction import Prediction
 from ..models.signal import Signal, SignalType
-from ..models.trade import TradeRequest
+from ..models.trade import TradeRequest, TradeStatus
+from ...utils.risk_engine import PortfolioRiskEngine
+from ...utils.trading_rules import LONG, SHORT, position_size, protective_levels, signal_direction
+from config.trading_pipeline_config import PIPELINE_CONFIG
 
 logger = structlog.get_logger(__name__)
 
@@ -40,6 +43,13 @@ class StrategyAgent(Agent):
         self.daily_trades = 0
         self.last_reset = datetime.utcnow().date()
         
+        # Corrélations entre positions et drawdown du portefeuille (limites de la config pipeline)
+        risk_management = PIPELINE_CONFIG["risk_management"]
+        self.risk_engine = PortfolioRiskEngine(
+            correlation_limit=risk_management["correlation_limit"],
+            max_drawdown=risk_management["max_drawdown"]
+        )
+        
         # Historique des signaux
         self.signal_history: List[Signal] = []
         self.max_history = 100
@@ -59,6 +69,10 @@ class StrategyAgent(Agent):
                        direction_prob=msg.direction_prob,
                        confidence=msg.confidence)
             
+            # Alimentation de la fenêtre de rendements du moteur de risque
+            if msg.features_used:
+                self.risk_engine.update_price(msg.symbol, msg.features_used.get("current_price"))
+            
             # Vérification des conditions de trading
             if not self._check_trading_conditions(msg):
                 logger.info("Conditions de trading non remplies", 
@@ -70,7 +84,19 @@ class StrategyAgent(Agent):
             signal = await self._generate_signal(msg)
             
             if signal and signal.signal_type != SignalType.HOLD:
-                # Envoi au Trader
+                # Contrôle des limites de portefeuille (corrélation, drawdown)
+                direction = LONG if signal.signal_type == SignalType.BUY else SHORT
+                decision = self.risk_engine.evaluate(signal.symbol, direction, signal.position_size)
+                if not decision.allowed:
+                    logger.info("Signal bloqué par les limites de risque", 
+                               symbol=signal.symbol,
+                               reason=decision.reason,
+                               correlated_with=decision.correlated_with,
+                               max_correlation=decision.max_correlation)
+                    return
+                signal.position_size = decision.size
+                
+                # Envoi au Trader; la position n'est comptée qu'à la confirmation du fill
                 await self._send_to_trader(ctx, signal)
                 
                 logger.info("📈 Signal généré", 
@@ -137,27 +163,25 @@ class StrategyAgent(Agent):
             buy_threshold = 0.65
             sell_threshold = 0.35
             
-            signal_type = SignalType.HOLD
-            
-            if direction_prob > buy_threshold:
-                signal_type = SignalType.BUY
-            elif direction_prob < sell_threshold:
-                signal_type = SignalType.SELL
+            direction = signal_direction(direction_prob, buy_threshold, sell_threshold)
+            signal_type = {LONG: SignalType.BUY, SHORT: SignalType.SELL}.get(direction, SignalType.HOLD)
             
             # Calcul de la taille de position basée sur la confiance
-            position_size = self._calculate_position_size(prediction)
+            size = self._calculate_position_size(prediction)
             
             # Calcul du stop loss et take profit
             current_price = prediction.features_used.get("current_price", 1.0)
-            stop_loss = current_price * (1 - self.risk_config["stop_loss"]) if signal_type == SignalType.BUY else current_price * (1 + self.risk_config["stop_loss"])
-            take_profit = current_price * (1 + self.risk_config["take_profit"]) if signal_type == SignalType.BUY else current_price * (1 - self.risk_config["take_profit"])
+            stop_loss, take_profit = protective_levels(
+                current_price, direction,
+                self.risk_config["stop_loss"], self.risk_config["take_profit"]
+            )
             
             signal = Signal(
                 symbol=prediction.symbol,
                 signal_type=signal_type,
                 confidence=prediction.confidence,
                 price=current_price,
-                position_size=position_size,
+                position_size=size,
                 stop_loss=stop_loss,
                 take_profit=take_profit,
                 prediction_data=prediction.dict(),
@@ -180,23 +204,9 @@ class StrategyAgent(Agent):
     def _calculate_position_size(self, prediction: Prediction) -> float:
         """Calcule la taille de position basée sur la confiance et le risque."""
         try:
-            # Taille de base
-            base_size = self.risk_config["max_position_size"]
-            
-            # Ajustement basé sur la confiance
-            confidence_factor = prediction.confidence
-            
-            # Ajustement basé sur la volatilité (plus de volatilité = position plus petite)
-            volatility = prediction.volatility
-            volatility_factor = max(0.3, 1.0 - volatility * 10)
-            
-            # Calcul de la taille finale
-            position_size = base_size * confidence_factor * volatility_factor
-            
-            # Limitation à la taille maximale
-            position_size = min(position_size, self.risk_config["max_position_size"])
-            
-            return round(position_size, 4)
+            # Taille maximale pondérée par la confiance, réduite par la volatilité
+            return position_size(prediction.confidence, prediction.volatility,
+                                 self.risk_config["max_position_size"])
             
         except Exception as e:
             logger.error("Erreur calcul taille position", error=str(e))
@@ -224,14 +234,24 @@ class StrategyAgent(Agent):
                        status=msg.status,
                        pnl=msg.realized_pnl)
             
-            # Mise à jour des statistiques
-            if msg.realized_pnl:
-                self.daily_pnl += msg.realized_pnl
-                self.daily_trades += 1
+            # Ordre exécuté: la position est ouverte pour le moteur de risque
+            if msg.status == TradeStatus.FILLED:
+                self.open_trades[msg.symbol] = {
+                    "trade_id": msg.trade_id,
+                    "side": msg.side,
+                    "entry_price": msg.price,
+                    "quantity": msg.quantity
+                }
+                self.risk_engine.open_position(msg.symbol, LONG if msg.side == SignalType.BUY else SHORT)
             
-            # Suppression du trade ouvert
-            if msg.symbol in self.open_trades:
-                del self.open_trades[msg.symbol]
+            # Position fermée: P&L réalisé et libération de la position
+            elif msg.status == TradeStatus.CLOSED:
+                if msg.realized_pnl is not None:
+                    self.daily_pnl += msg.realized_pnl
+                    self.daily_trades += 1
+                    self.risk_engine.record_pnl(msg.realized_pnl)
+                self.risk_engine.close_position(msg.symbol)
+                self.open_trades.pop(msg.symbol, None)
             
             logger.info("État mis à jour", 
                        daily_pnl=self.daily_pnl,
@@ -10,6 +10,8 @@ from uagents.setup import fund_agent_if_low
 from ..models.signal import Signal, SignalType
 from ..models.trade import TradeRequest, TradeStatus, TradeType
 from ..models.prediction import Prediction
+from ...utils.trading_rules import LONG, SHORT
+from ...utils.trigger_book import TriggerBook
 
 logger = structlog.get_logger(__name__)
 
@@ -31,12 +33,17 @@ class TraderAgent(Agent):
             "min_order_size": 10,   # Taille minimale en USD
             "max_order_size": 1000, # Taille maximale en USD
             "retry_attempts": 3,    # Nombre de tentatives
-            "retry_delay": 1        # Délai entre tentatives en secondes
+            "retry_delay": 1,       # Délai entre tentatives en secondes
+            "trailing_stop": None   # Distance du stop suiveur (ex: 0.02), None = stop fixe
         }
         
         # État des trades
         self.open_trades: Dict[str, Dict[str, Any]] = {}
         self.trade_history: List[Dict[str, Any]] = []
+        # Stops et objectifs indexés par prix (paires OCO par position)
+        self.trigger_book = TriggerBook()
+        # Journal persistant optionnel (EventLog), branché par le PipelineManager
+        self.event_log = None
         self.total_pnl = 0.0
         self.total_trades = 0
         self.successful_trades = 0
@@ -72,7 +79,8 @@ class TraderAgent(Agent):
             trade_result = await self._execute_trade(msg)
             
             if trade_result:
-                # Envoi du résultat au Logger
+                # Confirmation du fill au Strategy (ouverture de la position) et au Logger
+                await self._send_to_strategy(ctx, trade_result)
                 await self._send_to_logger(ctx, trade_result)
                 
                 logger.info("✅ Trade exécuté", 
@@ -166,16 +174,27 @@ class TraderAgent(Agent):
             
             # Ajout aux trades ouverts
             self.open_trades[signal.symbol] = {
+                "trade": trade,
                 "trade_id": trade_id,
+                "side": signal.signal_type,
                 "entry_price": execution_price,
                 "quantity": signal.position_size,
                 "stop_loss": signal.stop_loss,
                 "take_profit": signal.take_profit,
-                "timestamp": datetime.utcnow()
+                "timestamp": datetime.utcnow(),
+                "oco": self.trigger_book.add_bracket(
+                    signal.symbol,
+                    LONG if signal.signal_type == SignalType.BUY else SHORT,
+                    stop_loss=signal.stop_loss,
+                    take_profit=signal.take_profit,
+                    trail=self.trading_config["trailing_stop"],
+                    anchor_price=execution_price
+                )
             }
             
             # Ajout à l'historique
             self.trade_history.append(trade.dict())
+            self._persist("trade_opened", trade.dict())
             self.total_trades += 1
             
             logger.info("Trade créé", 
@@ -232,28 +251,37 @@ class TraderAgent(Agent):
         except Exception as e:
             logger.error("Erreur envoi au Logger", error=str(e))
     
+    async def _send_to_strategy(self, ctx: Context, trade: TradeRequest):
+        """Envoie le résultat du trade (fill ou fermeture) au Strategy."""
+        try:
+            # Adresse du Strategy (à configurer)
+            strategy_address = "agent1q2kxac3lxe4f9m9h2p9jwzqrv2y6s8ll0ctus7"
+            
+            await ctx.send(strategy_address, trade)
+            logger.info("Résultat envoyé au Strategy", 
+                       trade_id=trade.trade_id,
+                       symbol=trade.symbol,
+                       status=trade.status.value)
+            
+        except Exception as e:
+            logger.error("Erreur envoi au Strategy", error=str(e))
+    
     async def handle_price_update(self, ctx: Context, sender: str, msg: Prediction):
         """Gère les mises à jour de prix pour les stop loss/take profit."""
         try:
             current_price = msg.features_used.get("current_price", 0)
             symbol = msg.symbol
             
-            if symbol in self.open_trades:
-                trade_info = self.open_trades[symbol]
-                
-                # Vérification du stop loss
-                if current_price <= trade_info["stop_loss"]:
-                    await self._close_trade(symbol, current_price, "stop_loss")
-                
-                # Vérification du take profit
-                elif current_price >= trade_info["take_profit"]:
-                    await self._close_trade(symbol, current_price, "take_profit")
+            # Seuls les niveaux franchis par ce prix sont visités
+            for fired in self.trigger_book.on_price(symbol, current_price):
+                if symbol in self.open_trades:
+                    await self._close_trade(ctx, symbol, current_price, fired.trigger.kind)
             
         except Exception as e:
             logger.error("Erreur mise à jour prix", error=str(e))
     
-    async def _close_trade(self, symbol: str, exit_price: float, reason: str):
-        """Ferme un trade ouvert."""
+    async def _close_trade(self, ctx: Context, symbol: str, exit_price: float, reason: str):
+        """Ferme un trade ouvert et envoie le trade clôturé (P&L réalisé) au Strategy et au Logger."""
         try:
             trade_info = self.open_trades[symbol]
             entry_price = trade_info["entry_price"]
@@ -272,8 +300,18 @@ class TraderAgent(Agent):
             if pnl > 0:
                 self.successful_trades += 1
             
-            # Suppression du trade ouvert
+            # Suppression du trade ouvert et de ses déclencheurs restants
             del self.open_trades[symbol]
+            self.trigger_book.cancel_oco(trade_info.get("oco"))
+            self._persist("trade_closed", {
+                "trade_id": trade_info.get("trade_id"),
+                "symbol": symbol,
+                "entry_price": entry_price,
+                "exit_price": exit_price,
+                "quantity": quantity,
+                "pnl": pnl,
+                "reason": reason
+            })
             
             logger.info("Trade fermé", 
                        symbol=symbol,
@@ -281,11 +319,29 @@ class TraderAgent(Agent):
                        pnl=pnl,
                        total_pnl=self.total_pnl)
             
+            closed_trade = trade_info["trade"].copy(update={
+                "price": exit_price,
+                "status": TradeStatus.CLOSED,
+                "realized_pnl": pnl,
+                "timestamp": datetime.utcnow()
+            })
+            await self._send_to_strategy(ctx, closed_trade)
+            await self._send_to_logger(ctx, closed_trade)
+            
         except Exception as e:
             logger.error("Erreur fermeture trade", 
                         symbol=symbol,
                         error=str(e))
     
+    def _persist(self, kind: str, entry: Dict[str, Any]):
+        """Écrit un événement de trading dans le journal sur disque s'il est configuré."""
+        if self.event_log is None:
+            return
+        try:
+            self.event_log.append(kind, entry)
+        except Exception as e:
+            logger.error("Erreur écriture journal trader", kind=kind, error=str(e))
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Retourne les statistiques de trading."""
         win_rate = (self.successful_trades / self.total_trades * 100) if self.total_trades > 0 else 0
@@ -296,7 +352,8 @@ class TraderAgent(Agent):
             "win_rate": round(win_rate, 2),
             "total_pnl": round(self.total_pnl, 2),
             "available_capital": round(self.available_capital, 2),
-            "open_trades": len(self.open_trades)
+            "open_trades": len(self.open_trades),
+            "triggers": self.trigger_book.get_stats()
         }
     
     async def run(self):
@@ -15,6 +15,8 @@ from pydantic import BaseModel, Field
 import structlog
 
 from ..utils.pipeline_manager import pipeline_manager
+from ..utils.price_history import price_history_store
+from ..utils.rate_limiter import Priority
 
 logger = structlog.get_logger(__name__)
 
@@ -55,7 +57,10 @@ app_state = {
     "tests_running": {},
     "data_collected": [],
     "errors": [],
-    "price_history": [],  # Historique des prix pour le graphique
+    "price_symbol": "BTC/USD",  # Symbole affiché sur le graphique (historique dans price_history_store)
+    # Série propre aux relevés du dashboard: ne se mêle pas aux bougies du pipeline
+    # ("1m") et peut être effacée sans toucher à l'historique des agents
+    "price_timeframe": "dashboard",
     "max_price_history": 10  # Maximum 10 points de prix
 }
 
@@ -219,10 +224,10 @@ async def test_bitcoin_price():
     """Test de récupération du prix Bitcoin avec données complètes."""
     try:
         # Utiliser le service unifié de données de marché
-        from src.utils.market_data_service import market_data_service
+        from ..utils.market_data_service import market_data_service
         
         # Récupérer données complètes (prix + blockchain)
-        market_data = await market_data_service.get_complete_market_data("bitcoin")
+        market_data = await market_data_service.get_complete_market_data("bitcoin", priority=Priority.DASHBOARD)
         
         if market_data["success"]:
             results = {
@@ -277,11 +282,11 @@ async def run_data_collection_test():
         logger.info("🔄 Test de collecte de données...")
         
         # Récupérer de vraies données de marché
-        from src.utils.market_data_service import market_data_service
+        from ..utils.market_data_service import market_data_service
         
         # Collecter les prix de plusieurs cryptos
         crypto_ids = ["bitcoin", "ethereum", "tether", "usd-coin"]
-        prices = await market_data_service.get_multiple_prices(crypto_ids)
+        prices = await market_data_service.get_multiple_prices(crypto_ids, priority=Priority.DASHBOARD)
         
         # Récupérer les données blockchain
         blockchain_data = await market_data_service.get_blockchain_data()
@@ -328,63 +333,70 @@ async def get_price_data(limit: int = Query(10, description="Nombre de points de
     """Récupère les données de prix pour le graphique."""
     try:
         # Utiliser le service unifié de données de marché pour de vraies données
-        from src.utils.market_data_service import market_data_service
+        from ..utils.market_data_service import market_data_service
         
         # Récupérer le prix Bitcoin en temps réel
-        btc_price = await market_data_service.get_crypto_price("bitcoin")
+        btc_price = await market_data_service.get_crypto_price("bitcoin", priority=Priority.DASHBOARD)
+        
+        symbol = app_state["price_symbol"]
+        count = min(limit, app_state["max_price_history"])
         
         if btc_price:
-            # Créer un nouveau point de données
-            new_price_point = {
-                "timestamp": datetime.utcnow(),
-                "price": btc_price,
-                "token": "BTC",
-                "source": "CoinGecko"
-            }
-            
-            # Ajouter à l'historique
-            app_state["price_history"].append(new_price_point)
+            # Ajouter à la série du dashboard (buffer circulaire, O(1))
+            price_history_store.append(symbol, btc_price, timeframe=app_state["price_timeframe"])
             
-            # Garder seulement les 10 derniers points (FIFO)
-            if len(app_state["price_history"]) > app_state["max_price_history"]:
-                app_state["price_history"] = app_state["price_history"][-app_state["max_price_history"]:]
-            
-            # Retourner l'historique complet (max 10 points)
+            # Retourner les derniers points (max 10 points)
+            prices = _price_points(symbol, count)
             return {
-                "prices": app_state["price_history"],
-                "total": len(app_state["price_history"]),
+                "prices": prices,
+                "total": len(prices),
                 "source": "real_data"
             }
         else:
             # Fallback si pas de données disponibles
+            prices = _price_points(symbol, count)
             return {
-                "prices": app_state["price_history"],  # Retourner l'historique existant
-                "total": len(app_state["price_history"]),
+                "prices": prices,  # Retourner l'historique existant
+                "total": len(prices),
                 "error": "Impossible de récupérer les nouvelles données de prix",
                 "source": "cached_data"
             }
         
     except Exception as e:
         logger.error("❌ Erreur récupération données prix", error=str(e))
+        prices = _price_points(app_state["price_symbol"], app_state["max_price_history"])
         return {
-            "prices": app_state["price_history"],  # Retourner l'historique existant
-            "total": len(app_state["price_history"]),
+            "prices": prices,  # Retourner l'historique existant
+            "total": len(prices),
             "error": str(e),
             "source": "cached_data"
         }
 
+def _price_points(symbol: str, count: int) -> List[Dict[str, Any]]:
+    """Points de prix au format du graphique, lus dans l'historique partagé."""
+    return [
+        {
+            "timestamp": point["timestamp"],
+            "price": point["price"],
+            "token": symbol.split("/")[0],
+            "source": "CoinGecko"
+        }
+        for point in price_history_store.to_records(symbol, count, app_state["price_timeframe"])
+    ]
+
 @app.delete("/data/clear")
 async def clear_data():
     """Efface toutes les données collectées."""
     app_state["data_collected"] = []
     app_state["errors"] = []
-    app_state["price_history"] = []  # Vider aussi l'historique des prix
+    # Vider aussi les prix du dashboard (l'historique du pipeline est conservé)
+    price_history_store.clear(app_state["price_symbol"], app_state["price_timeframe"])
     return {"message": "Données effacées"}
 
 @app.delete("/data/prices/clear")
 async def clear_price_history():
-    """Efface l'historique des prix."""
-    app_state["price_history"] = []
+    """Efface l'historique des prix du dashboard."""
+    price_history_store.clear(app_state["price_symbol"], app_state["price_timeframe"])
     return {"message": "Historique des prix effacé"}
 
 # Endpoints de test pour les agents de trading
@@ -397,10 +409,10 @@ async def test_predictor_agent():
         # Importer les modules nécessaires
         from src.utils.asi_model import ASIOneModel
         from src.utils.technical_indicators import TechnicalIndicators
-        from src.utils.market_data_service import market_data_service
+        from ..utils.market_data_service import market_data_service
         
         # Récupérer de vraies données de marché
-        market_data = await market_data_service.get_complete_market_data("bitcoin")
+        market_data = await market_data_service.get_complete_market_data("bitcoin", priority=Priority.DASHBOARD)
         
         if not market_data["success"] or not market_data["crypto"]["price_usd"]:
             raise HTTPException(status_code=503, detail="Impossible de récupérer les données de marché")
@@ -474,8 +486,8 @@ async def test_strategy_agent():
         import random
         
         # Récupérer de vraies données de marché
-        from src.utils.market_data_service import market_data_service
-        market_data = await market_data_service.get_complete_market_data("bitcoin")
+        from ..utils.market_data_service import market_data_service
+        market_data = await market_data_service.get_complete_market_data("bitcoin", priority=Priority.DASHBOARD)
         
         if not market_data["success"] or not market_data["crypto"]["price_usd"]:
             raise HTTPException(status_code=503, detail="Impossible de récupérer les données de marché")
@@ -536,8 +548,8 @@ async def test_trader_agent():
         import random
         
         # Récupérer de vraies données de marché
-        from src.utils.market_data_service import market_data_service
-        market_data = await market_data_service.get_complete_market_data("bitcoin")
+        from ..utils.market_data_service import market_data_service
+        market_data = await market_data_service.get_complete_market_data("bitcoin", priority=Priority.DASHBOARD)
         
         if not market_data["success"] or not market_data["crypto"]["price_usd"]:
             raise HTTPException(status_code=503, detail="Impossible de récupérer les données de marché")
@@ -820,13 +832,35 @@ async def get_pipeline_status():
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/pipeline/data")
-async def get_pipeline_data(limit: int = Query(100, description="Nombre de données à récupérer")):
-    """Récupère les dernières données du pipeline."""
+async def get_pipeline_data(limit: int = Query(100, description="Nombre de données à récupérer"),
+                            symbol: Optional[str] = Query(None, description="Filtrer sur un symbole (ex: BTC/USD)"),
+                            start: Optional[datetime] = Query(None, description="Début de période (UTC)"),
+                            end: Optional[datetime] = Query(None, description="Fin de période exclue (UTC)"),
+                            before: Optional[int] = Query(None, description="Curseur de pagination (next_before)")):
+    """
+    Récupère les dernières données du pipeline.
+    Au-delà de l'historique en mémoire (période, curseur ou limite plus grande),
+    les données sont lues page par page depuis le journal sur disque.
+    """
     try:
+        in_memory = pipeline_manager.pipeline_data.count(symbol)
+        if start is None and end is None and before is None and limit <= in_memory:
+            return {
+                "data": pipeline_manager.get_pipeline_data(limit, symbol=symbol),
+                "pipeline_data_count": in_memory,
+                "limit": limit,
+                "next_before": None
+            }
+        
+        page = await asyncio.to_thread(
+            pipeline_manager.get_persisted_pipeline_data,
+            limit, symbol, start, end, before
+        )
         return {
-            "data": pipeline_manager.get_pipeline_data(limit),
-            "pipeline_data_count": len(pipeline_manager.pipeline_data),
-            "limit": limit
+            "data": page["data"],
+            "pipeline_data_count": in_memory,
+            "limit": limit,
+            "next_before": page["next_before"]
         }
     except Exception as e:
         logger.error("❌ Erreur récupération données pipeline", error=str(e))
@@ -850,14 +884,14 @@ async def execute_pipeline_once():
     """Exécute le pipeline une seule fois (pour les tests)."""
     try:
         # Exécuter une seule séquence du pipeline
-        pipeline_data = await pipeline_manager._execute_pipeline_sequence()
+        pipeline_data = await pipeline_manager.execute_once()
         
         if pipeline_data:
             return {
                 "success": True,
                 "message": "Pipeline exécuté avec succès",
                 "timestamp": datetime.utcnow().isoformat(),
-                "pipeline_data": pipeline_data.__dict__ if hasattr(pipeline_data, '__dict__') else pipeline_data
+                "pipeline_data": [data.__dict__ for data in pipeline_data]
             }
         else:
             return {
@@ -8,21 +8,26 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 import structlog
 
+from .record_replay import TrafficRecorder, traffic_recorder
+
 logger = structlog.get_logger(__name__)
 
 class ASIOneModel:
     """Interface pour le modèle ASI:One de Fetch.ai."""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "asi1-mini"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "asi1-mini",
+                 session: Optional[aiohttp.ClientSession] = None):
         """
         Initialise le modèle ASI:One.
         
         Args:
             api_key: Clé API ASI:One (si None, cherche dans ASI_ONE_API_KEY)
             model: Modèle à utiliser (asi1-mini, asi1-fast, asi1-extended, etc.)
+            session: Session aiohttp partagée (sinon une session par appel)
         """
         self.api_key = api_key or os.getenv("ASI_ONE_API_KEY")
         self.model = model
+        self.session = session
         self.base_url = "https://api.asi1.ai/v1"
         
         if not self.api_key:
@@ -52,7 +57,8 @@ class ASIOneModel:
         Returns:
             Dict avec prédiction, confiance, et métadonnées
         """
-        if self.simulation_mode:
+        # Au rejeu, les complétions enregistrées remplacent l'API même sans clé
+        if self.simulation_mode and not traffic_recorder.has_service(self.service_name):
             return await self._simulate_prediction(price_history, technical_indicators, symbol)
         
         try:
@@ -122,34 +128,54 @@ RÉPONSE ATTENDUE (JSON):
 """
         return prompt
     
+    @property
+    def service_name(self) -> str:
+        return TrafficRecorder.service_of(self.base_url)
+    
     async def _call_asi_api(self, prompt: str) -> Dict[str, Any]:
-        """Appelle l'API ASI:One."""
+        """Appelle l'API ASI:One (ou rejoue la complétion enregistrée pour ce prompt)."""
+        return await traffic_recorder.exchange_async(
+            self.service_name,
+            TrafficRecorder.request_key("POST", f"{self.base_url}/chat/completions",
+                                        body={"model": self.model, "prompt": prompt}),
+            lambda: self._send_prompt(prompt)
+        )
+    
+    async def _send_prompt(self, prompt: str) -> Dict[str, Any]:
+        """Envoie le prompt via la session partagée si elle est ouverte, sinon une session temporaire."""
+        if self.session is not None and not self.session.closed:
+            return await self._post_chat_completion(self.session, prompt)
+        
         async with aiohttp.ClientSession() as session:
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.api_key}"
-            }
-            
-            data = {
-                "model": self.model,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "temperature": 0.3,  # Réponses plus déterministes
-                "max_tokens": 500
-            }
-            
-            async with session.post(
-                f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=data
-            ) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    return result
-                else:
-                    error_text = await response.text()
-                    raise Exception(f"API ASI:One error {response.status}: {error_text}")
+            return await self._post_chat_completion(session, prompt)
+    
+    async def _post_chat_completion(self, session: aiohttp.ClientSession, prompt: str) -> Dict[str, Any]:
+        """Envoie le prompt à l'endpoint chat/completions."""
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        }
+        
+        data = {
+            "model": self.model,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,  # Réponses plus déterministes
+            "max_tokens": 500
+        }
+        
+        async with session.post(
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json=data
+        ) as response:
+            if response.status == 200:
+                result = await response.json()
+                return result
+            else:
+                error_text = await response.text()
+                raise Exception(f"API ASI:One error {response.status}: {error_text}")
     
     def _parse_prediction_response(self, response: Dict[str, Any], symbol: str) -> Dict[str, Any]:
         """Parse la réponse d'ASI:One."""
@@ -202,7 +228,7 @@ RÉPONSE ATTENDUE (JSON):
                                  technical_indicators: Dict[str, float],
                                  symbol: str) -> Dict[str, Any]:
         """Simulation de prédiction quand l'API n'est pas disponible."""
-        import random
+        rng = traffic_recorder.rng
         
         current_price = price_history[-1] if price_history else 1.0
         price_change = ((current_price - price_history[-2]) / price_history[-2]) if len(price_history) > 1 else 0
@@ -225,10 +251,10 @@ RÉPONSE ATTENDUE (JSON):
             base_prob -= 0.1
         
         # Ajouter du bruit
-        direction_prob = base_prob + random.uniform(-0.05, 0.05)
+        direction_prob = base_prob + rng.uniform(-0.05, 0.05)
         direction_prob = max(0.0, min(1.0, direction_prob))
         
-        confidence = random.uniform(0.6, 0.9)
+        confidence = rng.uniform(0.6, 0.9)
         
         return {
             "symbol": symbol,
@@ -0,0 +1,399 @@
+"""Backtester événementiel vectorisé reprenant les règles du StrategyAgent et du TraderAgent."""
+
+import heapq
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import structlog
+
+from ..agents.models.market_data import OHLCVSeries
+from .trading_rules import LONG, position_size, protective_levels, signal_direction
+
+logger = structlog.get_logger(__name__)
+
+MS_PER_DAY = 86_400_000
+MS_PER_YEAR = 365 * MS_PER_DAY
+
+# Prédictions par symbole: tableaux alignés sur les bougies
+Predictions = Dict[str, np.ndarray]
+Predictor = Callable[[OHLCVSeries], Predictions]
+
+
+@dataclass
+class BacktestConfig:
+    """Paramètres de risque (StrategyAgent) et d'exécution (TraderAgent)."""
+    initial_capital: float = 10000.0
+    max_position_size: float = 0.1      # Fraction du capital par trade
+    min_confidence: float = 0.7
+    buy_threshold: float = 0.65
+    sell_threshold: float = 0.35
+    stop_loss: float = 0.02
+    take_profit: float = 0.04
+    max_open_trades: int = 3
+    max_daily_loss: float = 0.05        # Fraction du capital en début de journée
+    slippage: float = 0.0005            # Appliqué défavorablement à chaque exécution
+    fee_rate: float = 0.001             # Frais proportionnels au notionnel, à l'entrée et à la sortie
+    min_order_size: float = 10.0        # USD
+    max_order_size: Optional[float] = None
+    allow_short: bool = True
+
+    @classmethod
+    def from_trading_config(cls, trading_config, **overrides) -> "BacktestConfig":
+        """Construit la configuration à partir de `TradingConfig` (variables d'environnement)."""
+        strategy, trader = trading_config.strategy, trading_config.trader
+        values = dict(
+            initial_capital=trader.initial_capital,
+            max_position_size=strategy.max_position_size,
+            min_confidence=strategy.min_confidence,
+            buy_threshold=strategy.buy_threshold,
+            sell_threshold=strategy.sell_threshold,
+            stop_loss=strategy.stop_loss,
+            take_profit=strategy.take_profit,
+            max_open_trades=strategy.max_open_trades,
+            max_daily_loss=strategy.max_daily_loss,
+            min_order_size=trader.min_order_size,
+            max_order_size=trader.max_order_size,
+        )
+        values.update(overrides)
+        return cls(**values)
+
+
+@dataclass
+class BacktestTrade:
+    """Trade simulé (prix d'exécution slippage inclus)."""
+    symbol: str
+    side: int
+    entry_index: int
+    entry_time: int
+    entry_price: float
+    quantity: float
+    stop_loss: float
+    take_profit: float
+    exit_index: int = -1
+    exit_time: int = 0
+    exit_price: float = 0.0
+    exit_reason: str = ""
+    fees: float = 0.0
+    pnl: float = 0.0
+
+    @property
+    def notional(self) -> float:
+        return self.quantity * self.entry_price
+
+    @property
+    def return_pct(self) -> float:
+        return self.pnl / self.notional if self.notional else 0.0
+
+
+@dataclass
+class BacktestResult:
+    """Courbe de capital, liste des trades et statistiques."""
+    timestamps: np.ndarray
+    equity: np.ndarray
+    trades: List[BacktestTrade]
+    rejected: Dict[str, int]
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    def trades_as_records(self) -> List[Dict[str, Any]]:
+        return [asdict(trade) for trade in self.trades]
+
+
+def rolling_rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI glissant (moyennes simples des hausses/baisses, comme TechnicalIndicators); 50 avant `period` barres."""
+    close = np.asarray(close, dtype=np.float64)
+    rsi = np.full(len(close), 50.0)
+    if len(close) <= period:
+        return rsi
+    changes = np.diff(close)
+    gains = np.concatenate(([0.0], np.cumsum(np.where(changes > 0, changes, 0.0))))
+    losses = np.concatenate(([0.0], np.cumsum(np.where(changes > 0, 0.0, -changes))))
+    avg_gain = (gains[period:] - gains[:-period]) / period
+    avg_loss = (losses[period:] - losses[:-period]) / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100 - 100 / (1 + avg_gain / avg_loss)
+    rsi[period:] = np.where(avg_loss <= 0, 100.0, values)
+    return rsi
+
+
+def rolling_volatility(close: np.ndarray, window: int = 20) -> np.ndarray:
+    """Écart-type glissant des rendements simples (0 tant que la fenêtre est incomplète)."""
+    close = np.asarray(close, dtype=np.float64)
+    volatility = np.zeros(len(close))
+    if len(close) <= window:
+        return volatility
+    returns = np.diff(close) / close[:-1]
+    sums = np.concatenate(([0.0], np.cumsum(returns)))
+    squares = np.concatenate(([0.0], np.cumsum(returns * returns)))
+    mean = (sums[window:] - sums[:-window]) / window
+    variance = (squares[window:] - squares[:-window]) / window - mean * mean
+    volatility[window:] = np.sqrt(np.maximum(variance, 0.0))
+    return volatility
+
+
+def indicator_predictions(series: OHLCVSeries, rsi_period: int = 14, volatility_window: int = 20,
+                          confidence: float = 0.75) -> Predictions:
+    """
+    Prédicteur par défaut: logique du mode simulation d'ASIOneModel sans bruit
+    (RSI survendu/suracheté ±0.2, variation de plus de 1% ±0.1), vectorisée.
+    """
+    close = series.close
+    rsi = rolling_rsi(close, rsi_period)
+    change = np.zeros(len(close))
+    change[1:] = np.diff(close) / close[:-1]
+
+    direction_prob = np.full(len(close), 0.5)
+    direction_prob += np.where(rsi < 30, 0.2, np.where(rsi > 70, -0.2, 0.0))
+    direction_prob += np.where(change > 0.01, 0.1, np.where(change < -0.01, -0.1, 0.0))
+    return {
+        "direction_prob": np.clip(direction_prob, 0.0, 1.0),
+        "confidence": np.full(len(close), confidence),
+        "volatility": rolling_volatility(close, volatility_window),
+    }
+
+
+class Backtester:
+    """
+    Rejoue les règles de décision du pipeline sur des historiques OHLCV.
+
+    Tout ce qui ne dépend pas de l'état du portefeuille est calculé en bloc
+    (prédictions, sens, tailles, niveaux SL/TP par bougie). La boucle ne visite
+    ensuite que les événements: entrées candidates et sorties. La sortie d'un
+    trade est trouvée par recherche vectorisée du premier franchissement de
+    stop loss / take profit, et les candidats d'un symbole occupé, bloqué par
+    la perte quotidienne ou par le nombre de trades ouverts sont sautés par
+    dichotomie jusqu'au prochain instant où ils pourraient être acceptés.
+
+    Conventions:
+    - entrée à la clôture de la bougie du signal, slippage défavorable;
+    - si SL et TP sont franchis dans la même bougie, le stop loss est retenu;
+    - un gap au-delà d'un niveau est exécuté à l'ouverture;
+    - les symboles partagent la même grille de timestamps;
+    - perte quotidienne comptée sur le PnL réalisé du jour UTC.
+    """
+
+    def __init__(self, config: Optional[BacktestConfig] = None, predictor: Optional[Predictor] = None):
+        self.config = config or BacktestConfig()
+        self.predictor = predictor or indicator_predictions
+
+    # --- Préparation ------------------------------------------------------
+
+    @staticmethod
+    def _as_universe(data: Union[OHLCVSeries, Mapping[str, OHLCVSeries]]) -> Dict[str, OHLCVSeries]:
+        universe = {"ASSET": data} if isinstance(data, OHLCVSeries) else dict(data)
+        if not universe:
+            raise ValueError("Aucune série à backtester")
+        reference = next(iter(universe.values())).timestamp
+        for symbol, series in universe.items():
+            if len(series) != len(reference) or not np.array_equal(series.timestamp, reference):
+                raise ValueError(f"Les séries doivent partager la même grille de timestamps ({symbol})")
+        if len(reference) < 2:
+            raise ValueError("Historique trop court")
+        return universe
+
+    def _prepare(self, universe: Dict[str, OHLCVSeries],
+                 predictions: Optional[Mapping[str, Predictions]]) -> Dict[str, np.ndarray]:
+        """Matrices (symboles × temps) des prix, signaux, tailles et niveaux."""
+        cfg = self.config
+        symbols = list(universe)
+        arrays = {name: np.vstack([getattr(universe[s], name) for s in symbols])
+                  for name in ("open", "high", "low", "close")}
+
+        preds = [predictions[s] if predictions is not None else self.predictor(universe[s]) for s in symbols]
+        direction_prob = np.vstack([np.asarray(p["direction_prob"], dtype=np.float64) for p in preds])
+        confidence = np.vstack([np.asarray(p["confidence"], dtype=np.float64) for p in preds])
+        volatility = np.vstack([np.asarray(p.get("volatility", np.zeros(direction_prob.shape[1])),
+                                           dtype=np.float64) for p in preds])
+
+        direction = signal_direction(direction_prob, cfg.buy_threshold, cfg.sell_threshold)
+        if not cfg.allow_short:
+            direction = np.where(direction == LONG, LONG, 0)
+        fill = arrays["close"] * (1 + direction * cfg.slippage)
+        stop, take = protective_levels(fill, direction, cfg.stop_loss, cfg.take_profit)
+
+        candidates = (direction != 0) & (confidence >= cfg.min_confidence)
+        candidates[:, -1] = False  # Pas d'entrée sur la dernière bougie
+        arrays.update(
+            direction=direction,
+            size=position_size(confidence, volatility, cfg.max_position_size),
+            fill=fill,
+            stop=stop,
+            take=take,
+            candidates=candidates,
+        )
+        return arrays
+
+    # --- Recherche de sortie ----------------------------------------------
+
+    def _find_exit(self, arrays: Dict[str, np.ndarray], row: int, entry: int, side: int,
+                   stop: float, take: float) -> Tuple[int, float, str]:
+        """Première bougie après `entry` qui touche SL ou TP (fenêtres croissantes vectorisées)."""
+        low, high, open_ = arrays["low"][row], arrays["high"][row], arrays["open"][row]
+        length = len(low)
+        start, chunk = entry + 1, 64
+        while start < length:
+            end = min(length, start + chunk)
+            if side == LONG:
+                stop_hit = low[start:end] <= stop
+                take_hit = high[start:end] >= take
+            else:
+                stop_hit = high[start:end] >= stop
+                take_hit = low[start:end] <= take
+            hit = stop_hit | take_hit
+            if hit.any():
+                offset = int(hit.argmax())
+                bar = start + offset
+                if stop_hit[offset]:
+                    price = min(open_[bar], stop) if side == LONG else max(open_[bar], stop)
+                    return bar, price, "stop_loss"
+                price = max(open_[bar], take) if side == LONG else min(open_[bar], take)
+                return bar, price, "take_profit"
+            start, chunk = end, chunk * 2
+        return length - 1, float(arrays["close"][row, -1]), "end_of_data"
+
+    # --- Boucle événementielle --------------------------------------------
+
+    def run(self, data: Union[OHLCVSeries, Mapping[str, OHLCVSeries]],
+            predictions: Optional[Mapping[str, Predictions]] = None) -> BacktestResult:
+        """Exécute le backtest; `predictions` remplace le prédicteur (tableaux par symbole)."""
+        started = time.perf_counter()
+        cfg = self.config
+        universe = self._as_universe(data)
+        symbols = list(universe)
+        timestamps = next(iter(universe.values())).timestamp.copy()
+        arrays = self._prepare(universe, predictions)
+
+        days = timestamps // MS_PER_DAY
+        candidate_bars = [np.flatnonzero(arrays["candidates"][row]) for row in range(len(symbols))]
+
+        trades: List[BacktestTrade] = []
+        rejected = {"max_open_trades": 0, "daily_loss": 0, "order_size": 0, "capital": 0}
+        realized_equity = cfg.initial_capital
+        committed = 0.0
+        open_heap: List[Tuple[int, int]] = []  # (bougie de sortie, index du trade)
+        current_day, day_start_equity, day_pnl = None, realized_equity, 0.0
+
+        # Prochain candidat de chaque symbole: (bougie, ligne)
+        queue = [(int(bars[0]), row) for row, bars in enumerate(candidate_bars) if len(bars)]
+        heapq.heapify(queue)
+
+        def push_next(row: int, from_bar: int):
+            bars = candidate_bars[row]
+            position = int(np.searchsorted(bars, from_bar, side="left"))
+            if position < len(bars):
+                heapq.heappush(queue, (int(bars[position]), row))
+
+        def close_until(bar: int):
+            nonlocal realized_equity, committed, day_pnl
+            while open_heap and open_heap[0][0] <= bar:
+                _, index = heapq.heappop(open_heap)
+                trade = trades[index]
+                realized_equity += trade.pnl
+                committed -= trade.notional
+                if days[trade.exit_index] == current_day:
+                    day_pnl += trade.pnl
+
+        while queue:
+            bar, row = heapq.heappop(queue)
+            if days[bar] != current_day:
+                # Les sorties de la veille comptent pour la veille
+                close_until(int(np.searchsorted(days, days[bar], side="left")) - 1)
+                current_day, day_start_equity, day_pnl = days[bar], realized_equity, 0.0
+            close_until(bar)
+
+            if day_pnl < -cfg.max_daily_loss * day_start_equity:
+                rejected["daily_loss"] += 1
+                push_next(row, int(np.searchsorted(days, current_day, side="right")))
+                continue
+            if len(open_heap) >= cfg.max_open_trades:
+                rejected["max_open_trades"] += 1
+                push_next(row, open_heap[0][0])
+                continue
+
+            side = int(arrays["direction"][row, bar])
+            entry_price = float(arrays["fill"][row, bar])
+            notional = float(arrays["size"][row, bar]) * realized_equity
+            if notional < cfg.min_order_size or (cfg.max_order_size is not None and notional > cfg.max_order_size):
+                rejected["order_size"] += 1
+                push_next(row, bar + 1)
+                continue
+            if committed + notional > realized_equity:
+                rejected["capital"] += 1
+                push_next(row, bar + 1)
+                continue
+
+            stop, take = float(arrays["stop"][row, bar]), float(arrays["take"][row, bar])
+            exit_bar, level_price, reason = self._find_exit(arrays, row, bar, side, stop, take)
+            exit_price = level_price * (1 - side * cfg.slippage)
+            quantity = notional / entry_price
+            fees = cfg.fee_rate * (notional + quantity * exit_price)
+            trade = BacktestTrade(
+                symbol=symbols[row], side=side,
+                entry_index=bar, entry_time=int(timestamps[bar]), entry_price=entry_price,
+                quantity=quantity, stop_loss=stop, take_profit=take,
+                exit_index=exit_bar, exit_time=int(timestamps[exit_bar]), exit_price=exit_price,
+                exit_reason=reason, fees=fees,
+                pnl=side * quantity * (exit_price - entry_price) - fees,
+            )
+            trades.append(trade)
+            committed += notional
+            heapq.heappush(open_heap, (exit_bar, len(trades) - 1))
+            # Le symbole redevient disponible à la clôture de la bougie de sortie
+            push_next(row, exit_bar)
+
+        equity = self._equity_curve(arrays, symbols, trades)
+        result = BacktestResult(timestamps=timestamps, equity=equity, trades=trades, rejected=rejected)
+        result.stats = self._statistics(result)
+        result.stats["elapsed_seconds"] = round(time.perf_counter() - started, 4)
+        logger.info("📈 Backtest terminé",
+                    symbols=symbols,
+                    bars=len(timestamps),
+                    trades=len(trades),
+                    total_return=result.stats["total_return"],
+                    elapsed_seconds=result.stats["elapsed_seconds"])
+        return result
+
+    # --- Résultats --------------------------------------------------------
+
+    def _equity_curve(self, arrays: Dict[str, np.ndarray], symbols: List[str],
+                      trades: List[BacktestTrade]) -> np.ndarray:
+        """Capital réalisé + latent à chaque clôture."""
+        close = arrays["close"]
+        realized = np.zeros(close.shape[1])
+        unrealized = np.zeros(close.shape[1])
+        rows = {symbol: row for row, symbol in enumerate(symbols)}
+        entry_fees = np.array([self.config.fee_rate * t.notional for t in trades])
+        if trades:
+            np.add.at(realized, [t.exit_index for t in trades], [t.pnl for t in trades])
+        for trade, entry_fee in zip(trades, entry_fees):
+            span = slice(trade.entry_index, trade.exit_index)
+            unrealized[span] += trade.side * trade.quantity * (close[rows[trade.symbol], span] - trade.entry_price) - entry_fee
+        return self.config.initial_capital + np.cumsum(realized) + unrealized
+
+    def _statistics(self, result: BacktestResult) -> Dict[str, Any]:
+        equity, trades = result.equity, result.trades
+        peaks = np.maximum.accumulate(equity)
+        drawdowns = (peaks - equity) / peaks
+        pnls = np.array([t.pnl for t in trades])
+        gains, losses = pnls[pnls > 0].sum(), -pnls[pnls < 0].sum()
+
+        returns = np.diff(equity) / equity[:-1]
+        step = float(np.median(np.diff(result.timestamps))) if len(result.timestamps) > 1 else 0.0
+        sharpe = None
+        if step > 0 and returns.std() > 0:
+            sharpe = float(returns.mean() / returns.std() * np.sqrt(MS_PER_YEAR / step))
+
+        return {
+            "initial_capital": self.config.initial_capital,
+            "final_equity": round(float(equity[-1]), 2),
+            "total_return": round(float(equity[-1] / self.config.initial_capital - 1), 6),
+            "max_drawdown": round(float(drawdowns.max()), 6),
+            "trades": len(trades),
+            "win_rate": round(float((pnls > 0).mean()), 4) if len(pnls) else 0.0,
+            "profit_factor": round(float(gains / losses), 4) if losses > 0 else None,
+            "sharpe": round(sharpe, 4) if sharpe is not None else None,
+            "exit_reasons": {reason: sum(1 for t in trades if t.exit_reason == reason)
+                             for reason in ("stop_loss", "take_profit", "end_of_data")},
+            "rejected": dict(result.rejected),
+        }
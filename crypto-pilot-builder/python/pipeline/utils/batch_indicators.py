@@ -0,0 +1,225 @@
+"""Calcul vectorisé des indicateurs techniques pour plusieurs symboles à la fois."""
+
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+ArrayLike = Union[np.ndarray, Sequence[Sequence[float]], Sequence[float]]
+
+
+class BatchIndicators:
+    """
+    Version matricielle de `TechnicalIndicators`.
+
+    Les prix sont une matrice (symboles × temps) dont les lignes sont alignées
+    sur la même grille temporelle. Chaque méthode retourne un tableau par
+    indicateur (une valeur par symbole), identique à ce que renverrait
+    `TechnicalIndicators` appliqué ligne par ligne.
+    """
+
+    @staticmethod
+    def _as_matrix(values: ArrayLike, name: str = "prices") -> np.ndarray:
+        """Convertit l'entrée en matrice float64 contiguë (symboles × temps)."""
+        matrix = np.ascontiguousarray(values, dtype=np.float64)
+        if matrix.ndim == 1:
+            matrix = matrix[np.newaxis, :]
+        if matrix.ndim != 2:
+            raise ValueError(f"{name} doit être une matrice 2-D (symboles × temps)")
+        return matrix
+
+    @staticmethod
+    def calculate_rsi(prices: ArrayLike, period: int = 14) -> np.ndarray:
+        """Calcule le RSI de chaque symbole."""
+        prices = BatchIndicators._as_matrix(prices)
+        n_symbols, length = prices.shape
+        if length < period + 1:
+            return np.full(n_symbols, 50.0)
+
+        changes = np.diff(prices[:, -(period + 1):], axis=1)
+        avg_gain = np.where(changes > 0, changes, 0.0).mean(axis=1)
+        avg_loss = np.where(changes > 0, 0.0, -changes).mean(axis=1)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        return np.where(avg_loss == 0, 100.0, rsi)
+
+    @staticmethod
+    def calculate_moving_averages(prices: ArrayLike, periods: List[int] = [5, 10, 20, 50]) -> Dict[str, np.ndarray]:
+        """Calcule les moyennes mobiles de chaque symbole."""
+        prices = BatchIndicators._as_matrix(prices)
+        if prices.shape[1] == 0:
+            return {f"ma_{period}": np.zeros(prices.shape[0]) for period in periods}
+        return {f"ma_{period}": prices[:, -period:].mean(axis=1) for period in periods}
+
+    @staticmethod
+    def _ema_series(values: np.ndarray, period: int) -> np.ndarray:
+        """
+        Série EMA complète (NaN avant amorçage), amorcée par la SMA des
+        `period` premières valeurs comme `TechnicalIndicators._calculate_ema`.
+        La récurrence est séquentielle dans le temps mais vectorisée sur les symboles.
+        """
+        n_symbols, length = values.shape
+        series = np.full((n_symbols, length), np.nan)
+        if length < period:
+            return series
+
+        multiplier = 2 / (period + 1)
+        ema = values[:, :period].mean(axis=1)
+        series[:, period - 1] = ema
+        for t in range(period, length):
+            ema = (values[:, t] * multiplier) + (ema * (1 - multiplier))
+            series[:, t] = ema
+        return series
+
+    @staticmethod
+    def calculate_macd(prices: ArrayLike, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict[str, np.ndarray]:
+        """Calcule le MACD de chaque symbole en une seule passe."""
+        prices = BatchIndicators._as_matrix(prices)
+        n_symbols, length = prices.shape
+        if length < slow_period:
+            zeros = np.zeros(n_symbols)
+            return {"macd": zeros, "macd_signal": zeros.copy(), "macd_histogram": zeros.copy()}
+
+        ema_fast = BatchIndicators._ema_series(prices, fast_period)
+        ema_slow = BatchIndicators._ema_series(prices, slow_period)
+        macd_series = ema_fast[:, slow_period - 1:] - ema_slow[:, slow_period - 1:]
+        macd_line = macd_series[:, -1]
+
+        if macd_series.shape[1] >= signal_period:
+            signal_line = BatchIndicators._ema_series(macd_series, signal_period)[:, -1]
+        else:
+            signal_line = macd_line.copy()
+
+        return {
+            "macd": macd_line,
+            "macd_signal": signal_line,
+            "macd_histogram": macd_line - signal_line
+        }
+
+    @staticmethod
+    def calculate_bollinger_bands(prices: ArrayLike, period: int = 20, std_dev: int = 2) -> Dict[str, np.ndarray]:
+        """Calcule les bandes de Bollinger de chaque symbole."""
+        prices = BatchIndicators._as_matrix(prices)
+        n_symbols, length = prices.shape
+        if length < period:
+            zeros = np.zeros(n_symbols)
+            return {"bb_upper": zeros, "bb_middle": zeros.copy(), "bb_lower": zeros.copy(), "bb_width": zeros.copy()}
+
+        window = prices[:, -period:]
+        middle = window.mean(axis=1)
+        std = window.std(axis=1)
+        upper = middle + (std_dev * std)
+        lower = middle - (std_dev * std)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            width = np.where(middle > 0, (upper - lower) / middle, 0.0)
+
+        return {"bb_upper": upper, "bb_middle": middle, "bb_lower": lower, "bb_width": width}
+
+    @staticmethod
+    def calculate_stochastic(prices: ArrayLike, period: int = 14) -> Dict[str, np.ndarray]:
+        """Calcule l'oscillateur stochastique de chaque symbole."""
+        prices = BatchIndicators._as_matrix(prices)
+        n_symbols, length = prices.shape
+        if length < period:
+            return {"stoch_k": np.full(n_symbols, 50.0), "stoch_d": np.full(n_symbols, 50.0)}
+
+        # Toutes les fenêtres complètes: la dernière donne %K, les précédentes alimentent %D
+        windows = sliding_window_view(prices, period, axis=1)
+        highs = windows.max(axis=2)
+        lows = windows.min(axis=2)
+        currents = prices[:, period - 1:]
+        span = highs - lows
+        with np.errstate(divide="ignore", invalid="ignore"):
+            k_series = np.where(span == 0, 50.0, (currents - lows) / span * 100)
+
+        k_percent = k_series[:, -1]
+        d_percent = k_series[:, :-1].mean(axis=1) if k_series.shape[1] > 1 else k_percent.copy()
+        return {"stoch_k": k_percent, "stoch_d": d_percent}
+
+    @staticmethod
+    def _price_returns(prices: np.ndarray):
+        """Rendements simples et masque des prix précédents strictement positifs."""
+        previous = prices[:, :-1]
+        valid = previous > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.where(valid, (prices[:, 1:] - previous) / previous, 0.0)
+        return returns, valid
+
+    @staticmethod
+    def calculate_volume_indicators(prices: ArrayLike, volumes: ArrayLike) -> Dict[str, np.ndarray]:
+        """Calcule les indicateurs de volume de chaque symbole."""
+        prices = BatchIndicators._as_matrix(prices)
+        volumes = BatchIndicators._as_matrix(volumes, "volumes")
+        n_symbols = prices.shape[0]
+        if prices.shape[1] < 2 or volumes.shape[1] < 2:
+            return {
+                "volume_sma": np.zeros(n_symbols),
+                "volume_ratio": np.ones(n_symbols),
+                "price_volume_trend": np.zeros(n_symbols)
+            }
+
+        volume_sma = volumes[:, -20:].mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            volume_ratio = np.where(volume_sma > 0, volumes[:, -1] / volume_sma, 1.0)
+
+        returns, _ = BatchIndicators._price_returns(prices)
+        pvt = (returns * volumes[:, 1:prices.shape[1]]).sum(axis=1)
+
+        return {"volume_sma": volume_sma, "volume_ratio": volume_ratio, "price_volume_trend": pvt}
+
+    @staticmethod
+    def calculate_all_indicators(prices: ArrayLike, volumes: Optional[ArrayLike] = None) -> Dict[str, np.ndarray]:
+        """Calcule tous les indicateurs pour une matrice de prix (symboles × temps)."""
+        prices = BatchIndicators._as_matrix(prices)
+        if prices.shape[1] == 0:
+            return {}
+        if volumes is not None:
+            volumes = BatchIndicators._as_matrix(volumes, "volumes")
+            if volumes.shape[0] != prices.shape[0]:
+                raise ValueError("volumes doit avoir autant de lignes que prices")
+
+        indicators = {"rsi": BatchIndicators.calculate_rsi(prices)}
+        indicators.update(BatchIndicators.calculate_moving_averages(prices))
+        indicators.update(BatchIndicators.calculate_macd(prices))
+        indicators.update(BatchIndicators.calculate_bollinger_bands(prices))
+        indicators.update(BatchIndicators.calculate_stochastic(prices))
+
+        if volumes is not None and volumes.shape[1] > 0:
+            indicators.update(BatchIndicators.calculate_volume_indicators(prices, volumes))
+
+        if prices.shape[1] >= 2:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                momentum = (prices[:, -1] - prices[:, -2]) / prices[:, -2] * 100
+            indicators["momentum"] = np.where(np.isfinite(momentum), momentum, 0.0)
+
+            returns, valid = BatchIndicators._price_returns(prices)
+            counts = valid.sum(axis=1)
+            safe_counts = np.maximum(counts, 1)
+            means = returns.sum(axis=1) / safe_counts
+            deviations = np.where(valid, returns - means[:, np.newaxis], 0.0)
+            variance = (deviations ** 2).sum(axis=1) / safe_counts
+            indicators["volatility"] = np.where(counts > 0, np.sqrt(variance), 0.0)
+
+        return indicators
+
+    @staticmethod
+    def indicators_by_symbol(symbols: List[str], prices: ArrayLike, volumes: Optional[ArrayLike] = None) -> Dict[str, Dict[str, float]]:
+        """Calcule tous les indicateurs et les retourne au format `calculate_all_indicators` par symbole."""
+        prices = BatchIndicators._as_matrix(prices)
+        if len(symbols) != prices.shape[0]:
+            raise ValueError("Le nombre de symboles doit correspondre au nombre de lignes de prices")
+
+        batch = BatchIndicators.calculate_all_indicators(prices, volumes)
+        result = {
+            symbol: {name: float(values[row]) for name, values in batch.items()}
+            for row, symbol in enumerate(symbols)
+        }
+
+        logger.debug("Indicateurs calculés en batch",
+                     symbols=len(symbols),
+                     history_length=prices.shape[1])
+        return result
@@ -0,0 +1,113 @@
+"""Regroupement automatique (micro-batching) des requêtes unitaires en requêtes groupées."""
+
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Dict, Hashable, List, Optional
+
+import structlog
+
+from .cache import BatchFetcher
+
+logger = structlog.get_logger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collecte les clés demandées pendant une courte fenêtre (`window` secondes)
+    et les récupère en un seul appel au fetcher groupé, puis redistribue les
+    résultats aux appelants. Le lot est envoyé immédiatement s'il atteint
+    `max_batch` clés. Une clé demandée plusieurs fois dans la même fenêtre
+    n'est envoyée qu'une fois.
+
+    Si `priority_var` est fourni, le lot est envoyé avec la plus petite valeur
+    (la plus urgente) de cette variable de contexte parmi ses demandeurs.
+    """
+
+    def __init__(self, fetcher: BatchFetcher, window: float = 0.005, max_batch: int = 250,
+                 priority_var: Optional[ContextVar] = None):
+        self.fetcher = fetcher
+        self.window = window
+        self.max_batch = max_batch
+        self.priority_var = priority_var
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._priority = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.stats = {"requests": 0, "keys": 0, "batches": 0}
+
+    async def load(self, key: Hashable) -> Optional[Any]:
+        """Valeur d'une clé, récupérée avec les autres demandes de la fenêtre."""
+        return (await self.load_many([key])).get(key)
+
+    async def load_many(self, keys: List[Hashable]) -> Dict[Hashable, Any]:
+        """Valeurs de plusieurs clés (les absentes de la réponse sont omises)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Nouvelle boucle (ex: thread du pipeline): l'état de l'ancienne est inutilisable
+            self._pending = {}
+            self._priority = None
+            self._timer = None
+            self._loop = loop
+
+        if self.priority_var is not None:
+            priority = self.priority_var.get()
+            if self._priority is None or priority < self._priority:
+                self._priority = priority
+
+        self.stats["requests"] += 1
+        futures = {}
+        for key in dict.fromkeys(keys):
+            future = self._pending.get(key)
+            if future is None:
+                future = loop.create_future()
+                self._pending[key] = future
+            futures[key] = future
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None and self._pending:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        results = {}
+        for key, future in futures.items():
+            value = await asyncio.shield(future)
+            if value is not None:
+                results[key] = value
+        return results
+
+    def _flush(self):
+        """Envoie le lot en attente."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, {}
+        priority, self._priority = self._priority, None
+        if not batch:
+            return
+
+        self.stats["batches"] += 1
+        self.stats["keys"] += len(batch)
+        task = self._loop.create_task(self._run(batch, priority))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[Hashable, asyncio.Future], priority: Any = None):
+        if self.priority_var is not None and priority is not None:
+            self.priority_var.set(priority)  # Contexte propre à cette tâche
+
+        keys = list(batch.keys())
+        results: Dict[Hashable, Any] = {}
+        try:
+            for start in range(0, len(keys), self.max_batch):
+                chunk = keys[start:start + self.max_batch]
+                results.update(await self.fetcher(chunk) or {})
+        except Exception as e:
+            logger.error("❌ Erreur requête groupée", keys=keys, error=str(e))
+        finally:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(results.get(key))
+
+        logger.debug("📦 Lot de requêtes envoyé", size=len(keys))
@@ -0,0 +1,172 @@
+"""Cache LRU asynchrone avec TTL, coalescence des requêtes et stale-while-revalidate."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+BatchFetcher = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    stored_at: float
+
+
+class AsyncTTLCache:
+    """
+    Cache borné (LRU) à expiration, partagé par les appelants asyncio.
+
+    - Une entrée est fraîche pendant `ttl` secondes, puis servie "périmée"
+      pendant `stale_ttl` secondes supplémentaires tout en étant rafraîchie
+      en arrière-plan (stale-while-revalidate).
+    - Les appels concurrents pour une même clé absente partagent une seule
+      requête en vol (single-flight).
+    - Les valeurs `None` (échec de récupération) ne sont jamais mises en cache.
+    """
+
+    def __init__(self, maxsize: int = 512, ttl: float = 30.0, stale_ttl: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize doit être strictement positif")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._tasks = set()  # Références fortes vers les récupérations en cours
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "fetches": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and self._clock() - entry.stored_at < self.ttl
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Optional[Any]:
+        """Valeur en cache si fraîche (ou périmée mais servable si `allow_stale`)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        age = self._clock() - entry.stored_at
+        limit = self.ttl + self.stale_ttl if allow_stale else self.ttl
+        if age >= self.ttl + self.stale_ttl:
+            del self._entries[key]
+            return None
+        if age >= limit:
+            return None
+
+        self._entries.move_to_end(key)
+        return entry.value
+
+    def set(self, key: Hashable, value: Any):
+        """Enregistre une valeur et évince les entrées les moins récemment utilisées."""
+        if value is None:
+            return
+        self._entries[key] = _CacheEntry(value, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Supprime une clé, ou tout le cache."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _inflight_future(self, key: Hashable) -> Optional[asyncio.Future]:
+        """Future en vol pour `key` sur la boucle courante (None sinon)."""
+        future = self._inflight.get(key)
+        if future is None or future.done() or future.get_loop() is not asyncio.get_running_loop():
+            return None
+        return future
+
+    def _start_fetch(self, keys: List[Hashable], fetcher: BatchFetcher) -> Dict[Hashable, asyncio.Future]:
+        """Lance une seule requête pour `keys` et enregistre une future par clé."""
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in keys}
+        self._inflight.update(futures)
+        self.stats["fetches"] += 1
+
+        async def run():
+            results: Dict[Hashable, Any] = {}
+            try:
+                results = await fetcher(list(keys)) or {}
+            except Exception as e:
+                logger.error("❌ Erreur de récupération pour le cache", keys=list(keys), error=str(e))
+            finally:
+                for key, future in futures.items():
+                    value = results.get(key)
+                    self.set(key, value)
+                    if self._inflight.get(key) is future:
+                        del self._inflight[key]
+                    if not future.done():
+                        future.set_result(value)
+
+        task = loop.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return futures
+
+    async def get_or_fetch(self, key: Hashable, fetcher: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """Retourne la valeur en cache ou la récupère une seule fois pour tous les appelants."""
+        async def batch(keys: List[Hashable]) -> Dict[Hashable, Any]:
+            return {key: await fetcher()}
+
+        return (await self.get_many_or_fetch([key], batch)).get(key)
+
+    async def get_many_or_fetch(self, keys: List[Hashable], fetcher: BatchFetcher) -> Dict[Hashable, Any]:
+        """
+        Retourne les valeurs de `keys` en ne récupérant que les clés absentes,
+        en une seule requête groupée. Les clés périmées sont servies puis
+        rafraîchies en arrière-plan.
+        """
+        results: Dict[Hashable, Any] = {}
+        waiting: Dict[Hashable, asyncio.Future] = {}
+        to_fetch: List[Hashable] = []
+        to_refresh: List[Hashable] = []
+
+        for key in dict.fromkeys(keys):
+            value = self.get(key)
+            if value is not None:
+                self.stats["hits"] += 1
+                results[key] = value
+                continue
+
+            inflight = self._inflight_future(key)
+            stale = self.get(key, allow_stale=True)
+            if stale is not None:
+                self.stats["stale_hits"] += 1
+                results[key] = stale
+                if inflight is None:
+                    to_refresh.append(key)
+            elif inflight is not None:
+                self.stats["coalesced"] += 1
+                waiting[key] = inflight
+            else:
+                self.stats["misses"] += 1
+                to_fetch.append(key)
+
+        if to_refresh:
+            logger.debug("🔄 Rafraîchissement en arrière-plan", keys=to_refresh)
+            self._start_fetch(to_refresh, fetcher)
+        if to_fetch:
+            waiting.update(self._start_fetch(to_fetch, fetcher))
+
+        for key, future in waiting.items():
+            value = await asyncio.shield(future)
+            if value is not None:
+                results[key] = value
+
+        return results
@@ -0,0 +1,165 @@
+"""Agrégation incrémentale de ticks de prix en bougies OHLCV multi-timeframe."""
+
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+import structlog
+
+from ..agents.models.market_data import OHLCV
+
+logger = structlog.get_logger(__name__)
+
+# Durée de chaque timeframe supporté, en secondes
+TIMEFRAME_SECONDS: Dict[str, int] = {
+    "1m": 60,
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "1h": 60 * 60,
+}
+
+
+@dataclass
+class _OpenCandle:
+    """Bougie en cours de construction."""
+    start_ms: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    ticks: int = 1
+
+    def to_ohlcv(self) -> OHLCV:
+        return OHLCV(
+            timestamp=self.start_ms,
+            open=self.open,
+            high=self.high,
+            low=self.low,
+            close=self.close,
+            volume=self.volume
+        )
+
+
+class CandleBuilder:
+    """
+    Construit les bougies d'un timeframe à partir de ticks bruts.
+
+    Chaque tick est intégré en O(1) à la bougie ouverte de son symbole. Dès
+    qu'un tick franchit la frontière du timeframe, la bougie précédente est
+    fermée et retournée. Les ticks en retard (antérieurs à la bougie ouverte
+    ou à une bougie déjà fermée) sont ignorés. Aucune bougie n'est inventée
+    pour les périodes sans tick.
+    """
+
+    def __init__(self, timeframe: str = "1m"):
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Timeframe non supporté: {timeframe} (attendu: {', '.join(TIMEFRAME_SECONDS)})")
+        self.timeframe = timeframe
+        self.period_ms = TIMEFRAME_SECONDS[timeframe] * 1000
+        self._candles: Dict[str, _OpenCandle] = {}
+        self._last_closed: Dict[str, int] = {}  # Début de la dernière bougie fermée
+
+    def bucket_start(self, timestamp_ms: int) -> int:
+        """Début (ms) de la période contenant `timestamp_ms`."""
+        return timestamp_ms - (timestamp_ms % self.period_ms)
+
+    def add_tick(self, symbol: str, price: float, volume: float = 0.0,
+                 timestamp_ms: Optional[int] = None) -> Optional[OHLCV]:
+        """Intègre un tick et retourne la bougie fermée s'il ouvre une nouvelle période."""
+        if timestamp_ms is None:
+            timestamp_ms = int(time.time() * 1000)
+        start = self.bucket_start(timestamp_ms)
+        candle = self._candles.get(symbol)
+
+        last_closed = self._last_closed.get(symbol)
+        if (candle is not None and start < candle.start_ms) or \
+                (candle is None and last_closed is not None and start <= last_closed):
+            logger.debug("Tick en retard ignoré", symbol=symbol, timeframe=self.timeframe)
+            return None
+
+        if candle is None or start > candle.start_ms:
+            self._candles[symbol] = _OpenCandle(start, price, price, price, price, volume)
+            if candle is None:
+                return None
+            self._last_closed[symbol] = candle.start_ms
+            return candle.to_ohlcv()
+
+        if price > candle.high:
+            candle.high = price
+        if price < candle.low:
+            candle.low = price
+        candle.close = price
+        candle.volume += volume
+        candle.ticks += 1
+        return None
+
+    def close_due(self, symbol: str, now_ms: Optional[int] = None) -> Optional[OHLCV]:
+        """Ferme la bougie ouverte si sa période est écoulée, même sans nouveau tick."""
+        candle = self._candles.get(symbol)
+        if candle is None:
+            return None
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        if now_ms < candle.start_ms + self.period_ms:
+            return None
+        del self._candles[symbol]
+        self._last_closed[symbol] = candle.start_ms
+        return candle.to_ohlcv()
+
+    def current(self, symbol: str) -> Optional[OHLCV]:
+        """Bougie en cours (non fermée) d'un symbole."""
+        candle = self._candles.get(symbol)
+        return candle.to_ohlcv() if candle else None
+
+    def tick_count(self, symbol: str) -> int:
+        candle = self._candles.get(symbol)
+        return candle.ticks if candle else 0
+
+    def reset(self, symbol: Optional[str] = None):
+        if symbol is None:
+            self._candles.clear()
+            self._last_closed.clear()
+        else:
+            self._candles.pop(symbol, None)
+            self._last_closed.pop(symbol, None)
+
+
+class MultiTimeframeCandleBuilder:
+    """Alimente un `CandleBuilder` par timeframe avec le même flux de ticks."""
+
+    def __init__(self, timeframes: Iterable[str] = ("1m", "5m", "15m", "1h")):
+        self.builders: Dict[str, CandleBuilder] = {tf: CandleBuilder(tf) for tf in timeframes}
+
+    @property
+    def timeframes(self) -> List[str]:
+        return list(self.builders.keys())
+
+    def add_tick(self, symbol: str, price: float, volume: float = 0.0,
+                 timestamp_ms: Optional[int] = None) -> Dict[str, OHLCV]:
+        """Intègre un tick dans chaque timeframe et retourne les bougies fermées par timeframe."""
+        if timestamp_ms is None:
+            timestamp_ms = int(time.time() * 1000)
+
+        closed = {}
+        for timeframe, builder in self.builders.items():
+            candle = builder.add_tick(symbol, price, volume, timestamp_ms)
+            if candle is not None:
+                closed[timeframe] = candle
+        return closed
+
+    def close_due(self, symbol: str, now_ms: Optional[int] = None) -> Dict[str, OHLCV]:
+        """Ferme les bougies dont la période est écoulée."""
+        closed = {}
+        for timeframe, builder in self.builders.items():
+            candle = builder.close_due(symbol, now_ms)
+            if candle is not None:
+                closed[timeframe] = candle
+        return closed
+
+    def current(self, symbol: str, timeframe: str) -> Optional[OHLCV]:
+        return self.builders[timeframe].current(symbol)
+
+    def reset(self, symbol: Optional[str] = None):
+        for builder in self.builders.values():
+            builder.reset(symbol)
@@ -1,76 +1,127 @@
 """Circuit Breaker pattern pour la gestion des erreurs."""
 
+import asyncio
 import time
 import functools
+import threading
 from typing import Callable, Any, Optional
 import structlog
 
 logger = structlog.get_logger(__name__)
 
+class CircuitBreakerOpen(Exception):
+    """Requête rejetée car le circuit est ouvert."""
+
 class CircuitBreaker:
-    """Circuit Breaker pattern pour gérer les erreurs d'API."""
-    
+    """
+    Circuit Breaker pattern pour gérer les erreurs d'API.
+
+    Utilisable comme décorateur de fonctions async ou synchrones; l'état est
+    protégé par un verrou pour être partagé entre threads.
+    """
+
     def __init__(self, fail_max: int = 5, reset_timeout: int = 60):
         self.fail_max = fail_max
         self.reset_timeout = reset_timeout
         self.fail_count = 0
         self.last_fail_time = 0
         self.state = "CLOSED"  # CLOSED, OPEN, HALF_OPEN
-    
+        self._lock = threading.RLock()
+        self._half_open_probe = False  # Un seul appel d'essai en HALF_OPEN
+
     def __call__(self, func: Callable) -> Callable:
         """Décorateur pour appliquer le circuit breaker."""
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await self._call(func, *args, **kwargs)
+            return async_wrapper
+
         @functools.wraps(func)
-        async def wrapper(*args, **kwargs):
-            return await self._call(func, *args, **kwargs)
+        def wrapper(*args, **kwargs):
+            return self.call_sync(func, *args, **kwargs)
         return wrapper
-    
+
+    def _before_call(self):
+        """Vérifie que l'appel est autorisé (lève CircuitBreakerOpen sinon)."""
+        with self._lock:
+            if self.state == "OPEN":
+                if time.time() - self.last_fail_time > self.reset_timeout:
+                    logger.info("Circuit breaker: passage en HALF_OPEN")
+                    self.state = "HALF_OPEN"
+                    self._half_open_probe = False
+                else:
+                    logger.warning("Circuit breaker: circuit OPEN, requête rejetée")
+                    raise CircuitBreakerOpen("Circuit breaker OPEN")
+
+            if self.state == "HALF_OPEN":
+                if self._half_open_probe:
+                    logger.warning("Circuit breaker: essai HALF_OPEN en cours, requête rejetée")
+                    raise CircuitBreakerOpen("Circuit breaker HALF_OPEN")
+                self._half_open_probe = True
+
     async def _call(self, func: Callable, *args, **kwargs) -> Any:
         """Exécute la fonction avec le circuit breaker."""
-        if self.state == "OPEN":
-            if time.time() - self.last_fail_time > self.reset_timeout:
-                logger.info("Circuit breaker: passage en HALF_OPEN")
-                self.state = "HALF_OPEN"
-            else:
-                logger.warning("Circuit breaker: circuit OPEN, requête rejetée")
-                raise Exception("Circuit breaker OPEN")
-        
+        self._before_call()
         try:
             result = await func(*args, **kwargs)
             self._on_success()
             return result
+        except asyncio.CancelledError:
+            # Annulation par l'appelant: ni succès ni échec, mais l'essai HALF_OPEN est libéré
+            with self._lock:
+                self._half_open_probe = False
+            raise
         except Exception as e:
             self._on_failure()
             raise e
-    
+
+    def call_sync(self, func: Callable, *args, **kwargs) -> Any:
+        """Exécute une fonction synchrone avec le circuit breaker."""
+        self._before_call()
+        try:
+            result = func(*args, **kwargs)
+            self._on_success()
+            return result
+        except Exception as e:
+            self._on_failure()
+            raise e
+
     def _on_success(self):
         """Appelé quand la fonction réussit."""
-        if self.state == "HALF_OPEN":
-            logger.info("Circuit breaker: retour en CLOSED")
-            self.state = "CLOSED"
-        self.fail_count = 0
-    
+        with self._lock:
+            if self.state == "HALF_OPEN":
+                logger.info("Circuit breaker: retour en CLOSED")
+                self.state = "CLOSED"
+            self._half_open_probe = False
+            self.fail_count = 0
+
     def _on_failure(self):
         """Appelé quand la fonction échoue."""
-        self.fail_count += 1
-        self.last_fail_time = time.time()
-        
-        if self.fail_count >= self.fail_max:
-            logger.error("Circuit breaker: passage en OPEN", 
-                        fail_count=self.fail_count,
-                        reset_timeout=self.reset_timeout)
-            self.state = "OPEN"
-        else:
-            logger.warning("Circuit breaker: échec", 
-                         fail_count=self.fail_count,
-                         max_fails=self.fail_max)
-    
+        with self._lock:
+            self.fail_count += 1
+            self.last_fail_time = time.time()
+
+            if self.state == "HALF_OPEN" or self.fail_count >= self.fail_max:
+                logger.error("Circuit breaker: passage en OPEN",
+                            fail_count=self.fail_count,
+                            reset_timeout=self.reset_timeout)
+                self.state = "OPEN"
+                self._half_open_probe = False
+            else:
+                logger.warning("Circuit breaker: échec",
+                             fail_count=self.fail_count,
+                             max_fails=self.fail_max)
+
     def get_state(self) -> str:
         """Retourne l'état actuel du circuit breaker."""
         return self.state
-    
+
     def reset(self):
         """Reset manuel du circuit breaker."""
-        self.state = "CLOSED"
-        self.fail_count = 0
-        self.last_fail_time = 0
+        with self._lock:
+            self.state = "CLOSED"
+            self.fail_count = 0
+            self.last_fail_time = 0
+            self._half_open_probe = False
         logger.info("Circuit breaker: reset manuel")
@@ -0,0 +1,475 @@
+"""Journal d'événements du pipeline: segments append-only sur disque, lus par mmap."""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# En-tête d'un enregistrement: taille du corps, CRC32 du corps, horodatage (epoch),
+# longueur du type, drapeaux. Corps = type (utf-8) + charge utile JSON compacte.
+RECORD_HEADER = struct.Struct("<IIdBB")
+# Entrée d'index (une par enregistrement): clé de temps, offset dans le segment
+INDEX_ENTRY = struct.Struct("<dQ")
+
+FLAG_ZLIB = 0x01
+COMPRESS_MIN_BYTES = 512
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+DEFAULT_SEGMENT_BYTES = 8 * 1024 * 1024
+
+
+class EventLogError(Exception):
+    """Journal illisible ou mal configuré."""
+
+
+@dataclass
+class LogEvent:
+    """Événement relu depuis le journal."""
+    seq: int
+    timestamp: datetime
+    kind: str
+    payload: Any
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if hasattr(value, "dict"):
+        return value.dict()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def _to_epoch(timestamp: Any) -> float:
+    """Les datetimes naïfs du pipeline sont en UTC (datetime.utcnow)."""
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+def _from_epoch(epoch: float) -> datetime:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None)
+
+
+def encode_record(kind: str, payload: Any, epoch: float) -> bytes:
+    """Encode un enregistrement (en-tête binaire + JSON compact, compressé si volumineux)."""
+    kind_bytes = kind.encode("utf-8")
+    if len(kind_bytes) > 255:
+        raise EventLogError(f"Type d'événement trop long: {kind}")
+    data = json.dumps(payload, separators=(",", ":"), default=_json_default).encode("utf-8")
+    flags = 0
+    if len(data) >= COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(data, 1)
+        if len(compressed) < len(data):
+            data, flags = compressed, FLAG_ZLIB
+    body = kind_bytes + data
+    return RECORD_HEADER.pack(len(body), zlib.crc32(body), epoch, len(kind_bytes), flags) + body
+
+
+def _decode_body(buffer, offset: int, length: int, kind_length: int, flags: int):
+    body_start = offset + RECORD_HEADER.size
+    kind = bytes(buffer[body_start:body_start + kind_length]).decode("utf-8")
+    data = bytes(buffer[body_start + kind_length:body_start + length])
+    if flags & FLAG_ZLIB:
+        data = zlib.decompress(data)
+    return kind, json.loads(data)
+
+
+class _Segment:
+    """Segment du journal: fichier de données + index (clé de temps, offset) à taille fixe."""
+
+    __slots__ = ("base_seq", "path", "index_path", "count", "size", "first_key", "last_key")
+
+    def __init__(self, directory: str, base_seq: int):
+        self.base_seq = base_seq
+        self.path = os.path.join(directory, f"{base_seq:016d}{SEGMENT_SUFFIX}")
+        self.index_path = os.path.join(directory, f"{base_seq:016d}{INDEX_SUFFIX}")
+        self.count = 0
+        self.size = 0
+        self.first_key: Optional[float] = None
+        self.last_key: Optional[float] = None
+
+    @property
+    def end_seq(self) -> int:
+        return self.base_seq + self.count
+
+    def recover(self) -> float:
+        """
+        Recalcule l'index à partir des données et tronque un éventuel
+        enregistrement partiel en fin de fichier (arrêt brutal pendant une écriture).
+        Retourne la dernière clé de temps.
+        """
+        entries = []
+        with open(self.path, "rb") as handle:
+            data = handle.read()
+
+        offset, last_key = 0, float("-inf")
+        while offset + RECORD_HEADER.size <= len(data):
+            length, crc, epoch, _, _ = RECORD_HEADER.unpack_from(data, offset)
+            end = offset + RECORD_HEADER.size + length
+            if end > len(data) or zlib.crc32(data[offset + RECORD_HEADER.size:end]) != crc:
+                break
+            last_key = max(last_key, epoch)
+            entries.append(INDEX_ENTRY.pack(last_key, offset))
+            offset = end
+
+        if offset != len(data):
+            logger.warning("⚠️ Fin de segment corrompue tronquée",
+                           segment=os.path.basename(self.path),
+                           dropped_bytes=len(data) - offset)
+            with open(self.path, "r+b") as handle:
+                handle.truncate(offset)
+
+        with open(self.index_path, "wb") as handle:
+            handle.write(b"".join(entries))
+
+        self.size = offset
+        self._load_bounds()
+        return last_key
+
+    def index_is_consistent(self) -> bool:
+        if not os.path.exists(self.index_path):
+            return False
+        index_size = os.path.getsize(self.index_path)
+        if index_size % INDEX_ENTRY.size:
+            return False
+        data_size = os.path.getsize(self.path)
+        if index_size == 0:
+            return data_size == 0
+        with open(self.index_path, "rb") as handle:
+            handle.seek(index_size - INDEX_ENTRY.size)
+            _, last_offset = INDEX_ENTRY.unpack(handle.read(INDEX_ENTRY.size))
+            if last_offset + RECORD_HEADER.size > data_size:
+                return False
+        with open(self.path, "rb") as handle:
+            handle.seek(last_offset)
+            length = RECORD_HEADER.unpack(handle.read(RECORD_HEADER.size))[0]
+        return last_offset + RECORD_HEADER.size + length == data_size
+
+    def _load_bounds(self):
+        index_size = os.path.getsize(self.index_path)
+        self.count = index_size // INDEX_ENTRY.size
+        self.size = os.path.getsize(self.path)
+        if self.count:
+            with open(self.index_path, "rb") as handle:
+                self.first_key = INDEX_ENTRY.unpack(handle.read(INDEX_ENTRY.size))[0]
+                handle.seek(index_size - INDEX_ENTRY.size)
+                self.last_key = INDEX_ENTRY.unpack(handle.read(INDEX_ENTRY.size))[0]
+        else:
+            self.first_key = self.last_key = None
+
+    def open_existing(self) -> float:
+        if self.index_is_consistent():
+            self._load_bounds()
+            return self.last_key if self.last_key is not None else float("-inf")
+        return self.recover()
+
+
+class _SegmentView:
+    """Vue mmap en lecture seule d'un segment, bornée à `count` enregistrements."""
+
+    def __init__(self, segment: _Segment, count: int, size: int):
+        self.base_seq = segment.base_seq
+        self.count = count
+        self._data = self._map(segment.path, size)
+        self._index = self._map(segment.index_path, count * INDEX_ENTRY.size)
+
+    @staticmethod
+    def _map(path: str, length: int):
+        if length == 0:
+            return b""
+        with open(path, "rb") as handle:
+            return mmap.mmap(handle.fileno(), length, access=mmap.ACCESS_READ)
+
+    def close(self):
+        for buffer in (self._data, self._index):
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+    def key(self, position: int) -> float:
+        return INDEX_ENTRY.unpack_from(self._index, position * INDEX_ENTRY.size)[0]
+
+    def lower_bound(self, key: float) -> int:
+        """Première position dont la clé est >= key (dichotomie sur l'index mmap)."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def read_kind(self, position: int) -> str:
+        offset = INDEX_ENTRY.unpack_from(self._index, position * INDEX_ENTRY.size)[1]
+        kind_length = RECORD_HEADER.unpack_from(self._data, offset)[3]
+        start = offset + RECORD_HEADER.size
+        return bytes(self._data[start:start + kind_length]).decode("utf-8")
+
+    def read(self, position: int) -> LogEvent:
+        offset = INDEX_ENTRY.unpack_from(self._index, position * INDEX_ENTRY.size)[1]
+        length, _, epoch, kind_length, flags = RECORD_HEADER.unpack_from(self._data, offset)
+        kind, payload = _decode_body(self._data, offset, length, kind_length, flags)
+        return LogEvent(self.base_seq + position, _from_epoch(epoch), kind, payload)
+
+
+class EventLog:
+    """
+    Journal append-only segmenté (un répertoire par journal).
+
+    - Écriture: un enregistrement binaire par événement dans le segment actif,
+      plus une entrée d'index de 16 octets; rotation au-delà de `segment_bytes`.
+    - Lecture: segments et index projetés en mémoire (mmap); les segments hors
+      de la plage demandée sont ignorés et le début de plage est trouvé par
+      dichotomie. Rien n'est chargé en RAM au-delà des enregistrements lus.
+    - Rétention optionnelle par nombre de segments ou par âge.
+
+    Les clés de temps de l'index sont rendues croissantes (une écriture plus
+    ancienne que la précédente prend la clé de la précédente); l'horodatage
+    d'origine reste celui de l'enregistrement.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 retention_days: Optional[float] = None, max_segments: Optional[int] = None,
+                 fsync: bool = False):
+        if segment_bytes <= RECORD_HEADER.size:
+            raise EventLogError("segment_bytes trop petit")
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.retention_days = retention_days
+        self.max_segments = max_segments
+        self.fsync = fsync
+
+        self._lock = threading.RLock()
+        self._segments: List[_Segment] = []
+        self._data_file = None
+        self._index_file = None
+        self._last_key = float("-inf")
+        self._closed = False
+
+        os.makedirs(directory, exist_ok=True)
+        self._open_segments()
+
+    # --- Ouverture / écriture -------------------------------------------
+
+    def _open_segments(self):
+        base_seqs = sorted(
+            int(name[:-len(SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit()
+        )
+        for base_seq in base_seqs:
+            segment = _Segment(self.directory, base_seq)
+            self._last_key = max(self._last_key, segment.open_existing())
+            self._segments.append(segment)
+
+        if not self._segments:
+            self._segments.append(self._create_segment(0))
+        self._open_writer()
+        self._apply_retention()
+
+        logger.info("🗄️ Journal d'événements ouvert",
+                    directory=self.directory,
+                    segments=len(self._segments),
+                    events=self.count())
+
+    def _create_segment(self, base_seq: int) -> _Segment:
+        segment = _Segment(self.directory, base_seq)
+        open(segment.path, "ab").close()
+        open(segment.index_path, "ab").close()
+        return segment
+
+    def _open_writer(self):
+        active = self._segments[-1]
+        self._data_file = open(active.path, "ab")
+        self._index_file = open(active.index_path, "ab")
+
+    def _close_writer(self):
+        for handle in (self._data_file, self._index_file):
+            if handle is not None:
+                handle.close()
+        self._data_file = self._index_file = None
+
+    def append(self, kind: str, payload: Any, timestamp: Any = None) -> int:
+        """Ajoute un événement et retourne son numéro de séquence."""
+        epoch = _to_epoch(timestamp) if timestamp is not None else time.time()
+        record = encode_record(kind, payload, epoch)
+
+        with self._lock:
+            if self._closed:
+                raise EventLogError("Journal fermé")
+            active = self._segments[-1]
+            if active.count and active.size + len(record) > self.segment_bytes:
+                active = self._rotate()
+
+            key = max(epoch, self._last_key)
+            self._data_file.write(record)
+            self._index_file.write(INDEX_ENTRY.pack(key, active.size))
+            self._data_file.flush()
+            self._index_file.flush()
+            if self.fsync:
+                os.fsync(self._data_file.fileno())
+                os.fsync(self._index_file.fileno())
+
+            seq = active.end_seq
+            active.size += len(record)
+            active.count += 1
+            if active.first_key is None:
+                active.first_key = key
+            active.last_key = self._last_key = key
+            return seq
+
+    def extend(self, kind: str, payloads: Iterable[Any], timestamp_of: Callable[[Any], Any] = None) -> int:
+        count = 0
+        for payload in payloads:
+            self.append(kind, payload, timestamp_of(payload) if timestamp_of else None)
+            count += 1
+        return count
+
+    def _rotate(self) -> _Segment:
+        self._close_writer()
+        segment = self._create_segment(self._segments[-1].end_seq)
+        self._segments.append(segment)
+        self._open_writer()
+        self._apply_retention()
+        logger.debug("🔁 Rotation du journal", segment=os.path.basename(segment.path))
+        return segment
+
+    def _apply_retention(self):
+        removable = []
+        closed_segments = self._segments[:-1]
+        if self.max_segments is not None:
+            excess = len(self._segments) - self.max_segments
+            removable.extend(closed_segments[:max(0, excess)])
+        if self.retention_days is not None:
+            cutoff = time.time() - self.retention_days * 86400
+            removable.extend(s for s in closed_segments
+                             if s.last_key is not None and s.last_key < cutoff and s not in removable)
+        for segment in removable:
+            self._segments.remove(segment)
+            for path in (segment.path, segment.index_path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        if removable:
+            logger.info("🧹 Segments expirés supprimés", count=len(removable))
+
+    def close(self):
+        with self._lock:
+            self._close_writer()
+            self._closed = True
+
+    # --- Lecture ----------------------------------------------------------
+
+    def _snapshot(self, start_key: Optional[float], end_key: Optional[float]) -> List[_SegmentView]:
+        """Vues mmap figées des segments qui recoupent [start, end)."""
+        with self._lock:
+            selected = [
+                (segment, segment.count, segment.size) for segment in self._segments
+                if segment.count
+                and (start_key is None or segment.last_key >= start_key)
+                and (end_key is None or segment.first_key < end_key)
+            ]
+            return [_SegmentView(segment, count, size) for segment, count, size in selected]
+
+    def read(self, start: Any = None, end: Any = None, kinds: Optional[Iterable[str]] = None,
+             where: Optional[Callable[[LogEvent], bool]] = None, limit: Optional[int] = None,
+             reverse: bool = False, before_seq: Optional[int] = None) -> Iterator[LogEvent]:
+        """
+        Parcourt les événements de [start, end) (datetime ou epoch), du plus ancien
+        au plus récent, ou l'inverse avec `reverse`. `before_seq` sert de curseur de
+        pagination: seuls les événements de séquence strictement inférieure sont lus.
+        """
+        start_key = _to_epoch(start) if start is not None else None
+        end_key = _to_epoch(end) if end is not None else None
+        kinds = set(kinds) if kinds is not None else None
+        views = self._snapshot(start_key, end_key)
+        if reverse:
+            views.reverse()
+
+        produced = 0
+        try:
+            for view in views:
+                low = view.lower_bound(start_key) if start_key is not None else 0
+                high = view.lower_bound(end_key) if end_key is not None else view.count
+                if before_seq is not None:
+                    high = min(high, max(0, before_seq - view.base_seq))
+                positions = range(high - 1, low - 1, -1) if reverse else range(low, high)
+                for position in positions:
+                    if kinds is not None and view.read_kind(position) not in kinds:
+                        continue
+                    event = view.read(position)
+                    if where is not None and not where(event):
+                        continue
+                    yield event
+                    produced += 1
+                    if limit is not None and produced >= limit:
+                        return
+        finally:
+            for view in views:
+                view.close()
+
+    def latest(self, limit: int = 100, **filters) -> List[LogEvent]:
+        """Les `limit` derniers événements correspondant aux filtres, du plus ancien au plus récent."""
+        if limit <= 0:
+            return []
+        events = list(self.read(limit=limit, reverse=True, **filters))
+        events.reverse()
+        return events
+
+    def count(self) -> int:
+        with self._lock:
+            return sum(segment.count for segment in self._segments)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            populated = [s for s in self._segments if s.count]
+            return {
+                "directory": self.directory,
+                "segments": len(self._segments),
+                "events": sum(s.count for s in self._segments),
+                "bytes": sum(s.size for s in self._segments),
+                "first_seq": self._segments[0].base_seq,
+                "next_seq": self._segments[-1].end_seq,
+                "oldest": _from_epoch(populated[0].first_key) if populated else None,
+                "newest": _from_epoch(populated[-1].last_key) if populated else None,
+            }
+
+
+def open_event_log_from_env(default_directory: str = "logs/pipeline_events") -> Optional[EventLog]:
+    """
+    Ouvre le journal configuré par PIPELINE_EVENT_LOG_DIR (chaîne vide = désactivé).
+    Une erreur d'ouverture désactive la persistance sans bloquer le pipeline.
+    """
+    directory = os.getenv("PIPELINE_EVENT_LOG_DIR", default_directory)
+    if not directory:
+        return None
+    retention = os.getenv("PIPELINE_EVENT_LOG_RETENTION_DAYS", "30")
+    try:
+        return EventLog(
+            directory,
+            segment_bytes=int(os.getenv("PIPELINE_EVENT_LOG_SEGMENT_BYTES", str(DEFAULT_SEGMENT_BYTES))),
+            retention_days=float(retention) if retention else None,
+            fsync=os.getenv("PIPELINE_EVENT_LOG_FSYNC", "false").lower() == "true"
+        )
+    except (OSError, ValueError, EventLogError) as e:
+        logger.error("❌ Journal d'événements indisponible", directory=directory, error=str(e))
+        return None
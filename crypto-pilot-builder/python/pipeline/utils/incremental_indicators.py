@@ -0,0 +1,441 @@
+"""Moteur d'indicateurs techniques incrémental (mise à jour tick par tick)."""
+
+import math
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class _EMAState:
+    """EMA amorcée par la SMA des `period` premières valeurs, comme `_calculate_ema`."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.multiplier = 2 / (period + 1)
+        self.seed: List[float] = []
+        self.value: Optional[float] = None
+
+    def update(self, price: float) -> Optional[float]:
+        if self.value is None:
+            self.seed.append(price)
+            if len(self.seed) == self.period:
+                self.value = float(np.mean(self.seed))
+                self.seed = []
+            return self.value
+
+        self.value = (price * self.multiplier) + (self.value * (1 - self.multiplier))
+        return self.value
+
+
+class _MonotonicWindow:
+    """Plus haut / plus bas glissants en O(1) amorti."""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.index = 0
+        self.max_queue: Deque = deque()
+        self.min_queue: Deque = deque()
+
+    def push(self, price: float):
+        while self.max_queue and self.max_queue[-1][1] <= price:
+            self.max_queue.pop()
+        self.max_queue.append((self.index, price))
+
+        while self.min_queue and self.min_queue[-1][1] >= price:
+            self.min_queue.pop()
+        self.min_queue.append((self.index, price))
+
+        self.index += 1
+        oldest = self.index - self.period
+        if self.max_queue[0][0] < oldest:
+            self.max_queue.popleft()
+        if self.min_queue[0][0] < oldest:
+            self.min_queue.popleft()
+
+    @property
+    def high(self) -> float:
+        return self.max_queue[0][1]
+
+    @property
+    def low(self) -> float:
+        return self.min_queue[0][1]
+
+
+class IncrementalIndicators:
+    """
+    Indicateurs techniques d'un symbole mis à jour en O(1) par tick.
+
+    Reproduit les valeurs de `TechnicalIndicators.calculate_all_indicators`
+    sur l'historique complet des ticks reçus, sans jamais le recalculer.
+    Les volumes doivent être fournis à chaque tick ou jamais.
+    """
+
+    # Resynchronisation périodique des sommes glissantes (dérive flottante)
+    RESYNC_INTERVAL = 1000
+
+    def __init__(self,
+                 rsi_period: int = 14,
+                 ma_periods: Optional[List[int]] = None,
+                 macd_fast: int = 12,
+                 macd_slow: int = 26,
+                 macd_signal: int = 9,
+                 bollinger_period: int = 20,
+                 bollinger_std: int = 2,
+                 stoch_period: int = 14,
+                 volume_period: int = 20,
+                 wilder_rsi: bool = False):
+        """
+        Initialise l'état des indicateurs.
+
+        Args:
+            wilder_rsi: Lissage de Wilder pour le RSI au lieu de la moyenne
+                simple utilisée par `TechnicalIndicators.calculate_rsi`
+        """
+        self.rsi_period = rsi_period
+        self.ma_periods = ma_periods or [5, 10, 20, 50]
+        self.macd_slow_period = macd_slow
+        self.macd_signal_period = macd_signal
+        self.bollinger_period = bollinger_period
+        self.bollinger_std = bollinger_std
+        self.stoch_period = stoch_period
+        self.volume_period = volume_period
+        self.wilder_rsi = wilder_rsi
+
+        self.count = 0
+        self.last_price: Optional[float] = None
+        self.prev_price: Optional[float] = None
+
+        # RSI: gains / pertes glissants
+        self._gains: Deque[float] = deque(maxlen=rsi_period)
+        self._losses: Deque[float] = deque(maxlen=rsi_period)
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._wilder_gain: Optional[float] = None
+        self._wilder_loss: Optional[float] = None
+
+        # Moyennes mobiles: une fenêtre par période
+        self._ma_windows: Dict[int, Deque[float]] = {p: deque(maxlen=p) for p in self.ma_periods}
+        self._ma_sums: Dict[int, float] = {p: 0.0 for p in self.ma_periods}
+
+        # MACD
+        self._ema_fast = _EMAState(macd_fast)
+        self._ema_slow = _EMAState(macd_slow)
+        self._ema_signal = _EMAState(macd_signal)
+        self._macd = 0.0
+        self._macd_signal: Optional[float] = None
+
+        # Bollinger: moyenne et M2 glissants (Welford)
+        self._bb_window: Deque[float] = deque(maxlen=bollinger_period)
+        self._bb_mean = 0.0
+        self._bb_m2 = 0.0
+
+        # Stochastique
+        self._stoch_window = _MonotonicWindow(stoch_period)
+        self._last_k: Optional[float] = None
+        self._k_sum = 0.0
+        self._k_count = 0
+
+        # Volume
+        self._volume_window: Deque[float] = deque(maxlen=volume_period)
+        self._volume_sum = 0.0
+        self._volume_count = 0
+        self._last_volume = 0.0
+        self._pvt = 0.0
+
+        # Volatilité: Welford sur tous les rendements
+        self._ret_count = 0
+        self._ret_mean = 0.0
+        self._ret_m2 = 0.0
+
+    def update(self, price: float, volume: Optional[float] = None) -> Dict[str, float]:
+        """Intègre un nouveau tick et retourne les indicateurs à jour."""
+        self._ingest(float(price), volume)
+        return self.snapshot()
+
+    def extend(self, prices, volumes=None) -> Dict[str, float]:
+        """
+        Intègre une série de ticks (listes ou tableaux NumPy; volumes NaN ignorés)
+        et ne calcule l'instantané qu'une fois, à la fin.
+        """
+        # Les mises à jour sont scalaires: une seule conversion en floats Python
+        prices = np.asarray(prices, dtype=np.float64).tolist()
+        if volumes is None:
+            for price in prices:
+                self._ingest(price, None)
+        else:
+            volumes = np.asarray(volumes, dtype=np.float64).tolist()
+            if len(volumes) != len(prices):
+                raise ValueError("prices et volumes doivent avoir la même longueur")
+            for price, volume in zip(prices, volumes):
+                self._ingest(price, None if volume != volume else volume)
+        return self.snapshot()
+
+    def _ingest(self, price: float, volume: Optional[float]):
+        self.prev_price = self.last_price
+        self.last_price = price
+        self.count += 1
+
+        self._update_rsi(price)
+        self._update_moving_averages(price)
+        self._update_macd(price)
+        self._update_bollinger(price)
+        self._update_stochastic(price)
+        if volume is not None:
+            self._update_volume(price, float(volume))
+        self._update_volatility(price)
+
+        if self.count % self.RESYNC_INTERVAL == 0:
+            self._resync()
+
+    def snapshot(self) -> Dict[str, float]:
+        """Retourne les indicateurs courants sans nouveau tick."""
+        if self.count == 0:
+            return {}
+
+        indicators = {"rsi": self._rsi()}
+        for period in self.ma_periods:
+            window = self._ma_windows[period]
+            indicators[f"ma_{period}"] = float(self._ma_sums[period] / len(window))
+        indicators.update(self._macd_values())
+        indicators.update(self._bollinger_values())
+        indicators.update(self._stochastic_values())
+        if self._volume_count > 0:
+            indicators.update(self._volume_values())
+
+        if self.count >= 2:
+            indicators["momentum"] = float((self.last_price - self.prev_price) / self.prev_price * 100) if self.prev_price else 0.0
+            indicators["volatility"] = float(math.sqrt(self._ret_m2 / self._ret_count)) if self._ret_count else 0.0
+
+        return indicators
+
+    # ------------------------------------------------------------------
+    # Mises à jour par indicateur
+    # ------------------------------------------------------------------
+
+    def _update_rsi(self, price: float):
+        if self.prev_price is None:
+            return
+
+        change = price - self.prev_price
+        gain = change if change > 0 else 0.0
+        loss = abs(change) if change <= 0 else 0.0
+
+        if len(self._gains) == self.rsi_period:
+            self._gain_sum -= self._gains[0]
+            self._loss_sum -= self._losses[0]
+        self._gains.append(gain)
+        self._losses.append(loss)
+        self._gain_sum += gain
+        self._loss_sum += loss
+
+        if self.wilder_rsi:
+            if self._wilder_gain is None:
+                if len(self._gains) == self.rsi_period:
+                    self._wilder_gain = self._gain_sum / self.rsi_period
+                    self._wilder_loss = self._loss_sum / self.rsi_period
+            else:
+                self._wilder_gain = (self._wilder_gain * (self.rsi_period - 1) + gain) / self.rsi_period
+                self._wilder_loss = (self._wilder_loss * (self.rsi_period - 1) + loss) / self.rsi_period
+
+    def _rsi(self) -> float:
+        if self.count < self.rsi_period + 1:
+            return 50.0
+
+        if self.wilder_rsi:
+            avg_gain, avg_loss = self._wilder_gain, self._wilder_loss
+        else:
+            avg_gain = self._gain_sum / self.rsi_period
+            # Une fenêtre sans perte doit donner exactement 100
+            avg_loss = self._loss_sum / self.rsi_period if any(self._losses) else 0.0
+
+        if avg_loss == 0:
+            return 100.0
+
+        rs = avg_gain / avg_loss
+        return float(100 - (100 / (1 + rs)))
+
+    def _update_moving_averages(self, price: float):
+        for period, window in self._ma_windows.items():
+            if len(window) == period:
+                self._ma_sums[period] -= window[0]
+            window.append(price)
+            self._ma_sums[period] += price
+
+    def _update_macd(self, price: float):
+        fast = self._ema_fast.update(price)
+        slow = self._ema_slow.update(price)
+        if slow is None:
+            return
+
+        self._macd = fast - slow
+        self._macd_signal = self._ema_signal.update(self._macd)
+
+    def _macd_values(self) -> Dict[str, float]:
+        if self.count < self.macd_slow_period:
+            return {"macd": 0.0, "macd_signal": 0.0, "macd_histogram": 0.0}
+
+        signal = self._macd_signal if self._macd_signal is not None else self._macd
+        return {
+            "macd": float(self._macd),
+            "macd_signal": float(signal),
+            "macd_histogram": float(self._macd - signal)
+        }
+
+    def _update_bollinger(self, price: float):
+        window = self._bb_window
+        if len(window) < self.bollinger_period:
+            window.append(price)
+            delta = price - self._bb_mean
+            self._bb_mean += delta / len(window)
+            self._bb_m2 += delta * (price - self._bb_mean)
+            return
+
+        old = window[0]
+        window.append(price)
+        old_mean = self._bb_mean
+        self._bb_mean += (price - old) / self.bollinger_period
+        self._bb_m2 += (price - old) * (price - self._bb_mean + old - old_mean)
+
+    def _bollinger_values(self) -> Dict[str, float]:
+        if len(self._bb_window) < self.bollinger_period:
+            return {"bb_upper": 0.0, "bb_middle": 0.0, "bb_lower": 0.0, "bb_width": 0.0}
+
+        middle = self._bb_mean
+        std = math.sqrt(max(self._bb_m2, 0.0) / self.bollinger_period)
+        upper = middle + (self.bollinger_std * std)
+        lower = middle - (self.bollinger_std * std)
+        width = (upper - lower) / middle if middle > 0 else 0
+
+        return {
+            "bb_upper": float(upper),
+            "bb_middle": float(middle),
+            "bb_lower": float(lower),
+            "bb_width": float(width)
+        }
+
+    def _update_stochastic(self, price: float):
+        # %D = moyenne des %K de tous les préfixes précédents (cf. calculate_stochastic)
+        if self._last_k is not None:
+            self._k_sum += self._last_k
+            self._k_count += 1
+
+        self._stoch_window.push(price)
+        if self.count < self.stoch_period:
+            return
+
+        high, low = self._stoch_window.high, self._stoch_window.low
+        self._last_k = 50.0 if high == low else ((price - low) / (high - low)) * 100
+
+    def _stochastic_values(self) -> Dict[str, float]:
+        if self.count < self.stoch_period:
+            return {"stoch_k": 50.0, "stoch_d": 50.0}
+
+        d_percent = self._k_sum / self._k_count if self._k_count else self._last_k
+        return {"stoch_k": float(self._last_k), "stoch_d": float(d_percent)}
+
+    def _update_volume(self, price: float, volume: float):
+        if len(self._volume_window) == self.volume_period:
+            self._volume_sum -= self._volume_window[0]
+        self._volume_window.append(volume)
+        self._volume_sum += volume
+        self._volume_count += 1
+        self._last_volume = volume
+
+        if self.prev_price is not None:
+            price_change = (price - self.prev_price) / self.prev_price if self.prev_price > 0 else 0
+            self._pvt += price_change * volume
+
+    def _volume_values(self) -> Dict[str, float]:
+        if self.count < 2 or self._volume_count < 2:
+            return {"volume_sma": 0.0, "volume_ratio": 1.0, "price_volume_trend": 0.0}
+
+        volume_sma = self._volume_sum / len(self._volume_window)
+        volume_ratio = self._last_volume / volume_sma if volume_sma > 0 else 1.0
+        return {
+            "volume_sma": float(volume_sma),
+            "volume_ratio": float(volume_ratio),
+            "price_volume_trend": float(self._pvt)
+        }
+
+    def _update_volatility(self, price: float):
+        if self.prev_price is None or self.prev_price <= 0:
+            return
+
+        ret = (price - self.prev_price) / self.prev_price
+        self._ret_count += 1
+        delta = ret - self._ret_mean
+        self._ret_mean += delta / self._ret_count
+        self._ret_m2 += delta * (ret - self._ret_mean)
+
+    def _resync(self):
+        """Recalcule les sommes glissantes depuis les fenêtres pour borner la dérive."""
+        self._gain_sum = float(sum(self._gains))
+        self._loss_sum = float(sum(self._losses))
+        for period, window in self._ma_windows.items():
+            self._ma_sums[period] = float(sum(window))
+        self._volume_sum = float(sum(self._volume_window))
+        if self._bb_window:
+            values = np.fromiter(self._bb_window, dtype=np.float64)
+            self._bb_mean = float(values.mean())
+            self._bb_m2 = float(((values - self._bb_mean) ** 2).sum())
+
+
+class IndicatorEngine:
+    """
+    Registre d'états `IncrementalIndicators` par clé.
+
+    La clé est un symbole, ou un couple (symbole, timeframe) quand plusieurs
+    timeframes d'un même symbole sont suivis: chaque série doit avoir son
+    propre état pour que les bougies d'un timeframe ne se mêlent pas à celles
+    d'un autre.
+    """
+
+    def __init__(self, **indicator_params):
+        self.indicator_params = indicator_params
+        self.states: Dict[Hashable, IncrementalIndicators] = {}
+
+    def get_state(self, symbol: str) -> IncrementalIndicators:
+        """Retourne (et crée si besoin) l'état d'un symbole."""
+        state = self.states.get(symbol)
+        if state is None:
+            state = IncrementalIndicators(**self.indicator_params)
+            self.states[symbol] = state
+            logger.debug("État indicateurs créé", symbol=symbol)
+        return state
+
+    def update(self, symbol: str, price: float, volume: Optional[float] = None) -> Dict[str, float]:
+        """Intègre un tick pour un symbole et retourne ses indicateurs."""
+        return self.get_state(symbol).update(price, volume)
+
+    def update_many(self, symbol: str, prices, volumes=None) -> Dict[str, float]:
+        """Intègre une série de ticks (tableaux NumPy acceptés) et retourne les indicateurs finaux."""
+        return self.get_state(symbol).extend(prices, volumes)
+
+    def warm_up(self, symbol: str, prices: List[float], volumes: Optional[List[float]] = None) -> Dict[str, float]:
+        """Rejoue un historique existant dans l'état d'un symbole."""
+        state = self.get_state(symbol)
+        for i, price in enumerate(prices):
+            volume = volumes[i] if volumes and i < len(volumes) else None
+            state.update(price, volume)
+        return state.snapshot()
+
+    def snapshot(self, symbol: str) -> Dict[str, float]:
+        """Indicateurs courants d'un symbole ({} si inconnu)."""
+        state = self.states.get(symbol)
+        return state.snapshot() if state else {}
+
+    def tick_count(self, symbol: str) -> int:
+        """Nombre de ticks intégrés pour un symbole."""
+        state = self.states.get(symbol)
+        return state.count if state else 0
+
+    def reset(self, symbol: Optional[str] = None):
+        """Réinitialise un symbole, ou tous les symboles."""
+        if symbol is None:
+            self.states.clear()
+        else:
+            self.states.pop(symbol, None)
@@ -11,6 +11,10 @@ from typing import Dict, Any, Optional, List
 from datetime import datetime
 import os
 
+from .cache import AsyncTTLCache
+from .batching import MicroBatcher
+from .rate_limiter import Priority, priority_scope, rate_limited_request, request_priority
+
 logger = structlog.get_logger(__name__)
 
 class MarketDataService:
@@ -20,9 +24,23 @@ class MarketDataService:
         self.coingecko_base_url = "https://api.coingecko.com/api/v3"
         self.session = None
         
-        # Cache pour éviter trop d'appels API
-        self.price_cache = {}
+        # Cache partagé pour éviter trop d'appels API (LRU + TTL, requêtes coalescées)
         self.cache_duration = 30  # secondes
+        self.stale_duration = 120  # secondes pendant lesquelles un prix périmé reste servi
+        self.price_cache = AsyncTTLCache(
+            maxsize=512,
+            ttl=self.cache_duration,
+            stale_ttl=self.stale_duration
+        )
+        
+        # Les demandes arrivant dans la même fenêtre partagent un seul appel /simple/price
+        self.batch_window = 0.005  # secondes
+        self.price_batcher = MicroBatcher(
+            self._fetch_prices,
+            window=self.batch_window,
+            max_batch=250,
+            priority_var=request_priority
+        )
         
     async def get_session(self):
         """Crée une session aiohttp si nécessaire."""
@@ -33,56 +51,48 @@ class MarketDataService:
             )
         return self.session
     
-    async def get_crypto_price(self, coin_id: str) -> Optional[float]:
-        """Récupère le prix d'une crypto via CoinGecko."""
+    async def get_crypto_price(self, coin_id: str, priority: Optional[Priority] = None) -> Optional[float]:
+        """Récupère le prix d'une crypto via CoinGecko (priorité: trading > dashboard)."""
         try:
-            session = await self.get_session()
-            
-            # Vérifier le cache
-            cache_key = f"price_{coin_id}"
-            if cache_key in self.price_cache:
-                cached_data = self.price_cache[cache_key]
-                if (datetime.now() - cached_data["timestamp"]).seconds < self.cache_duration:
-                    logger.info("Prix récupéré du cache", coin=coin_id, price=cached_data["price"])
-                    return cached_data["price"]
-            
-            url = f"{self.coingecko_base_url}/simple/price"
-            params = {"ids": coin_id, "vs_currencies": "usd"}
-            
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    price = data.get(coin_id, {}).get("usd")
-                    
-                    if price:
-                        # Mettre en cache
-                        self.price_cache[cache_key] = {
-                            "price": price,
-                            "timestamp": datetime.now()
-                        }
-                        
-                        logger.info("Prix temps réel récupéré", 
-                                  coin=coin_id, price=price, source="CoinGecko")
-                        return price
-                    else:
-                        logger.warning("Prix non trouvé", coin=coin_id)
-                        return None
-                else:
-                    logger.error("Erreur API CoinGecko", 
-                               coin=coin_id, status=response.status)
-                    return None
-                    
+            with priority_scope(priority):
+                prices = await self.price_cache.get_many_or_fetch([coin_id], self.price_batcher.load_many)
+            return prices.get(coin_id)
         except Exception as e:
             logger.error("Erreur récupération prix", coin=coin_id, error=str(e))
             return None
     
-
+    async def _fetch_prices(self, coin_ids: List[str]) -> Dict[str, float]:
+        """Appel CoinGecko pour les cryptos absentes du cache (une seule requête)."""
+        session = await self.get_session()
+        
+        url = f"{self.coingecko_base_url}/simple/price"
+        params = {"ids": ",".join(coin_ids), "vs_currencies": "usd"}
+        
+        # Jeton de l'hôte CoinGecko (priorité héritée de l'appelant)
+        response = await rate_limited_request(session, "GET", url, params=params)
+        if response.status != 200:
+            logger.error("Erreur API CoinGecko", 
+                       coins=coin_ids, status=response.status)
+            return {}
+        
+        data = response.json()
+        prices = {}
+        for coin_id in coin_ids:
+            price = data.get(coin_id, {}).get("usd")
+            if price:
+                prices[coin_id] = price
+            else:
+                logger.warning("Prix non trouvé", coin=coin_id)
+        
+        logger.info("Prix temps réel récupérés", 
+                  coins=list(prices.keys()), source="CoinGecko")
+        return prices
     
-    async def get_complete_market_data(self, coin_id: str) -> Dict[str, Any]:
+    async def get_complete_market_data(self, coin_id: str, priority: Optional[Priority] = None) -> Dict[str, Any]:
         """Récupère les données de prix crypto."""
         try:
             # Récupérer le prix crypto
-            price = await self.get_crypto_price(coin_id)
+            price = await self.get_crypto_price(coin_id, priority)
             
             if price:
                 return {
@@ -111,36 +121,15 @@ class MarketDataService:
                 "error": str(e)
             }
     
-    async def get_multiple_prices(self, coin_ids: List[str]) -> Dict[str, float]:
-        """Récupère les prix de plusieurs cryptos."""
+    async def get_multiple_prices(self, coin_ids: List[str], priority: Optional[Priority] = None) -> Dict[str, float]:
+        """Récupère les prix de plusieurs cryptos (seules les absentes du cache sont demandées)."""
         try:
-            session = await self.get_session()
-            
-            url = f"{self.coingecko_base_url}/simple/price"
-            params = {"ids": ",".join(coin_ids), "vs_currencies": "usd"}
+            with priority_scope(priority):
+                prices = await self.price_cache.get_many_or_fetch(coin_ids, self.price_batcher.load_many)
             
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    prices = {}
-                    
-                    for coin_id in coin_ids:
-                        price = data.get(coin_id, {}).get("usd")
-                        if price:
-                            prices[coin_id] = price
-                            # Mettre en cache
-                            cache_key = f"price_{coin_id}"
-                            self.price_cache[cache_key] = {
-                                "price": price,
-                                "timestamp": datetime.now()
-                            }
-                    
-                    logger.info("Prix multiples récupérés", 
-                              coins=list(prices.keys()), count=len(prices))
-                    return prices
-                else:
-                    logger.error("Erreur API CoinGecko multiple", status=response.status)
-                    return {}
+            logger.info("Prix multiples récupérés", 
+                      coins=list(prices.keys()), count=len(prices))
+            return prices
                     
         except Exception as e:
             logger.error("Erreur récupération prix multiples", error=str(e))
@@ -0,0 +1,188 @@
+"""Détection des cryptomonnaies mentionnées dans un texte (automate multi-motifs en une passe)."""
+
+import json
+import os
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Symbole -> noms usuels (insensibles à la casse); le symbole lui-même est
+# reconnu en majuscules ("ETH") ou préfixé d'un dollar ("$eth")
+DEFAULT_ALIASES: Dict[str, List[str]] = {
+    "BTC": ["Bitcoin", "XBT"],
+    "ETH": ["Ethereum", "Ether"],
+    "ADA": ["Cardano"],
+    "DOT": ["Polkadot"],
+    "SOL": ["Solana"],
+    "MATIC": ["Polygon"],
+    "AVAX": [],
+    "UNI": ["Uniswap"],
+    "LINK": ["Chainlink"],
+    "BNB": ["Binance Coin"],
+    "XRP": ["Ripple"],
+    "DOGE": ["Dogecoin"],
+    "SHIB": ["Shiba Inu"],
+    "LTC": ["Litecoin"],
+    "BCH": ["Bitcoin Cash"],
+    "XLM": ["Stellar Lumens"],
+    "VET": ["VeChain"],
+    "TRX": ["Tron"],
+    "ATOM": ["Cosmos Hub"],
+    "NEAR": ["NEAR Protocol"],
+    "FTM": ["Fantom"],
+    "ALGO": ["Algorand"],
+    "ICP": ["Internet Computer"],
+    "FIL": ["Filecoin"],
+    "THETA": ["Theta Network"],
+    "EOS": [],
+    "AAVE": ["Aave"],
+}
+
+# Mots: lettres/chiffres Unicode, éventuellement précédés d'un "$" (cashtag)
+TOKEN_PATTERN = re.compile(r"\$?[^\W_]+")
+
+
+def _token_key(token: str) -> str:
+    """Clé d'automate: majuscules pour un ticker (MAJUSCULES ou cashtag), minuscules sinon."""
+    if token[0] == "$":
+        return token[1:].upper()
+    return token if token.isupper() else token.lower()
+
+
+class MentionExtractor:
+    """
+    Automate d'Aho–Corasick sur l'alphabet des mots.
+
+    Le texte est découpé en mots par une seule expression régulière (en C),
+    puis parcouru une fois par l'automate: chaque mot coûte une recherche de
+    dictionnaire, quel que soit le nombre de symboles et d'alias. Travailler
+    sur des mots entiers donne les frontières de mots gratuitement (pas
+    d'"ETH" dans "TOGETHER" ni d'"UNI" dans "UNITED") et gère les alias de
+    plusieurs mots ("Shiba Inu", "Bitcoin Cash") avec priorité au plus long.
+
+    Les tickers ne sont reconnus qu'en majuscules ou en cashtag pour ne pas
+    confondre "near", "link" ou "dot" avec NEAR, LINK ou DOT; les noms sont
+    insensibles à la casse.
+    """
+
+    def __init__(self, aliases: Optional[Mapping[str, Iterable[str]]] = None):
+        self.aliases = {symbol.upper(): list(names) for symbol, names in (aliases or DEFAULT_ALIASES).items()}
+        # États: transitions, lien d'échec, motif (symbole, longueur) le plus long se terminant ici
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Optional[Tuple[str, int]]] = [None]  # (symbole, nombre de mots)
+        for symbol, names in self.aliases.items():
+            self._add((symbol,), symbol)
+            for name in names:
+                words = tuple(TOKEN_PATTERN.findall(name))
+                if not words:
+                    continue
+                self._add(tuple(word.lower() for word in words), symbol)
+                self._add(tuple(word.upper() for word in words), symbol)  # Titres en capitales
+        self._build()
+
+    @classmethod
+    def from_file(cls, path: str, merge_defaults: bool = True) -> "MentionExtractor":
+        """Charge un dictionnaire JSON {"SYMBOLE": ["Nom", ...]} (fusionné aux valeurs par défaut)."""
+        with open(path, "r", encoding="utf-8") as f:
+            custom = json.load(f)
+        aliases = {**DEFAULT_ALIASES, **custom} if merge_defaults else custom
+        return cls(aliases)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self.aliases)
+
+    def _add(self, words: Tuple[str, ...], symbol: str):
+        state = 0
+        for word in words:
+            state = self._goto[state].setdefault(word, len(self._goto))
+            if state == len(self._goto):
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+        current = self._output[state]
+        if current is None or current[1] < len(words):
+            self._output[state] = (symbol, len(words))
+
+    def _build(self):
+        """Liens d'échec en largeur; chaque état hérite de la sortie la plus longue de son suffixe."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[child] = target if target != child else 0
+                if self._output[child] is None:
+                    self._output[child] = self._output[self._fail[child]]
+
+    def _scan(self, text: str) -> List[str]:
+        """Symboles de chaque mention dans l'ordre du texte (plus long alias à gauche d'abord)."""
+        goto, fail, output = self._goto, self._fail, self._output
+        root = goto[0]
+        state = 0
+        matches = []
+        for position, token in enumerate(TOKEN_PATTERN.findall(text)):
+            key = _token_key(token)
+            if state == 0:
+                state = root.get(key, 0)
+            else:
+                while state and key not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(key, 0)
+            if state and output[state] is not None:
+                symbol, length = output[state]
+                matches.append((position - length + 1, position, symbol))
+        if len(matches) < 2:
+            return [symbol for _, _, symbol in matches]
+
+        # "Bitcoin Cash" contient "Bitcoin": on ne garde que les mentions qui ne se chevauchent pas
+        matches.sort(key=lambda m: (m[0], m[0] - m[1]))
+        symbols, last_end = [], -1
+        for start, end, symbol in matches:
+            if start > last_end:
+                symbols.append(symbol)
+                last_end = end
+        return symbols
+
+    def extract(self, text: Optional[str]) -> List[str]:
+        """Symboles mentionnés, sans doublon, dans l'ordre de première apparition."""
+        if not text:
+            return []
+        seen: Dict[str, None] = {}
+        for symbol in self._scan(text):
+            seen.setdefault(symbol, None)
+        return list(seen)
+
+    def count(self, text: Optional[str]) -> Dict[str, int]:
+        """Nombre de mentions par symbole."""
+        counts: Dict[str, int] = {}
+        if text:
+            for symbol in self._scan(text):
+                counts[symbol] = counts.get(symbol, 0) + 1
+        return counts
+
+    def extract_many(self, texts: Iterable[Optional[str]]) -> List[List[str]]:
+        return [self.extract(text) for text in texts]
+
+
+def _load_default() -> MentionExtractor:
+    path = os.getenv("CRYPTO_ALIASES_FILE")
+    if path:
+        try:
+            return MentionExtractor.from_file(path)
+        except (OSError, ValueError) as e:
+            logger.error("❌ Dictionnaire d'alias illisible, valeurs par défaut utilisées", path=path, error=str(e))
+    return MentionExtractor()
+
+
+# Instance globale (automate construit une seule fois)
+mention_extractor = _load_default()
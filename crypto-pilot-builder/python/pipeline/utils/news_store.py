@@ -0,0 +1,222 @@
+"""Magasin de news partagé: articles par identifiant, index chronologique et index par symbole."""
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+def _symbol_key(symbol: str) -> str:
+    """"ETH", "eth" et "ETH/USD" désignent le même symbole."""
+    return symbol.split("/")[0].upper()
+
+
+class _TimeIndex:
+    """Identifiants triés par date de publication (listes parallèles, recherche dichotomique)."""
+
+    __slots__ = ("times", "ids")
+
+    def __init__(self):
+        self.times: List[float] = []
+        self.ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, timestamp: float, article_id: str):
+        # Les news arrivent surtout par la fin: l'insertion est presque toujours un ajout
+        position = bisect_right(self.times, timestamp)
+        self.times.insert(position, timestamp)
+        self.ids.insert(position, article_id)
+
+    def remove(self, timestamp: float, article_id: str):
+        start = bisect_left(self.times, timestamp)
+        position = self.ids.index(article_id, start, bisect_right(self.times, timestamp))
+        del self.times[position]
+        del self.ids[position]
+
+    def after(self, timestamp: float, limit: Optional[int] = None) -> List[str]:
+        """Identifiants publiés strictement après `timestamp`, du plus récent au plus ancien."""
+        start = bisect_right(self.times, timestamp)
+        if limit is not None:
+            start = max(start, len(self.ids) - limit)
+        return self.ids[start:][::-1]
+
+    def count_before(self, timestamp: float) -> int:
+        return bisect_left(self.times, timestamp)
+
+
+class NewsStore:
+    """
+    Articles indexés par identifiant, par date et par symbole mentionné.
+
+    Chaque récupération est fusionnée dans le magasin (`upsert`) au lieu de
+    remplacer la liste: seuls les articles nouveaux ou modifiés sont retournés,
+    pour n'analyser qu'eux. Un index chronologique global et un index
+    chronologique par symbole (index inversé sur `crypto_mentions`) répondent
+    à "news ETH de la dernière heure" en O(log n + k) par recherche
+    dichotomique. Les articles plus anciens que `retention`, puis les plus
+    anciens au-delà de `max_items`, sont évincés par la tête des index.
+
+    Les articles doivent exposer `id`, `published_at` et `crypto_mentions`.
+    Le magasin est partagé entre threads (agents, pipeline, autowallet): toutes
+    les opérations prennent un verrou.
+    """
+
+    def __init__(self, retention: Optional[timedelta] = timedelta(days=7), max_items: Optional[int] = 5000):
+        self.retention = retention
+        self.max_items = max_items
+        self._articles: Dict[str, Any] = {}
+        self._timeline = _TimeIndex()
+        self._by_symbol: Dict[str, _TimeIndex] = {}
+        self._lock = threading.RLock()
+        self._stats = {"merged": 0, "added": 0, "updated": 0, "unchanged": 0, "evicted": 0}
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def __contains__(self, article_id: str) -> bool:
+        return article_id in self._articles
+
+    @staticmethod
+    def _timestamp(item: Any) -> float:
+        return item.published_at.timestamp()
+
+    @staticmethod
+    def _mentions(item: Any) -> List[str]:
+        return list(dict.fromkeys(_symbol_key(symbol) for symbol in (item.crypto_mentions or [])))
+
+    @staticmethod
+    def _fingerprint(item: Any) -> tuple:
+        return (item.published_at, getattr(item, "title", None), getattr(item, "content", None),
+                tuple(item.crypto_mentions or ()))
+
+    # --- Écriture ---------------------------------------------------------
+
+    def _index(self, item: Any):
+        timestamp = self._timestamp(item)
+        self._timeline.add(timestamp, item.id)
+        for symbol in self._mentions(item):
+            index = self._by_symbol.get(symbol)
+            if index is None:
+                index = self._by_symbol[symbol] = _TimeIndex()
+            index.add(timestamp, item.id)
+
+    def _unindex(self, item: Any):
+        timestamp = self._timestamp(item)
+        self._timeline.remove(timestamp, item.id)
+        for symbol in self._mentions(item):
+            index = self._by_symbol[symbol]
+            index.remove(timestamp, item.id)
+            if not index:
+                del self._by_symbol[symbol]
+
+    def upsert(self, items: Iterable[Any]) -> List[Any]:
+        """Fusionne des articles; retourne ceux ajoutés ou modifiés (toujours présents après éviction)."""
+        changed = []
+        with self._lock:
+            for item in items:
+                current = self._articles.get(item.id)
+                if current is not None:
+                    if self._fingerprint(current) == self._fingerprint(item):
+                        self._stats["unchanged"] += 1
+                        continue
+                    self._unindex(current)
+                    self._stats["updated"] += 1
+                else:
+                    self._stats["added"] += 1
+                self._articles[item.id] = item
+                self._index(item)
+                changed.append(item)
+            self._stats["merged"] += 1
+            self._evict()
+            return [item for item in changed if self._articles.get(item.id) is item]
+
+    def remove(self, article_id: str) -> bool:
+        with self._lock:
+            item = self._articles.pop(article_id, None)
+            if item is None:
+                return False
+            self._unindex(item)
+            return True
+
+    def _evict(self):
+        """Retire les articles trop anciens, puis les plus anciens au-delà de la capacité."""
+        count = 0
+        if self.retention is not None:
+            count = self._timeline.count_before((datetime.now() - self.retention).timestamp())
+        if self.max_items is not None:
+            count = max(count, len(self._timeline) - self.max_items)
+        if count <= 0:
+            return
+        for article_id in self._timeline.ids[:count]:
+            item = self._articles.pop(article_id)
+            timestamp = self._timestamp(item)
+            for symbol in self._mentions(item):
+                index = self._by_symbol[symbol]
+                index.remove(timestamp, article_id)
+                if not index:
+                    del self._by_symbol[symbol]
+        del self._timeline.times[:count]
+        del self._timeline.ids[:count]
+        self._stats["evicted"] += count
+        logger.debug("🧹 News évincées du magasin", count=count, remaining=len(self._articles))
+
+    def clear(self):
+        with self._lock:
+            self._articles.clear()
+            self._timeline = _TimeIndex()
+            self._by_symbol.clear()
+
+    # --- Lecture ----------------------------------------------------------
+
+    @staticmethod
+    def _cutoff(hours: Optional[float], since: Optional[datetime]) -> float:
+        if since is not None:
+            return since.timestamp()
+        if hours is not None:
+            return (datetime.now() - timedelta(hours=hours)).timestamp()
+        return float("-inf")
+
+    def get(self, article_id: str) -> Optional[Any]:
+        return self._articles.get(article_id)
+
+    def recent(self, hours: Optional[float] = None, since: Optional[datetime] = None,
+               symbol: Optional[str] = None, limit: Optional[int] = None) -> List[Any]:
+        """
+        Articles publiés après `since` (ou dans les `hours` dernières heures),
+        du plus récent au plus ancien; `symbol` restreint à ceux qui le mentionnent.
+        """
+        cutoff = self._cutoff(hours, since)
+        with self._lock:
+            index = self._timeline if symbol is None else self._by_symbol.get(_symbol_key(symbol))
+            if index is None:
+                return []
+            return [self._articles[article_id] for article_id in index.after(cutoff, limit)]
+
+    def recent_by_symbol(self, hours: Optional[float] = None, since: Optional[datetime] = None,
+                         symbols: Optional[Iterable[str]] = None) -> Dict[str, List[Any]]:
+        """Articles récents groupés par symbole (tous les symboles indexés par défaut), sans groupe vide."""
+        cutoff = self._cutoff(hours, since)
+        grouped = {}
+        with self._lock:
+            keys = self._by_symbol if symbols is None else dict.fromkeys(_symbol_key(s) for s in symbols)
+            for symbol in keys:
+                index = self._by_symbol.get(symbol)
+                ids = index.after(cutoff) if index is not None else []
+                if ids:
+                    grouped[symbol] = [self._articles[article_id] for article_id in ids]
+        return grouped
+
+    def symbols(self) -> Dict[str, int]:
+        """Nombre d'articles indexés par symbole."""
+        with self._lock:
+            return {symbol: len(index) for symbol, index in self._by_symbol.items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"articles": len(self._articles), "symbols": len(self._by_symbol), **self._stats}
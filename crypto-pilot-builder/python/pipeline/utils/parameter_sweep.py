@@ -0,0 +1,230 @@
+"""Balayage parallèle des paramètres de risque de la stratégie sur un historique."""
+
+import dataclasses
+import itertools
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import structlog
+
+from ..agents.models.market_data import OHLCVSeries
+from .backtester import Backtester, BacktestConfig, Predictions, indicator_predictions
+
+logger = structlog.get_logger(__name__)
+
+# Paramètres de StrategyConfig explorés par défaut
+STRATEGY_PARAMETERS = ("buy_threshold", "sell_threshold", "stop_loss", "take_profit",
+                       "min_confidence", "max_position_size", "max_open_trades", "max_daily_loss")
+
+PREDICTION_FIELDS = ("direction_prob", "confidence", "volatility")
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+# (nom, offset, forme, dtype) de chaque tableau dans le bloc partagé
+_Layout = List[Tuple[str, int, Tuple[int, ...], str]]
+
+
+@dataclass
+class SweepResult:
+    """Statistiques du backtest d'un jeu de paramètres."""
+    params: Dict[str, Any]
+    stats: Dict[str, Any]
+    rank: int = 0
+
+    @property
+    def sharpe(self) -> float:
+        sharpe = self.stats.get("sharpe")
+        return sharpe if sharpe is not None else -math.inf
+
+    @property
+    def max_drawdown(self) -> float:
+        return self.stats.get("max_drawdown", math.inf)
+
+
+def parameter_grid(space: Mapping[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """Produit cartésien des valeurs; les combinaisons où sell_threshold >= buy_threshold sont écartées."""
+    names = list(space)
+    combos = (dict(zip(names, values)) for values in itertools.product(*(list(space[n]) for n in names)))
+    return [params for params in combos if _coherent(params)]
+
+
+def random_parameters(space: Mapping[str, Union[Tuple[float, float], Sequence[Any]]], samples: int,
+                      seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Tirages aléatoires: un tuple `(bas, haut)` est échantillonné uniformément
+    (entier si les deux bornes le sont), une liste par choix.
+    """
+    rng = random.Random(seed)
+    results: List[Dict[str, Any]] = []
+    attempts = 0
+    while len(results) < samples and attempts < samples * 100:
+        attempts += 1
+        params = {}
+        for name, values in space.items():
+            if isinstance(values, tuple) and len(values) == 2:
+                low, high = values
+                if isinstance(low, int) and isinstance(high, int):
+                    params[name] = rng.randint(low, high)
+                else:
+                    params[name] = round(rng.uniform(low, high), 6)
+            else:
+                params[name] = rng.choice(list(values))
+        if _coherent(params):
+            results.append(params)
+    return results
+
+
+def _coherent(params: Mapping[str, Any]) -> bool:
+    buy = params.get("buy_threshold", BacktestConfig.buy_threshold)
+    sell = params.get("sell_threshold", BacktestConfig.sell_threshold)
+    return sell < buy
+
+
+def rank_results(results: List[SweepResult], max_drawdown: Optional[float] = None) -> List[SweepResult]:
+    """Classe par Sharpe décroissant puis drawdown croissant; écarte les drawdowns au-delà du plafond."""
+    kept = [r for r in results if max_drawdown is None or r.max_drawdown <= max_drawdown]
+    kept.sort(key=lambda r: (-r.sharpe, r.max_drawdown, -r.stats.get("total_return", 0.0)))
+    for position, result in enumerate(kept, start=1):
+        result.rank = position
+    return kept
+
+
+# --- Côté processus de calcul -------------------------------------------------
+
+_worker_state: Dict[str, Any] = {}
+
+
+def _attach(name: str, layout: _Layout) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+    block = shared_memory.SharedMemory(name=name)
+    arrays = {}
+    for key, offset, shape, dtype in layout:
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset)
+        arrays[key].flags.writeable = False
+    return block, arrays
+
+
+def _init_worker(name: str, layout: _Layout, symbols: List[str], base_config: Dict[str, Any]):
+    """Rattache le bloc partagé une fois par processus et reconstruit séries et prédictions."""
+    block, arrays = _attach(name, layout)
+    _worker_state.update(_state_from_arrays(arrays, symbols))
+    _worker_state["block"] = block  # Garde le mapping ouvert pendant la vie du processus
+    _worker_state["base_config"] = BacktestConfig(**base_config)
+
+
+def _state_from_arrays(arrays: Dict[str, np.ndarray], symbols: List[str]) -> Dict[str, Any]:
+    timestamps = arrays["timestamp"]
+    universe = {}
+    predictions = {}
+    for row, symbol in enumerate(symbols):
+        universe[symbol] = OHLCVSeries(
+            timestamp=timestamps,
+            volume=np.zeros(len(timestamps)),
+            **{field: arrays[field][row] for field in PRICE_FIELDS}
+        )
+        predictions[symbol] = {field: arrays[field][row] for field in PREDICTION_FIELDS}
+    return {"universe": universe, "predictions": predictions}
+
+
+def _evaluate(params: Dict[str, Any]) -> SweepResult:
+    config = dataclasses.replace(_worker_state["base_config"], **params)
+    result = Backtester(config).run(_worker_state["universe"], _worker_state["predictions"])
+    return SweepResult(params=params, stats=result.stats)
+
+
+# --- Orchestrateur --------------------------------------------------------------
+
+class ParameterSweep:
+    """
+    Évalue des jeux de paramètres de risque en parallèle avec le Backtester.
+
+    Les prix et les prédictions (indépendantes des paramètres de risque) sont
+    calculés une fois puis copiés dans un unique bloc de mémoire partagée; chaque
+    processus du pool s'y rattache à son démarrage, de sorte que seuls les
+    dictionnaires de paramètres et les statistiques transitent par pickle.
+    """
+
+    def __init__(self, data: Union[OHLCVSeries, Mapping[str, OHLCVSeries]],
+                 base_config: Optional[BacktestConfig] = None,
+                 predictions: Optional[Mapping[str, Predictions]] = None,
+                 workers: Optional[int] = None):
+        self.universe = Backtester._as_universe(data)
+        self.symbols = list(self.universe)
+        self.base_config = base_config or BacktestConfig()
+        self.workers = workers or os.cpu_count() or 1
+        self.predictions = {
+            symbol: (predictions[symbol] if predictions is not None else indicator_predictions(series))
+            for symbol, series in self.universe.items()
+        }
+        self._fields = {field.name for field in dataclasses.fields(BacktestConfig)}
+
+    def _stacked_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {"timestamp": next(iter(self.universe.values())).timestamp}
+        for field in PRICE_FIELDS:
+            arrays[field] = np.vstack([getattr(self.universe[s], field) for s in self.symbols])
+        for field in PREDICTION_FIELDS:
+            arrays[field] = np.vstack([
+                np.asarray(self.predictions[s].get(field, np.zeros(len(arrays["timestamp"]))), dtype=np.float64)
+                for s in self.symbols
+            ])
+        return arrays
+
+    @staticmethod
+    def _share(arrays: Dict[str, np.ndarray]) -> Tuple[shared_memory.SharedMemory, _Layout]:
+        layout: _Layout = []
+        offset = 0
+        for key, array in arrays.items():
+            offset = (offset + 63) // 64 * 64  # Alignement sur une ligne de cache
+            layout.append((key, offset, array.shape, array.dtype.str))
+            offset += array.nbytes
+        block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (key, start, shape, dtype), array in zip(layout, arrays.values()):
+            np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=start)[...] = array
+        return block, layout
+
+    def run(self, param_sets: Sequence[Mapping[str, Any]], max_drawdown: Optional[float] = None,
+            chunksize: Optional[int] = None) -> List[SweepResult]:
+        """Backteste chaque jeu de paramètres et retourne les résultats classés."""
+        param_sets = [dict(params) for params in param_sets]
+        for params in param_sets:
+            unknown = set(params) - self._fields
+            if unknown:
+                raise ValueError(f"Paramètres inconnus: {sorted(unknown)}")
+        if not param_sets:
+            return []
+
+        started = time.perf_counter()
+        base = dataclasses.asdict(self.base_config)
+        workers = min(self.workers, len(param_sets))
+
+        if workers <= 1:
+            _worker_state.update(_state_from_arrays(self._stacked_arrays(), self.symbols))
+            _worker_state["base_config"] = self.base_config
+            try:
+                results = [_evaluate(params) for params in param_sets]
+            finally:
+                _worker_state.clear()
+        else:
+            block, layout = self._share(self._stacked_arrays())
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                         initargs=(block.name, layout, self.symbols, base)) as pool:
+                    chunk = chunksize or max(1, len(param_sets) // (workers * 4))
+                    results = list(pool.map(_evaluate, param_sets, chunksize=chunk))
+            finally:
+                block.close()
+                block.unlink()
+
+        ranked = rank_results(results, max_drawdown)
+        logger.info("🧮 Balayage de paramètres terminé",
+                    configs=len(param_sets),
+                    kept=len(ranked),
+                    workers=workers,
+                    elapsed_seconds=round(time.perf_counter() - started, 3),
+                    best=ranked[0].params if ranked else None)
+        return ranked
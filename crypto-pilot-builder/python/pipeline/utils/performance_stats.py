@@ -0,0 +1,120 @@
+"""Statistiques de performance de trading mises à jour en flux (O(1) par trade)."""
+
+import math
+from typing import Any, Dict, Optional
+
+
+class PerformanceStats:
+    """
+    Accumulateurs de P&L réalisés trade par trade.
+
+    Chaque `add` met à jour en temps constant le P&L cumulé, son plus haut, le
+    drawdown courant et maximal, les gains/pertes bruts et la variance des P&L
+    par l'algorithme de Welford (stable numériquement, sans conserver les
+    trades). Sharpe et Sortino sont exprimés par trade, sans annualisation.
+    """
+
+    __slots__ = ("total_trades", "successful_trades", "losing_trades", "total_pnl", "gross_profit",
+                 "gross_loss", "best_trade", "worst_trade", "peak_pnl", "current_drawdown",
+                 "max_drawdown", "_mean", "_m2", "_downside_sq")
+
+    def __init__(self):
+        self.total_trades = 0
+        self.successful_trades = 0
+        self.losing_trades = 0
+        self.total_pnl = 0.0
+        self.gross_profit = 0.0
+        self.gross_loss = 0.0
+        self.best_trade = 0.0
+        self.worst_trade = 0.0
+        self.peak_pnl = 0.0
+        self.current_drawdown = 0.0
+        self.max_drawdown = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._downside_sq = 0.0
+
+    def add(self, pnl: float):
+        """Intègre le P&L réalisé d'un trade."""
+        pnl = float(pnl)
+        self.total_trades += 1
+        if pnl > 0:
+            self.successful_trades += 1
+            self.gross_profit += pnl
+        elif pnl < 0:
+            self.losing_trades += 1
+            self.gross_loss -= pnl
+            self._downside_sq += pnl * pnl
+
+        if self.total_trades == 1:
+            self.best_trade = self.worst_trade = pnl
+        else:
+            self.best_trade = max(self.best_trade, pnl)
+            self.worst_trade = min(self.worst_trade, pnl)
+
+        # Courbe de P&L cumulé: plus haut et drawdowns
+        self.total_pnl += pnl
+        self.peak_pnl = max(self.peak_pnl, self.total_pnl)
+        self.current_drawdown = self.peak_pnl - self.total_pnl
+        self.max_drawdown = max(self.max_drawdown, self.current_drawdown)
+
+        # Welford
+        delta = pnl - self._mean
+        self._mean += delta / self.total_trades
+        self._m2 += delta * (pnl - self._mean)
+
+    @property
+    def win_rate(self) -> float:
+        return self.successful_trades / self.total_trades if self.total_trades else 0.0
+
+    @property
+    def avg_trade_pnl(self) -> float:
+        return self._mean
+
+    @property
+    def std_pnl(self) -> float:
+        return math.sqrt(self._m2 / (self.total_trades - 1)) if self.total_trades > 1 else 0.0
+
+    @property
+    def sharpe(self) -> Optional[float]:
+        std = self.std_pnl
+        return self._mean / std if std > 0 else None
+
+    @property
+    def sortino(self) -> Optional[float]:
+        if not self.total_trades or self._downside_sq <= 0:
+            return None
+        return self._mean / math.sqrt(self._downside_sq / self.total_trades)
+
+    @property
+    def profit_factor(self) -> Optional[float]:
+        return self.gross_profit / self.gross_loss if self.gross_loss > 0 else None
+
+    @property
+    def expectancy(self) -> float:
+        """Gain moyen attendu par trade: taux de gain × gain moyen − taux de perte × perte moyenne."""
+        if not self.total_trades:
+            return 0.0
+        avg_win = self.gross_profit / self.successful_trades if self.successful_trades else 0.0
+        avg_loss = self.gross_loss / self.losing_trades if self.losing_trades else 0.0
+        loss_rate = self.losing_trades / self.total_trades
+        return self.win_rate * avg_win - loss_rate * avg_loss
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Vue des accumulateurs au format de `LoggerAgent.stats` (valeurs brutes)."""
+        return {
+            "total_trades": self.total_trades,
+            "successful_trades": self.successful_trades,
+            "losing_trades": self.losing_trades,
+            "win_rate": self.win_rate,
+            "total_pnl": self.total_pnl,
+            "avg_trade_pnl": self.avg_trade_pnl,
+            "best_trade": self.best_trade,
+            "worst_trade": self.worst_trade,
+            "current_drawdown": self.current_drawdown,
+            "max_drawdown": self.max_drawdown,
+            "profit_factor": self.profit_factor,
+            "sharpe": self.sharpe,
+            "sortino": self.sortino,
+            "expectancy": self.expectancy,
+        }
@@ -0,0 +1,226 @@
+"""Historique borné des résultats du pipeline, indexé par symbole et par temps."""
+
+import threading
+from bisect import bisect_left
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+def _epoch(timestamp: Any) -> float:
+    """Horodatage en secondes; les datetimes naïfs du pipeline sont en UTC (datetime.utcnow)."""
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+    return float(timestamp)
+
+
+class _TimeIndexedLog:
+    """
+    File FIFO à clés de temps croissantes: liste + indice de tête.
+    Les retraits en tête sont O(1) (compactage amorti) et les requêtes
+    temporelles se font par dichotomie sur les clés.
+    """
+
+    __slots__ = ("_items", "_keys", "_head")
+
+    COMPACT_MIN = 64
+
+    def __init__(self):
+        self._items: List[Any] = []
+        self._keys: List[float] = []
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._items) - self._head
+
+    def append(self, item: Any, key: float):
+        self._items.append(item)
+        self._keys.append(key)
+
+    def popleft(self) -> Any:
+        item = self._items[self._head]
+        self._items[self._head] = None
+        self._head += 1
+        if self._head >= self.COMPACT_MIN and self._head * 2 >= len(self._items):
+            del self._items[:self._head]
+            del self._keys[:self._head]
+            self._head = 0
+        return item
+
+    def last_key(self) -> Optional[float]:
+        return self._keys[-1] if len(self) else None
+
+    def tail(self, count: Optional[int] = None) -> List[Any]:
+        if count is None or count >= len(self):
+            return self._items[self._head:]
+        if count <= 0:
+            return []
+        return self._items[-count:]
+
+    def since(self, key: float) -> List[Any]:
+        start = bisect_left(self._keys, key, lo=self._head)
+        return self._items[start:]
+
+    def get(self, index):
+        size = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(size)
+            return self._items[self._head + start:self._head + stop:step]
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("index hors de l'historique")
+        return self._items[self._head + index]
+
+
+class PipelineHistory:
+    """
+    Historique circulaire des PipelineData (au plus `maxlen` entrées).
+
+    - Compteurs tenus à jour à l'ajout et à l'éviction: prédictions, signaux
+      et trades de la fenêtre sont disponibles en O(1).
+    - Index secondaires par symbole et par temps (requêtes en O(log n + k)).
+    - Partagé entre la boucle du pipeline et l'API: protégé par un verrou.
+
+    Se comporte comme une séquence en lecture (len, itération, index, slices)
+    pour rester compatible avec l'ancienne liste `pipeline_data`.
+    """
+
+    COUNTED_FIELDS = {
+        "predictions": "prediction",
+        "signals": "strategy_signal",
+        "trades": "trade_execution",
+    }
+
+    def __init__(self, maxlen: int = 1000):
+        if maxlen <= 0:
+            raise ValueError("maxlen doit être positif")
+        self._maxlen = maxlen
+        self._log = _TimeIndexedLog()
+        self._by_symbol: Dict[str, _TimeIndexedLog] = {}
+        self._counts = {name: 0 for name in self.COUNTED_FIELDS}
+        self._appended = 0
+        self._evicted = 0
+        self._lock = threading.RLock()
+
+    @property
+    def maxlen(self) -> int:
+        return self._maxlen
+
+    @maxlen.setter
+    def maxlen(self, value: int):
+        if value <= 0:
+            raise ValueError("maxlen doit être positif")
+        with self._lock:
+            self._maxlen = value
+            while len(self._log) > self._maxlen:
+                self._evict_oldest()
+
+    def _flags(self, data: Any) -> Dict[str, bool]:
+        return {name: bool(getattr(data, attr, None)) for name, attr in self.COUNTED_FIELDS.items()}
+
+    def append(self, data: Any):
+        """Ajoute un résultat; évince le plus ancien si la capacité est atteinte."""
+        with self._lock:
+            key = _epoch(data.timestamp)
+            last = self._log.last_key()
+            if last is not None and key < last:
+                key = last  # Garde les clés croissantes (cycles concurrents)
+
+            self._log.append(data, key)
+            symbol_log = self._by_symbol.get(data.symbol)
+            if symbol_log is None:
+                symbol_log = self._by_symbol[data.symbol] = _TimeIndexedLog()
+            symbol_log.append(data, key)
+
+            for name, present in self._flags(data).items():
+                self._counts[name] += present
+            self._appended += 1
+
+            if len(self._log) > self._maxlen:
+                self._evict_oldest()
+
+    def extend(self, items):
+        with self._lock:
+            for data in items:
+                self.append(data)
+
+    def _evict_oldest(self):
+        oldest = self._log.popleft()
+        # FIFO global: l'entrée évincée est aussi la plus ancienne de son symbole
+        symbol_log = self._by_symbol[oldest.symbol]
+        symbol_log.popleft()
+        if not len(symbol_log):
+            del self._by_symbol[oldest.symbol]
+        for name, present in self._flags(oldest).items():
+            self._counts[name] -= present
+        self._evicted += 1
+
+    def clear(self):
+        with self._lock:
+            self._log = _TimeIndexedLog()
+            self._by_symbol = {}
+            self._counts = {name: 0 for name in self.COUNTED_FIELDS}
+
+    def latest(self, count: Optional[int] = None, symbol: Optional[str] = None) -> List[Any]:
+        """Les `count` derniers résultats (tous symboles ou un seul), du plus ancien au plus récent."""
+        with self._lock:
+            if symbol is None:
+                return self._log.tail(count)
+            symbol_log = self._by_symbol.get(symbol)
+            return symbol_log.tail(count) if symbol_log else []
+
+    def since(self, timestamp: Any, symbol: Optional[str] = None) -> List[Any]:
+        """Résultats horodatés à partir de `timestamp` (datetime ou epoch)."""
+        key = _epoch(timestamp)
+        with self._lock:
+            if symbol is None:
+                return self._log.since(key)
+            symbol_log = self._by_symbol.get(symbol)
+            return symbol_log.since(key) if symbol_log else []
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return sorted(self._by_symbol)
+
+    def count(self, symbol: Optional[str] = None) -> int:
+        with self._lock:
+            if symbol is None:
+                return len(self._log)
+            symbol_log = self._by_symbol.get(symbol)
+            return len(symbol_log) if symbol_log else 0
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Prédictions, signaux et trades présents dans la fenêtre (O(1))."""
+        with self._lock:
+            return dict(self._counts)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._log),
+                "maxlen": self._maxlen,
+                "appended": self._appended,
+                "evicted": self._evicted,
+                "symbols": len(self._by_symbol),
+                **self._counts
+            }
+
+    def __len__(self) -> int:
+        return len(self._log)
+
+    def __bool__(self) -> bool:
+        return len(self._log) > 0
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.latest())
+
+    def __getitem__(self, index):
+        with self._lock:
+            return self._log.get(index)
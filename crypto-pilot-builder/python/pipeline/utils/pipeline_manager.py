@@ -4,10 +4,13 @@ Pipeline Manager - Orchestration séquentielle des agents de trading
 """
 
 import asyncio
+import aiohttp
+import numpy as np
 import structlog
 import threading
 import time
 import requests
+from contextlib import asynccontextmanager
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
@@ -20,9 +23,26 @@ from ..agents.trading.predictor import PredictorAgent
 from ..agents.trading.strategy import StrategyAgent
 from ..agents.trading.trader import TraderAgent
 from ..agents.trading.logger import LoggerAgent
+from .asi_model import ASIOneModel
+from .event_log import EventLog, open_event_log_from_env
+from .incremental_indicators import IndicatorEngine
+from .pipeline_history import PipelineHistory
+from .price_history import price_history_store
+from .rate_limiter import Priority, rate_limited_get, rate_limited_request
+from .record_replay import traffic_recorder
+from .stage_graph import StageGraph, StageRun
 
 logger = structlog.get_logger(__name__)
 
+# Identifiants CoinGecko des paires suivies par le pipeline
+COINGECKO_IDS: Dict[str, str] = {
+    "BTC/USD": "bitcoin",
+    "ETH/USD": "ethereum",
+    "ADA/USD": "cardano",
+    "DOT/USD": "polkadot",
+    "SOL/USD": "solana",
+}
+
 class AgentStatus(Enum):
     """Statuts possibles d'un agent."""
     STOPPED = "stopped"
@@ -56,16 +76,45 @@ class PipelineData:
 class PipelineManager:
     """Gestionnaire du pipeline séquentiel des agents."""
     
-    def __init__(self):
+    def __init__(self, event_log: Optional[EventLog] = None):
         self.agents: Dict[str, Any] = {}
         self.agent_status: Dict[str, AgentInfo] = {}
-        self.pipeline_data: List[PipelineData] = []
+        # Historique circulaire indexé (symbole, temps) avec compteurs O(1)
+        self.pipeline_data = PipelineHistory(maxlen=1000)
+        # Journal persistant (survit aux redémarrages): injecté, ou ouvert par
+        # start_pipeline depuis PIPELINE_EVENT_LOG_DIR; None si désactivé
+        self.event_log: Optional[EventLog] = event_log
+        self._owns_event_log = False
+        self._owns_traffic_recorder = False
         self.is_running = False
         self.execution_interval = 60  # secondes
-        self.max_pipeline_data = 1000
+        
+        # Watchlist traitée à chaque cycle (symboles en parallèle, plafonnés)
+        self.watchlist: List[str] = list(COINGECKO_IDS.keys())
+        self.max_concurrent_symbols = 4
+        
+        # Graphe des étapes d'un cycle: marché et news en parallèle, puis fusion
+        self.stage_graph = self._build_stage_graph()
+        self.last_stage_run: Optional[StageRun] = None
         self.pipeline_thread = None
         self.stop_event = threading.Event()
         
+        # Mode d'exécution: "async" (une boucle asyncio dédiée et persistante)
+        # ou "thread" (boucle synchrone historique)
+        self.execution_mode = "async"
+        self.event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.pipeline_future = None
+        self._async_stop: Optional[asyncio.Event] = None
+        
+        # Clients réutilisés d'un tick à l'autre (ouverts sur la boucle du pipeline)
+        self.http_session: Optional[aiohttp.ClientSession] = None
+        self.asi_model: Optional[ASIOneModel] = None
+        self._clients_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._standalone_asi_model: Optional[ASIOneModel] = None
+        
+        # Indicateurs techniques incrémentaux par symbole
+        self.indicator_engine = IndicatorEngine()
+        
         # Initialisation des agents
         self._init_agents()
         
@@ -85,6 +134,9 @@ class PipelineManager:
                 "logger": LoggerAgent()
             }
             
+            # Les agents qui produisent un historique l'écrivent aussi dans le journal
+            self._set_event_log(self.event_log)
+            
             # Initialisation des statuts
             for name in self.agents.keys():
                 self.agent_status[name] = AgentInfo(
@@ -157,67 +209,106 @@ class PipelineManager:
         total_errors = sum(agent.error_count for agent in self.agent_status.values())
         success_rate = ((total_executions - total_errors) / total_executions * 100) if total_executions > 0 else 0
         
-        # Compter les prédictions et signaux de manière sécurisée
-        predictions_count = 0
-        signals_count = 0
-        
-        for d in self.pipeline_data:
-            try:
-                if hasattr(d, 'prediction') and d.prediction:
-                    predictions_count += 1
-                elif isinstance(d, dict) and d.get('prediction'):
-                    predictions_count += 1
-                    
-                if hasattr(d, 'strategy_signal') and d.strategy_signal:
-                    signals_count += 1
-                elif isinstance(d, dict) and d.get('strategy_signal'):
-                    signals_count += 1
-            except Exception:
-                continue
+        # Compteurs tenus à jour par l'historique (pas de parcours)
+        counts = self.pipeline_data.counts
         
         return {
             "total_executions": total_executions,
             "total_errors": total_errors,
             "success_rate": success_rate,
-            "predictions_count": predictions_count,
-            "signals_count": signals_count
+            "predictions_count": counts["predictions"],
+            "signals_count": counts["signals"],
+            "trades_count": counts["trades"]
         }
     
-    def _generate_ai_prediction_sync(self, market_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Génère une prédiction avec IA ASI:One (version synchrone)."""
+    @property
+    def max_pipeline_data(self) -> int:
+        """Capacité de l'historique des résultats."""
+        return self.pipeline_data.maxlen
+    
+    @max_pipeline_data.setter
+    def max_pipeline_data(self, value: int):
+        self.pipeline_data.maxlen = value
+    
+    @staticmethod
+    def _new_http_session() -> aiohttp.ClientSession:
+        return aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=10),
+            headers={"User-Agent": "TradingBot/1.0"}
+        )
+    
+    def _owns_clients(self) -> bool:
+        """Vrai si les clients partagés sont ouverts sur la boucle courante."""
         try:
-            # Importer les modules nécessaires
-            import asyncio
-            from ..utils.asi_model import ASIOneModel
-            from ..utils.technical_indicators import TechnicalIndicators
-            
-            # Initialiser le modèle ASI:One
-            asi_model = ASIOneModel(model="asi1-mini")
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return (self.http_session is not None and not self.http_session.closed
+                and self._clients_loop is loop)
+    
+    async def _open_clients(self):
+        """Ouvre la session HTTP et le modèle ASI:One partagés par tous les ticks."""
+        self.http_session = self._new_http_session()
+        self.asi_model = ASIOneModel(model="asi1-mini", session=self.http_session)
+        self._clients_loop = asyncio.get_running_loop()
+        logger.info("🔌 Clients HTTP du pipeline ouverts")
+    
+    async def _close_clients(self):
+        """Ferme la session HTTP partagée."""
+        if self.http_session is not None and not self.http_session.closed:
+            await self.http_session.close()
+        self.http_session = None
+        self.asi_model = None
+        self._clients_loop = None
+        logger.info("🔌 Clients HTTP du pipeline fermés")
+    
+    @asynccontextmanager
+    async def _http(self):
+        """Session HTTP partagée si elle appartient à la boucle courante, sinon temporaire."""
+        if self._owns_clients():
+            yield self.http_session
+        else:
+            async with self._new_http_session() as session:
+                yield session
+    
+    def _get_asi_model(self) -> ASIOneModel:
+        """Modèle ASI:One de la boucle courante (sans session partagée hors du pipeline)."""
+        if self._owns_clients():
+            return self.asi_model
+        if self._standalone_asi_model is None:
+            self._standalone_asi_model = ASIOneModel(model="asi1-mini")
+        return self._standalone_asi_model
+    
+    async def _generate_ai_prediction(self, market_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Génère une prédiction avec IA ASI:One."""
+        try:
+            asi_model = self._get_asi_model()
             
-            # Créer des données de prix fictives pour les indicateurs
+            # Historique réel des derniers ticks (vues sur le buffer circulaire partagé)
+            symbol = market_data.get("symbol", "BTC/USD")
             current_price = market_data.get("price", 50000)
-            price_history = [current_price * (1 + i * 0.001) for i in range(-19, 1)]  # 20 points
-            
-            # Calculer les indicateurs techniques
-            technical_indicators = TechnicalIndicators.calculate_all_indicators(price_history)
+            price_history = price_history_store.last_prices(symbol, 20).tolist() or [current_price]
+            volume_history = np.nan_to_num(
+                price_history_store.last_volumes(symbol, len(price_history)),
+                nan=market_data.get("volume", 1000000)
+            ).tolist() or [market_data.get("volume", 1000000)]
+            
+            # Mettre à jour les indicateurs techniques avec le tick réel (O(1))
+            technical_indicators = self.indicator_engine.update(
+                symbol,
+                current_price,
+                market_data.get("volume")
+            )
             
-            # Générer la prédiction avec ASI:One (mode synchrone)
+            # Générer la prédiction avec ASI:One
             try:
-                # Créer un nouvel event loop pour l'appel async
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                prediction_result = loop.run_until_complete(
-                    asi_model.predict_price_direction(
-                        price_history=price_history,
-                        volume_history=[market_data.get("volume", 1000000)] * 20,
-                        technical_indicators=technical_indicators,
-                        symbol=market_data.get("symbol", "BTC/USD")
-                    )
+                prediction_result = await asi_model.predict_price_direction(
+                    price_history=price_history,
+                    volume_history=volume_history,
+                    technical_indicators=technical_indicators,
+                    symbol=symbol
                 )
                 
-                loop.close()
-                
                 # Convertir la prédiction au format attendu
                 direction = "UP" if prediction_result["direction_probability"] > 0.5 else "DOWN"
                 confidence = prediction_result["confidence"]
@@ -254,9 +345,19 @@ class PipelineManager:
                 "timestamp": datetime.utcnow()
             }
     
+    def _generate_ai_prediction_sync(self, market_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Génère une prédiction avec IA ASI:One (version synchrone)."""
+        return self._run_sync(self._generate_ai_prediction(market_data))
+    
+    def _run_sync(self, coro):
+        """Exécute une coroutine depuis le thread synchrone, sur sa boucle persistante si elle existe."""
+        if self.event_loop is not None and not self.event_loop.is_closed() and not self.event_loop.is_running():
+            return self.event_loop.run_until_complete(coro)
+        return asyncio.run(coro)
+    
     def _generate_fallback_prediction(self, market_data: Dict[str, Any], technical_indicators: Dict[str, float]) -> Dict[str, Any]:
         """Génère une prédiction de fallback basée sur les indicateurs techniques."""
-        import random
+        rng = traffic_recorder.rng
         
         current_price = market_data.get("price", 50000)
         
@@ -270,11 +371,11 @@ class PipelineManager:
             base_prob = 0.3
         
         # Ajouter du bruit réaliste
-        direction_prob = base_prob + random.uniform(-0.1, 0.1)
+        direction_prob = base_prob + rng.uniform(-0.1, 0.1)
         direction_prob = max(0.1, min(0.9, direction_prob))
         
         direction = "UP" if direction_prob > 0.5 else "DOWN"
-        confidence = random.uniform(0.6, 0.85)
+        confidence = rng.uniform(0.6, 0.85)
         price_target = current_price * (1.02 if direction == "UP" else 0.98)
         
         logger.info("📊 Prédiction fallback avec indicateurs techniques", 
@@ -292,74 +393,147 @@ class PipelineManager:
             "timestamp": datetime.utcnow()
         }
     
-    def _collect_real_market_data_sync(self):
-        """Collecte les vraies données de marché via CoinGecko API (version synchrone)."""
-        try:
-            import requests
-            import random
-            
-            # Appel à l'API CoinGecko
-            url = "https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                'ids': 'bitcoin',
-                'vs_currencies': 'usd',
-                'include_24hr_vol': 'true',
-                'include_24hr_change': 'true'
+    COINGECKO_TICKER_URL = "https://api.coingecko.com/api/v3/simple/price"
+    
+    def _ticker_params(self, symbols: List[str]) -> Dict[str, str]:
+        """Paramètres /simple/price pour toute la watchlist en une requête."""
+        return {
+            'ids': ",".join(COINGECKO_IDS[symbol] for symbol in symbols),
+            'vs_currencies': 'usd',
+            'include_24hr_vol': 'true',
+            'include_24hr_change': 'true'
+        }
+    
+    def _parse_coingecko_ticker(self, data: Dict[str, Any], symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Convertit la réponse /simple/price en données de marché par symbole."""
+        snapshot = {}
+        for symbol in symbols:
+            coin_data = data.get(COINGECKO_IDS[symbol], {})
+            if not coin_data.get('usd'):
+                logger.warning("⚠️ Symbole absent de la réponse CoinGecko", symbol=symbol)
+                continue
+            snapshot[symbol] = {
+                "symbol": symbol,
+                "price": float(coin_data['usd']),
+                "volume": float(coin_data.get('usd_24h_vol') or 0.0),
+                "change_24h": float(coin_data.get('usd_24h_change') or 0.0),
+                "timestamp": datetime.utcnow(),
+                "source": "CoinGecko"
             }
-            
-            logger.info("🌐 Appel API CoinGecko...")
-            response = requests.get(url, params=params, timeout=10)
+        logger.info("✅ Données CoinGecko récupérées",
+                   prices={symbol: data["price"] for symbol, data in snapshot.items()})
+        return snapshot
+    
+    def _fallback_market_data(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Données de secours quand CoinGecko est indisponible: dernier prix connu,
+        ou prix aléatoire réaliste pour BTC/USD. Les symboles sans historique
+        sont ignorés pour ce cycle.
+        """
+        rng = traffic_recorder.rng
+        
+        snapshot = {}
+        for symbol in symbols:
+            price = price_history_store.latest_price(symbol)
+            if price is None:
+                if symbol != "BTC/USD":
+                    continue
+                price = float(rng.randint(45000, 55000))
+            snapshot[symbol] = {
+                "symbol": symbol,
+                "price": float(price),
+                "volume": float(rng.randint(1000000, 5000000)),
+                "change_24h": float(rng.uniform(-5, 5)),
+                "timestamp": datetime.utcnow(),
+                "source": "Fallback"
+            }
+        logger.info("📊 Utilisation données fallback", symbols=list(snapshot.keys()))
+        return snapshot
+    
+    async def _collect_market_snapshot(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Collecte les données de toute la watchlist en un seul appel CoinGecko (session partagée)."""
+        url = self.COINGECKO_TICKER_URL
+        try:
+            logger.info("🌐 Appel API CoinGecko...", symbols=len(symbols))
+            async with self._http() as session:
+                response = await rate_limited_request(
+                    session, "GET", url, Priority.TRADING, params=self._ticker_params(symbols)
+                )
+            if response.status == 200:
+                return self._parse_coingecko_ticker(response.json(), symbols)
+            logger.warning(f"⚠️ Erreur API CoinGecko: {response.status}")
+                
+        except Exception as e:
+            logger.error(f"❌ Erreur collecte données CoinGecko: {str(e)}")
+        
+        return self._fallback_market_data(symbols)
+    
+    def _collect_market_snapshot_sync(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Collecte les données de toute la watchlist en un seul appel CoinGecko (version synchrone)."""
+        try:
+            logger.info("🌐 Appel API CoinGecko...", symbols=len(symbols))
+            response = rate_limited_get(
+                self.COINGECKO_TICKER_URL,
+                priority=Priority.TRADING,
+                params=self._ticker_params(symbols),
+                timeout=10
+            )
             
             if response.status_code == 200:
-                data = response.json()
-                bitcoin_data = data.get('bitcoin', {})
-                
-                market_data = {
-                    "symbol": "BTC/USD",
-                    "price": float(bitcoin_data.get('usd', 50000)),
-                    "volume": float(bitcoin_data.get('usd_24h_vol', 1000000)),
-                    "change_24h": float(bitcoin_data.get('usd_24h_change', 0)),
-                    "timestamp": datetime.utcnow(),
-                    "source": "CoinGecko"
-                }
-                
-                logger.info(f"✅ Données CoinGecko récupérées: Prix=${market_data['price']:,.2f}, Volume=${market_data['volume']:,.0f}")
-                return market_data
+                return self._parse_coingecko_ticker(response.json(), symbols)
             else:
                 logger.warning(f"⚠️ Erreur API CoinGecko: {response.status_code}")
                 
         except Exception as e:
             logger.error(f"❌ Erreur collecte données CoinGecko: {str(e)}")
         
-        # Fallback avec des données réalistes mais aléatoires
-        fallback_data = {
-            "symbol": "BTC/USD",
-            "price": float(random.randint(45000, 55000)),
-            "volume": float(random.randint(1000000, 5000000)),
-            "change_24h": float(random.uniform(-5, 5)),
-            "timestamp": datetime.utcnow(),
-            "source": "Fallback"
-        }
-        logger.info(f"📊 Utilisation données fallback: Prix=${fallback_data['price']:,.2f}")
-        return fallback_data
+        return self._fallback_market_data(symbols)
     
-    async def start_pipeline(self):
-        """Démarre le pipeline complet."""
+    async def start_pipeline(self, mode: Optional[str] = None):
+        """
+        Démarre le pipeline complet.
+        
+        Args:
+            mode: "async" (boucle asyncio dédiée) ou "thread" (boucle synchrone),
+                  par défaut `execution_mode`
+        """
         if self.is_running:
             logger.warning("⚠️ Pipeline déjà en cours d'exécution")
             return False
         
+        mode = mode or self.execution_mode
         try:
-            logger.info("🚀 Démarrage du pipeline séquentiel...")
+            logger.info("🚀 Démarrage du pipeline séquentiel...", mode=mode)
             self.is_running = True
             self.stop_event.clear()
+            self.execution_mode = mode
+            
+            # Journal ouvert au démarrage, pas à la construction: l'import du module
+            # (singleton) ne crée rien sur disque
+            if self.event_log is None:
+                event_log = open_event_log_from_env()
+                if event_log is not None:
+                    self._set_event_log(event_log)
+                    self._owns_event_log = True
+            
+            # Record/replay par variables d'environnement, sauf si un appelant
+            # (benchmark, test) a déjà branché le magnétophone
+            if not traffic_recorder.active:
+                traffic_recorder.configure_from_env()
+                self._owns_traffic_recorder = traffic_recorder.active
             
             # Démarrer tous les agents uAgent
             await self._start_all_agents()
             
-            # Démarrer la tâche périodique dans un thread séparé
-            self.pipeline_thread = threading.Thread(target=self._pipeline_loop_thread, daemon=True)
-            self.pipeline_thread.start()
+            if mode == "async":
+                # Une seule boucle asyncio pour toute la durée du pipeline: pas de
+                # création de boucle ni de client à chaque tick
+                self._start_event_loop()
+                self.pipeline_future = asyncio.run_coroutine_threadsafe(self._pipeline_loop(), self.event_loop)
+            else:
+                # Démarrer la tâche périodique dans un thread séparé
+                self.pipeline_thread = threading.Thread(target=self._pipeline_loop_thread, daemon=True)
+                self.pipeline_thread.start()
             
             logger.info("✅ Pipeline démarré avec succès")
             return True
@@ -367,6 +541,7 @@ class PipelineManager:
         except Exception as e:
             logger.error("❌ Erreur démarrage pipeline", error=str(e))
             self.is_running = False
+            self._close_event_log()
             return False
     
     async def stop_pipeline(self):
@@ -380,12 +555,27 @@ class PipelineManager:
             self.is_running = False
             self.stop_event.set()
             
+            if self.pipeline_future is not None:
+                # Réveiller la boucle asyncio et attendre la fin du tick en cours
+                self.event_loop.call_soon_threadsafe(self._wake_async_loop)
+                try:
+                    await asyncio.wait_for(asyncio.wrap_future(self.pipeline_future), timeout=5)
+                except asyncio.TimeoutError:
+                    logger.warning("⚠️ Tick en cours interrompu à l'arrêt")
+                    self.pipeline_future.cancel()
+                self.pipeline_future = None
+                self._stop_event_loop()
+            
             # Attendre que le thread se termine
             if self.pipeline_thread and self.pipeline_thread.is_alive():
                 self.pipeline_thread.join(timeout=5)
             
             # Arrêter tous les agents
             await self._stop_all_agents()
+            self._close_event_log()
+            if self._owns_traffic_recorder:
+                traffic_recorder.stop()
+                self._owns_traffic_recorder = False
             
             logger.info("✅ Pipeline arrêté")
             return True
@@ -394,10 +584,76 @@ class PipelineManager:
             logger.error("❌ Erreur arrêt pipeline", error=str(e))
             return False
     
+    def _set_event_log(self, event_log: Optional[EventLog]):
+        """Branche le journal sur le manager et sur les agents qui y écrivent."""
+        self.event_log = event_log
+        for name in ("trader", "logger"):
+            if name in self.agents:
+                self.agents[name].event_log = event_log
+    
+    def _close_event_log(self):
+        """Ferme le journal ouvert par start_pipeline (un journal injecté reste à l'appelant)."""
+        if self._owns_event_log and self.event_log is not None:
+            self.event_log.close()
+            self._set_event_log(None)
+        self._owns_event_log = False
+    
+    def _start_event_loop(self):
+        """Crée la boucle asyncio du pipeline et la fait tourner dans un thread dédié."""
+        self.event_loop = asyncio.new_event_loop()
+        self.pipeline_thread = threading.Thread(
+            target=self._run_event_loop,
+            args=(self.event_loop,),
+            name="pipeline-event-loop",
+            daemon=True
+        )
+        self.pipeline_thread.start()
+    
+    def _run_event_loop(self, loop: asyncio.AbstractEventLoop):
+        """Point d'entrée du thread de la boucle asyncio."""
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+    
+    def _stop_event_loop(self):
+        """Arrête la boucle asyncio du pipeline et son thread."""
+        if self.event_loop is not None and not self.event_loop.is_closed():
+            self.event_loop.call_soon_threadsafe(self.event_loop.stop)
+        if self.pipeline_thread and self.pipeline_thread.is_alive():
+            self.pipeline_thread.join(timeout=5)
+        self.event_loop = None
+    
+    def _wake_async_loop(self):
+        """Interrompt l'attente entre deux ticks (appelé sur la boucle du pipeline)."""
+        if self._async_stop is not None:
+            self._async_stop.set()
+    
+    def _store_pipeline_data(self, pipeline_data: List[PipelineData]):
+        """Ajoute les résultats d'un cycle à l'historique borné (les plus anciens sont évincés)."""
+        if pipeline_data:
+            self.pipeline_data.extend(pipeline_data)
+            self._persist_pipeline_data(pipeline_data)
+    
+    def _persist_pipeline_data(self, pipeline_data: List[PipelineData]):
+        """Écrit les résultats dans le journal sur disque (sans interrompre le pipeline en cas d'échec)."""
+        if self.event_log is None:
+            return
+        try:
+            for data in pipeline_data:
+                self.event_log.append("pipeline_data", asdict(data), data.timestamp)
+        except Exception as e:
+            logger.error("❌ Erreur écriture journal d'événements", error=str(e))
+    
     def _pipeline_loop_thread(self):
         """Boucle principale du pipeline dans un thread séparé."""
         logger.info("🔄 Démarrage de la boucle pipeline dans le thread")
         
+        # Boucle asyncio et clients créés une fois pour tout le thread
+        self.event_loop = asyncio.new_event_loop()
+        self.event_loop.run_until_complete(self._open_clients())
+        
         while self.is_running and not self.stop_event.is_set():
             try:
                 start_time = datetime.utcnow()
@@ -405,12 +661,7 @@ class PipelineManager:
                 
                 # Exécution séquentielle des agents (version synchrone)
                 pipeline_data = self._execute_pipeline_sequence_sync()
-                
-                if pipeline_data:
-                    self.pipeline_data.append(pipeline_data)
-                    # Garder seulement les dernières données
-                    if len(self.pipeline_data) > self.max_pipeline_data:
-                        self.pipeline_data = self.pipeline_data[-self.max_pipeline_data:]
+                self._store_pipeline_data(pipeline_data)
                 
                 # Calculer le temps d'exécution
                 execution_time = (datetime.utcnow() - start_time).total_seconds()
@@ -418,138 +669,242 @@ class PipelineManager:
                            execution_time_seconds=execution_time,
                            pipeline_data_count=len(self.pipeline_data))
                 
-                # Attendre le prochain cycle (version thread-safe)
-                for _ in range(self.execution_interval):
-                    if self.stop_event.is_set():
-                        break
-                    time.sleep(1)
+                # Attendre le prochain cycle (réveillé immédiatement à l'arrêt)
+                self.stop_event.wait(self.execution_interval)
                 
             except Exception as e:
                 logger.error("❌ Erreur dans la boucle pipeline", error=str(e))
                 # Attendre 10 secondes avant de réessayer
-                for _ in range(10):
-                    if self.stop_event.is_set():
-                        break
-                    time.sleep(1)
+                self.stop_event.wait(10)
         
+        self.event_loop.run_until_complete(self._close_clients())
+        self.event_loop.close()
+        self.event_loop = None
         logger.info("🛑 Boucle pipeline terminée")
     
     async def _pipeline_loop(self):
-        """Boucle principale du pipeline (version asynchrone pour compatibilité)."""
-        # Cette méthode est maintenant dépréciée, utilisez _pipeline_loop_thread
-        logger.warning("⚠️ _pipeline_loop est déprécié, utilisez _pipeline_loop_thread")
+        """Boucle principale du pipeline sur la boucle asyncio dédiée."""
+        logger.info("🔄 Démarrage de la boucle pipeline asyncio")
+        self._async_stop = asyncio.Event()
+        await self._open_clients()
+        
+        try:
+            while self.is_running and not self.stop_event.is_set():
+                try:
+                    start_time = time.perf_counter()
+                    logger.info("🔄 Début cycle pipeline", timestamp=datetime.utcnow())
+                    
+                    pipeline_data = await self._execute_pipeline_sequence()
+                    self._store_pipeline_data(pipeline_data)
+                    
+                    execution_time = time.perf_counter() - start_time
+                    logger.info("✅ Cycle pipeline terminé", 
+                               execution_time_seconds=execution_time,
+                               pipeline_data_count=len(self.pipeline_data))
+                    
+                    # Cadence fixe: le temps du tick est décompté de l'intervalle
+                    await self._wait_next_tick(max(0.0, self.execution_interval - execution_time))
+                    
+                except Exception as e:
+                    logger.error("❌ Erreur dans la boucle pipeline", error=str(e))
+                    # Attendre 10 secondes avant de réessayer
+                    await self._wait_next_tick(10)
+        finally:
+            await self._close_clients()
+            self._async_stop = None
+            logger.info("🛑 Boucle pipeline terminée")
+    
+    async def _wait_next_tick(self, delay: float):
+        """Attend `delay` secondes ou l'arrêt du pipeline."""
+        try:
+            await asyncio.wait_for(self._async_stop.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+    
+    async def execute_once(self) -> List[PipelineData]:
+        """
+        Exécute un tick manuel. Si le pipeline tourne en mode async, le tick est
+        exécuté sur sa boucle pour réutiliser ses clients; sinon des clients
+        temporaires sont utilisés.
+        """
+        if self.pipeline_future is not None and self.event_loop is not None and self.event_loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(self._execute_pipeline_sequence(), self.event_loop)
+            return await asyncio.wrap_future(future)
         return await self._execute_pipeline_sequence()
     
-    async def _execute_pipeline_sequence(self) -> Optional[PipelineData]:
-        """Exécute la séquence complète des agents."""
+    def _build_stage_graph(self) -> StageGraph:
+        """
+        Déclare les étapes d'un cycle et leurs entrées:
+        market ─┐
+                ├─> aggregate ─> symbols (Predictor → Strategy → Trader → Logger)
+        news ───┘ (optionnelle)
+        """
+        graph = StageGraph("pipeline")
+        graph.add_stage("market", self._execute_data_collector)
+        graph.add_stage("news", self._execute_news_collector)
+        graph.add_stage("aggregate", self._execute_data_aggregator,
+                        inputs=("market", "news"), optional=("news",))
+        graph.add_stage("symbols", self._execute_symbols, inputs=("aggregate",))
+        return graph
+    
+    async def _execute_pipeline_sequence(self) -> List[PipelineData]:
+        """
+        Exécute un cycle complet via le graphe d'étapes: la collecte de marché
+        (un seul appel pour toute la watchlist) et la collecte de news tournent
+        en parallèle, la fusion démarre dès que les deux sont prêtes. La latence
+        du cycle est celle du chemin critique.
+        """
         try:
-            # 1. DataCollector - Collecte des données
-            logger.info("📊 Étape 1: DataCollector")
-            market_data = await self._execute_data_collector()
-            if not market_data:
+            run = await self.stage_graph.run()
+            self.last_stage_run = run
+            
+            if not run.results.get("market"):
                 logger.warning("⚠️ Aucune donnée collectée, arrêt du pipeline")
-                return None
+                return []
+            
+            logger.info("🧭 Étapes du cycle",
+                       stages_ms=run.durations_ms(),
+                       total_ms=int(run.total_seconds * 1000))
+            return run.results.get("symbols") or []
             
+        except Exception as e:
+            logger.error("❌ Erreur dans la séquence pipeline", error=str(e))
+        return []
+    
+    async def _execute_symbols(self, aggregate: Dict[str, Dict[str, Any]]) -> List[PipelineData]:
+        """
+        Exécute la séquence Predictor → Strategy → Trader → Logger pour chaque
+        symbole en parallèle (au plus `max_concurrent_symbols` à la fois).
+        L'échec d'un symbole n'interrompt pas les autres.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrent_symbols)
+        
+        async def run_symbol(market_data: Dict[str, Any]) -> Optional[PipelineData]:
+            async with semaphore:
+                return await self._execute_symbol_sequence(market_data)
+        
+        results = await asyncio.gather(
+            *(run_symbol(market_data) for market_data in aggregate.values()),
+            return_exceptions=True
+        )
+        
+        pipeline_data = []
+        for symbol, result in zip(aggregate.keys(), results):
+            if isinstance(result, BaseException):
+                logger.error("❌ Erreur séquence symbole", symbol=symbol, error=str(result))
+            elif result is not None:
+                pipeline_data.append(result)
+        return pipeline_data
+    
+    async def _execute_symbol_sequence(self, market_data: Dict[str, Any]) -> Optional[PipelineData]:
+        """Exécute la séquence des agents pour un symbole."""
+        symbol = market_data.get("symbol", "UNKNOWN")
+        try:
             # 2. Predictor - Génération de prédictions
-            logger.info("🔮 Étape 2: Predictor")
+            logger.info("🔮 Étape 2: Predictor", symbol=symbol)
             prediction = await self._execute_predictor(market_data)
             
             # 3. Strategy - Analyse et signaux
-            logger.info("📈 Étape 3: Strategy")
+            logger.info("📈 Étape 3: Strategy", symbol=symbol)
             strategy_signal = await self._execute_strategy(market_data, prediction)
             
             # 4. Trader - Exécution des trades
-            logger.info("💰 Étape 4: Trader")
+            logger.info("💰 Étape 4: Trader", symbol=symbol)
             trade_execution = await self._execute_trader(market_data, strategy_signal)
             
             # 5. Logger - Monitoring et logging
-            logger.info("📝 Étape 5: Logger")
+            logger.info("📝 Étape 5: Logger", symbol=symbol)
             await self._execute_logger(market_data, prediction, strategy_signal, trade_execution)
             
-            # Créer les données du pipeline
-            pipeline_data = PipelineData(
-                timestamp=datetime.utcnow(),
-                symbol=market_data.get("symbol", "UNKNOWN"),
-                price=market_data.get("price", 0.0),
-                volume=market_data.get("volume", 0.0),
-                prediction=prediction,
-                strategy_signal=strategy_signal,
-                trade_execution=trade_execution,
-                metadata={
-                    "pipeline_version": "1.0.0",
-                    "execution_id": f"exec_{datetime.utcnow().timestamp()}"
-                }
-            )
-            
-            return pipeline_data
+            return self._build_pipeline_data(market_data, prediction, strategy_signal, trade_execution)
             
         except Exception as e:
-                    logger.error("❌ Erreur dans la séquence pipeline", error=str(e))
+            logger.error("❌ Erreur dans la séquence pipeline", symbol=symbol, error=str(e))
         return None
     
-    def _execute_pipeline_sequence_sync(self) -> Optional[PipelineData]:
-        """Exécute la séquence complète des agents (version synchrone pour le thread)."""
+    def _build_pipeline_data(self, market_data: Dict[str, Any], prediction: Optional[Dict[str, Any]],
+                             strategy_signal: Optional[Dict[str, Any]],
+                             trade_execution: Optional[Dict[str, Any]]) -> PipelineData:
+        """Crée les données du pipeline pour un symbole."""
+        return PipelineData(
+            timestamp=datetime.utcnow(),
+            symbol=market_data.get("symbol", "UNKNOWN"),
+            price=market_data.get("price", 0.0),
+            volume=market_data.get("volume", 0.0),
+            prediction=prediction,
+            strategy_signal=strategy_signal,
+            trade_execution=trade_execution,
+            metadata={
+                "pipeline_version": "1.0.0",
+                "execution_id": f"exec_{datetime.utcnow().timestamp()}",
+                "news_sentiment": market_data.get("news_sentiment"),
+                "news_count": market_data.get("news_count", 0)
+            }
+        )
+    
+    def _execute_pipeline_sequence_sync(self) -> List[PipelineData]:
+        """Exécute un cycle complet (version synchrone pour le thread, symboles traités un par un)."""
         try:
-            # 1. DataCollector - Collecte des données
-            logger.info("📊 Étape 1: DataCollector")
-            market_data = self._execute_data_collector_sync()
-            if not market_data:
+            # 1. DataCollector - Collecte des données (un seul appel pour tous les symboles)
+            logger.info("📊 Étape 1: DataCollector", symbols=len(self.watchlist))
+            snapshot = self._execute_data_collector_sync()
+            if not snapshot:
                 logger.warning("⚠️ Aucune donnée collectée, arrêt du pipeline")
-                return None
+                return []
             
+            pipeline_data = []
+            for market_data in snapshot.values():
+                result = self._execute_symbol_sequence_sync(market_data)
+                if result is not None:
+                    pipeline_data.append(result)
+            return pipeline_data
+            
+        except Exception as e:
+            logger.error("❌ Erreur dans la séquence pipeline synchrone", error=str(e))
+            return []
+    
+    def _execute_symbol_sequence_sync(self, market_data: Dict[str, Any]) -> Optional[PipelineData]:
+        """Exécute la séquence des agents pour un symbole (version synchrone)."""
+        symbol = market_data.get("symbol", "UNKNOWN")
+        try:
             # 2. Predictor - Génération de prédictions
-            logger.info("🔮 Étape 2: Predictor")
+            logger.info("🔮 Étape 2: Predictor", symbol=symbol)
             prediction = self._execute_predictor_sync(market_data)
             
             # 3. Strategy - Analyse et signaux
-            logger.info("📈 Étape 3: Strategy")
+            logger.info("📈 Étape 3: Strategy", symbol=symbol)
             strategy_signal = self._execute_strategy_sync(market_data, prediction)
             
             # 4. Trader - Exécution des trades
-            logger.info("💰 Étape 4: Trader")
+            logger.info("💰 Étape 4: Trader", symbol=symbol)
             trade_execution = self._execute_trader_sync(market_data, strategy_signal)
             
             # 5. Logger - Monitoring et logging
-            logger.info("📝 Étape 5: Logger")
+            logger.info("📝 Étape 5: Logger", symbol=symbol)
             self._execute_logger_sync(market_data, prediction, strategy_signal, trade_execution)
             
-            # Créer les données du pipeline
-            pipeline_data = PipelineData(
-                timestamp=datetime.utcnow(),
-                symbol=market_data.get("symbol", "UNKNOWN"),
-                price=market_data.get("price", 0.0),
-                volume=market_data.get("volume", 0.0),
-                prediction=prediction,
-                strategy_signal=strategy_signal,
-                trade_execution=trade_execution,
-                metadata={
-                    "pipeline_version": "1.0.0",
-                    "execution_id": f"exec_{datetime.utcnow().timestamp()}"
-                }
-            )
-            
-            return pipeline_data
+            return self._build_pipeline_data(market_data, prediction, strategy_signal, trade_execution)
             
         except Exception as e:
-            logger.error("❌ Erreur dans la séquence pipeline synchrone", error=str(e))
+            logger.error("❌ Erreur dans la séquence pipeline synchrone", symbol=symbol, error=str(e))
             return None
     
-    async def _execute_data_collector(self) -> Optional[Dict[str, Any]]:
-        """Exécute l'agent DataCollector."""
+    async def _execute_data_collector(self) -> Dict[str, Dict[str, Any]]:
+        """Exécute l'agent DataCollector pour toute la watchlist."""
         agent_name = "data_collector"
         start_time = datetime.utcnow()
         
         try:
             self.agent_status[agent_name].status = AgentStatus.PROCESSING
             
-            # Simuler la collecte de données (remplacé par l'appel réel à l'agent)
-            market_data = {
-                "symbol": "BTC/USD",
-                "price": 108538.0,
-                "volume": 1000000.0,
-                "timestamp": datetime.utcnow(),
-                "source": "CoinGecko"
-            }
+            # Vraie collecte de données via CoinGecko API (session HTTP réutilisée)
+            snapshot = await self._collect_market_snapshot(self.watchlist)
+            if not snapshot:
+                logger.error("❌ Impossible de collecter les données de marché")
+                return {}
+            
+            # Enregistrer les ticks dans l'historique partagé
+            self._record_snapshot(snapshot)
             
             # Mettre à jour le statut
             self.agent_status[agent_name].status = AgentStatus.RUNNING
@@ -557,18 +912,18 @@ class PipelineManager:
             self.agent_status[agent_name].execution_count += 1
             self.agent_status[agent_name].processing_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
             
-            logger.info("✅ DataCollector exécuté", data=market_data)
-            return market_data
+            logger.info("✅ DataCollector exécuté", symbols=list(snapshot.keys()))
+            return snapshot
             
         except Exception as e:
             self.agent_status[agent_name].status = AgentStatus.ERROR
             self.agent_status[agent_name].error_count += 1
             self.agent_status[agent_name].last_error = str(e)
             logger.error("❌ Erreur DataCollector", error=str(e))
-            return None
+            return {}
     
-    def _execute_data_collector_sync(self) -> Optional[Dict[str, Any]]:
-        """Exécute l'agent DataCollector (version synchrone)."""
+    def _execute_data_collector_sync(self) -> Dict[str, Dict[str, Any]]:
+        """Exécute l'agent DataCollector pour toute la watchlist (version synchrone)."""
         agent_name = "data_collector"
         start_time = datetime.utcnow()
         
@@ -576,10 +931,13 @@ class PipelineManager:
             self.agent_status[agent_name].status = AgentStatus.PROCESSING
             
             # Vraie collecte de données via CoinGecko API
-            market_data = self._collect_real_market_data_sync()
-            if not market_data:
+            snapshot = self._collect_market_snapshot_sync(self.watchlist)
+            if not snapshot:
                 logger.error("❌ Impossible de collecter les données de marché")
-                return None
+                return {}
+            
+            # Enregistrer les ticks dans l'historique partagé
+            self._record_snapshot(snapshot)
             
             # Mettre à jour le statut
             self.agent_status[agent_name].status = AgentStatus.RUNNING
@@ -587,15 +945,96 @@ class PipelineManager:
             self.agent_status[agent_name].execution_count += 1
             self.agent_status[agent_name].processing_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
             
-            logger.info("✅ DataCollector exécuté (sync)", data=market_data)
-            return market_data
+            logger.info("✅ DataCollector exécuté (sync)", symbols=list(snapshot.keys()))
+            return snapshot
             
         except Exception as e:
             self.agent_status[agent_name].status = AgentStatus.ERROR
             self.agent_status[agent_name].error_count += 1
             self.agent_status[agent_name].last_error = str(e)
             logger.error("❌ Erreur DataCollector (sync)", error=str(e))
-            return None
+            return {}
+    
+    async def _execute_news_collector(self) -> Dict[str, Dict[str, Any]]:
+        """Exécute l'agent NewsCollector: sentiment agrégé des news récentes par crypto."""
+        agent_name = "news_collector"
+        start_time = datetime.utcnow()
+        
+        try:
+            self.agent_status[agent_name].status = AgentStatus.PROCESSING
+            
+            agent = self.agents[agent_name]
+            async with self._http() as session:
+                news_by_symbol = await agent._fetch_news_by_symbol(session=session)
+            
+            news_summary = {
+                symbol: {
+                    "news_sentiment": agent._calculate_aggregated_sentiment(items),
+                    "news_count": len(items),
+                    "high_impact_news_count": sum(1 for news in items if news.impact_level in ["high", "critical"])
+                }
+                for symbol, items in news_by_symbol.items()
+            }
+            
+            # Mettre à jour le statut
+            self.agent_status[agent_name].status = AgentStatus.RUNNING
+            self.agent_status[agent_name].last_execution = datetime.utcnow()
+            self.agent_status[agent_name].execution_count += 1
+            self.agent_status[agent_name].processing_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+            
+            logger.info("✅ NewsCollector exécuté", 
+                       news_count=sum(summary["news_count"] for summary in news_summary.values()),
+                       symbols=list(news_summary.keys()))
+            return news_summary
+            
+        except Exception as e:
+            self.agent_status[agent_name].status = AgentStatus.ERROR
+            self.agent_status[agent_name].error_count += 1
+            self.agent_status[agent_name].last_error = str(e)
+            logger.error("❌ Erreur NewsCollector", error=str(e))
+            return {}
+    
+    async def _execute_data_aggregator(self, market: Dict[str, Dict[str, Any]],
+                                       news: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """Exécute l'agent DataAggregator: enrichit chaque tick de marché avec le sentiment des news."""
+        agent_name = "data_aggregator"
+        start_time = datetime.utcnow()
+        
+        try:
+            self.agent_status[agent_name].status = AgentStatus.PROCESSING
+            
+            fused = {}
+            for symbol, market_data in (market or {}).items():
+                news_summary = (news or {}).get(symbol.split("/")[0])
+                fused[symbol] = {**market_data, **news_summary} if news_summary else market_data
+            
+            # Mettre à jour le statut
+            self.agent_status[agent_name].status = AgentStatus.RUNNING
+            self.agent_status[agent_name].last_execution = datetime.utcnow()
+            self.agent_status[agent_name].execution_count += 1
+            self.agent_status[agent_name].processing_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
+            
+            logger.info("✅ DataAggregator exécuté", 
+                       symbols=len(fused),
+                       with_news=sum(1 for data in fused.values() if "news_sentiment" in data))
+            return fused
+            
+        except Exception as e:
+            self.agent_status[agent_name].status = AgentStatus.ERROR
+            self.agent_status[agent_name].error_count += 1
+            self.agent_status[agent_name].last_error = str(e)
+            logger.error("❌ Erreur DataAggregator", error=str(e))
+            return market or {}
+    
+    def _record_snapshot(self, snapshot: Dict[str, Dict[str, Any]]):
+        """Ajoute les ticks collectés à l'historique partagé."""
+        for symbol, market_data in snapshot.items():
+            price_history_store.append(
+                symbol,
+                market_data["price"],
+                market_data.get("volume"),
+                market_data.get("timestamp")
+            )
     
     async def _execute_predictor(self, market_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Exécute l'agent Predictor."""
@@ -605,13 +1044,8 @@ class PipelineManager:
         try:
             self.agent_status[agent_name].status = AgentStatus.PROCESSING
             
-            # Simuler la prédiction (remplacé par l'appel réel à l'agent)
-            prediction = {
-                "direction": "UP",
-                "confidence": 0.75,
-                "price_target": market_data["price"] * 1.02,
-                "timestamp": datetime.utcnow()
-            }
+            # Utiliser le vrai Predictor avec IA ASI:One (modèle partagé)
+            prediction = await self._generate_ai_prediction(market_data)
             
             # Mettre à jour le statut
             self.agent_status[agent_name].status = AgentStatus.RUNNING
@@ -875,14 +1309,39 @@ class PipelineManager:
             "execution_interval": self.execution_interval,
             "agents": agents_dict,
             "pipeline_data_count": len(self.pipeline_data),
+            "pipeline_history": self.pipeline_data.get_stats(),
+            "event_log": self.event_log.get_stats() if self.event_log else None,
+            "last_cycle_stages_ms": self.last_stage_run.durations_ms() if self.last_stage_run else {},
             "last_execution": max([status.last_execution for status in self.agent_status.values() if status.last_execution], default=None)
         }
     
-    def get_pipeline_data(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Retourne les dernières données du pipeline."""
-        recent_data = self.pipeline_data[-limit:] if self.pipeline_data else []
+    def get_pipeline_data(self, limit: int = 100, symbol: Optional[str] = None,
+                          since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Retourne les dernières données du pipeline (éventuellement d'un symbole / depuis une date)."""
+        if since is not None:
+            recent_data = self.pipeline_data.since(since, symbol)[-limit:] if limit > 0 else []
+        else:
+            recent_data = self.pipeline_data.latest(limit, symbol)
         return [asdict(data) for data in recent_data]
     
+    def get_persisted_pipeline_data(self, limit: int = 100, symbol: Optional[str] = None,
+                                    start: Optional[datetime] = None, end: Optional[datetime] = None,
+                                    before: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Page de résultats lue depuis le journal sur disque (du plus ancien au plus récent).
+        `next_before` est le curseur de la page précédente (None quand l'historique est épuisé).
+        """
+        if self.event_log is None:
+            return {"data": self.get_pipeline_data(limit, symbol=symbol, since=start), "next_before": None}
+        
+        where = (lambda event: event.payload.get("symbol") == symbol) if symbol else None
+        events = self.event_log.latest(limit, kinds=("pipeline_data",), where=where,
+                                       start=start, end=end, before_seq=before)
+        return {
+            "data": [event.payload for event in events],
+            "next_before": events[0].seq if len(events) == limit and events[0].seq > 0 else None
+        }
+    
     def get_agent_status(self, agent_name: str) -> Optional[Dict[str, Any]]:
         """Retourne le statut d'un agent spécifique."""
         if agent_name in self.agent_status:
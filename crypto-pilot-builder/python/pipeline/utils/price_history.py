@@ -0,0 +1,223 @@
+"""Historique des prix par symbole dans des buffers circulaires NumPy."""
+
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_TIMEFRAME = "1m"
+DEFAULT_CAPACITY = 1000
+
+
+class RingBuffer:
+    """
+    Buffer circulaire float64 de capacité fixe.
+
+    Chaque valeur est écrite deux fois (position `i` et `i + capacity`) dans un
+    tableau de taille `2 * capacity`: les N dernières valeurs forment ainsi
+    toujours une tranche contiguë, retournée sans copie. Une vue reste valide
+    pendant les `capacity - N` ajouts suivants.
+    """
+
+    __slots__ = ("capacity", "_data", "_head", "_count")
+
+    def __init__(self, capacity: int, dtype=np.float64):
+        if capacity <= 0:
+            raise ValueError("La capacité doit être strictement positive")
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._head = 0  # Prochaine position d'écriture dans [0, capacity)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float):
+        """Ajoute une valeur en écrasant la plus ancienne si le buffer est plein (O(1))."""
+        self._data[self._head] = value
+        self._data[self._head + self.capacity] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def extend(self, values):
+        """Ajoute plusieurs valeurs par copies de blocs (seules les `capacity` dernières sont conservées)."""
+        values = np.asarray(values, dtype=self._data.dtype)[-self.capacity:]
+        count = len(values)
+        if count == 0:
+            return
+        # Au plus deux blocs: jusqu'à la fin du buffer, puis depuis le début
+        first = min(count, self.capacity - self._head)
+        for start, block in ((self._head, values[:first]), (0, values[first:])):
+            if len(block):
+                self._data[start:start + len(block)] = block
+                self._data[start + self.capacity:start + self.capacity + len(block)] = block
+        self._head = (self._head + count) % self.capacity
+        self._count = min(self._count + count, self.capacity)
+
+    def last(self, count: Optional[int] = None) -> np.ndarray:
+        """Vue en lecture seule sur les `count` dernières valeurs (toutes par défaut)."""
+        count = self._count if count is None else max(0, min(count, self._count))
+        end = self._head + self.capacity
+        view = self._data[end - count:end]
+        view.flags.writeable = False
+        return view
+
+    def latest(self) -> Optional[float]:
+        """Dernière valeur ajoutée."""
+        if self._count == 0:
+            return None
+        return self._data[self._head + self.capacity - 1].item()
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+
+class _SymbolHistory:
+    """Buffers alignés (timestamps, prix, volumes) d'un couple symbole/timeframe."""
+
+    __slots__ = ("timestamps", "prices", "volumes")
+
+    def __init__(self, capacity: int):
+        self.timestamps = RingBuffer(capacity)
+        self.prices = RingBuffer(capacity)
+        self.volumes = RingBuffer(capacity)
+
+
+class PriceHistoryStore:
+    """
+    Registre partagé des historiques de prix par symbole et timeframe.
+
+    Les ajouts sont en O(1) et les fenêtres "N derniers points" sont des vues
+    sans copie. L'écriture est protégée par un verrou pour permettre les ajouts
+    depuis le thread du pipeline et depuis la boucle asyncio de l'API.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._histories: Dict[Tuple[str, str], _SymbolHistory] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, symbol: str, timeframe: str) -> Optional[_SymbolHistory]:
+        return self._histories.get((symbol, timeframe))
+
+    def _get_or_create(self, symbol: str, timeframe: str) -> _SymbolHistory:
+        history = self._histories.get((symbol, timeframe))
+        if history is None:
+            history = _SymbolHistory(self.capacity)
+            self._histories[(symbol, timeframe)] = history
+        return history
+
+    def append(self, symbol: str, price: float, volume: Optional[float] = None,
+               timestamp: Optional[float] = None, timeframe: str = DEFAULT_TIMEFRAME):
+        """Ajoute un point (timestamp Unix en secondes, maintenant par défaut)."""
+        if isinstance(timestamp, datetime):
+            # Les datetimes naïfs du pipeline sont en UTC (datetime.utcnow)
+            if timestamp.tzinfo is None:
+                timestamp = timestamp.replace(tzinfo=timezone.utc)
+            timestamp = timestamp.timestamp()
+
+        with self._lock:
+            history = self._get_or_create(symbol, timeframe)
+
+            history.timestamps.append(time.time() if timestamp is None else timestamp)
+            history.prices.append(price)
+            history.volumes.append(np.nan if volume is None else volume)
+
+    def extend(self, symbol: str, prices, volumes=None, timestamps=None,
+               timeframe: str = DEFAULT_TIMEFRAME):
+        """Ajoute une série de points alignés."""
+        prices = list(prices)
+        volumes = list(volumes) if volumes is not None else [None] * len(prices)
+        timestamps = list(timestamps) if timestamps is not None else [None] * len(prices)
+        if not len(prices) == len(volumes) == len(timestamps):
+            raise ValueError("prices, volumes et timestamps doivent avoir la même longueur")
+
+        for price, volume, timestamp in zip(prices, volumes, timestamps):
+            self.append(symbol, price, volume, timestamp, timeframe)
+
+    def extend_arrays(self, symbol: str, prices: np.ndarray, volumes: Optional[np.ndarray] = None,
+                      timestamps: Optional[np.ndarray] = None, timeframe: str = DEFAULT_TIMEFRAME):
+        """
+        Ajoute des colonnes NumPy alignées (timestamps Unix en secondes) par copies
+        de blocs, sans objet Python par point. Volumes NaN si absents, timestamps à maintenant.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        count = len(prices)
+        volumes = np.full(count, np.nan) if volumes is None else np.asarray(volumes, dtype=np.float64)
+        timestamps = np.full(count, time.time()) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+        if not count == len(volumes) == len(timestamps):
+            raise ValueError("prices, volumes et timestamps doivent avoir la même longueur")
+
+        with self._lock:
+            history = self._get_or_create(symbol, timeframe)
+            history.timestamps.extend(timestamps)
+            history.prices.extend(prices)
+            history.volumes.extend(volumes)
+
+    def last_prices(self, symbol: str, count: Optional[int] = None,
+                    timeframe: str = DEFAULT_TIMEFRAME) -> np.ndarray:
+        """Vue sur les derniers prix d'un symbole (tableau vide si inconnu)."""
+        history = self._get(symbol, timeframe)
+        return history.prices.last(count) if history else np.empty(0)
+
+    def last_volumes(self, symbol: str, count: Optional[int] = None,
+                     timeframe: str = DEFAULT_TIMEFRAME) -> np.ndarray:
+        """Vue sur les derniers volumes (NaN quand le volume n'était pas connu)."""
+        history = self._get(symbol, timeframe)
+        return history.volumes.last(count) if history else np.empty(0)
+
+    def last_timestamps(self, symbol: str, count: Optional[int] = None,
+                        timeframe: str = DEFAULT_TIMEFRAME) -> np.ndarray:
+        """Vue sur les derniers timestamps Unix."""
+        history = self._get(symbol, timeframe)
+        return history.timestamps.last(count) if history else np.empty(0)
+
+    def latest_price(self, symbol: str, timeframe: str = DEFAULT_TIMEFRAME) -> Optional[float]:
+        history = self._get(symbol, timeframe)
+        return history.prices.latest() if history else None
+
+    def length(self, symbol: str, timeframe: str = DEFAULT_TIMEFRAME) -> int:
+        history = self._get(symbol, timeframe)
+        return len(history.prices) if history else 0
+
+    def symbols(self, timeframe: Optional[str] = None) -> List[str]:
+        """Symboles présents (éventuellement filtrés par timeframe)."""
+        with self._lock:
+            return sorted({s for s, tf in self._histories if timeframe is None or tf == timeframe})
+
+    def to_records(self, symbol: str, count: Optional[int] = None,
+                   timeframe: str = DEFAULT_TIMEFRAME) -> List[Dict[str, Any]]:
+        """Fenêtre sérialisable (timestamp, price, volume) pour l'API."""
+        # Copie cohérente des trois colonnes, à l'abri d'un ajout concurrent
+        with self._lock:
+            timestamps = self.last_timestamps(symbol, count, timeframe).tolist()
+            prices = self.last_prices(symbol, count, timeframe).tolist()
+            volumes = self.last_volumes(symbol, count, timeframe).tolist()
+        return [
+            {
+                "timestamp": datetime.utcfromtimestamp(ts),
+                "price": price,
+                "volume": None if np.isnan(volume) else volume
+            }
+            for ts, price, volume in zip(timestamps, prices, volumes)
+        ]
+
+    def clear(self, symbol: Optional[str] = None, timeframe: Optional[str] = None):
+        """Vide l'historique d'un symbole, d'un timeframe, ou tout le registre."""
+        with self._lock:
+            for key in list(self._histories):
+                if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                    del self._histories[key]
+
+        logger.info("🧹 Historique des prix vidé", symbol=symbol or "all", timeframe=timeframe or "all")
+
+
+# Instance globale partagée par les agents, l'API et le PipelineManager
+price_history_store = PriceHistoryStore()
@@ -0,0 +1,347 @@
+"""Limitation de débit par hôte (token bucket) avec priorités et backoff adaptatif."""
+
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+import structlog
+
+from .record_replay import RecordedResponse, TrafficRecorder, traffic_recorder
+
+logger = structlog.get_logger(__name__)
+
+
+class Priority(IntEnum):
+    """Priorité d'un appel sortant (plus petit = servi en premier)."""
+    TRADING = 0
+    DEFAULT = 1
+    DASHBOARD = 2
+
+
+class RateLimitTimeout(Exception):
+    """Aucun jeton obtenu dans le délai imparti."""
+
+
+# Priorité des appels émis dans le contexte courant (propagée aux tâches asyncio)
+request_priority: ContextVar[Priority] = ContextVar("request_priority", default=Priority.DEFAULT)
+
+
+@contextmanager
+def priority_scope(priority: Optional[Priority]):
+    """Fixe la priorité des appels sortants émis dans ce bloc (None: inchangée)."""
+    if priority is None:
+        yield
+        return
+    token = request_priority.set(priority)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+# Limites connues des fournisseurs: (jetons par seconde, rafale maximale)
+DEFAULT_HOST_LIMITS: Dict[str, Tuple[float, int]] = {
+    "api.coingecko.com": (0.5, 5),           # ~30 appels/min (offre gratuite)
+    "min-api.cryptocompare.com": (1.0, 5),
+    "li.quest": (1.5, 5),
+    "api.etherscan.io": (5.0, 5),
+    "api-sepolia.etherscan.io": (5.0, 5),
+}
+DEFAULT_LIMIT: Tuple[float, int] = (2.0, 5)
+
+# Codes HTTP signalant une saturation côté fournisseur
+THROTTLE_STATUSES = (429, 503)
+
+# Attente maximale d'un jeton pour un appel bloquant sans `timeout` de requête (secondes)
+DEFAULT_ACQUIRE_TIMEOUT = 30.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """Délai (secondes) d'un en-tête Retry-After, en secondes ou en date HTTP."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class HostRateLimiter:
+    """
+    Token bucket d'un hôte, partagé entre threads et boucles asyncio.
+
+    - Les demandeurs attendent dans une file de priorité: un jeton n'est
+      attribué qu'au premier de la file (priorité, puis ordre d'arrivée).
+    - Un 429/503 bloque l'hôte jusqu'à l'échéance du Retry-After (ou d'un
+      backoff exponentiel avec jitter) et divise le débit par deux; chaque
+      succès le fait remonter progressivement vers la limite configurée (AIMD).
+    """
+
+    MIN_RATE_FACTOR = 0.1
+    RECOVERY_STEP = 0.05
+    MAX_BACKOFF = 300.0
+    ASYNC_POLL_INTERVAL = 0.05
+
+    def __init__(self, host: str, rate: float, burst: int, clock=time.monotonic):
+        self.host = host
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._rate_factor = 1.0
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._throttle_count = 0
+        self._waiters: list = []  # tas de (priorité, numéro d'arrivée)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self.stats = {"acquired": 0, "throttled": 0, "timeouts": 0}
+
+    @property
+    def effective_rate(self) -> float:
+        return self.rate * self._rate_factor
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.effective_rate)
+            self._updated = now
+
+    def _try_take(self, ticket: Tuple[int, int]) -> float:
+        """Prend un jeton pour `ticket` (retourne 0) ou retourne l'attente estimée. Verrou requis."""
+        now = self._clock()
+        self._refill(now)
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._waiters[0] != ticket:
+            return 1.0 / self.effective_rate
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            heapq.heappop(self._waiters)
+            self.stats["acquired"] += 1
+            self._condition.notify_all()
+            return 0.0
+        return (1.0 - self._tokens) / self.effective_rate
+
+    def _enqueue(self, priority: Optional[Priority]) -> Tuple[int, int]:
+        if priority is None:
+            priority = request_priority.get()
+        ticket = (int(priority), next(self._sequence))
+        heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _abandon(self, ticket: Tuple[int, int]):
+        self._waiters.remove(ticket)
+        heapq.heapify(self._waiters)
+        self.stats["timeouts"] += 1
+        self._condition.notify_all()
+
+    def acquire(self, priority: Optional[Priority] = None, timeout: Optional[float] = None):
+        """
+        Attend un jeton (bloquant). Lève RateLimitTimeout après `timeout` secondes.
+        Sans priorité explicite, celle du contexte courant est utilisée.
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._condition:
+            ticket = self._enqueue(priority)
+            while True:
+                wait = self._try_take(ticket)
+                if wait == 0.0:
+                    return
+                if deadline is not None:
+                    remaining = deadline - self._clock()
+                    if remaining <= 0:
+                        self._abandon(ticket)
+                        raise RateLimitTimeout(f"Aucun jeton disponible pour {self.host}")
+                    wait = min(wait, remaining)
+                self._condition.wait(wait)
+
+    async def acquire_async(self, priority: Optional[Priority] = None, timeout: Optional[float] = None):
+        """Attend un jeton sans bloquer la boucle asyncio."""
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._lock:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._lock:
+                    wait = self._try_take(ticket)
+                if wait == 0.0:
+                    return
+                if deadline is not None and self._clock() >= deadline:
+                    raise RateLimitTimeout(f"Aucun jeton disponible pour {self.host}")
+                await asyncio.sleep(min(wait, self.ASYNC_POLL_INTERVAL))
+        except BaseException:
+            with self._condition:
+                if ticket in self._waiters:
+                    self._abandon(ticket)
+            raise
+
+    def record_response(self, status: int, retry_after: Optional[str] = None):
+        """Adapte le débit à la réponse du fournisseur."""
+        with self._condition:
+            if status in THROTTLE_STATUSES:
+                self._throttle_count += 1
+                self.stats["throttled"] += 1
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = (2 ** self._throttle_count) * (0.5 + random.random() / 2)
+                delay = min(self.MAX_BACKOFF, delay)
+                self._blocked_until = max(self._blocked_until, self._clock() + delay)
+                self._rate_factor = max(self.MIN_RATE_FACTOR, self._rate_factor / 2)
+                self._tokens = 0.0
+                logger.warning("⏳ Fournisseur saturé, backoff",
+                               host=self.host,
+                               status=status,
+                               delay=round(delay, 2),
+                               rate=round(self.effective_rate, 3))
+            elif status < 400:
+                self._throttle_count = 0
+                self._rate_factor = min(1.0, self._rate_factor + self.RECOVERY_STEP)
+            self._condition.notify_all()
+
+    def get_state(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(self._clock())
+            return {
+                "host": self.host,
+                "rate": self.rate,
+                "effective_rate": self.effective_rate,
+                "tokens": self._tokens,
+                "waiting": len(self._waiters),
+                "blocked_for": max(0.0, self._blocked_until - self._clock()),
+                **self.stats
+            }
+
+
+class RateLimiterRegistry:
+    """Registre des limiteurs par hôte, créés à la demande."""
+
+    def __init__(self, limits: Optional[Mapping[str, Tuple[float, int]]] = None,
+                 default: Tuple[float, int] = DEFAULT_LIMIT):
+        self.limits = dict(DEFAULT_HOST_LIMITS if limits is None else limits)
+        self.default = default
+        self._limiters: Dict[str, HostRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).hostname or url
+
+    def for_host(self, host: str) -> HostRateLimiter:
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                rate, burst = self.limits.get(host, self.default)
+                limiter = HostRateLimiter(host, rate, burst)
+                self._limiters[host] = limiter
+            return limiter
+
+    def for_url(self, url: str) -> HostRateLimiter:
+        return self.for_host(self.host_of(url))
+
+    def acquire(self, url: str, priority: Optional[Priority] = None, timeout: Optional[float] = None):
+        self.for_url(url).acquire(priority, timeout)
+
+    async def acquire_async(self, url: str, priority: Optional[Priority] = None, timeout: Optional[float] = None):
+        await self.for_url(url).acquire_async(priority, timeout)
+
+    def record_response(self, url: str, status: int, headers: Optional[Mapping[str, str]] = None):
+        retry_after = headers.get("Retry-After") if headers else None
+        self.for_url(url).record_response(status, retry_after)
+
+    def get_state(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            limiters = list(self._limiters.values())
+        return {limiter.host: limiter.get_state() for limiter in limiters}
+
+
+def _acquire_timeout_for(request_timeout: Any) -> float:
+    """
+    Attente d'un jeton alignée sur le timeout de la requête: nombre, tuple requests
+    (connexion) ou aiohttp.ClientTimeout (total).
+    """
+    if isinstance(request_timeout, tuple):
+        request_timeout = request_timeout[0]
+    elif request_timeout is not None and not isinstance(request_timeout, (int, float)):
+        request_timeout = getattr(request_timeout, "total", None)
+    return float(request_timeout) if request_timeout is not None else DEFAULT_ACQUIRE_TIMEOUT
+
+
+def rate_limited_get(url: str, priority: Optional[Priority] = None,
+                     acquire_timeout: Optional[float] = None, **kwargs):
+    """
+    `requests.get` précédé d'un jeton de l'hôte, avec prise en compte des 429.
+    En record/replay, la réponse est enregistrée ou rejouée (sans jeton ni réseau).
+
+    L'attente du jeton est bornée: `acquire_timeout`, à défaut le `timeout` de la
+    requête, à défaut DEFAULT_ACQUIRE_TIMEOUT. Au-delà, RateLimitTimeout est levée
+    pour que l'appelant passe à son repli au lieu de bloquer son thread.
+    """
+    if acquire_timeout is None:
+        acquire_timeout = _acquire_timeout_for(kwargs.get("timeout"))
+    
+    def fetch():
+        rate_limiter.acquire(url, priority, acquire_timeout)
+        response = requests.get(url, **kwargs)
+        rate_limiter.record_response(url, response.status_code, response.headers)
+        return response
+    
+    if not traffic_recorder.active:
+        return fetch()
+    return traffic_recorder.exchange_sync(
+        TrafficRecorder.service_of(url),
+        TrafficRecorder.request_key("GET", url, kwargs.get("params")),
+        lambda: RecordedResponse.from_requests(fetch()),
+        encode=RecordedResponse.to_dict,
+        decode=RecordedResponse.from_dict
+    )
+
+
+async def rate_limited_request(session, method: str, url: str, priority: Optional[Priority] = None,
+                               acquire_timeout: Optional[float] = None, **kwargs) -> RecordedResponse:
+    """
+    Requête aiohttp précédée d'un jeton de l'hôte. Le corps est lu dans la foulée
+    (JSON si 200, texte sinon) pour pouvoir être enregistré ou rejoué.
+
+    Comme pour rate_limited_get, l'attente du jeton est bornée: `acquire_timeout`,
+    à défaut le `timeout` de la requête puis celui de la session, à défaut
+    DEFAULT_ACQUIRE_TIMEOUT. Au-delà, RateLimitTimeout est levée.
+    """
+    if acquire_timeout is None:
+        acquire_timeout = _acquire_timeout_for(kwargs.get("timeout", getattr(session, "timeout", None)))
+    
+    async def fetch() -> RecordedResponse:
+        await rate_limiter.acquire_async(url, priority, acquire_timeout)
+        async with session.request(method, url, **kwargs) as response:
+            rate_limiter.record_response(url, response.status, response.headers)
+            body = await response.json() if response.status == 200 else await response.text()
+            return RecordedResponse(response.status, body, dict(response.headers), url)
+    
+    return await traffic_recorder.exchange_async(
+        TrafficRecorder.service_of(url),
+        TrafficRecorder.request_key(method, url, kwargs.get("params"), kwargs.get("json")),
+        fetch,
+        encode=RecordedResponse.to_dict,
+        decode=RecordedResponse.from_dict
+    )
+
+
+# Instance globale partagée par tous les clients HTTP du processus
+rate_limiter = RateLimiterRegistry()
@@ -0,0 +1,365 @@
+"""Enregistrement et rejeu déterministes des réponses des API amont (prix, news, LLM)."""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+import requests
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+TAPE_FORMAT = 1
+
+
+class TrafficMode(str, Enum):
+    OFF = "off"
+    RECORD = "record"
+    REPLAY = "replay"
+
+
+class ReplayMiss(Exception):
+    """Aucune réponse enregistrée ne correspond à la requête rejouée."""
+
+
+class ReplayedError(Exception):
+    """Erreur enregistrée lors de la capture, relevée à l'identique au rejeu."""
+
+
+@dataclass
+class RecordedResponse:
+    """
+    Réponse HTTP figée (JSON décodé si statut 200, texte sinon).
+    Expose `status`/`status_code`, `ok`, `raise_for_status()`, `json()`, `text`,
+    `content` et `headers` pour rester interchangeable avec les réponses aiohttp
+    et requests aux points d'appel.
+    """
+    status: int
+    body: Any
+    headers: Dict[str, str] = field(default_factory=dict)
+    url: str = ""
+
+    @property
+    def status_code(self) -> int:
+        return self.status
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    @property
+    def text(self) -> str:
+        return self.body if isinstance(self.body, str) else json.dumps(self.body)
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode("utf-8")
+
+    def raise_for_status(self):
+        """Lève `requests.HTTPError` sur un statut 4xx/5xx, comme une réponse requests."""
+        if not self.ok:
+            kind = "Client" if self.status < 500 else "Server"
+            raise requests.exceptions.HTTPError(f"{self.status} {kind} Error for url: {self.url}", response=self)
+
+    def json(self) -> Any:
+        return json.loads(self.body) if isinstance(self.body, str) else self.body
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"status": self.status, "body": self.body, "headers": self.headers, "url": self.url}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RecordedResponse":
+        return cls(data["status"], data["body"], data.get("headers") or {}, data.get("url", ""))
+
+    @classmethod
+    def from_requests(cls, response) -> "RecordedResponse":
+        try:
+            body = response.json() if response.status_code == 200 else response.text
+        except ValueError:
+            body = response.text
+        return cls(response.status_code, body, dict(response.headers), response.url)
+
+
+@dataclass
+class _Interaction:
+    service: str
+    key: str
+    started: float   # secondes depuis le début de l'enregistrement
+    latency: float
+    value: Any = None
+    error: Optional[str] = None
+    consumed: bool = False
+
+
+class TrafficRecorder:
+    """
+    Magnétophone des appels aux API externes.
+
+    - record: chaque appel est exécuté pour de vrai puis sa réponse (ou son
+      erreur) est ajoutée à une bande JSON Lines avec son instant et sa latence.
+    - replay: aucune requête réseau; la réponse est prise dans la bande par
+      clé exacte (méthode, URL, paramètres, empreinte du corps), à défaut la
+      plus ancienne non consommée du même service. `speed=None` rejoue au
+      plus vite, `speed=1.0` respecte l'horloge de l'enregistrement (2.0 deux
+      fois plus vite...).
+    - off: appel direct, sans surcoût.
+
+    Le générateur `rng` du magnétophone est réinitialisé avec la graine de la
+    bande pour que les replis simulés du pipeline soient eux aussi
+    reproductibles (le `random` global n'est pas touché).
+    """
+
+    def __init__(self):
+        self.mode = TrafficMode.OFF
+        self.path: Optional[str] = None
+        self.speed: Optional[float] = None
+        self.strict = False
+        self.seed: Optional[int] = None
+        self.rng = random.Random()
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._origin = time.monotonic()
+        self._by_key: Dict[Tuple[str, str], Deque[_Interaction]] = {}
+        self._by_service: Dict[str, Deque[_Interaction]] = {}
+        self._stats = {"recorded": 0, "replayed": 0, "fallbacks": 0, "misses": 0}
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not TrafficMode.OFF
+
+    @property
+    def recording(self) -> bool:
+        return self.mode is TrafficMode.RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode is TrafficMode.REPLAY
+
+    def has_service(self, service: str) -> bool:
+        """Vrai si la bande rejouée contient des échanges pour ce service."""
+        return self.replaying and service in self._by_service
+
+    # --- Cycle de vie -----------------------------------------------------
+
+    def start_recording(self, path: str, seed: Optional[int] = None):
+        """Démarre une nouvelle bande (écrase le fichier existant)."""
+        self.stop()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(json.dumps({
+            "format": TAPE_FORMAT,
+            "seed": self.seed,
+            "created_at": datetime.utcnow().isoformat()
+        }) + "\n")
+        self._file.flush()
+        self._reset(path)
+        self.mode = TrafficMode.RECORD
+        self.rng.seed(self.seed)
+        logger.info("⏺️ Enregistrement du trafic amont", path=path, seed=self.seed)
+
+    def start_replay(self, path: str, speed: Optional[float] = None, strict: bool = False):
+        """Charge une bande et rejoue ses réponses à la place du réseau."""
+        self.stop()
+        if speed is not None and speed <= 0:
+            raise ValueError("speed doit être positif (None = vitesse maximale)")
+        with open(path, "r", encoding="utf-8") as handle:
+            header = json.loads(handle.readline() or "{}")
+            if header.get("format") != TAPE_FORMAT:
+                raise ValueError(f"Bande de trafic invalide: {path}")
+            interactions = [_Interaction(**json.loads(line)) for line in handle if line.strip()]
+
+        self._reset(path)
+        for interaction in interactions:
+            self._by_key.setdefault((interaction.service, interaction.key), deque()).append(interaction)
+            self._by_service.setdefault(interaction.service, deque()).append(interaction)
+        self.speed = speed
+        self.strict = strict
+        self.seed = header.get("seed")
+        self.mode = TrafficMode.REPLAY
+        self.rng.seed(self.seed)
+        logger.info("▶️ Rejeu du trafic amont",
+                    path=path,
+                    interactions=len(interactions),
+                    speed=speed or "max",
+                    services=sorted(self._by_service))
+
+    def stop(self) -> Dict[str, Any]:
+        """Revient au mode direct et retourne les statistiques de la session."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            stats = self.get_stats()
+            if self.active:
+                logger.info("⏹️ Fin du record/replay", **stats)
+            self.mode = TrafficMode.OFF
+            self._by_key = {}
+            self._by_service = {}
+            return stats
+
+    def _reset(self, path: str):
+        self.path = path
+        self.speed = None
+        self.strict = False
+        self._origin = time.monotonic()
+        self._stats = {name: 0 for name in self._stats}
+
+    def configure_from_env(self):
+        """PIPELINE_TRAFFIC_MODE=record|replay, PIPELINE_TRAFFIC_FILE, PIPELINE_REPLAY_SPEED=max|<facteur>."""
+        mode = os.getenv("PIPELINE_TRAFFIC_MODE", TrafficMode.OFF.value).lower()
+        path = os.getenv("PIPELINE_TRAFFIC_FILE", "logs/traffic_tape.jsonl")
+        try:
+            if mode == TrafficMode.RECORD.value:
+                seed = os.getenv("PIPELINE_TRAFFIC_SEED")
+                self.start_recording(path, int(seed) if seed else None)
+            elif mode == TrafficMode.REPLAY.value:
+                speed = os.getenv("PIPELINE_REPLAY_SPEED", "max")
+                self.start_replay(path, None if speed == "max" else float(speed))
+        except (OSError, ValueError) as e:
+            logger.error("❌ Record/replay désactivé", mode=mode, path=path, error=str(e))
+            self.stop()
+
+    # --- Clés de requête --------------------------------------------------
+
+    @staticmethod
+    def service_of(url: str) -> str:
+        return urlparse(url).netloc or url
+
+    @staticmethod
+    def request_key(method: str, url: str, params: Optional[Mapping[str, Any]] = None,
+                    body: Any = None) -> str:
+        """Clé canonique: méthode, URL, paramètres triés et empreinte du corps JSON."""
+        key = f"{method.upper()} {url}"
+        if params:
+            key += "?" + urlencode(sorted((str(k), str(v)) for k, v in params.items()))
+        if body is not None:
+            digest = hashlib.sha1(json.dumps(body, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+            key += f" #{digest[:16]}"
+        return key
+
+    # --- Échanges ---------------------------------------------------------
+
+    async def exchange_async(self, service: str, key: str, fetch: Callable[[], Awaitable[Any]],
+                             encode: Callable[[Any], Any] = None, decode: Callable[[Any], Any] = None) -> Any:
+        """Exécute `fetch` (direct/enregistrement) ou retourne la réponse rejouée."""
+        if self.mode is TrafficMode.REPLAY:
+            interaction = self._take(service, key)
+            delay = self._replay_delay(interaction)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return self._replay_result(interaction, decode)
+
+        if self.mode is TrafficMode.OFF:
+            return await fetch()
+
+        started = time.monotonic()
+        try:
+            value = await fetch()
+        except Exception as e:
+            self._record(service, key, started, error=e)
+            raise
+        self._record(service, key, started, value=encode(value) if encode else value)
+        return value
+
+    def exchange_sync(self, service: str, key: str, fetch: Callable[[], Any],
+                      encode: Callable[[Any], Any] = None, decode: Callable[[Any], Any] = None) -> Any:
+        """Version bloquante de `exchange_async` (clients requests)."""
+        if self.mode is TrafficMode.REPLAY:
+            interaction = self._take(service, key)
+            delay = self._replay_delay(interaction)
+            if delay > 0:
+                time.sleep(delay)
+            return self._replay_result(interaction, decode)
+
+        if self.mode is TrafficMode.OFF:
+            return fetch()
+
+        started = time.monotonic()
+        try:
+            value = fetch()
+        except Exception as e:
+            self._record(service, key, started, error=e)
+            raise
+        self._record(service, key, started, value=encode(value) if encode else value)
+        return value
+
+    def _record(self, service: str, key: str, started: float, value: Any = None,
+                error: Optional[Exception] = None):
+        line = json.dumps({
+            "service": service,
+            "key": key,
+            "started": round(started - self._origin, 6),
+            "latency": round(time.monotonic() - started, 6),
+            "value": value,
+            "error": f"{type(error).__name__}: {error}" if error is not None else None
+        }, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._stats["recorded"] += 1
+
+    def _take(self, service: str, key: str) -> _Interaction:
+        with self._lock:
+            interaction = self._pop_unconsumed(self._by_key.get((service, key)))
+            if interaction is None and not self.strict:
+                interaction = self._pop_unconsumed(self._by_service.get(service))
+                if interaction is not None:
+                    self._stats["fallbacks"] += 1
+                    logger.debug("🔁 Rejeu hors clé exacte", service=service, key=key)
+            if interaction is None:
+                self._stats["misses"] += 1
+                raise ReplayMiss(f"Aucune réponse enregistrée pour {service}: {key}")
+            interaction.consumed = True
+            self._stats["replayed"] += 1
+            return interaction
+
+    @staticmethod
+    def _pop_unconsumed(queue: Optional[Deque[_Interaction]]) -> Optional[_Interaction]:
+        # Les deux index partagent les mêmes objets: on saute ceux déjà rejoués via l'autre
+        while queue:
+            interaction = queue.popleft()
+            if not interaction.consumed:
+                return interaction
+        return None
+
+    def _replay_delay(self, interaction: _Interaction) -> float:
+        if self.speed is None:
+            return 0.0
+        due = self._origin + (interaction.started + interaction.latency) / self.speed
+        return due - time.monotonic()
+
+    @staticmethod
+    def _replay_result(interaction: _Interaction, decode: Optional[Callable[[Any], Any]]) -> Any:
+        if interaction.error is not None:
+            raise ReplayedError(interaction.error)
+        return decode(interaction.value) if decode else interaction.value
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode.value,
+            "path": self.path,
+            "speed": self.speed,
+            "seed": self.seed,
+            "pending": sum(1 for queue in self._by_service.values() for i in queue if not i.consumed),
+            **self._stats
+        }
+
+
+# Instance globale, configurée au démarrage du pipeline (pas à l'import)
+traffic_recorder = TrafficRecorder()
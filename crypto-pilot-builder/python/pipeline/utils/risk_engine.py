@@ -0,0 +1,229 @@
+"""Moteur de risque de portefeuille: corrélations glissantes et drawdown maximal."""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass
+class RiskDecision:
+    """Verdict du moteur de risque pour un signal."""
+    allowed: bool
+    size: float
+    reason: str = "ok"
+    max_correlation: Optional[float] = None
+    correlated_with: Optional[str] = None
+    correlations: Dict[str, float] = field(default_factory=dict)
+
+
+class PortfolioRiskEngine:
+    """
+    Fenêtre glissante de rendements pour tous les symboles suivis.
+
+    Les sommes et produits croisés de la fenêtre sont tenus à jour à chaque
+    échantillon (ajout de la nouvelle ligne, retrait de la plus ancienne), si
+    bien que la corrélation d'un candidat avec les positions détenues se lit
+    directement dans ces cumuls en O(positions), sans recalcul sur l'historique.
+    Les cumuls sont recalculés depuis la fenêtre à chaque tour complet pour
+    éviter la dérive des flottants.
+
+    Les prix arrivent symbole par symbole: un échantillon est clos dès qu'un
+    symbole déjà présent dans l'échantillon en cours reçoit un nouveau prix.
+    Un symbole sans nouveau prix a un rendement nul sur l'échantillon.
+    """
+
+    def __init__(self, window: int = 120, correlation_limit: float = 0.7, max_drawdown: float = 0.15,
+                 min_observations: int = 30, policy: str = "reject", min_size: float = 0.001,
+                 initial_capital: float = 10000.0, capacity: int = 16):
+        if policy not in ("reject", "resize"):
+            raise ValueError("policy doit valoir 'reject' ou 'resize'")
+        self.window = window
+        self.correlation_limit = correlation_limit
+        self.max_drawdown = max_drawdown
+        self.min_observations = min(min_observations, window)
+        self.policy = policy
+        self.min_size = min_size
+
+        self.slots: Dict[str, int] = {}
+        self._returns = np.zeros((window, capacity))
+        self._sums = np.zeros(capacity)
+        self._cross = np.zeros((capacity, capacity))
+        self._observations = np.zeros(capacity, dtype=np.int64)
+        self._last_price = np.full(capacity, np.nan)
+        self._pending: Dict[int, float] = {}
+        self._head = 0
+        self._rows = 0
+        self._samples = 0
+
+        # Positions détenues: symbole -> sens (+1 achat, -1 vente)
+        self.positions: Dict[str, int] = {}
+        self.equity = initial_capital
+        self.peak_equity = initial_capital
+        self._stats = {"evaluated": 0, "rejected": 0, "resized": 0}
+
+    # --- Données de marché ------------------------------------------------
+
+    def _slot(self, symbol: str) -> int:
+        slot = self.slots.get(symbol)
+        if slot is not None:
+            return slot
+        slot = len(self.slots)
+        capacity = self._sums.shape[0]
+        if slot >= capacity:
+            grow = capacity
+            self._returns = np.pad(self._returns, ((0, 0), (0, grow)))
+            self._sums = np.pad(self._sums, (0, grow))
+            self._cross = np.pad(self._cross, ((0, grow), (0, grow)))
+            self._observations = np.pad(self._observations, (0, grow))
+            self._last_price = np.pad(self._last_price, (0, grow), constant_values=np.nan)
+        self.slots[symbol] = slot
+        return slot
+
+    def update_price(self, symbol: str, price: float):
+        """Enregistre un prix; clôt l'échantillon courant si le symbole y figure déjà."""
+        if not price or price <= 0:
+            return
+        slot = self._slot(symbol)
+        if slot in self._pending:
+            self._commit()
+        self._pending[slot] = float(price)
+
+    def update_prices(self, prices: Dict[str, float]):
+        """Instantané complet (un prix par symbole): ajouté comme un échantillon."""
+        for symbol, price in prices.items():
+            if price and price > 0:
+                self._pending[self._slot(symbol)] = float(price)
+        self._commit()
+
+    def _commit(self):
+        if not self._pending:
+            return
+        n = len(self.slots)
+        previous = self._last_price[:n]
+        current = previous.copy()
+        slots = np.fromiter(self._pending.keys(), dtype=np.int64)
+        current[slots] = np.fromiter(self._pending.values(), dtype=np.float64)
+        self._pending.clear()
+
+        valid = np.isfinite(previous) & np.isfinite(current)
+        row = np.zeros(n)
+        row[valid] = current[valid] / previous[valid] - 1
+        self._last_price[:n] = current
+        self._observations[:n][valid] += 1
+        self._push(row)
+
+    def _push(self, row: np.ndarray):
+        n = len(row)
+        old = self._returns[self._head, :n].copy()
+        self._returns[self._head, :n] = row
+        self._head = (self._head + 1) % self.window
+        self._rows = min(self._rows + 1, self.window)
+        self._samples += 1
+
+        if self._samples % self.window == 0:
+            # Resynchronisation exacte des cumuls sur la fenêtre
+            block = self._returns[:self._rows, :n]
+            self._sums[:n] = block.sum(axis=0)
+            self._cross[:n, :n] = block.T @ block
+        else:
+            self._sums[:n] += row - old
+            self._cross[:n, :n] += np.outer(row, row) - np.outer(old, old)
+
+    # --- Corrélations -----------------------------------------------------
+
+    def correlations(self, symbol: str, others: List[str]) -> np.ndarray:
+        """Corrélations de `symbol` avec chacun de `others` sur la fenêtre (0 si indéfinie)."""
+        if self._rows < 2 or symbol not in self.slots:
+            return np.zeros(len(others))
+        c = self.slots[symbol]
+        idx = np.array([self.slots[s] for s in others], dtype=np.int64)
+        n = self._rows
+        means = self._sums[idx] / n
+        mean_c = self._sums[c] / n
+        cov = self._cross[c, idx] / n - mean_c * means
+        var_c = self._cross[c, c] / n - mean_c * mean_c
+        var_o = self._cross[idx, idx] / n - means * means
+        denominator = np.sqrt(np.maximum(var_c, 0.0) * np.maximum(var_o, 0.0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(denominator > 1e-18, cov / denominator, 0.0)
+
+    def correlation_matrix(self) -> Dict[str, Dict[str, float]]:
+        """Matrice de corrélation complète des symboles suivis (diagnostic)."""
+        symbols = list(self.slots)
+        return {s: dict(zip(symbols, np.round(self.correlations(s, symbols), 4).tolist())) for s in symbols}
+
+    # --- Décisions --------------------------------------------------------
+
+    @property
+    def drawdown(self) -> float:
+        return 1 - self.equity / self.peak_equity if self.peak_equity > 0 else 0.0
+
+    def evaluate(self, symbol: str, direction: int, size: float) -> RiskDecision:
+        """
+        Accepte, réduit ou refuse un signal. La corrélation est orientée: un achat
+        et une vente sur deux actifs corrélés se couvrent et ne comptent pas.
+        """
+        self._stats["evaluated"] += 1
+        if self.drawdown >= self.max_drawdown:
+            return self._reject(symbol, size, "max_drawdown")
+
+        held = [s for s in self.positions if s != symbol and s in self.slots
+                and self._observations[self.slots[s]] >= self.min_observations]
+        if not held or symbol not in self.slots \
+                or self._observations[self.slots[symbol]] < self.min_observations:
+            return RiskDecision(True, size)
+
+        raw = self.correlations(symbol, held)
+        oriented = raw * direction * np.array([self.positions[s] for s in held])
+        worst = int(np.argmax(oriented))
+        rho = float(oriented[worst])
+        correlations = dict(zip(held, np.round(raw, 4).tolist()))
+        if rho <= self.correlation_limit:
+            return RiskDecision(True, size, max_correlation=rho, correlated_with=held[worst],
+                                correlations=correlations)
+
+        if self.policy == "resize":
+            resized = round(size * (1 - rho) / (1 - self.correlation_limit), 4)
+            if resized >= self.min_size:
+                self._stats["resized"] += 1
+                return RiskDecision(True, resized, "correlation_resized", rho, held[worst], correlations)
+        decision = self._reject(symbol, size, "correlation_limit")
+        decision.max_correlation, decision.correlated_with, decision.correlations = rho, held[worst], correlations
+        return decision
+
+    def _reject(self, symbol: str, size: float, reason: str) -> RiskDecision:
+        self._stats["rejected"] += 1
+        logger.info("🛡️ Signal refusé par le moteur de risque", symbol=symbol, reason=reason,
+                    drawdown=round(self.drawdown, 4))
+        return RiskDecision(False, 0.0, reason)
+
+    # --- Portefeuille -----------------------------------------------------
+
+    def open_position(self, symbol: str, direction: int):
+        self._slot(symbol)
+        self.positions[symbol] = direction
+
+    def close_position(self, symbol: str):
+        self.positions.pop(symbol, None)
+
+    def record_pnl(self, pnl: float):
+        """Met à jour le capital et son plus haut pour le suivi du drawdown."""
+        self.equity += pnl
+        self.peak_equity = max(self.peak_equity, self.equity)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "symbols": len(self.slots),
+            "samples": self._samples,
+            "window_rows": self._rows,
+            "positions": dict(self.positions),
+            "equity": round(self.equity, 2),
+            "drawdown": round(self.drawdown, 4),
+            "correlation_limit": self.correlation_limit,
+            "max_drawdown": self.max_drawdown,
+            **self._stats
+        }
@@ -0,0 +1,184 @@
+"""Score de sentiment par lexique compilé (expressions, négation, traitement par lots)."""
+
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+# Lexique historique de NewsService (poids +1 / -1)
+POSITIVE_TERMS = [
+    "bullish", "moon", "pump", "surge", "rally", "breakout", "adoption",
+    "partnership", "upgrade", "innovation", "growth", "profit", "gain",
+    "success", "launch", "integration", "expansion", "milestone", "achievement",
+]
+NEGATIVE_TERMS = [
+    "bearish", "crash", "dump", "sell-off", "decline", "bear market",
+    "regulation", "ban", "hack", "scam", "loss", "bankruptcy", "failure",
+    "delay", "issue", "problem", "concern", "risk", "volatility",
+]
+NEGATORS = {
+    "not", "no", "never", "without", "neither", "nor", "hardly", "cannot",
+}
+# Formes contractées ("isn't", "won't", "don’t"): seulement avec le suffixe n't, pour que
+# "won" ou "don" employés comme mots ordinaires ne soient pas pris pour des négations
+_CONTRACTED_NEGATION = r"[a-z]+n['’]t"
+
+_SEPARATORS = re.compile(r"[\s\-]+")
+_VOWELS = "aeiou"
+_DOCUMENT_BREAK = "\n\x00\n"
+
+
+def _inflections(term: str) -> List[str]:
+    """
+    Formes fléchies d'un terme (dernier mot pour une expression): pluriel,
+    passé, participe présent ("surges", "crashed", "rallies", "banned").
+    Les formes impossibles générées au passage ne se rencontrent pas et sont sans effet.
+    """
+    head, _, word = term.rpartition(" ")
+    prefix = head + " " if head else ""
+    forms = {word, word + "s", word + "es", word + "ed", word + "ing"}
+    if word.endswith("e"):
+        forms |= {word + "d", word[:-1] + "ing"}
+    if len(word) > 1 and word.endswith("y") and word[-2] not in _VOWELS:
+        forms |= {word[:-1] + "ies", word[:-1] + "ied"}
+    if len(word) >= 3 and word[-1] not in _VOWELS + "wxy" and word[-2] in _VOWELS and word[-3] not in _VOWELS:
+        forms |= {word + word[-1] + "ed", word + word[-1] + "ing"}  # Consonne doublée: ban -> banned
+    return [prefix + form for form in sorted(forms)]
+
+
+def _trie_regex(terms: Iterable[str]) -> str:
+    """
+    Alternance factorisée en arbre de préfixes ("ban(?:kruptcy)?", "bear(?:ish|[\\s\\-]+market)?"):
+    le moteur d'expressions régulières n'essaie plus chaque terme à chaque position.
+    """
+    trie: Dict[str, dict] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        optional = "" in node
+        branches = [(r"[\s\-]+" if char == " " else re.escape(char)) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if optional:
+            return body + "?" if len(branches) == 1 and len(body) == 1 else "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class SentimentLexicon:
+    """
+    Lexique compilé en une seule expression régulière.
+
+    Les termes (mots ou expressions comme "bear market" ou "sell-off", qui
+    reconnaissent aussi "sell off") et leurs formes fléchies ("surges",
+    "crashed", "rallies") sont fusionnés en une alternance bornée aux mots:
+    le texte est parcouru une fois en C et le code Python ne travaille que
+    sur les termes trouvés, sans faux positif comme "gain" dans "again". Un
+    terme précédé d'une négation dans les `negation_window` mots qui le
+    précèdent change de signe ("no hack", "not bullish", "isn't bullish");
+    les contractions ne comptent qu'avec leur suffixe n't (apostrophe droite
+    ou typographique).
+
+    Comme l'historique de NewsService, chaque terme compte une fois par texte
+    (signe de sa première occurrence), et le score garde la même échelle:
+    (positifs − négatifs) / nombre de mots × `scale`, borné à [-1, 1].
+    """
+
+    def __init__(self, weights: Optional[Mapping[str, float]] = None, negators: Iterable[str] = NEGATORS,
+                 negation_window: int = 3, scale: float = 15.0):
+        if weights is None:
+            weights = {**{t: 1.0 for t in POSITIVE_TERMS}, **{t: -1.0 for t in NEGATIVE_TERMS}}
+        self.weights: Dict[str, float] = {self._normalize(term): w for term, w in weights.items()}
+        # Forme rencontrée -> terme du lexique (les termes eux-mêmes sont prioritaires)
+        self._forms: Dict[str, str] = {}
+        for term in self.weights:
+            for form in _inflections(term):
+                self._forms.setdefault(form, term)
+        self._forms.update({term: term for term in self.weights})
+        self.negators = frozenset(negators)
+        self.negation_window = negation_window
+        self.scale = scale
+
+        # Termes et négations dans la même expression: un seul passage sur le texte
+        self._pattern = re.compile(
+            r"\b(?:(" + _trie_regex(self.negators) + "|" + _CONTRACTED_NEGATION + r")|"
+            + _trie_regex(self._forms) + r")\b"
+        )
+
+    @staticmethod
+    def _normalize(term: str) -> str:
+        return _SEPARATORS.sub(" ", term.strip().lower())
+
+    def _totals(self, text: str, starts: List[int]) -> List[float]:
+        """
+        Somme des poids par document de `text` (documents débutant aux offsets
+        `starts`), chaque terme comptant une fois par document. Un terme est
+        inversé si une négation le précède de moins de `negation_window` mots
+        dans le même document.
+        """
+        totals = [0.0] * len(starts)
+        document, next_start = 0, starts[1] if len(starts) > 1 else len(text) + 1
+        negation_end = -1
+        seen = set()
+        for match in self._pattern.finditer(text):
+            position = match.start()
+            while position >= next_start:
+                document += 1
+                next_start = starts[document + 1] if document + 1 < len(starts) else len(text) + 1
+                negation_end = -1
+                seen = set()
+            if match.group(1) is not None:
+                negation_end = match.end()
+                continue
+
+            form = match.group(0)
+            term = self._forms.get(form)
+            if term is None:
+                term = self._forms[_SEPARATORS.sub(" ", form)]
+            if term in seen:
+                continue
+            seen.add(term)
+            weight = self.weights[term]
+            if negation_end >= 0 and len(text[negation_end:position].split()) < self.negation_window:
+                weight = -weight
+            totals[document] += weight
+        return totals
+
+    def _finish(self, total: float, word_count: int) -> float:
+        if word_count == 0:
+            return 0.0
+        return max(-1.0, min(1.0, total / word_count * self.scale))
+
+    def raw_score(self, text: Optional[str]) -> float:
+        """Somme des poids des termes trouvés (une fois chacun, négations appliquées), sans normalisation."""
+        if not text:
+            return 0.0
+        return self._totals(text.lower(), [0])[0]
+
+    def score(self, text: Optional[str]) -> float:
+        """Score normalisé dans [-1, 1]."""
+        if not text:
+            return 0.0
+        lowered = text.lower()
+        return self._finish(self._totals(lowered, [0])[0], len(lowered.split()))
+
+    def score_many(self, texts: Sequence[Optional[str]]) -> List[float]:
+        """Scores d'un lot de textes en un seul passage sur le lot concaténé."""
+        lowered = [(text or "").lower() for text in texts]
+        if not lowered:
+            return []
+        starts, offset = [], 0
+        for text in lowered:
+            starts.append(offset)
+            offset += len(text) + len(_DOCUMENT_BREAK)
+        totals = self._totals(_DOCUMENT_BREAK.join(lowered), starts)
+        return [self._finish(total, len(text.split())) for total, text in zip(totals, lowered)]
+
+
+# Instance globale (expression compilée une seule fois)
+sentiment_lexicon = SentimentLexicon()
@@ -0,0 +1,196 @@
+"""Ordonnanceur d'étapes en graphe (DAG): les étapes indépendantes s'exécutent en parallèle."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+class StageGraphError(Exception):
+    """Graphe d'étapes invalide (entrée inconnue, doublon ou cycle)."""
+
+
+@dataclass
+class Stage:
+    """
+    Étape du graphe.
+
+    `func` reçoit les résultats de ses entrées en arguments nommés (nom de
+    l'étape amont). Une fonction synchrone est exécutée dans un thread pour ne
+    pas bloquer la boucle. Une entrée listée dans `optional` qui échoue est
+    passée à None au lieu d'annuler l'étape.
+    """
+    name: str
+    func: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    optional: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageRun:
+    """Résultat d'une exécution du graphe."""
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+    timings: Dict[str, Tuple[float, float]] = field(default_factory=dict)  # (début, fin) relatifs en secondes
+    total_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.skipped
+
+    def durations_ms(self) -> Dict[str, int]:
+        return {name: int((end - start) * 1000) for name, (start, end) in self.timings.items()}
+
+
+class StageGraph:
+    """
+    Graphe d'étapes exécuté sur la boucle asyncio courante.
+
+    Chaque étape démarre dès que toutes ses entrées sont prêtes: la latence
+    d'un tick devient celle du chemin critique et non la somme des étapes.
+    """
+
+    def __init__(self, name: str = "pipeline"):
+        self.name = name
+        self.stages: Dict[str, Stage] = {}
+        self._order: Optional[List[str]] = None
+
+    def add_stage(self, name: str, func: Callable[..., Any], inputs: Iterable[str] = (),
+                  optional: Iterable[str] = ()) -> "StageGraph":
+        if name in self.stages:
+            raise StageGraphError(f"Étape déjà déclarée: {name}")
+        inputs = tuple(inputs)
+        optional = tuple(optional)
+        unknown = set(optional) - set(inputs)
+        if unknown:
+            raise StageGraphError(f"Entrées optionnelles non déclarées pour {name}: {sorted(unknown)}")
+        self.stages[name] = Stage(name, func, inputs, optional)
+        self._order = None
+        return self
+
+    def topological_order(self) -> List[str]:
+        """Ordre d'exécution valide (vérifie les entrées et l'absence de cycle)."""
+        if self._order is not None:
+            return self._order
+
+        for stage in self.stages.values():
+            for dependency in stage.inputs:
+                if dependency not in self.stages:
+                    raise StageGraphError(f"Entrée inconnue pour {stage.name}: {dependency}")
+
+        remaining = {name: set(stage.inputs) for name, stage in self.stages.items()}
+        order = []
+        ready = [name for name, deps in remaining.items() if not deps]
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for other, deps in remaining.items():
+                if name in deps:
+                    deps.discard(name)
+                    if not deps and other not in order and other not in ready:
+                        ready.append(other)
+
+        if len(order) != len(self.stages):
+            cycle = sorted(set(self.stages) - set(order))
+            raise StageGraphError(f"Cycle dans le graphe d'étapes: {cycle}")
+
+        self._order = order
+        return order
+
+    def critical_path(self, durations: Dict[str, float]) -> Tuple[List[str], float]:
+        """Chemin le plus long du graphe pour des durées d'étapes données."""
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for name in self.topological_order():
+            stage = self.stages[name]
+            start, parent = 0.0, None
+            for dependency in stage.inputs:
+                if finish[dependency] > start:
+                    start, parent = finish[dependency], dependency
+            finish[name] = start + durations.get(name, 0.0)
+            previous[name] = parent
+
+        if not finish:
+            return [], 0.0
+        node = max(finish, key=finish.get)
+        total = finish[node]
+        path = []
+        while node is not None:
+            path.append(node)
+            node = previous[node]
+        return list(reversed(path)), total
+
+    async def _call(self, stage: Stage, kwargs: Dict[str, Any]) -> Any:
+        if asyncio.iscoroutinefunction(stage.func):
+            return await stage.func(**kwargs)
+        return await asyncio.to_thread(stage.func, **kwargs)
+
+    async def run(self) -> StageRun:
+        """Exécute toutes les étapes en respectant les dépendances."""
+        self.topological_order()
+        run = StageRun()
+        origin = time.perf_counter()
+        pending = dict(self.stages)
+        running: Dict[asyncio.Task, str] = {}
+
+        def launch_ready():
+            # Une étape ignorée peut rendre ses dépendantes prêtes: boucler jusqu'à stabilité
+            progressed = True
+            while progressed:
+                progressed = False
+                for name, stage in list(pending.items()):
+                    if any(dep in pending or dep in running.values() for dep in stage.inputs):
+                        continue
+                    del pending[name]
+                    progressed = True
+
+                    failed = [dep for dep in stage.inputs
+                              if dep not in run.results and dep not in stage.optional]
+                    if failed:
+                        run.skipped.append(name)
+                        logger.warning("⏭️ Étape ignorée (entrée en échec)",
+                                       graph=self.name, stage=name, failed_inputs=failed)
+                        continue
+
+                    kwargs = {dep: run.results.get(dep) for dep in stage.inputs}
+                    task = asyncio.create_task(self._timed(stage, kwargs, origin, run))
+                    running[task] = name
+
+        try:
+            launch_ready()
+            while running:
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        run.errors[name] = str(error)
+                        logger.error("❌ Échec d'étape", graph=self.name, stage=name, error=str(error))
+                    else:
+                        run.results[name] = task.result()
+                launch_ready()
+        finally:
+            # Exécution annulée (arrêt du pipeline): ne pas laisser d'étape orpheline
+            for task in running:
+                task.cancel()
+
+        run.total_seconds = time.perf_counter() - origin
+        logger.debug("🧭 Graphe d'étapes exécuté",
+                     graph=self.name,
+                     total_ms=int(run.total_seconds * 1000),
+                     stages_ms=run.durations_ms(),
+                     errors=list(run.errors),
+                     skipped=run.skipped)
+        return run
+
+    async def _timed(self, stage: Stage, kwargs: Dict[str, Any], origin: float, run: StageRun) -> Any:
+        start = time.perf_counter() - origin
+        try:
+            return await self._call(stage, kwargs)
+        finally:
+            run.timings[stage.name] = (start, time.perf_counter() - origin)
@@ -0,0 +1,41 @@
+"""Règles de décision de la stratégie, partagées par les agents et le backtester (scalaires ou tableaux NumPy)."""
+
+from typing import Tuple, Union
+
+import numpy as np
+
+Numeric = Union[float, np.ndarray]
+
+# Sens d'un signal: +1 achat, -1 vente, 0 neutre
+LONG, SHORT, FLAT = 1, -1, 0
+
+
+def signal_direction(direction_prob: Numeric, buy_threshold: float = 0.65,
+                     sell_threshold: float = 0.35) -> Union[int, np.ndarray]:
+    """BUY au-dessus du seuil d'achat, SELL sous le seuil de vente, HOLD sinon."""
+    direction = np.where(direction_prob > buy_threshold, LONG,
+                         np.where(direction_prob < sell_threshold, SHORT, FLAT))
+    return int(direction) if direction.ndim == 0 else direction
+
+
+def position_size(confidence: Numeric, volatility: Numeric, max_position_size: float = 0.1) -> Numeric:
+    """
+    Fraction du capital engagée: taille maximale pondérée par la confiance et
+    réduite par la volatilité (facteur plancher 0.3), arrondie à 4 décimales.
+    """
+    volatility_factor = np.maximum(0.3, 1.0 - np.asarray(volatility, dtype=np.float64) * 10)
+    size = np.minimum(max_position_size * np.asarray(confidence, dtype=np.float64) * volatility_factor,
+                      max_position_size)
+    size = np.round(size, 4)
+    return float(size) if size.ndim == 0 else size
+
+
+def protective_levels(price: Numeric, direction: Union[int, np.ndarray], stop_loss: float = 0.02,
+                      take_profit: float = 0.04) -> Tuple[Numeric, Numeric]:
+    """Niveaux de stop loss et take profit (symétriques pour une vente)."""
+    long_side = np.asarray(direction) == LONG
+    stop = np.where(long_side, price * (1 - stop_loss), price * (1 + stop_loss))
+    take = np.where(long_side, price * (1 + take_profit), price * (1 - take_profit))
+    if stop.ndim == 0:
+        return float(stop), float(take)
+    return stop, take
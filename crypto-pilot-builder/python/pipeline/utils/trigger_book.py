@@ -0,0 +1,308 @@
+"""Carnet de déclencheurs stop loss / take profit indexé par prix (stops fixes, suiveurs, OCO)."""
+
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from .trading_rules import LONG, SHORT
+
+logger = structlog.get_logger(__name__)
+
+# Sens de déclenchement
+BELOW = "below"   # Prix <= niveau (stop d'un achat, objectif d'une vente)
+ABOVE = "above"   # Prix >= niveau (objectif d'un achat, stop d'une vente)
+_SIGN = {BELOW: -1, ABOVE: 1}
+
+
+@dataclass(eq=False)
+class Trigger:
+    """Déclencheur armé sur un symbole."""
+    trigger_id: int
+    symbol: str
+    kind: str                   # stop_loss, take_profit, trailing_stop...
+    side: str                   # BELOW ou ABOVE
+    level: float = 0.0          # Niveau fixe (ignoré pour un stop suiveur)
+    trail: Optional[float] = None
+    oco: Optional[int] = None
+    payload: Any = None
+    active: bool = True
+    _group: Any = field(default=None, repr=False)
+
+    @property
+    def current_level(self) -> float:
+        """Niveau de déclenchement actuel (recalculé pour un stop suiveur)."""
+        if self._group is None:
+            return self.level
+        return self._group.level_for(self.trail)
+
+
+@dataclass
+class FiredTrigger:
+    trigger: Trigger
+    price: float
+    level: float
+
+
+class _TrailingGroup:
+    """Stops suiveurs partageant le même extrême (plus haut pour un achat, plus bas pour une vente)."""
+
+    __slots__ = ("direction", "extreme", "heap", "version", "alive")
+
+    def __init__(self, direction: int, extreme: float):
+        self.direction = direction
+        self.extreme = extreme
+        self.heap: List[Tuple[float, int, Trigger]] = []  # (distance, seq, trigger): plus serrés d'abord
+        self.version = 0
+        self.alive = True
+
+    def level_for(self, trail: float) -> float:
+        return self.extreme * (1 - self.direction * trail)
+
+    def prune(self) -> Optional[float]:
+        """Retire les stops annulés en tête; retourne le niveau du plus serré."""
+        while self.heap and not self.heap[0][2].active:
+            heapq.heappop(self.heap)
+        return self.level_for(self.heap[0][0]) if self.heap else None
+
+
+class _TrailingStops:
+    """
+    Stops suiveurs d'un sens sur un symbole.
+
+    Les stops qui ont vu le même extrême sont regroupés: un nouvel extrême
+    fusionne tous les groupes dépassés en un seul (le plus petit dans le plus
+    grand), si bien qu'un tick ne coûte que O(log n) amorti quel que soit le
+    nombre de stops qui suivent le prix. Deux tas indexent les groupes: par
+    extrême pour le suivi, par niveau du stop le plus serré pour le déclenchement.
+    """
+
+    def __init__(self, direction: int):
+        self.direction = direction
+        self.sign = -direction  # Un stop suiveur d'achat se déclenche par le bas
+        self._extremes: List[Tuple[float, int, _TrailingGroup]] = []
+        self._levels: List[Tuple[float, int, int, _TrailingGroup]] = []
+        self._ids = itertools.count()
+
+    def add(self, trigger: Trigger, anchor: float, seq: int):
+        group = _TrailingGroup(self.direction, anchor)
+        trigger._group = group
+        heapq.heappush(group.heap, (trigger.trail, seq, trigger))
+        heapq.heappush(self._extremes, (self.direction * anchor, next(self._ids), group))
+        self._schedule(group)
+
+    def _schedule(self, group: _TrailingGroup):
+        level = group.prune()
+        group.version += 1
+        if level is None:
+            group.alive = False
+            return
+        heapq.heappush(self._levels, (self.sign * level, next(self._ids), group.version, group))
+
+    def fire(self, price: float) -> List[FiredTrigger]:
+        fired = []
+        threshold = self.sign * price
+        while self._levels and self._levels[0][0] <= threshold:
+            _, _, version, group = heapq.heappop(self._levels)
+            if not group.alive or version != group.version:
+                continue
+            while group.heap:
+                trail, _, trigger = group.heap[0]
+                if not trigger.active:
+                    heapq.heappop(group.heap)
+                    continue
+                level = group.level_for(trail)
+                if self.sign * level > threshold:
+                    break
+                heapq.heappop(group.heap)
+                fired.append(FiredTrigger(trigger, price, level))
+            self._schedule(group)
+        return fired
+
+    def ratchet(self, price: float):
+        """Fait suivre le prix aux groupes dont l'extrême est dépassé."""
+        key = self.direction * price
+        moved = []
+        while self._extremes and self._extremes[0][0] < key:
+            group = heapq.heappop(self._extremes)[2]
+            if group.alive and group.prune() is not None:
+                moved.append(group)
+        if not moved:
+            return
+        target = max(moved, key=lambda g: len(g.heap))
+        for group in moved:
+            if group is target:
+                continue
+            for entry in group.heap:
+                if entry[2].active:
+                    entry[2]._group = target
+                    heapq.heappush(target.heap, entry)
+            group.alive = False
+        target.extreme = price
+        heapq.heappush(self._extremes, (key, next(self._ids), target))
+        self._schedule(target)
+
+
+class _SymbolTriggers:
+    def __init__(self):
+        # Tas de (signe * niveau, seq, trigger): la tête est le prochain niveau franchi
+        self.fixed: Dict[str, List[Tuple[float, int, Trigger]]] = {BELOW: [], ABOVE: []}
+        self.trailing = {LONG: _TrailingStops(LONG), SHORT: _TrailingStops(SHORT)}
+        self.active = 0
+
+
+class TriggerBook:
+    """
+    Carnet de déclencheurs par symbole.
+
+    Les niveaux fixes sont rangés dans deux tas par symbole (déclenchement par
+    le bas et par le haut): un tick ne consulte que la tête des tas et ne
+    dépile que les niveaux réellement franchis, soit O(log n + k). Les annulations
+    sont paresseuses (drapeau `active`), ce qui garde l'annulation en O(1) et
+    permet les paires OCO: le déclenchement d'un membre désactive les autres.
+    """
+
+    def __init__(self):
+        self._symbols: Dict[str, _SymbolTriggers] = {}
+        self._triggers: Dict[int, Trigger] = {}
+        self._oco: Dict[int, List[int]] = {}
+        self._ids = itertools.count(1)
+        self._stats = {"added": 0, "fired": 0, "cancelled": 0, "ticks": 0}
+
+    def __len__(self) -> int:
+        return len(self._triggers)
+
+    def _book(self, symbol: str) -> _SymbolTriggers:
+        book = self._symbols.get(symbol)
+        if book is None:
+            book = self._symbols[symbol] = _SymbolTriggers()
+        return book
+
+    def _register(self, trigger: Trigger) -> Trigger:
+        self._triggers[trigger.trigger_id] = trigger
+        self._book(trigger.symbol).active += 1
+        if trigger.oco is not None:
+            self._oco.setdefault(trigger.oco, []).append(trigger.trigger_id)
+        self._stats["added"] += 1
+        return trigger
+
+    # --- Ajout ------------------------------------------------------------
+
+    def add_level(self, symbol: str, level: float, side: str, kind: str = "stop_loss",
+                  payload: Any = None, oco: Optional[int] = None) -> Trigger:
+        """Déclencheur à niveau fixe: `side=BELOW` (prix <= niveau) ou `ABOVE` (prix >= niveau)."""
+        if side not in _SIGN:
+            raise ValueError(f"Sens de déclenchement invalide: {side}")
+        trigger = Trigger(next(self._ids), symbol, kind, side, float(level), oco=oco, payload=payload)
+        heapq.heappush(self._book(symbol).fixed[side], (_SIGN[side] * trigger.level, trigger.trigger_id, trigger))
+        return self._register(trigger)
+
+    def add_trailing_stop(self, symbol: str, anchor_price: float, trail: float, direction: int = LONG,
+                          payload: Any = None, oco: Optional[int] = None) -> Trigger:
+        """Stop suiveur à `trail` (fraction) sous le plus haut (achat) ou au-dessus du plus bas (vente)."""
+        if not 0 < trail < 1:
+            raise ValueError("trail doit être une fraction entre 0 et 1")
+        side = BELOW if direction == LONG else ABOVE
+        trigger = Trigger(next(self._ids), symbol, "trailing_stop", side, trail=float(trail),
+                          oco=oco, payload=payload)
+        self._book(symbol).trailing[LONG if direction == LONG else SHORT].add(
+            trigger, float(anchor_price), trigger.trigger_id)
+        return self._register(trigger)
+
+    def add_bracket(self, symbol: str, direction: int, stop_loss: Optional[float] = None,
+                    take_profit: Optional[float] = None, trail: Optional[float] = None,
+                    anchor_price: Optional[float] = None, payload: Any = None) -> int:
+        """
+        Encadre une position par une paire OCO stop / objectif; `trail` remplace
+        le stop fixe par un stop suiveur ancré sur `anchor_price`. Retourne l'identifiant OCO.
+        """
+        oco = next(self._ids)
+        long_side = direction == LONG
+        if trail:
+            anchor = anchor_price if anchor_price is not None else stop_loss
+            if anchor is None:
+                raise ValueError("anchor_price requis pour un stop suiveur")
+            self.add_trailing_stop(symbol, anchor, trail, LONG if long_side else SHORT, payload, oco)
+        elif stop_loss is not None:
+            self.add_level(symbol, stop_loss, BELOW if long_side else ABOVE, "stop_loss", payload, oco)
+        if take_profit is not None:
+            self.add_level(symbol, take_profit, ABOVE if long_side else BELOW, "take_profit", payload, oco)
+        return oco
+
+    # --- Annulation -------------------------------------------------------
+
+    def cancel(self, trigger_id: int) -> bool:
+        trigger = self._triggers.pop(trigger_id, None)
+        if trigger is None:
+            return False
+        members = self._oco.get(trigger.oco)
+        if members is not None:
+            members.remove(trigger_id)
+            if not members:
+                del self._oco[trigger.oco]
+        self._deactivate(trigger)
+        self._stats["cancelled"] += 1
+        return True
+
+    def cancel_oco(self, oco: Optional[int]) -> int:
+        """Annule tous les membres encore armés d'un groupe OCO."""
+        return sum(self.cancel(trigger_id) for trigger_id in self._oco.pop(oco, []))
+
+    def cancel_symbol(self, symbol: str) -> int:
+        ids = [t.trigger_id for t in self._triggers.values() if t.symbol == symbol]
+        return sum(self.cancel(trigger_id) for trigger_id in ids)
+
+    def _deactivate(self, trigger: Trigger):
+        trigger.active = False
+        book = self._symbols.get(trigger.symbol)
+        if book is not None:
+            book.active -= 1
+            if book.active == 0:
+                del self._symbols[trigger.symbol]  # Libère les tas et les entrées paresseuses
+
+    # --- Ticks ------------------------------------------------------------
+
+    def on_price(self, symbol: str, price: float) -> List[FiredTrigger]:
+        """Déclenche les niveaux franchis par `price` (stops suiveurs mis à jour ensuite)."""
+        self._stats["ticks"] += 1
+        book = self._symbols.get(symbol)
+        if book is None:
+            return []
+
+        candidates: List[FiredTrigger] = []
+        for side, heap in book.fixed.items():
+            threshold = _SIGN[side] * price
+            while heap and heap[0][0] <= threshold:
+                _, _, trigger = heapq.heappop(heap)
+                if trigger.active:
+                    candidates.append(FiredTrigger(trigger, price, trigger.level))
+        for trailing in book.trailing.values():
+            candidates.extend(trailing.fire(price))
+            trailing.ratchet(price)
+
+        fired = []
+        for event in sorted(candidates, key=lambda e: e.trigger.trigger_id):
+            trigger = event.trigger
+            if not trigger.active:  # Membre OCO désactivé par un autre dans ce même tick
+                continue
+            self._triggers.pop(trigger.trigger_id, None)
+            self._deactivate(trigger)
+            fired.append(event)
+            if trigger.oco is not None:
+                for sibling in self._oco.pop(trigger.oco, []):
+                    if sibling != trigger.trigger_id:
+                        self.cancel(sibling)
+        self._stats["fired"] += len(fired)
+        if fired:
+            logger.debug("🎯 Déclencheurs franchis", symbol=symbol, price=price,
+                         kinds=[event.trigger.kind for event in fired])
+        return fired
+
+    def get(self, trigger_id: int) -> Optional[Trigger]:
+        return self._triggers.get(trigger_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"armed": len(self._triggers), "symbols": len(self._symbols), "oco_groups": len(self._oco),
+                **self._stats}
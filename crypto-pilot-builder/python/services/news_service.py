@@ -4,13 +4,20 @@ Service de news crypto pour l'autowallet
 Analyse les actualités et détecte les opportunités d'investissement
 """
 
-import requests
 import json
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from pipeline.utils.mention_extractor import mention_extractor
+from pipeline.utils.news_store import NewsStore
+from pipeline.utils.rate_limiter import Priority, rate_limited_get, rate_limited_request
+from pipeline.utils.sentiment_lexicon import sentiment_lexicon
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +34,7 @@ class NewsItem:
     relevance_score: float = 0.0
     crypto_mentions: List[str] = None
     impact_level: str = "low"  # low, medium, high, critical
+    _base_relevance: Optional[float] = field(default=None, repr=False, compare=False)  # Part de pertinence indépendante de l'âge
 
 @dataclass
 class InvestmentAlert:
@@ -48,44 +56,155 @@ class NewsService:
         self.base_url = "https://min-api.cryptocompare.com/data/v2"
         self.cache_duration = timedelta(minutes=15)
         self.last_fetch = None
-        self.cached_news = []
+        # Magasin partagé: chaque récupération y est fusionnée (index par date et par symbole)
+        self.store = NewsStore(retention=timedelta(days=7))
         
-    def fetch_crypto_news(self, limit: int = 50) -> List[NewsItem]:
-        """Récupère les dernières news crypto depuis CryptoCompare (même API que le Bento)"""
-        try:
-            # Endpoint pour les news de CryptoCompare
-            url = f"{self.base_url}/news/?lang=EN&limit={min(limit, 50)}"
-            
-            response = requests.get(url, timeout=10)
+        # Ingestion incrémentale: validateurs HTTP, date de la news la plus récente
+        # et empreintes de contenu déjà vues (copies syndiquées sous un autre id)
+        self.etag = None
+        self.last_modified = None
+        self.latest_published = None
+        self.late_news_window = timedelta(hours=1)  # Retard d'indexation toléré par le fournisseur
+        self._seen_hashes: "OrderedDict[str, str]" = OrderedDict()
+        self.ingest_stats = {"fetches": 0, "not_modified": 0, "new": 0, "known": 0, "duplicates": 0, "stale": 0}
+        # Ingestion partagée entre les threads (autowallet) et les boucles asyncio (agents)
+        self._ingest_lock = threading.Lock()
+        
+    def _news_url(self, limit: int) -> str:
+        # Endpoint pour les news de CryptoCompare
+        return f"{self.base_url}/news/?lang=EN&limit={min(limit, 50)}"
+    
+    def _conditional_headers(self) -> Dict[str, str]:
+        """
+        Requête conditionnelle: 304 si rien n'a changé depuis la dernière réponse
+        (sans objet si le magasin est vide: il faut alors la réponse complète)
+        """
+        headers = {}
+        if len(self.store):
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+        return headers
+    
+    @staticmethod
+    def _header(response, name: str) -> Optional[str]:
+        """En-tête de réponse insensible à la casse (les réponses aiohttp rejouées sont des dict simples)"""
+        headers = response.headers or {}
+        value = headers.get(name)
+        if value is None:
+            value = next((v for k, v in headers.items() if k.lower() == name.lower()), None)
+        return value
+    
+    def _ingest_response(self, response) -> Optional[List[NewsItem]]:
+        """Fusionne une réponse CryptoCompare (requests ou aiohttp); None si le statut est une erreur"""
+        with self._ingest_lock:
+            self.ingest_stats["fetches"] += 1
             
-            if response.status_code == 200:
-                data = response.json()
-                news_items = self._parse_cryptocompare_news(data)
-                self.cached_news = news_items
+            if response.status_code == 304:
+                self.ingest_stats["not_modified"] += 1
                 self.last_fetch = datetime.now()
-                logger.info(f"✅ {len(news_items)} news récupérées depuis CryptoCompare")
-                return news_items
-            else:
+                logger.info("✅ News CryptoCompare inchangées (304)")
+                return []
+            
+            if response.status_code != 200:
                 logger.error(f"Erreur API CryptoCompare: {response.status_code} - {response.text}")
+                return None
+            
+            self.etag = self._header(response, "ETag")
+            self.last_modified = self._header(response, "Last-Modified")
+            data = response.json()
+            # Seuls les articles jamais vus sont parsés, puis analysés une fois à la fusion
+            news_items = self._parse_cryptocompare_news(data)
+            new_items = self.store.upsert(news_items)
+            self._analyze_new_items(new_items)
+            self.last_fetch = datetime.now()
+            logger.info(f"✅ {len(new_items)} nouvelles news récupérées depuis CryptoCompare")
+            return new_items
+    
+    def fetch_crypto_news(self, limit: int = 50) -> List[NewsItem]:
+        """Récupère les news crypto nouvelles depuis CryptoCompare (même API que le Bento)"""
+        try:
+            response = rate_limited_get(self._news_url(limit), priority=Priority.DEFAULT, timeout=10,
+                                        headers=self._conditional_headers())
+            new_items = self._ingest_response(response)
+            if new_items is None:
                 # Fallback vers les news simulées
                 return self._get_fallback_news(limit)
+            return new_items
                 
         except Exception as e:
             logger.error(f"Erreur lors de la récupération des news: {e}")
             return self._get_fallback_news(limit)
     
+    async def fetch_crypto_news_async(self, session, limit: int = 50,
+                                      priority: Optional[Priority] = None) -> List[NewsItem]:
+        """
+        Version non bloquante de `fetch_crypto_news` sur une session aiohttp fournie
+        par l'appelant (pool de connexions et timeouts de la session). Les erreurs
+        sont propagées, sans news simulées, pour que le circuit breaker de
+        l'appelant les compte; l'annulation interrompt la requête en cours.
+        """
+        response = await rate_limited_request(session, "GET", self._news_url(limit), priority=priority,
+                                              headers=self._conditional_headers())
+        new_items = self._ingest_response(response)
+        if new_items is None:
+            raise RuntimeError(f"Erreur API CryptoCompare: {response.status_code}")
+        return new_items
+    
+    def _analyze_new_items(self, news_items: List[NewsItem]):
+        """Sentiment (en un lot) et part fixe de pertinence des articles nouveaux"""
+        for news, sentiment in zip(news_items, self.analyze_sentiment_batch(news_items)):
+            news.sentiment_score = sentiment
+            news._base_relevance = self._base_relevance(news)
+    
+    @staticmethod
+    def _content_hash(title: str, body: str) -> str:
+        """Empreinte du contenu normalisé (casse et espaces ignorés)"""
+        normalized = " ".join((title + " " + body).lower().split())
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+    
+    def _is_new(self, item: Dict) -> bool:
+        """
+        Filtre d'ingestion, du moins coûteux au plus coûteux: date antérieure à la
+        news la plus récente déjà vue (au retard d'indexation près), id déjà
+        stocké, puis empreinte de contenu déjà vue.
+        """
+        published_on = item.get('published_on')
+        if self.latest_published is not None and isinstance(published_on, (int, float)) \
+                and published_on < self.latest_published - self.late_news_window.total_seconds():
+            self.ingest_stats["stale"] += 1
+            return False
+        if 'id' in item and str(item['id']) in self.store:
+            self.ingest_stats["known"] += 1
+            return False
+        
+        content_hash = self._content_hash(item.get('title', ''), item.get('body', ''))
+        if content_hash in self._seen_hashes:
+            self.ingest_stats["duplicates"] += 1
+            return False
+        self._seen_hashes[content_hash] = str(item.get('id', ''))
+        if self.store.max_items is not None and len(self._seen_hashes) > self.store.max_items:
+            self._seen_hashes.popitem(last=False)
+        self.ingest_stats["new"] += 1
+        return True
+    
     def _parse_cryptocompare_news(self, data: Dict) -> List[NewsItem]:
-        """Parse les données de l'API CryptoCompare (même format que le Bento)"""
+        """Parse les articles nouveaux des données de l'API CryptoCompare (même format que le Bento)"""
         news_items = []
         
         try:
             if 'Data' in data and isinstance(data['Data'], list):
+                latest = self.latest_published
                 for item in data['Data']:
+                    if not self._is_new(item):
+                        continue
+                    
                     # Extraire les cryptomonnaies mentionnées depuis les catégories et le titre
                     crypto_mentions = []
                     
                     # D'abord, essayer de détecter les cryptomonnaies dans le titre et le contenu
-                    title_content = (item.get('title', '') + ' ' + item.get('body', '')).upper()
+                    title_content = item.get('title', '') + ' ' + item.get('body', '')
                     crypto_mentions = self._extract_crypto_mentions(title_content)
                     
                     # Si aucune crypto n'est trouvée, essayer les catégories
@@ -104,6 +223,7 @@ class NewsService:
                     if 'published_on' in item:
                         try:
                             published_at = datetime.fromtimestamp(item['published_on'])
+                            latest = max(latest or 0, item['published_on'])
                         except:
                             published_at = datetime.now()
                     
@@ -117,6 +237,7 @@ class NewsService:
                         crypto_mentions=crypto_mentions
                     )
                     news_items.append(news_item)
+                self.latest_published = latest
                     
         except Exception as e:
             logger.error(f"Erreur lors du parsing des news CryptoCompare: {e}")
@@ -190,51 +311,44 @@ class NewsService:
         return news_items
     
     def _extract_crypto_mentions(self, text: str) -> List[str]:
-        """Extrait les mentions de cryptomonnaies du texte"""
-        crypto_symbols = [
-            'BTC', 'ETH', 'ADA', 'DOT', 'SOL', 'MATIC', 'AVAX', 'UNI', 'LINK',
-            'BNB', 'XRP', 'DOGE', 'SHIB', 'LTC', 'BCH', 'XLM', 'VET', 'TRX',
-            'ATOM', 'NEAR', 'FTM', 'ALGO', 'ICP', 'FIL', 'THETA', 'EOS', 'AAVE'
-        ]
-        
-        mentions = []
-        text_upper = text.upper()
-        
-        for symbol in crypto_symbols:
-            if symbol in text_upper:
-                mentions.append(symbol)
-        
-        return mentions
+        """Extrait les mentions de cryptomonnaies du texte (mots entiers, tickers et noms)"""
+        # La casse d'origine est nécessaire: "near" ou "link" ne sont pas des tickers
+        return mention_extractor.extract(text)
     
     def analyze_sentiment(self, news_item: NewsItem) -> float:
-        """Analyse le sentiment d'un article (basique)"""
-        positive_words = [
-            'bullish', 'moon', 'pump', 'surge', 'rally', 'breakout', 'adoption',
-            'partnership', 'upgrade', 'innovation', 'growth', 'profit', 'gain',
-            'success', 'launch', 'integration', 'expansion', 'milestone', 'achievement'
-        ]
-        
-        negative_words = [
-            'bearish', 'crash', 'dump', 'sell-off', 'decline', 'bear market',
-            'regulation', 'ban', 'hack', 'scam', 'loss', 'bankruptcy', 'failure',
-            'delay', 'issue', 'problem', 'concern', 'risk', 'volatility'
-        ]
+        """Analyse le sentiment d'un article (lexique avec expressions et négations)"""
+        return sentiment_lexicon.score(news_item.title + ' ' + news_item.content)
+    
+    def analyze_sentiment_batch(self, news_items: List[NewsItem]) -> List[float]:
+        """Analyse le sentiment d'un lot d'articles en un seul passage"""
+        return sentiment_lexicon.score_many([news.title + ' ' + news.content for news in news_items])
+    
+    def _base_relevance(self, news_item: NewsItem) -> float:
+        """Part de la pertinence indépendante de l'âge (mentions, source, contenu)"""
+        relevance_score = 0.0
         
-        text = (news_item.title + ' ' + news_item.content).lower()
+        # Score basé sur les mentions de crypto
+        if news_item.crypto_mentions:
+            relevance_score += 0.3
         
-        positive_count = sum(1 for word in positive_words if word in text)
-        negative_count = sum(1 for word in negative_words if word in text)
+        # Score basé sur la source (priorité aux sources fiables)
+        trusted_sources = ['coindesk', 'cointelegraph', 'bitcoin.com', 'decrypt', 'reuters', 'bloomberg']
+        if any(source in news_item.source.lower() for source in trusted_sources):
+            relevance_score += 0.2
         
-        total_words = len(text.split())
-        if total_words == 0:
-            return 0.0
+        # Score basé sur le contenu (longueur, mots-clés)
+        content_length = len(news_item.content)
+        if content_length > 200:
+            relevance_score += 0.1
         
-        sentiment = (positive_count - negative_count) / total_words
-        return max(-1.0, min(1.0, sentiment * 15))  # Normaliser entre -1 et 1
+        return relevance_score
     
     def calculate_relevance(self, news_item: NewsItem) -> float:
         """Calcule la pertinence d'une news pour l'investissement"""
-        relevance_score = 0.0
+        # Seule la fraîcheur est recalculée, le reste est figé à l'ingestion
+        if news_item._base_relevance is None:
+            news_item._base_relevance = self._base_relevance(news_item)
+        relevance_score = news_item._base_relevance
         
         # Score basé sur la fraîcheur
         hours_old = (datetime.now() - news_item.published_at).total_seconds() / 3600
@@ -247,40 +361,20 @@ class NewsService:
         elif hours_old < 48:
             relevance_score += 0.1
         
-        # Score basé sur les mentions de crypto
-        if news_item.crypto_mentions:
-            relevance_score += 0.3
-        
-        # Score basé sur la source (priorité aux sources fiables)
-        trusted_sources = ['coindesk', 'cointelegraph', 'bitcoin.com', 'decrypt', 'reuters', 'bloomberg']
-        if any(source in news_item.source.lower() for source in trusted_sources):
-            relevance_score += 0.2
-        
-        # Score basé sur le contenu (longueur, mots-clés)
-        content_length = len(news_item.content)
-        if content_length > 200:
-            relevance_score += 0.1
-        
         return min(1.0, relevance_score)
     
-    def get_recent_news(self, hours: int = 24) -> List[NewsItem]:
-        """Récupère les news récentes"""
-        # Si pas de cache ou cache expiré, récupérer de nouvelles news
-        if not self.cached_news or not self.last_fetch or datetime.now() - self.last_fetch > self.cache_duration:
+    def needs_refresh(self) -> bool:
+        """Vrai si le magasin est vide ou le cache expiré"""
+        return not len(self.store) or not self.last_fetch or datetime.now() - self.last_fetch > self.cache_duration
+    
+    def _refresh_if_stale(self):
+        """Fusionne une nouvelle récupération si nécessaire"""
+        if self.needs_refresh():
             self.fetch_crypto_news()
-        
-        if not self.cached_news:
-            return []
-        
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        recent_news = [
-            news for news in self.cached_news 
-            if news.published_at > cutoff_time
-        ]
-        
-        # Analyser le sentiment et la pertinence
-        for news in recent_news:
-            news.sentiment_score = self.analyze_sentiment(news)
+    
+    def _update_relevance(self, news_items: List[NewsItem]):
+        """Pertinence (qui dépend de l'âge) et niveau d'impact; le sentiment est calculé à la fusion"""
+        for news in news_items:
             news.relevance_score = self.calculate_relevance(news)
             
             # Déterminer le niveau d'impact
@@ -292,8 +386,32 @@ class NewsService:
                 news.impact_level = "medium"
             else:
                 news.impact_level = "low"
+    
+    def get_recent_news(self, hours: int = 24, symbol: Optional[str] = None) -> List[NewsItem]:
+        """Récupère les news récentes (toutes, ou celles qui mentionnent `symbol`)"""
+        self._refresh_if_stale()
         
+        recent_news = self.store.recent(hours=hours, symbol=symbol)
+        self._update_relevance(recent_news)
         return sorted(recent_news, key=lambda x: x.relevance_score, reverse=True)
+    
+    def get_recent_news_by_symbol(self, hours: int = 24, symbols: Optional[List[str]] = None,
+                                  refresh: bool = True) -> Dict[str, List[NewsItem]]:
+        """
+        News récentes groupées par crypto mentionnée (index par symbole, sans parcourir
+        toutes les news). `refresh=False` lit le magasin sans appel réseau (l'appelant
+        asynchrone le rafraîchit lui-même via `fetch_crypto_news_async`).
+        """
+        if refresh:
+            self._refresh_if_stale()
+        
+        grouped = self.store.recent_by_symbol(hours=hours, symbols=symbols)
+        unique = {news.id: news for items in grouped.values() for news in items}
+        self._update_relevance(list(unique.values()))
+        return {
+            symbol: sorted(items, key=lambda x: x.relevance_score, reverse=True)
+            for symbol, items in grouped.items()
+        }
 
 # Instance singleton
 news_service = NewsService()
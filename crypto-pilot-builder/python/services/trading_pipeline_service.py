@@ -18,6 +18,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '../pipeline'))
 from pipeline.utils.pipeline_manager import pipeline_manager
+from pipeline.utils.stage_graph import StageGraph
 
 logger = logging.getLogger(__name__)
 
@@ -78,6 +79,9 @@ class TradingPipelineService:
         logger.info("TradingPipelineService initialisé avec le vrai PipelineManager")
         self.trades_cache: Dict[str, TradeExecution] = {}
         
+        # Étapes de la boucle principale: news et prix en parallèle, puis la chaîne de décision
+        self.stage_graph = self._build_stage_graph()
+        
         # Statistiques
         self.stats = {
             "total_signals": 0,
@@ -113,33 +117,40 @@ class TradingPipelineService:
             logger.error(f"Erreur lors de l'arrêt de la pipeline: {e}")
             return False
     
+    def _build_stage_graph(self) -> StageGraph:
+        """Déclare les étapes de la boucle principale et leurs dépendances"""
+        graph = StageGraph("trading_service")
+        graph.add_stage("news", self._collect_news_sentiment)
+        graph.add_stage("prices", self._fetch_real_time_prices)
+        graph.add_stage("market", self._merge_market_data, inputs=("news", "prices"), optional=("news",))
+        graph.add_stage("predictions", lambda market: self._generate_predictions(), inputs=("market",))
+        graph.add_stage("signals", lambda predictions: self._generate_trading_signals(), inputs=("predictions",))
+        graph.add_stage("trades", lambda signals: self._execute_trades(), inputs=("signals",))
+        graph.add_stage("statistics", lambda trades: self._update_statistics(), inputs=("trades",))
+        return graph
+    
     def _pipeline_main_loop(self):
         """Boucle principale de la pipeline"""
         logger.info("Démarrage de la boucle principale de la pipeline")
         
-        while not self.should_stop and self.is_running:
-            try:
-                # Étape 1: Collecte de données (DataCollector)
-                self._collect_market_data()
-                
-                # Étape 2: Génération de prédictions (Predictor)
-                self._generate_predictions()
-                
-                # Étape 3: Génération de signaux (Strategy)
-                self._generate_trading_signals()
-                
-                # Étape 4: Exécution des trades (Trader)
-                self._execute_trades()
-                
-                # Mise à jour des statistiques
-                self._update_statistics()
-                
-                # Attendre l'intervalle suivant
-                time.sleep(self.pipeline_config["data_collection_interval"])
-                
-            except Exception as e:
-                logger.error(f"Erreur dans la boucle principale de la pipeline: {e}")
-                time.sleep(60)  # Attendre 1 minute en cas d'erreur
+        # Boucle asyncio unique pour toute la durée de la boucle principale
+        loop = asyncio.new_event_loop()
+        try:
+            while not self.should_stop and self.is_running:
+                try:
+                    # Collecte des news et des prix en parallèle, puis
+                    # Predictor → Strategy → Trader → statistiques
+                    run = loop.run_until_complete(self.stage_graph.run())
+                    logger.debug(f"Cycle de la pipeline: {run.durations_ms()}")
+                    
+                    # Attendre l'intervalle suivant
+                    time.sleep(self.pipeline_config["data_collection_interval"])
+                    
+                except Exception as e:
+                    logger.error(f"Erreur dans la boucle principale de la pipeline: {e}")
+                    time.sleep(60)  # Attendre 1 minute en cas d'erreur
+        finally:
+            loop.close()
         
         logger.info("Arrêt de la boucle principale de la pipeline")
     
@@ -147,64 +158,66 @@ class TradingPipelineService:
         """Collecte les données de marché (remplace DataCollector)"""
         try:
             logger.debug("Collecte des données de marché...")
-            
-            # 1. Récupérer les news récentes (via le service existant)
-            recent_news = self.news_service.get_recent_news(hours=1)
-            
-            # 2. Analyser le sentiment des news
-            for news in recent_news:
-                # Extraire les cryptomonnaies mentionnées
-                if news.crypto_mentions:
-                    for crypto in news.crypto_mentions:
-                        symbol = f"{crypto}/USD"
-                        
-                        # Créer ou mettre à jour les données de marché
-                        if symbol not in self.market_data_cache:
-                            self.market_data_cache[symbol] = MarketData(
-                                symbol=symbol,
-                                price=0.0,  # À récupérer via API de prix
-                                volume=0.0,
-                                timestamp=datetime.utcnow(),
-                                news_sentiment=news.sentiment_score,
-                                technical_indicators={},
-                                social_sentiment=0.0
-                            )
-                        else:
-                            # Mettre à jour le sentiment des news
-                            current_data = self.market_data_cache[symbol]
-                            # Moyenne pondérée du sentiment
-                            current_data.news_sentiment = (
-                                current_data.news_sentiment * 0.7 + 
-                                news.sentiment_score * 0.3
-                            )
-                            current_data.timestamp = datetime.utcnow()
-            
-            # 3. Récupérer les prix en temps réel (à implémenter)
-            self._update_real_time_prices()
-            
+            self._merge_market_data(self._collect_news_sentiment(), self._fetch_real_time_prices())
             logger.debug(f"Données de marché collectées pour {len(self.market_data_cache)} symboles")
             
         except Exception as e:
             logger.error(f"Erreur lors de la collecte des données de marché: {e}")
     
-    def _update_real_time_prices(self):
-        """Met à jour les prix en temps réel (remplace la collecte de prix du DataCollector)"""
-        try:
-            # TODO: Implémenter la récupération des prix via API (CoinGecko, Binance, etc.)
-            # Pour l'instant, on utilise des prix simulés
-            
-            for symbol in self.market_data_cache:
-                # Simulation de prix (à remplacer par vraie API)
-                import random
-                base_price = 50000 if "BTC" in symbol else 3000 if "ETH" in symbol else 100
-                price_change = random.uniform(-0.02, 0.02)  # ±2%
-                new_price = base_price * (1 + price_change)
-                
-                self.market_data_cache[symbol].price = new_price
-                self.market_data_cache[symbol].volume = random.uniform(1000000, 10000000)
-                
-        except Exception as e:
-            logger.error(f"Erreur lors de la mise à jour des prix: {e}")
+    def _collect_news_sentiment(self) -> Dict[str, List[float]]:
+        """Sentiments des news récentes par symbole, dans l'ordre des news (sans toucher au cache)"""
+        # News récentes déjà groupées par crypto mentionnée (index par symbole du service)
+        news_by_symbol = self.news_service.get_recent_news_by_symbol(hours=1)
+        
+        return {
+            f"{crypto}/USD": [news.sentiment_score for news in items]
+            for crypto, items in news_by_symbol.items()
+        }
+    
+    def _fetch_real_time_prices(self) -> Dict[str, Dict[str, float]]:
+        """Prix des symboles suivis (remplace la collecte de prix du DataCollector)"""
+        # TODO: Implémenter la récupération des prix via API (CoinGecko, Binance, etc.)
+        return {symbol: self._simulated_price(symbol) for symbol in list(self.market_data_cache)}
+    
+    def _simulated_price(self, symbol: str) -> Dict[str, float]:
+        """Simulation de prix (à remplacer par vraie API)"""
+        import random
+        base_price = 50000 if "BTC" in symbol else 3000 if "ETH" in symbol else 100
+        price_change = random.uniform(-0.02, 0.02)  # ±2%
+        return {
+            "price": base_price * (1 + price_change),
+            "volume": random.uniform(1000000, 10000000)
+        }
+    
+    def _merge_market_data(self, news: Optional[Dict[str, List[float]]], prices: Dict[str, Dict[str, float]]):
+        """Fusionne sentiment des news et prix dans le cache des données de marché"""
+        for symbol, scores in (news or {}).items():
+            for score in scores:
+                # Créer ou mettre à jour les données de marché
+                if symbol not in self.market_data_cache:
+                    self.market_data_cache[symbol] = MarketData(
+                        symbol=symbol,
+                        price=0.0,
+                        volume=0.0,
+                        timestamp=datetime.utcnow(),
+                        news_sentiment=score,
+                        technical_indicators={},
+                        social_sentiment=0.0
+                    )
+                else:
+                    # Moyenne pondérée du sentiment
+                    current_data = self.market_data_cache[symbol]
+                    current_data.news_sentiment = (
+                        current_data.news_sentiment * 0.7 + 
+                        score * 0.3
+                    )
+                    current_data.timestamp = datetime.utcnow()
+        
+        for symbol, market_data in self.market_data_cache.items():
+            # Symbole apparu dans les news de ce cycle: prix récupéré maintenant
+            quote = prices.get(symbol) or self._simulated_price(symbol)
+            market_data.price = quote["price"]
+            market_data.volume = quote["volume"]
     
     def _generate_predictions(self):
         """Génère les prédictions de trading (remplace Predictor)"""
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests du mode d'exécution asyncio du pipeline
+Vérifie la boucle unique, la réutilisation des clients HTTP et l'arrêt immédiat
+"""
+
+import sys
+import os
+import asyncio
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import AsyncMock, patch
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.asi_model import ASIOneModel
+from pipeline.utils.pipeline_manager import PipelineManager
+
+
+class FakeResponse:
+    """Réponse aiohttp minimale"""
+
+    status = 200
+
+    async def json(self):
+        return {"choices": [{"message": {"content": '{"direction_probability": 0.7, "confidence": 0.8}'}}]}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Session partagée qui compte les requêtes"""
+
+    closed = False
+
+    def __init__(self):
+        self.posts = 0
+
+    def post(self, *args, **kwargs):
+        self.posts += 1
+        return FakeResponse()
+
+
+class TestAsyncPipeline(unittest.TestCase):
+    """Tests du moteur asyncio du PipelineManager"""
+
+    def setUp(self):
+        # Journal d'événements dans un répertoire temporaire (jamais dans logs/)
+        self.directory = tempfile.mkdtemp(prefix="pipeline_events_")
+        self.env = patch.dict(os.environ, {"PIPELINE_EVENT_LOG_DIR": self.directory})
+        self.env.start()
+        # Les agents uAgent exigent une boucle courante à leur création
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.manager = PipelineManager()
+        self.manager.agents["news_collector"]._fetch_news_by_symbol = AsyncMock(return_value={})
+        self.manager.execution_interval = 0.05
+        self.manager.watchlist = ["BTC/USD"]
+        self.ticks = []
+
+        async def fake_collect(symbols):
+            # Enregistre la boucle et les clients vus par chaque tick
+            self.ticks.append((
+                asyncio.get_running_loop(),
+                self.manager.http_session,
+                self.manager._get_asi_model()
+            ))
+            return {symbol: {"symbol": symbol, "price": 100.0 + len(self.ticks), "volume": 10.0}
+                    for symbol in symbols}
+
+        self.manager._collect_market_snapshot = fake_collect
+
+    def tearDown(self):
+        self.loop.close()
+        self.env.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_event_log_opened_on_start_and_closed_on_stop(self):
+        """Le journal n'est ouvert qu'au démarrage et fermé à l'arrêt"""
+        print("🧪 Test cycle de vie du journal...")
+        self.assertIsNone(self.manager.event_log)
+        self.assertEqual(os.listdir(self.directory), [])
+        self.assertTrue(asyncio.run(self.manager.start_pipeline()))
+        event_log = self.manager.event_log
+        self.assertIsNotNone(event_log)
+        self.assertIs(self.manager.agents["trader"].event_log, event_log)
+        while not self.ticks:
+            time.sleep(0.01)
+        self.assertTrue(asyncio.run(self.manager.stop_pipeline()))
+
+        self.assertIsNone(self.manager.event_log)
+        self.assertIsNone(self.manager.agents["logger"].event_log)
+        self.assertNotEqual(os.listdir(self.directory), [])
+        print("✅ Journal ouvert au démarrage, fermé à l'arrêt")
+
+    def test_ticks_share_one_loop_and_clients(self):
+        """Tous les ticks tournent sur la même boucle avec les mêmes clients"""
+        print("🧪 Test boucle et clients partagés...")
+        self.assertTrue(asyncio.run(self.manager.start_pipeline()))
+        deadline = time.monotonic() + 5
+        while len(self.ticks) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        session = self.manager.http_session
+        self.assertTrue(asyncio.run(self.manager.stop_pipeline()))
+
+        self.assertGreaterEqual(len(self.ticks), 3)
+        self.assertEqual(len({id(loop) for loop, _, _ in self.ticks}), 1)
+        self.assertEqual(len({id(s) for _, s, _ in self.ticks}), 1)
+        self.assertEqual(len({id(m) for _, _, m in self.ticks}), 1)
+        self.assertIs(self.ticks[0][2].session, session)
+        self.assertTrue(session.closed)
+        self.assertGreaterEqual(len(self.manager.pipeline_data), 3)
+        print(f"✅ {len(self.ticks)} ticks sur une seule boucle")
+
+    def test_stop_interrupts_wait(self):
+        """L'arrêt n'attend pas la fin de l'intervalle entre deux ticks"""
+        print("🧪 Test arrêt immédiat...")
+        self.manager.execution_interval = 60
+        asyncio.run(self.manager.start_pipeline())
+        while not self.ticks:
+            time.sleep(0.01)
+
+        start = time.monotonic()
+        asyncio.run(self.manager.stop_pipeline())
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertIsNone(self.manager.event_loop)
+        print("✅ Pipeline arrêté sans attendre l'intervalle")
+
+    def test_execute_once_without_running_pipeline(self):
+        """Un tick manuel fonctionne hors de la boucle du pipeline"""
+        print("🧪 Test tick manuel...")
+        data = asyncio.run(self.manager.execute_once())
+        self.assertEqual([d.symbol for d in data], ["BTC/USD"])
+        self.assertIsNone(self.ticks[0][1])  # Pas de session partagée ouverte
+        print("✅ Tick manuel exécuté")
+
+
+class TestASIOneSharedSession(unittest.TestCase):
+    """Tests de la session partagée du modèle ASI:One"""
+
+    def test_shared_session_is_reused(self):
+        """Les appels successifs passent par la session fournie"""
+        print("🧪 Test session ASI:One partagée...")
+        session = FakeSession()
+        model = ASIOneModel(api_key="test", session=session)
+
+        async def scenario():
+            for _ in range(3):
+                await model._call_asi_api("prompt")
+
+        asyncio.run(scenario())
+        self.assertEqual(session.posts, 3)
+        print("✅ 3 appels, 1 session")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
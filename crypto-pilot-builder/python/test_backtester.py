@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests du backtester vectorisé
+Vérifie les sorties SL/TP, les limites de risque, le slippage, la courbe de capital et la vitesse
+"""
+
+import sys
+import os
+import asyncio
+import time
+import unittest
+
+import numpy as np
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.agents.models.market_data import OHLCVSeries
+from pipeline.agents.models.prediction import Prediction
+from pipeline.agents.trading.strategy import StrategyAgent
+from pipeline.utils.backtester import Backtester, BacktestConfig, MS_PER_DAY
+from pipeline.utils.config import TradingConfig
+from pipeline.utils.trading_rules import position_size, signal_direction
+
+HOUR = 3_600_000
+
+
+def make_series(close, start=0, step=HOUR, spread=0.0):
+    close = np.asarray(close, dtype=np.float64)
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    return OHLCVSeries(
+        timestamp=start + np.arange(len(close), dtype=np.int64) * step,
+        open=open_,
+        high=np.maximum(open_, close) * (1 + spread),
+        low=np.minimum(open_, close) * (1 - spread),
+        close=close,
+        volume=np.ones(len(close)),
+    )
+
+
+def constant_predictions(length, direction_prob=0.9, confidence=0.9, signal_bars=None):
+    prob = np.full(length, 0.5)
+    prob[signal_bars if signal_bars is not None else slice(None)] = direction_prob
+    return {"direction_prob": prob, "confidence": np.full(length, confidence), "volatility": np.zeros(length)}
+
+
+class TestBacktester(unittest.TestCase):
+    """Tests de Backtester"""
+
+    def setUp(self):
+        self.config = BacktestConfig(slippage=0.0, fee_rate=0.0)
+
+    def test_take_profit_and_stop_loss(self):
+        """Un achat sort au take profit sur une hausse et au stop loss sur une baisse"""
+        print("🧪 Test sorties SL/TP...")
+        rising = make_series([100, 101, 102, 103, 105, 106])
+        result = Backtester(self.config).run(rising, {"ASSET": constant_predictions(6, signal_bars=[0])})
+        self.assertEqual(len(result.trades), 1)
+        trade = result.trades[0]
+        self.assertEqual((trade.exit_reason, trade.exit_index), ("take_profit", 4))
+        self.assertAlmostEqual(trade.exit_price, 104.0)
+        self.assertAlmostEqual(trade.pnl, trade.quantity * 4.0)
+
+        falling = make_series([100, 99, 97, 95, 94])
+        trade = Backtester(self.config).run(falling, {"ASSET": constant_predictions(5, signal_bars=[0])}).trades[0]
+        self.assertEqual((trade.exit_reason, trade.exit_index), ("stop_loss", 2))
+        self.assertAlmostEqual(trade.exit_price, 98.0)
+        self.assertLess(trade.pnl, 0)
+
+        short = make_series([100, 99, 97, 95, 94])
+        trade = Backtester(self.config).run(short, {"ASSET": constant_predictions(5, 0.1, signal_bars=[0])}).trades[0]
+        self.assertEqual((trade.side, trade.exit_reason), (-1, "take_profit"))
+        self.assertGreater(trade.pnl, 0)
+        print("✅ SL/TP exécutés aux bons niveaux")
+
+    def test_gap_and_end_of_data(self):
+        """Un gap sous le stop est exécuté à l'ouverture, une position ouverte est close en fin de données"""
+        print("🧪 Test gap et fin de données...")
+        gap = OHLCVSeries(timestamp=np.arange(4) * HOUR, open=[100, 100, 90, 90.5], high=[100, 100, 91, 91],
+                          low=[100, 100, 89, 90], close=[100, 100, 90.5, 91], volume=np.ones(4))
+        trade = Backtester(self.config).run(gap, {"ASSET": constant_predictions(4, signal_bars=[1])}).trades[0]
+        self.assertEqual((trade.exit_reason, trade.exit_index), ("stop_loss", 2))
+        self.assertAlmostEqual(trade.exit_price, 90.0)  # Ouverture, pas le niveau du stop (98)
+
+        flat = make_series([100, 100.5, 101, 100.5])
+        trade = Backtester(self.config).run(flat, {"ASSET": constant_predictions(4, signal_bars=[0])}).trades[0]
+        self.assertEqual((trade.exit_reason, trade.exit_index), ("end_of_data", 3))
+        print("✅ Gap et fin de données gérés")
+
+    def test_max_open_trades(self):
+        """Pas plus de max_open_trades positions simultanées sur l'ensemble des symboles"""
+        print("🧪 Test limite de trades ouverts...")
+        flat = [100.0, 100.2, 100.1, 100.3, 100.2, 100.1]
+        universe = {f"S{i}": make_series(flat) for i in range(5)}
+        predictions = {symbol: constant_predictions(6) for symbol in universe}
+        result = Backtester(BacktestConfig(slippage=0.0, fee_rate=0.0, max_open_trades=2)).run(universe, predictions)
+        self.assertEqual(len(result.trades), 2)
+        self.assertGreater(result.rejected["max_open_trades"], 0)
+        for bar in range(6):
+            opened = sum(1 for t in result.trades if t.entry_index <= bar < t.exit_index)
+            self.assertLessEqual(opened, 2)
+        print(f"✅ {result.rejected['max_open_trades']} entrée(s) refusée(s)")
+
+    def test_daily_loss_blocks_until_next_day(self):
+        """Après la perte quotidienne maximale, plus d'entrée avant le lendemain UTC"""
+        print("🧪 Test perte quotidienne...")
+        # Chaque trade perd 2% de 50% du capital: 1% par trade; limite 1.5%
+        close = []
+        for _ in range(2):
+            close += [100, 97] * 6
+        series = make_series(close, step=2 * HOUR)  # 12 bougies par jour
+        config = BacktestConfig(slippage=0.0, fee_rate=0.0, max_position_size=0.5, max_daily_loss=0.015,
+                                max_open_trades=1)
+        predictions = {"ASSET": constant_predictions(len(close), signal_bars=np.arange(0, len(close), 2))}
+        result = Backtester(config).run(series, predictions)
+        days = [t.entry_time // MS_PER_DAY for t in result.trades]
+        self.assertEqual(days.count(0), 2)
+        self.assertEqual(days.count(1), 2)
+        self.assertGreater(result.rejected["daily_loss"], 0)
+        print("✅ Entrées bloquées puis reprises le lendemain")
+
+    def test_slippage_and_fees_cost(self):
+        """Le slippage et les frais réduisent le PnL d'un trade identique"""
+        print("🧪 Test slippage et frais...")
+        series = make_series([100, 101, 102, 103, 105, 106])
+        predictions = {"ASSET": constant_predictions(6, signal_bars=[0])}
+        clean = Backtester(self.config).run(series, predictions).trades[0]
+        costly = Backtester(BacktestConfig(slippage=0.001, fee_rate=0.001)).run(series, predictions).trades[0]
+        self.assertAlmostEqual(costly.entry_price, 100.1)
+        self.assertGreater(costly.fees, 0)
+        self.assertLess(costly.pnl, clean.pnl)
+        print("✅ Coûts d'exécution appliqués")
+
+    def test_equity_curve_matches_trades(self):
+        """La courbe de capital finit au capital initial plus la somme des PnL"""
+        print("🧪 Test courbe de capital...")
+        rng = np.random.default_rng(3)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 2000)))
+        universe = {"BTC": make_series(close, spread=0.003), "ETH": make_series(close[::-1], spread=0.003)}
+        result = Backtester().run(universe)
+        self.assertGreater(len(result.trades), 0)
+        self.assertEqual(len(result.equity), 2000)
+        self.assertAlmostEqual(result.equity[-1], 10000 + sum(t.pnl for t in result.trades), places=6)
+        self.assertEqual(result.stats["trades"], len(result.trades))
+        self.assertGreaterEqual(result.stats["max_drawdown"], 0)
+        print(f"✅ {len(result.trades)} trades, rendement {result.stats['total_return']:.2%}")
+
+    def test_rules_match_strategy_agent(self):
+        """Les règles vectorisées donnent les mêmes décisions que StrategyAgent"""
+        print("🧪 Test équivalence avec StrategyAgent...")
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        agent = StrategyAgent()
+        for prob, confidence, volatility in [(0.8, 0.9, 0.01), (0.2, 0.75, 0.05), (0.5, 0.9, 0.0)]:
+            prediction = Prediction(symbol="BTC/USD", horizon=60, direction_prob=prob, confidence=confidence,
+                                    volatility=volatility, model_name="test",
+                                    features_used={"current_price": 100.0})
+            signal = loop.run_until_complete(agent._generate_signal(prediction))
+            expected = {1: "BUY", -1: "SELL", 0: "HOLD"}[signal_direction(prob)]
+            self.assertEqual(getattr(signal.signal_type, "value", signal.signal_type), expected)
+            self.assertAlmostEqual(signal.position_size, position_size(confidence, volatility))
+        loop.close()
+        print("✅ Décisions identiques")
+
+    def test_from_trading_config(self):
+        """La configuration reprend les paramètres de TradingConfig"""
+        config = BacktestConfig.from_trading_config(TradingConfig(), slippage=0.0)
+        self.assertEqual(config.max_order_size, 1000)
+        self.assertEqual(config.slippage, 0.0)
+
+    def test_multi_year_speed(self):
+        """Deux ans de bougies horaires sur trois symboles en quelques secondes"""
+        print("🧪 Test de vitesse...")
+        rng = np.random.default_rng(0)
+        bars = 2 * 365 * 24
+        universe = {symbol: make_series(100 * np.exp(np.cumsum(rng.normal(0, 0.008, bars))), spread=0.002)
+                    for symbol in ("BTC", "ETH", "SOL")}
+        start = time.perf_counter()
+        result = Backtester().run(universe)
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 10.0)
+        print(f"✅ {bars * 3} bougies, {len(result.trades)} trades en {elapsed:.2f}s")
+
+    def test_rejects_misaligned_series(self):
+        """Des grilles de timestamps différentes sont refusées"""
+        with self.assertRaises(ValueError):
+            Backtester().run({"A": make_series([1, 2, 3]), "B": make_series([1, 2, 3], start=HOUR)})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
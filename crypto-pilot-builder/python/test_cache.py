@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests du cache asynchrone partagé et du micro-batching
+Vérifie TTL, LRU, coalescence des requêtes, stale-while-revalidate et regroupement
+"""
+
+import sys
+import os
+import asyncio
+import unittest
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.cache import AsyncTTLCache
+from pipeline.utils.batching import MicroBatcher
+
+
+class FakeClock:
+    """Horloge contrôlée par le test"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingFetcher:
+    """Fetcher groupé qui compte les appels et simule la latence réseau"""
+
+    def __init__(self, prices, delay=0.01):
+        self.prices = prices
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, keys):
+        self.calls.append(list(keys))
+        await asyncio.sleep(self.delay)
+        return {key: self.prices[key] for key in keys if key in self.prices}
+
+
+class TestAsyncTTLCache(unittest.TestCase):
+    """Tests de AsyncTTLCache"""
+
+    def test_concurrent_misses_share_one_request(self):
+        """N appelants concurrents pour la même clé partagent une requête"""
+        print("🧪 Test single-flight...")
+        cache = AsyncTTLCache(ttl=30)
+        fetcher = CountingFetcher({"bitcoin": 50000.0})
+
+        async def scenario():
+            return await asyncio.gather(*[
+                cache.get_many_or_fetch(["bitcoin"], fetcher) for _ in range(20)
+            ])
+
+        results = asyncio.run(scenario())
+        self.assertEqual(len(fetcher.calls), 1)
+        self.assertTrue(all(r == {"bitcoin": 50000.0} for r in results))
+        self.assertEqual(cache.stats["coalesced"], 19)
+        print("✅ 20 appels, 1 requête")
+
+    def test_batch_only_fetches_missing_keys(self):
+        """Une requête groupée ne demande que les clés absentes"""
+        print("🧪 Test requête groupée partielle...")
+        cache = AsyncTTLCache(ttl=30)
+        fetcher = CountingFetcher({"bitcoin": 1.0, "ethereum": 2.0, "solana": 3.0})
+
+        async def scenario():
+            await cache.get_many_or_fetch(["bitcoin"], fetcher)
+            return await cache.get_many_or_fetch(["bitcoin", "ethereum", "solana", "unknown"], fetcher)
+
+        result = asyncio.run(scenario())
+        self.assertEqual(result, {"bitcoin": 1.0, "ethereum": 2.0, "solana": 3.0})
+        self.assertEqual(fetcher.calls, [["bitcoin"], ["ethereum", "solana", "unknown"]])
+        self.assertNotIn("unknown", cache)
+        print("✅ Seules les clés manquantes sont demandées")
+
+    def test_ttl_and_stale_while_revalidate(self):
+        """Une valeur périmée est servie pendant son rafraîchissement"""
+        print("🧪 Test TTL et stale-while-revalidate...")
+        clock = FakeClock()
+        cache = AsyncTTLCache(ttl=30, stale_ttl=60, clock=clock)
+        fetcher = CountingFetcher({"bitcoin": 100.0}, delay=0)
+
+        async def get():
+            return (await cache.get_many_or_fetch(["bitcoin"], fetcher)).get("bitcoin")
+
+        async def stale_then_refresh():
+            first = await get()
+            fetcher.prices["bitcoin"] = 200.0
+            clock.now = 40  # Périmé mais servable
+            stale = await get()
+            await asyncio.sleep(0.01)  # Laisser le rafraîchissement se terminer
+            fresh = await get()
+            clock.now = 40 + 100  # Au-delà de ttl + stale_ttl: nouvelle requête bloquante
+            fetcher.prices["bitcoin"] = 300.0
+            expired = await get()
+            return first, stale, fresh, expired
+
+        self.assertEqual(asyncio.run(stale_then_refresh()), (100.0, 100.0, 200.0, 300.0))
+        self.assertEqual(len(fetcher.calls), 3)
+        self.assertEqual(cache.stats["stale_hits"], 1)
+        print("✅ Prix périmé servi puis rafraîchi")
+
+    def test_lru_eviction(self):
+        """Le cache est borné et évince l'entrée la moins récemment utilisée"""
+        print("🧪 Test éviction LRU...")
+        cache = AsyncTTLCache(maxsize=2, ttl=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(len(cache), 2)
+        cache.set("d", None)
+        self.assertNotIn("d", cache)
+        print("✅ Éviction LRU conforme")
+
+
+class TestMicroBatcher(unittest.TestCase):
+    """Tests du regroupement des requêtes unitaires"""
+
+    def test_lookups_in_window_share_one_request(self):
+        """Les demandes d'une même fenêtre partent en un seul appel groupé"""
+        print("🧪 Test micro-batching...")
+        prices = {f"coin{i}": float(i) for i in range(30)}
+        fetcher = CountingFetcher(prices, delay=0)
+        batcher = MicroBatcher(fetcher, window=0.005)
+
+        async def scenario():
+            singles = [batcher.load(f"coin{i}") for i in range(30)]
+            return await asyncio.gather(batcher.load("coin0"), batcher.load("missing"), *singles)
+
+        results = asyncio.run(scenario())
+        self.assertEqual(results[0], 0.0)
+        self.assertIsNone(results[1])
+        self.assertEqual(results[2:], [float(i) for i in range(30)])
+        self.assertEqual(len(fetcher.calls), 1)
+        self.assertEqual(len(fetcher.calls[0]), 31)  # coin0 dédupliqué
+        print("✅ 32 demandes, 1 requête")
+
+    def test_max_batch_splits_requests(self):
+        """Un lot plein est envoyé sans attendre la fin de la fenêtre"""
+        print("🧪 Test taille maximale de lot...")
+        fetcher = CountingFetcher({f"c{i}": 1.0 for i in range(10)}, delay=0)
+        batcher = MicroBatcher(fetcher, window=10.0, max_batch=4)
+
+        async def scenario():
+            return await asyncio.wait_for(
+                asyncio.gather(*[batcher.load(f"c{i}") for i in range(8)]), timeout=1.0
+            )
+
+        self.assertEqual(asyncio.run(scenario()), [1.0] * 8)
+        self.assertEqual([len(call) for call in fetcher.calls], [4, 4])
+        print("✅ Lots de 4 envoyés immédiatement")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests de l'agrégation ticks -> bougies OHLCV
+Vérifie la construction incrémentale et la fermeture aux frontières de timeframe
+"""
+
+import sys
+import os
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.agents.trading.data_collector import DataCollectorAgent
+from pipeline.utils.candle_builder import CandleBuilder, MultiTimeframeCandleBuilder
+from pipeline.utils.market_data_service import market_data_service
+
+# Début d'une heure ronde (ms)
+T0 = 1_700_000_000_000 - (1_700_000_000_000 % 3_600_000)
+SECOND = 1000
+MINUTE = 60 * SECOND
+
+
+class TestCandleBuilder(unittest.TestCase):
+    """Tests d'un timeframe unique"""
+
+    def test_folds_ticks_into_true_ohlcv(self):
+        """Open/high/low/close/volume sont ceux des ticks de la période"""
+        print("🧪 Test construction d'une bougie 1m...")
+        builder = CandleBuilder("1m")
+        ticks = [(100.0, 1.0), (105.0, 2.0), (98.0, 0.5), (101.0, 1.5)]
+        for i, (price, volume) in enumerate(ticks):
+            self.assertIsNone(builder.add_tick("BTC/USD", price, volume, T0 + i * 10 * SECOND))
+
+        closed = builder.add_tick("BTC/USD", 102.0, 1.0, T0 + MINUTE)
+        self.assertEqual(closed.timestamp, T0)
+        self.assertEqual((closed.open, closed.high, closed.low, closed.close), (100.0, 105.0, 98.0, 101.0))
+        self.assertEqual(closed.volume, 5.0)
+        self.assertEqual(builder.current("BTC/USD").open, 102.0)
+        print("✅ Bougie conforme aux ticks")
+
+    def test_late_ticks_and_close_due(self):
+        """Les ticks en retard sont ignorés, close_due ferme une période écoulée"""
+        print("🧪 Test ticks en retard et fermeture forcée...")
+        builder = CandleBuilder("5m")
+        builder.add_tick("ETH/USD", 10.0, 0.0, T0 + 6 * MINUTE)
+        self.assertIsNone(builder.add_tick("ETH/USD", 99.0, 0.0, T0 + MINUTE))
+        self.assertEqual(builder.current("ETH/USD").high, 10.0)
+
+        self.assertIsNone(builder.close_due("ETH/USD", T0 + 9 * MINUTE))
+        closed = builder.close_due("ETH/USD", T0 + 10 * MINUTE)
+        self.assertEqual(closed.timestamp, T0 + 5 * MINUTE)
+        self.assertIsNone(builder.add_tick("ETH/USD", 11.0, 0.0, T0 + 7 * MINUTE))
+        self.assertIsNone(builder.current("ETH/USD"))
+
+        with self.assertRaises(ValueError):
+            CandleBuilder("2m")
+        print("✅ Ticks en retard ignorés")
+
+
+class TestMultiTimeframeCandleBuilder(unittest.TestCase):
+    """Tests multi-timeframe"""
+
+    def test_higher_timeframes_close_on_their_boundaries(self):
+        """Chaque timeframe ferme ses bougies à sa propre frontière"""
+        print("🧪 Test multi-timeframe sur une heure de ticks...")
+        builder = MultiTimeframeCandleBuilder()
+        closed_by_tf = {tf: [] for tf in builder.timeframes}
+
+        # Un tick toutes les 15 secondes pendant 1h, plus un tick d'ouverture de l'heure suivante
+        for i in range(4 * 60 + 1):
+            price = 100.0 + (i % 7)
+            for timeframe, candle in builder.add_tick("BTC/USD", price, 1.0, T0 + i * 15 * SECOND).items():
+                closed_by_tf[timeframe].append(candle)
+
+        self.assertEqual(len(closed_by_tf["1m"]), 60)
+        self.assertEqual(len(closed_by_tf["5m"]), 12)
+        self.assertEqual(len(closed_by_tf["15m"]), 4)
+        self.assertEqual(len(closed_by_tf["1h"]), 1)
+
+        hour = closed_by_tf["1h"][0]
+        self.assertEqual(hour.high, max(c.high for c in closed_by_tf["1m"]))
+        self.assertEqual(hour.low, min(c.low for c in closed_by_tf["1m"]))
+        self.assertEqual(hour.volume, sum(c.volume for c in closed_by_tf["5m"]))
+        self.assertEqual(hour.open, closed_by_tf["15m"][0].open)
+        self.assertEqual(hour.close, closed_by_tf["15m"][-1].close)
+        print("✅ 60 x 1m, 12 x 5m, 4 x 15m, 1 x 1h cohérentes")
+
+
+class TestDataCollectorCandles(unittest.TestCase):
+    """Tests de l'émission des bougies par le DataCollectorAgent"""
+
+    def setUp(self):
+        # Les agents uAgent exigent une boucle courante à leur création
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.agent = DataCollectorAgent()
+        self.agent._send_to_predictor = mock.AsyncMock()
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def sent(self):
+        return sorted(call.args[1].timeframe for call in self.agent._send_to_predictor.call_args_list)
+
+    def test_due_candles_closed_without_price(self):
+        """Un intervalle sans prix ferme quand même les bougies échues"""
+        print("🧪 Test fermeture des bougies sans nouveau tick...")
+        for price in (None, RuntimeError("CoinGecko indisponible")):
+            self.agent._send_to_predictor.reset_mock()
+            self.agent.candle_builder.reset()
+            self.agent.candle_builder.add_tick("BTC/USD", 100.0, 0.0, int(time.time() * 1000) - 2 * 3_600_000)
+            with mock.patch.object(market_data_service, "get_crypto_price",
+                                   mock.AsyncMock(side_effect=[price])):
+                self.loop.run_until_complete(self.agent._collect_crypto_data(None, "bitcoin", "BTC"))
+
+            self.assertEqual(self.sent(), ["15m", "1h", "1m", "5m"])
+            self.assertIsNone(self.agent.candle_builder.current("BTC/USD", "1m"))
+        print("✅ Bougies échues envoyées au Predictor malgré l'absence de prix")
+
+    def test_price_tick_opens_new_candle(self):
+        """Un prix reçu après la période ferme l'ancienne bougie et en ouvre une nouvelle"""
+        now_ms = int(time.time() * 1000)
+        self.agent.candle_builder.add_tick("ETH/USD", 100.0, 0.0, now_ms - 2 * MINUTE)
+        with mock.patch.object(market_data_service, "get_crypto_price", mock.AsyncMock(return_value=101.0)):
+            self.loop.run_until_complete(self.agent._collect_crypto_data(None, "ethereum", "ETH"))
+
+        self.assertIn("1m", self.sent())
+        self.assertEqual(self.agent.candle_builder.current("ETH/USD", "1m").close, 101.0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Tests du journal d'événements persistant
+Vérifie l'encodage, la rotation des segments, les requêtes par plage et la reprise après crash
+"""
+
+import sys
+import os
+import asyncio
+import shutil
+import tempfile
+import unittest
+from unittest.mock import AsyncMock
+from datetime import datetime, timedelta
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.event_log import EventLog, INDEX_SUFFIX, SEGMENT_SUFFIX
+from pipeline.utils.pipeline_manager import PipelineManager
+
+
+START = datetime(2024, 1, 1, 0, 0, 0)
+
+
+def fill(log, count, kind="pipeline_data"):
+    for i in range(count):
+        log.append(kind, {
+            "symbol": ("BTC/USD", "ETH/USD")[i % 2],
+            "price": 100.0 + i,
+            "timestamp": START + timedelta(minutes=i)
+        }, START + timedelta(minutes=i))
+
+
+class TestEventLog(unittest.TestCase):
+    """Tests de EventLog"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="event_log_")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def segment_files(self):
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(SEGMENT_SUFFIX))
+
+    def test_roundtrip(self):
+        """Les événements sont relus à l'identique, gros payloads compressés"""
+        print("🧪 Test aller-retour...")
+        log = EventLog(self.directory)
+        seq = log.append("trade_opened", {"trade_id": "t1", "timestamp": START}, START)
+        big = {"prices": list(range(2000))}
+        log.append("snapshot", big, START + timedelta(seconds=1))
+
+        events = list(log.read())
+        self.assertEqual(seq, 0)
+        self.assertEqual([e.kind for e in events], ["trade_opened", "snapshot"])
+        self.assertEqual(events[0].payload, {"trade_id": "t1", "timestamp": START.isoformat()})
+        self.assertEqual(events[0].timestamp, START)
+        self.assertEqual(events[1].payload, big)
+        self.assertLess(log.get_stats()["bytes"], len(str(big)) // 2)
+        log.close()
+        print("✅ Événements relus à l'identique")
+
+    def test_range_query_across_segments(self):
+        """Une plage horaire ne lit que les segments concernés"""
+        print("🧪 Test plage sur plusieurs segments...")
+        log = EventLog(self.directory, segment_bytes=2048)
+        fill(log, 500)
+        self.assertGreater(len(self.segment_files()), 5)
+
+        events = list(log.read(start=START + timedelta(minutes=100), end=START + timedelta(minutes=110)))
+        self.assertEqual([e.seq for e in events], list(range(100, 110)))
+        btc = list(log.read(start=START + timedelta(minutes=100), end=START + timedelta(minutes=110),
+                            where=lambda e: e.payload["symbol"] == "BTC/USD"))
+        self.assertEqual(len(btc), 5)
+        log.close()
+        print(f"✅ 10 événements lus parmi {len(self.segment_files())} segments")
+
+    def test_pagination_with_cursor(self):
+        """Les pages successives couvrent tout l'historique une seule fois"""
+        print("🧪 Test pagination...")
+        log = EventLog(self.directory, segment_bytes=4096)
+        fill(log, 250)
+
+        seen, before = [], None
+        while True:
+            page = log.latest(40, before_seq=before)
+            if not page:
+                break
+            seen = [e.seq for e in page] + seen
+            before = page[0].seq
+        self.assertEqual(seen, list(range(250)))
+        log.close()
+        print("✅ 250 événements en pages de 40")
+
+    def test_kinds_filter(self):
+        """Filtre par type d'événement"""
+        print("🧪 Test filtre par type...")
+        log = EventLog(self.directory)
+        fill(log, 10, kind="pipeline_data")
+        fill(log, 3, kind="trade_closed")
+        self.assertEqual(len(log.latest(100, kinds=("trade_closed",))), 3)
+        self.assertEqual(len(log.latest(5, kinds=("pipeline_data",))), 5)
+        log.close()
+        print("✅ Types filtrés")
+
+    def test_reopen_and_recover_torn_tail(self):
+        """Réouverture après crash: fin partielle tronquée, index reconstruit"""
+        print("🧪 Test reprise après crash...")
+        log = EventLog(self.directory, segment_bytes=2048)
+        fill(log, 100)
+        log.close()
+
+        last_segment = os.path.join(self.directory, self.segment_files()[-1])
+        with open(last_segment, "ab") as handle:
+            handle.write(b"\x30\x00\x00\x00partial")
+        os.remove(last_segment[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX)
+
+        reopened = EventLog(self.directory, segment_bytes=2048)
+        self.assertEqual(reopened.count(), 100)
+        self.assertEqual(reopened.append("pipeline_data", {"price": 1.0}, START + timedelta(days=1)), 100)
+        self.assertEqual(reopened.latest(1)[0].payload, {"price": 1.0})
+        self.assertEqual(len(list(reopened.read())), 101)
+        reopened.close()
+        print("✅ Journal repris à la séquence 100")
+
+    def test_retention_by_segment_count(self):
+        """Les segments les plus anciens sont supprimés à la rotation"""
+        print("🧪 Test rétention...")
+        log = EventLog(self.directory, segment_bytes=2048, max_segments=3)
+        fill(log, 400)
+
+        self.assertEqual(len(self.segment_files()), 3)
+        events = list(log.read())
+        self.assertEqual(events[-1].seq, 399)
+        self.assertEqual(events[0].seq, log.get_stats()["first_seq"])
+        log.close()
+        print(f"✅ {len(events)} événements conservés sur 3 segments")
+
+
+class TestPipelinePersistence(unittest.TestCase):
+    """Tests de la persistance des résultats du PipelineManager"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="event_log_")
+        # Les agents uAgent exigent une boucle courante à leur création
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.manager = PipelineManager(event_log=EventLog(self.directory))
+        self.manager.agents["news_collector"]._fetch_news_by_symbol = AsyncMock(return_value={})
+        self.manager.watchlist = ["BTC/USD", "ETH/USD"]
+
+        async def fake_collect(symbols):
+            return {symbol: {"symbol": symbol, "price": 100.0, "volume": 10.0} for symbol in symbols}
+
+        self.manager._collect_market_snapshot = fake_collect
+
+    def tearDown(self):
+        self.manager.event_log.close()
+        self.loop.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_results_survive_memory_history(self):
+        """Les résultats évincés de la mémoire restent lisibles sur disque"""
+        print("🧪 Test persistance des résultats...")
+        self.manager.max_pipeline_data = 2
+        for _ in range(3):
+            self.manager._store_pipeline_data(asyncio.run(self.manager.execute_once()))
+
+        self.assertEqual(len(self.manager.pipeline_data), 2)
+        page = self.manager.get_persisted_pipeline_data(limit=4)
+        self.assertEqual(len(page["data"]), 4)
+        self.assertIsNotNone(page["next_before"])
+        older = self.manager.get_persisted_pipeline_data(limit=4, before=page["next_before"])
+        self.assertEqual(len(older["data"]), 2)
+        self.assertIsNone(older["next_before"])
+        eth = self.manager.get_persisted_pipeline_data(limit=10, symbol="ETH/USD")
+        self.assertEqual({d["symbol"] for d in eth["data"]}, {"ETH/USD"})
+        print("✅ 6 résultats relus depuis le journal")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
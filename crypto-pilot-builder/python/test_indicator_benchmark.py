@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests de la comparaison de baselines du benchmark des indicateurs
+Vérifie la détection des régressions, le seuil de bruit et les cas devenus trop lents
+"""
+
+import sys
+import os
+import json
+import unittest
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks.indicator_benchmark import BENCHMARKS, compare_results
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "baselines", "indicators.json")
+
+
+def document(results):
+    return {"results": results}
+
+
+class TestCompareResults(unittest.TestCase):
+    """Tests de compare_results"""
+
+    def test_ratio_regression(self):
+        """Un cas plus lent que max_ratio est signalé, pas un cas stable"""
+        print("🧪 Test régression par ratio...")
+        baseline = document({"calculate_rsi": {"1000": {"seconds": 0.010}, "100": {"seconds": 0.001}}})
+        current = document({"calculate_rsi": {"1000": {"seconds": 0.030}, "100": {"seconds": 0.0011}}})
+        regressions = compare_results(current, baseline, max_ratio=1.5)
+        self.assertEqual([(r["method"], r["length"], r["skipped"]) for r in regressions],
+                         [("calculate_rsi", 1000, False)])
+        self.assertAlmostEqual(regressions[0]["ratio"], 3.0)
+        print("✅ Régression détectée")
+
+    def test_noise_floor(self):
+        """Un écart absolu sous le seuil de bruit n'est pas une régression"""
+        baseline = document({"incremental.tick": {"20": {"seconds": 1e-6}}})
+        current = document({"incremental.tick": {"20": {"seconds": 5e-6}}})
+        self.assertEqual(compare_results(current, baseline, max_ratio=1.5), [])
+
+    def test_measured_then_skipped_is_regression(self):
+        """Mesuré dans la baseline puis ignoré car trop lent: régression"""
+        print("🧪 Test cas devenu trop lent...")
+        baseline = document({"calculate_macd": {"100000": {"seconds": 2.0}}})
+        current = document({"calculate_macd": {"100000": {"skipped": True, "estimated_seconds": 80.0}}})
+        regressions = compare_results(current, baseline, max_ratio=1.5)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0]["skipped"])
+        self.assertEqual(regressions[0]["current_seconds"], 80.0)
+        print("✅ Cas ignoré signalé")
+
+    def test_skipped_in_both_or_unknown(self):
+        """Ignoré des deux côtés, ou absent de la baseline: rien à comparer"""
+        baseline = document({"calculate_macd": {"100000": {"skipped": True, "estimated_seconds": 90.0}}})
+        current = document({"calculate_macd": {"100000": {"skipped": True, "estimated_seconds": 80.0},
+                                               "10": {"seconds": 1.0}}})
+        self.assertEqual(compare_results(current, baseline, max_ratio=1.5), [])
+
+    def test_reference_baseline(self):
+        """La baseline de référence couvre toutes les méthodes mesurées"""
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+        self.assertEqual(set(baseline["results"]), set(BENCHMARKS))
+        self.assertEqual(compare_results(baseline, baseline, max_ratio=1.5), [])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
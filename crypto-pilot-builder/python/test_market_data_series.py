@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests de la série OHLCV colonnaire
+Vérifie les vues, le découpage, l'ajout et la compatibilité avec MarketData
+"""
+
+import sys
+import os
+import unittest
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.agents.models.market_data import MarketData, OHLCV, OHLCVSeries
+
+
+def make_candles(count: int, start_price: float = 50000.0):
+    """Génère des bougies OHLCV régulières"""
+    candles = []
+    for i in range(count):
+        price = start_price + i * 10
+        candles.append(OHLCV(
+            timestamp=1_700_000_000_000 + i * 60_000,
+            open=price,
+            high=price * 1.001,
+            low=price * 0.999,
+            close=price + 5,
+            volume=1000.0 + i
+        ))
+    return candles
+
+
+class TestOHLCVSeries(unittest.TestCase):
+    """Tests de OHLCVSeries"""
+
+    def test_roundtrip_with_candles(self):
+        """Les bougies reconstruites sont identiques aux originales"""
+        print("🧪 Test aller-retour bougies <-> série...")
+        candles = make_candles(50)
+        series = OHLCVSeries.from_candles(candles)
+
+        self.assertEqual(len(series), 50)
+        self.assertEqual(series.to_candles(), candles)
+        self.assertEqual(series.to_records(), [{name: getattr(c, name) for name in OHLCVSeries.COLUMNS} for c in candles])
+        self.assertEqual(series.close.dtype.name, "float64")
+        self.assertEqual(series.timestamp.dtype.name, "int64")
+        self.assertEqual(series.nbytes, 50 * 6 * 8)
+
+        from_records = OHLCVSeries.from_candles(series.to_records())
+        self.assertEqual(from_records.to_candles(), candles)
+        from_records.append(1, 1.0, 1.0, 1.0, 1.0, 1.0)
+        self.assertEqual(len(from_records), 51)
+        self.assertEqual(len(OHLCVSeries.from_candles([])), 0)
+        print("✅ Aller-retour conforme")
+
+    def test_column_views_are_zero_copy(self):
+        """Les colonnes et les tranches partagent la mémoire de la série"""
+        print("🧪 Test des vues sans copie...")
+        series = OHLCVSeries.from_candles(make_candles(20))
+        tail = series.tail(5)
+
+        self.assertTrue(series.close.base is not None)
+        self.assertEqual(tail.close.tolist(), series.close[-5:].tolist())
+        with self.assertRaises(ValueError):
+            series.close[0] = 1.0
+        print("✅ Vues en lecture seule sans copie")
+
+    def test_append_does_not_alias_slices(self):
+        """Ajouter à une tranche ne modifie jamais la série d'origine"""
+        print("🧪 Test append et isolation des tranches...")
+        series = OHLCVSeries.from_candles(make_candles(10))
+        head = series[:5]
+        head.append(1, 1.0, 1.0, 1.0, 1.0, 1.0)
+
+        self.assertEqual(len(head), 6)
+        self.assertEqual(len(series), 10)
+        self.assertEqual(series[5], make_candles(10)[5])
+
+        for i in range(1000):
+            series.append(i, 1.0, 2.0, 0.5, 1.5, 10.0)
+        self.assertEqual(len(series), 1010)
+        self.assertGreaterEqual(series.capacity, 1010)
+        self.assertEqual(series[-1].close, 1.5)
+        print("✅ Tranches isolées, append amorti")
+
+    def test_extend_and_validation(self):
+        """extend accepte une série ou des bougies, colonnes de même longueur"""
+        print("🧪 Test extend et validation...")
+        series = OHLCVSeries()
+        series.extend(OHLCVSeries.from_candles(make_candles(3)))
+        series.extend(make_candles(2))
+        self.assertEqual(len(series), 5)
+
+        with self.assertRaises(ValueError):
+            OHLCVSeries(timestamp=[1, 2], open=[1.0], high=[1.0], low=[1.0], close=[1.0], volume=[1.0])
+        with self.assertRaises(IndexError):
+            series[5]
+        print("✅ extend et validation conformes")
+
+    def test_market_data_compatibility(self):
+        """MarketData garde le même format de message"""
+        print("🧪 Test compatibilité MarketData...")
+        series = OHLCVSeries.from_candles(make_candles(30))
+        message = MarketData.from_series("BTC/USD", "1m", series)
+
+        self.assertEqual(len(message.ohlcv), 30)
+        self.assertIsInstance(message.ohlcv[0], OHLCV)
+        self.assertEqual(message.to_series().close.tolist(), series.close.tolist())
+        print("✅ Format de message inchangé")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
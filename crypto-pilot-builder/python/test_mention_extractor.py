@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests de l'extracteur de mentions crypto
+Vérifie les frontières de mots, les alias, la casse des tickers et le débit
+"""
+
+import sys
+import os
+import json
+import tempfile
+import time
+import unittest
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.mention_extractor import MentionExtractor, mention_extractor
+from services.news_service import NewsService
+
+
+class TestMentionExtractor(unittest.TestCase):
+    """Tests de MentionExtractor"""
+
+    def test_word_boundaries(self):
+        """Pas de ticker à l'intérieur d'un mot"""
+        print("🧪 Test frontières de mots...")
+        self.assertEqual(mention_extractor.extract("TOGETHER WE STAND IN THE UNITED STATES"), [])
+        self.assertEqual(mention_extractor.extract("ETH/USD and BTC-USD pairs, (SOL)."), ["ETH", "BTC", "SOL"])
+        print("✅ Frontières respectées")
+
+    def test_aliases_and_case(self):
+        """Noms insensibles à la casse, tickers en majuscules ou cashtag seulement"""
+        print("🧪 Test alias et casse...")
+        text = "Ethereum rallies while bitcoin stalls; $link jumps near the highs, see the link"
+        self.assertEqual(mention_extractor.extract(text), ["ETH", "BTC", "LINK"])
+        self.assertEqual(mention_extractor.extract("We are near a dot"), [])
+        self.assertEqual(mention_extractor.extract("BITCOIN HITS NEW HIGH"), ["BTC"])
+        print("✅ Alias reconnus")
+
+    def test_longest_alias_wins(self):
+        """Un alias de plusieurs mots l'emporte sur son préfixe"""
+        self.assertEqual(mention_extractor.extract("Bitcoin Cash forks again"), ["BCH"])
+        self.assertEqual(mention_extractor.extract("Bitcoin and Bitcoin Cash"), ["BTC", "BCH"])
+        self.assertEqual(mention_extractor.extract("Shiba Inu and Dogecoin"), ["SHIB", "DOGE"])
+        self.assertEqual(mention_extractor.count("BTC, Bitcoin, XBT and ETH"), {"BTC": 3, "ETH": 1})
+
+    def test_custom_dictionary(self):
+        """Un dictionnaire JSON complète les symboles par défaut"""
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"PEPE": ["Pepe Coin"]}, f)
+        try:
+            extractor = MentionExtractor.from_file(f.name)
+        finally:
+            os.unlink(f.name)
+        self.assertIn("BTC", extractor.symbols)
+        self.assertEqual(extractor.extract("pepe coin and $PEPE outpace BTC"), ["PEPE", "BTC"])
+
+    def test_news_service_uses_extractor(self):
+        """NewsService extrait depuis le texte d'origine"""
+        service = NewsService()
+        news = service._parse_cryptocompare_news({"Data": [{
+            "id": 1, "title": "Together with United partners, Solana expands",
+            "body": "The network is near record usage.", "categories": "GENERAL", "published_on": 1700000000
+        }]})
+        self.assertEqual(news[0].crypto_mentions, ["SOL"])
+
+    def test_throughput(self):
+        """Des milliers d'articles par seconde"""
+        print("🧪 Test de débit...")
+        article = ("Ethereum developers met together in the United States to discuss the roadmap. " * 8
+                   + "Meanwhile BTC and $SOL traded near their highs while Chainlink oracles expanded. " * 4)
+        articles = [article] * 3000
+        start = time.perf_counter()
+        results = mention_extractor.extract_many(articles)
+        rate = len(articles) / (time.perf_counter() - start)
+        self.assertEqual(results[0], ["ETH", "BTC", "SOL", "LINK"])
+        self.assertGreater(rate, 2000)
+        print(f"✅ {rate:,.0f} articles/s ({len(article)} caractères)")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests de l'exécution multi-symboles du pipeline
+Vérifie la collecte groupée, le plafond de concurrence et l'isolation des échecs
+"""
+
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+from datetime import datetime
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.agents.models.news_data import NewsItem
+from pipeline.utils.pipeline_manager import COINGECKO_IDS, PipelineManager
+
+
+class TestMultiSymbolPipeline(unittest.TestCase):
+    """Tests du cycle multi-symboles du PipelineManager"""
+
+    def setUp(self):
+        # Les agents uAgent exigent une boucle courante à leur création
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.manager = PipelineManager()
+        self.manager.agents["news_collector"]._fetch_news_by_symbol = AsyncMock(return_value={})
+        self.collect_calls = []
+
+        async def fake_collect(symbols):
+            self.collect_calls.append(list(symbols))
+            return {symbol: {"symbol": symbol, "price": 100.0 + i, "volume": 10.0}
+                    for i, symbol in enumerate(symbols)}
+
+        self.manager._collect_market_snapshot = fake_collect
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_one_fetch_for_whole_watchlist(self):
+        """Un seul appel de collecte alimente tous les symboles"""
+        print("🧪 Test collecte groupée...")
+        data = self.loop.run_until_complete(self.manager.execute_once())
+
+        self.assertEqual(self.collect_calls, [self.manager.watchlist])
+        self.assertEqual(sorted(d.symbol for d in data), sorted(self.manager.watchlist))
+        params = self.manager._ticker_params(self.manager.watchlist)
+        self.assertEqual(params["ids"].split(","), [COINGECKO_IDS[s] for s in self.manager.watchlist])
+        print(f"✅ {len(data)} symboles traités avec 1 appel")
+
+    def test_concurrency_cap(self):
+        """Au plus max_concurrent_symbols séquences tournent en même temps"""
+        print("🧪 Test plafond de concurrence...")
+        self.manager.max_concurrent_symbols = 2
+        state = {"running": 0, "peak": 0}
+
+        async def slow_predictor(market_data):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.02)
+            state["running"] -= 1
+            return None
+
+        self.manager._execute_predictor = slow_predictor
+        data = self.loop.run_until_complete(self.manager.execute_once())
+
+        self.assertEqual(state["peak"], 2)
+        self.assertEqual(len(data), len(self.manager.watchlist))
+        print("✅ Jamais plus de 2 symboles en parallèle")
+
+    def test_failure_is_isolated(self):
+        """L'échec d'un symbole n'empêche pas les autres d'aboutir"""
+        print("🧪 Test isolation des échecs...")
+        original = self.manager._execute_predictor
+
+        async def flaky_predictor(market_data):
+            if market_data["symbol"] == "ETH/USD":
+                raise RuntimeError("boom")
+            return await original(market_data)
+
+        self.manager._execute_predictor = flaky_predictor
+        data = self.loop.run_until_complete(self.manager.execute_once())
+
+        symbols = {d.symbol for d in data}
+        self.assertNotIn("ETH/USD", symbols)
+        self.assertEqual(symbols, set(self.manager.watchlist) - {"ETH/USD"})
+        print("✅ ETH/USD en échec, les autres symboles traités")
+
+    def test_news_collected_in_parallel_and_fused(self):
+        """Les news sont collectées en parallèle du marché puis fusionnées par symbole"""
+        print("🧪 Test collecte news parallèle...")
+        collect_market = self.manager._collect_market_snapshot
+
+        async def slow_market(symbols):
+            await asyncio.sleep(0.2)
+            return await collect_market(symbols)
+
+        async def slow_news(session=None):
+            await asyncio.sleep(0.2)
+            return {"BTC": [NewsItem(id="1", title="Bitcoin ETF", content="...", source="test",
+                                     published_at=datetime.utcnow(), url="http://test", sentiment_score=0.8,
+                                     relevance_score=1.0, crypto_mentions=["BTC"], impact_level="high")]}
+
+        self.manager._collect_market_snapshot = slow_market
+        self.manager.agents["news_collector"]._fetch_news_by_symbol = slow_news
+        data = {d.symbol: d for d in self.loop.run_until_complete(self.manager.execute_once())}
+
+        run = self.manager.last_stage_run
+        self.assertLess(run.timings["news"][0], run.timings["market"][1])
+        self.assertAlmostEqual(data["BTC/USD"].metadata["news_sentiment"], 0.8)
+        self.assertEqual(data["BTC/USD"].metadata["news_count"], 1)
+        self.assertIsNone(data["ETH/USD"].metadata["news_sentiment"])
+        print(f"✅ Cycle en {run.total_seconds * 1000:.0f}ms pour 2 × 200ms de collecte")
+
+    def test_parse_skips_missing_symbols(self):
+        """Un symbole absent de la réponse CoinGecko est ignoré"""
+        print("🧪 Test parsing réponse partielle...")
+        snapshot = self.manager._parse_coingecko_ticker(
+            {"bitcoin": {"usd": 60000, "usd_24h_vol": 1e9, "usd_24h_change": 1.5}},
+            ["BTC/USD", "ETH/USD"]
+        )
+        self.assertEqual(list(snapshot.keys()), ["BTC/USD"])
+        self.assertEqual(snapshot["BTC/USD"]["price"], 60000.0)
+        print("✅ Réponse partielle gérée")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
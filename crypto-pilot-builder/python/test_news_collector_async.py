@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests de la collecte asynchrone des news du NewsCollectorAgent
+Vérifie que la boucle reste disponible, les timeouts, l'annulation et le repli sur le magasin
+"""
+
+import sys
+import os
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+import aiohttp
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.agents.trading.news_collector import NewsCollectorAgent
+from pipeline.utils.record_replay import RecordedResponse
+from services.news_service import NewsService
+
+
+def articles():
+    now = int(time.time())
+    return [{"id": 1, "title": "Bitcoin rally", "body": "", "published_on": now - 120},
+            {"id": 2, "title": "Ethereum and Bitcoin upgrade", "body": "", "published_on": now - 60}]
+
+
+class TestNewsCollectorAsync(unittest.TestCase):
+    """Tests du client de news asynchrone de l'agent"""
+
+    def setUp(self):
+        # Les agents uAgent exigent une boucle courante à leur création
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.agent = NewsCollectorAgent()
+        self.service = NewsService()
+        self.service_patch = patch("pipeline.agents.trading.news_collector.news_service", self.service)
+        self.service_patch.start()
+        self.requests = []
+
+    def tearDown(self):
+        self.service_patch.stop()
+        self.loop.run_until_complete(self.agent.cleanup())
+        self.loop.close()
+
+    def fake_request(self, delay=0.0, error=None):
+        async def request(session, method, url, **kwargs):
+            self.requests.append((session, kwargs.get("headers")))
+            await asyncio.sleep(delay)
+            if error is not None:
+                raise error
+            return RecordedResponse(200, {"Data": articles()}, {"ETag": '"v1"'}, url)
+        return patch("services.news_service.rate_limited_request", side_effect=request)
+
+    def test_loop_stays_responsive(self):
+        """La boucle de l'agent continue de tourner pendant l'appel HTTP"""
+        print("🧪 Test boucle non bloquée...")
+        ticks = []
+
+        async def heartbeat():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async def scenario():
+            beat = asyncio.create_task(heartbeat())
+            try:
+                return await self.agent._fetch_news_by_symbol()
+            finally:
+                beat.cancel()
+
+        with self.fake_request(delay=0.2):
+            grouped = self.loop.run_until_complete(scenario())
+
+        self.assertEqual({s: [n.id for n in items] for s, items in grouped.items()},
+                         {"BTC": ["2", "1"], "ETH": ["2"]})
+        self.assertGreaterEqual(len(ticks), 10)
+        self.assertIs(self.requests[0][0], self.agent.http_session)  # Session poolée de l'agent
+        self.assertEqual(self.service.etag, '"v1"')
+        print(f"✅ {len(ticks)} battements pendant la collecte")
+
+    def test_session_reused_and_caller_session(self):
+        """Session de l'agent réutilisée; celle de l'appelant prioritaire"""
+        async def scenario():
+            async with aiohttp.ClientSession() as caller:
+                await self.agent._fetch_news_by_symbol(session=caller)
+                self.service.last_fetch = None
+                await self.agent._fetch_news_by_symbol()
+                self.service.last_fetch = None
+                await self.agent._fetch_news_by_symbol()
+                return caller
+
+        with self.fake_request():
+            caller = self.loop.run_until_complete(scenario())
+        self.assertIs(self.requests[0][0], caller)
+        self.assertIs(self.requests[1][0], self.requests[2][0])
+        self.assertEqual(self.requests[2][1], {"If-None-Match": '"v1"'})
+
+    def test_timeout_serves_store(self):
+        """Un timeout compte comme un échec et les news en magasin restent servies"""
+        print("🧪 Test timeout...")
+        with self.fake_request():
+            self.loop.run_until_complete(self.agent._fetch_news_by_symbol())
+        self.service.last_fetch = None
+        self.agent.fetch_timeout = 0.05
+
+        start = time.perf_counter()
+        with self.fake_request(delay=1.0):
+            grouped = self.loop.run_until_complete(self.agent._fetch_news_by_symbol())
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(sorted(grouped), ["BTC", "ETH"])
+        self.assertEqual(self.agent.circuit_breaker.fail_count, 1)
+        print("✅ Timeout respecté")
+
+    def test_errors_open_the_circuit(self):
+        """Les erreurs HTTP passent par le circuit breaker asynchrone"""
+        with self.fake_request(error=aiohttp.ClientConnectionError("down")):
+            for _ in range(self.agent.circuit_breaker.fail_max + 1):
+                self.assertEqual(self.loop.run_until_complete(self.agent._fetch_news_by_symbol()), {})
+        self.assertEqual(self.agent.circuit_breaker.get_state(), "OPEN")
+        self.assertEqual(len(self.requests), self.agent.circuit_breaker.fail_max)
+
+    def test_cancellation(self):
+        """L'annulation interrompt l'appel sans être comptée comme un échec"""
+        async def scenario():
+            task = asyncio.create_task(self.agent._fetch_news_by_symbol())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await task
+
+        with self.fake_request(delay=1.0):
+            with self.assertRaises(asyncio.CancelledError):
+                self.loop.run_until_complete(scenario())
+        self.assertEqual(self.agent.circuit_breaker.fail_count, 0)
+        self.assertEqual(len(self.service.store), 0)
+
+        # Un essai HALF_OPEN annulé ne bloque pas les suivants
+        self.agent.circuit_breaker.state = "HALF_OPEN"
+        with self.fake_request(delay=1.0):
+            with self.assertRaises(asyncio.CancelledError):
+                self.loop.run_until_complete(scenario())
+        with self.fake_request():
+            self.assertEqual(sorted(self.loop.run_until_complete(self.agent._fetch_news_by_symbol())), ["BTC", "ETH"])
+        self.assertEqual(self.agent.circuit_breaker.get_state(), "CLOSED")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
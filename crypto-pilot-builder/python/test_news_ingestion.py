@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests de l'ingestion incrémentale des news
+Vérifie les requêtes conditionnelles, le dédoublonnage et l'analyse des seuls articles nouveaux
+"""
+
+import sys
+import os
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.news_service import NewsService
+
+
+def article(news_id, title, minutes_ago, body=""):
+    return {"id": news_id, "title": title, "body": body, "published_on": int(time.time()) - minutes_ago * 60,
+            "source_info": {"name": "CoinDesk"}}
+
+
+def response(articles=None, status=200, headers=None):
+    mock = MagicMock(status_code=status, headers=headers or {})
+    mock.json.return_value = {"Data": articles or []}
+    return mock
+
+
+class TestNewsIngestion(unittest.TestCase):
+    """Tests de l'ingestion incrémentale de NewsService"""
+
+    def setUp(self):
+        self.service = NewsService()
+        self.calls = []
+
+    def fetch(self, resp):
+        def fake_get(url, **kwargs):
+            self.calls.append(kwargs.get("headers") or {})
+            return resp
+        with patch("services.news_service.rate_limited_get", side_effect=fake_get):
+            return self.service.fetch_crypto_news()
+
+    def test_conditional_request(self):
+        """Validateurs renvoyés au fournisseur; une 304 ne touche pas au magasin"""
+        print("🧪 Test requête conditionnelle...")
+        first = self.fetch(response([article(1, "Bitcoin rally", 5)],
+                                    headers={"ETag": '"v1"', "Last-Modified": "Fri, 16 Oct 2026 10:00:00 GMT"}))
+        self.assertEqual(len(first), 1)
+        self.assertEqual(self.calls[0], {})
+
+        self.assertEqual(self.fetch(response(status=304)), [])
+        self.assertEqual(self.calls[1], {"If-None-Match": '"v1"', "If-Modified-Since": "Fri, 16 Oct 2026 10:00:00 GMT"})
+        self.assertEqual(len(self.service.store), 1)
+        self.assertIsNotNone(self.service.last_fetch)
+        self.assertEqual(self.service.ingest_stats["not_modified"], 1)
+        print("✅ 304 prise en compte")
+
+    def test_only_new_articles_are_analyzed(self):
+        """Les articles déjà vus ne sont ni parsés ni analysés à nouveau"""
+        print("🧪 Test analyse des seuls nouveaux articles...")
+        batch = [article(2, "Ethereum upgrade", 10), article(1, "Bitcoin rally", 20)]
+        self.fetch(response(batch))
+        eth = self.service.store.get("2")
+
+        with patch.object(self.service, "_extract_crypto_mentions", wraps=self.service._extract_crypto_mentions) as extract, \
+                patch.object(self.service, "analyze_sentiment_batch",
+                             wraps=self.service.analyze_sentiment_batch) as analyze:
+            new = self.fetch(response([article(3, "Solana launch", 1)] + batch))
+
+        self.assertEqual([n.id for n in new], ["3"])
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(len(analyze.call_args[0][0]), 1)
+        self.assertIs(self.service.store.get("2"), eth)
+        self.assertEqual(self.service.ingest_stats["known"], 2)
+        print("✅ Un seul article analysé")
+
+    def test_duplicates_and_stale_items(self):
+        """Copie syndiquée (même contenu, autre id) et article antérieur au dernier vu ignorés"""
+        self.fetch(response([article(1, "Bitcoin ETF approved", 5, body="The SEC  approved the ETF.")]))
+        new = self.fetch(response([article(9, "bitcoin ETF approved", 4, body="The SEC approved the ETF."),
+                                   article(7, "Old Cardano story", 3 * 60)]))
+        self.assertEqual(new, [])
+        self.assertEqual(self.service.ingest_stats["duplicates"], 1)
+        self.assertEqual(self.service.ingest_stats["stale"], 1)
+
+        late = self.fetch(response([article(8, "Polkadot parachain", 30)]))  # Retard d'indexation toléré
+        self.assertEqual([n.id for n in late], ["8"])
+
+    def test_relevance_base_is_cached(self):
+        """La part fixe de pertinence est calculée à l'ingestion; seule la fraîcheur varie"""
+        self.fetch(response([article(1, "Bitcoin rally", 5, body="x" * 300)]))
+        news = self.service.store.get("1")
+        self.assertAlmostEqual(news._base_relevance, 0.6)
+        with patch.object(self.service, "_base_relevance") as base:
+            self.assertEqual(self.service.calculate_relevance(news), 1.0)
+            base.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
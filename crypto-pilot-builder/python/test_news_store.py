@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests du magasin de news indexé
+Vérifie la fusion incrémentale, les index par date et par symbole et l'éviction
+"""
+
+import sys
+import os
+import time
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.news_store import NewsStore
+from services.news_service import NewsItem, NewsService
+
+
+def make_news(news_id, minutes_ago, mentions, title="Crypto news", now=None):
+    now = now or datetime.now()
+    return NewsItem(id=str(news_id), title=title, content="", source="test",
+                    published_at=now - timedelta(minutes=minutes_ago), url="", crypto_mentions=list(mentions))
+
+
+class TestNewsStore(unittest.TestCase):
+    """Tests de NewsStore"""
+
+    def test_incremental_merge(self):
+        """Seuls les articles nouveaux ou modifiés sont retournés"""
+        print("🧪 Test fusion incrémentale...")
+        store = NewsStore()
+        first = [make_news(1, 10, ["BTC"]), make_news(2, 20, ["ETH"])]
+        self.assertEqual([n.id for n in store.upsert(first)], ["1", "2"])
+
+        again = [make_news(1, 10, ["BTC"]), make_news(2, 20, ["ETH"], title="Ethereum update"),
+                 make_news(3, 5, ["ETH", "BTC"])]
+        again[0].published_at = first[0].published_at
+        again[1].published_at = first[1].published_at
+        self.assertEqual([n.id for n in store.upsert(again)], ["2", "3"])
+        self.assertEqual(len(store), 3)
+        self.assertIs(store.get("1"), first[0])  # Article inchangé conservé (avec son analyse)
+        self.assertEqual(store.get("2").title, "Ethereum update")
+        self.assertEqual(store.get_stats()["unchanged"], 1)
+        print("✅ Fusion incrémentale OK")
+
+    def test_symbol_and_time_queries(self):
+        """Fenêtre temporelle, symbole et limite; du plus récent au plus ancien"""
+        store = NewsStore()
+        now = datetime.now()
+        store.upsert([make_news(1, 90, ["ETH"], now=now), make_news(2, 30, ["ETH", "BTC"], now=now),
+                      make_news(3, 10, ["BTC"], now=now), make_news(4, 5, ["eth"], now=now)])
+
+        self.assertEqual([n.id for n in store.recent(hours=1)], ["4", "3", "2"])
+        self.assertEqual([n.id for n in store.recent(hours=1, symbol="ETH")], ["4", "2"])
+        self.assertEqual([n.id for n in store.recent(symbol="ETH/USD")], ["4", "2", "1"])
+        self.assertEqual([n.id for n in store.recent(symbol="ETH", limit=1)], ["4"])
+        self.assertEqual(store.recent(hours=1, symbol="SOL"), [])
+        self.assertEqual([n.id for n in store.recent(since=now - timedelta(minutes=20))], ["4", "3"])
+
+        grouped = store.recent_by_symbol(hours=1)
+        self.assertEqual({s: [n.id for n in items] for s, items in grouped.items()},
+                         {"ETH": ["4", "2"], "BTC": ["3", "2"]})
+        self.assertEqual(list(store.recent_by_symbol(hours=1, symbols=["BTC", "SOL"])), ["BTC"])
+
+    def test_update_moves_article(self):
+        """Un article modifié change d'index (date et symboles)"""
+        store = NewsStore()
+        store.upsert([make_news(1, 90, ["ETH"])])
+        store.upsert([make_news(1, 5, ["SOL"])])
+        self.assertEqual(store.recent(symbol="ETH"), [])
+        self.assertEqual([n.id for n in store.recent(hours=1, symbol="SOL")], ["1"])
+        self.assertEqual(store.symbols(), {"SOL": 1})
+
+    def test_eviction(self):
+        """Rétention par âge puis capacité maximale"""
+        print("🧪 Test éviction...")
+        store = NewsStore(retention=timedelta(hours=2), max_items=3)
+        changed = store.upsert([make_news(1, 300, ["BTC"]), make_news(2, 60, ["BTC"]),
+                                make_news(3, 50, ["ETH"]), make_news(4, 40, ["ETH"]), make_news(5, 30, ["BTC"])])
+        self.assertEqual([n.id for n in changed], ["3", "4", "5"])
+        self.assertEqual([n.id for n in store.recent()], ["5", "4", "3"])
+        self.assertEqual(store.symbols(), {"ETH": 2, "BTC": 1})
+        self.assertEqual(store.get_stats()["evicted"], 2)
+        self.assertTrue(store.remove("5"))
+        self.assertEqual(store.symbols(), {"ETH": 2})
+        print("✅ Éviction OK")
+
+    def test_query_speed(self):
+        """Requête par symbole sur une fenêtre courte d'un grand magasin"""
+        print("🧪 Test de débit...")
+        store = NewsStore(retention=None, max_items=None)
+        now = datetime.now()
+        symbols = ["BTC", "ETH", "SOL", "ADA", "DOT"]
+        store.upsert([make_news(i, 20000 - i, [symbols[i % 5]], now=now) for i in range(20000)])
+        start = time.perf_counter()
+        for _ in range(1000):
+            recent = store.recent(hours=1, symbol="ETH")
+        elapsed = time.perf_counter() - start
+        self.assertEqual(len(recent), 12)
+        self.assertLess(elapsed, 0.2)
+        print(f"✅ 1000 requêtes en {elapsed * 1000:.1f} ms")
+
+
+class TestNewsServiceStore(unittest.TestCase):
+    """Intégration du magasin dans NewsService"""
+
+    def _response(self, articles):
+        response = MagicMock(status_code=200, headers={})
+        response.json.return_value = {"Data": articles}
+        return response
+
+    def test_fetches_are_merged(self):
+        service = NewsService()
+        now = time.time()
+        first = [{"id": 1, "title": "Bitcoin rally", "body": "", "published_on": now - 600},
+                 {"id": 2, "title": "Ethereum hack", "body": "", "published_on": now - 300}]
+        second = [{"id": 3, "title": "Solana launch", "body": "", "published_on": now - 60}] + first
+
+        with patch("services.news_service.rate_limited_get", return_value=self._response(first)):
+            service.fetch_crypto_news()
+        btc = service.store.get("1")
+        with patch("services.news_service.rate_limited_get", return_value=self._response(second)):
+            service.fetch_crypto_news()
+
+        self.assertEqual(len(service.store), 3)
+        self.assertIs(service.store.get("1"), btc)
+        self.assertGreater(btc.sentiment_score, 0)
+        self.assertEqual([n.id for n in service.get_recent_news(hours=1, symbol="ETH")], ["2"])
+        self.assertEqual(sorted(service.get_recent_news_by_symbol(hours=1)), ["BTC", "ETH", "SOL"])
+        self.assertLess(service.store.get("2").sentiment_score, 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
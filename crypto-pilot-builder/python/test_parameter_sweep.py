@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests du balayage parallèle des paramètres de stratégie
+Vérifie la génération des grilles, le classement et l'identité des résultats en mémoire partagée
+"""
+
+import sys
+import os
+import unittest
+
+import numpy as np
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.agents.models.market_data import OHLCVSeries
+from pipeline.utils.backtester import Backtester, BacktestConfig
+from pipeline.utils.parameter_sweep import (
+    ParameterSweep, SweepResult, parameter_grid, random_parameters, rank_results
+)
+
+
+def random_walk(seed, bars=3000):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.008, bars)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    return OHLCVSeries(
+        timestamp=np.arange(bars, dtype=np.int64) * 3_600_000,
+        open=open_,
+        high=np.maximum(open_, close) * 1.002,
+        low=np.minimum(open_, close) * 0.998,
+        close=close,
+        volume=np.ones(bars),
+    )
+
+
+class TestParameterSweep(unittest.TestCase):
+    """Tests de ParameterSweep"""
+
+    def setUp(self):
+        self.universe = {"BTC": random_walk(1), "ETH": random_walk(2)}
+
+    def test_grid_and_random_samples(self):
+        """Grille cartésienne sans seuils incohérents, tirages reproductibles"""
+        print("🧪 Test génération des paramètres...")
+        grid = parameter_grid({"buy_threshold": [0.6, 0.7], "sell_threshold": [0.3, 0.65], "stop_loss": [0.01, 0.02]})
+        self.assertEqual(len(grid), 6)  # (0.6, 0.65) écarté
+        self.assertTrue(all(p["sell_threshold"] < p["buy_threshold"] for p in grid))
+
+        space = {"stop_loss": (0.005, 0.05), "max_open_trades": (1, 5), "min_confidence": [0.6, 0.7]}
+        first = random_parameters(space, 20, seed=4)
+        self.assertEqual(first, random_parameters(space, 20, seed=4))
+        self.assertTrue(all(isinstance(p["max_open_trades"], int) for p in first))
+        self.assertTrue(all(0.005 <= p["stop_loss"] <= 0.05 for p in first))
+        print(f"✅ {len(grid)} combinaisons, {len(first)} tirages")
+
+    def test_ranking(self):
+        """Sharpe décroissant, drawdown en départage, plafond de drawdown"""
+        results = [
+            SweepResult({"a": 1}, {"sharpe": 1.0, "max_drawdown": 0.2}),
+            SweepResult({"a": 2}, {"sharpe": 2.0, "max_drawdown": 0.3}),
+            SweepResult({"a": 3}, {"sharpe": 1.0, "max_drawdown": 0.1}),
+            SweepResult({"a": 4}, {"sharpe": None, "max_drawdown": 0.0}),
+        ]
+        ranked = rank_results(results, max_drawdown=0.25)
+        self.assertEqual([r.params["a"] for r in ranked], [3, 1, 4])
+        self.assertEqual([r.rank for r in ranked], [1, 2, 3])
+
+    def test_parallel_matches_sequential(self):
+        """Les résultats des processus (mémoire partagée) sont identiques au backtest direct"""
+        print("🧪 Test balayage parallèle...")
+        grid = parameter_grid({"stop_loss": [0.01, 0.03], "take_profit": [0.02, 0.06], "max_open_trades": [1, 3]})
+        sweep = ParameterSweep(self.universe, BacktestConfig(fee_rate=0.0005), workers=2)
+        ranked = sweep.run(grid)
+        self.assertEqual(len(ranked), len(grid))
+        self.assertEqual(ranked[0].rank, 1)
+
+        sequential = ParameterSweep(self.universe, BacktestConfig(fee_rate=0.0005), workers=1).run(grid)
+        by_params = {tuple(sorted(r.params.items())): r.stats["final_equity"] for r in sequential}
+        for result in ranked:
+            self.assertEqual(result.stats["final_equity"], by_params[tuple(sorted(result.params.items()))])
+
+        best = ranked[0].params
+        direct = Backtester(BacktestConfig(fee_rate=0.0005, **best)).run(self.universe)
+        self.assertEqual(direct.stats["final_equity"], ranked[0].stats["final_equity"])
+        print(f"✅ Meilleure configuration: {best} (Sharpe {ranked[0].stats['sharpe']})")
+
+    def test_unknown_parameter(self):
+        """Un paramètre absent de BacktestConfig est refusé"""
+        with self.assertRaises(ValueError):
+            ParameterSweep(self.universe, workers=1).run([{"leverage": 3}])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Tests des statistiques de performance en flux
+Vérifie les accumulateurs contre un recalcul complet et l'intégration au LoggerAgent
+"""
+
+import sys
+import os
+import asyncio
+import time
+import unittest
+
+import numpy as np
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.agents.models.prediction import Prediction
+from pipeline.agents.models.signal import Signal, SignalType
+from pipeline.agents.models.trade import TradeRequest, TradeStatus, TradeType
+from pipeline.agents.trading.logger import LoggerAgent
+from pipeline.agents.trading.trader import TraderAgent
+from pipeline.utils.performance_stats import PerformanceStats
+
+
+class TestPerformanceStats(unittest.TestCase):
+    """Tests de PerformanceStats"""
+
+    def test_matches_full_recomputation(self):
+        """Les accumulateurs égalent un recalcul complet sur la liste des P&L"""
+        print("🧪 Test accumulateurs...")
+        pnls = np.random.default_rng(1).normal(5, 50, 5000)
+        stats = PerformanceStats()
+        for pnl in pnls:
+            stats.add(pnl)
+
+        cumulative = np.cumsum(pnls)
+        drawdowns = np.maximum.accumulate(np.maximum(cumulative, 0)) - cumulative
+        self.assertAlmostEqual(stats.total_pnl, pnls.sum(), places=6)
+        self.assertAlmostEqual(stats.current_drawdown, drawdowns[-1], places=6)
+        self.assertAlmostEqual(stats.max_drawdown, drawdowns.max(), places=6)
+        self.assertAlmostEqual(stats.win_rate, (pnls > 0).mean())
+        self.assertAlmostEqual(stats.sharpe, pnls.mean() / pnls.std(ddof=1), places=9)
+        downside = np.sqrt((np.minimum(pnls, 0) ** 2).mean())
+        self.assertAlmostEqual(stats.sortino, pnls.mean() / downside, places=9)
+        self.assertAlmostEqual(stats.expectancy, pnls.mean(), places=6)
+        self.assertEqual((stats.best_trade, stats.worst_trade), (pnls.max(), pnls.min()))
+        print(f"✅ Sharpe {stats.sharpe:.4f}, drawdown max {stats.max_drawdown:.2f}")
+
+    def test_empty_and_single_trade(self):
+        """Pas de division par zéro sur peu de trades"""
+        stats = PerformanceStats()
+        self.assertIsNone(stats.sharpe)
+        self.assertEqual(stats.expectancy, 0.0)
+        stats.add(-10)
+        self.assertEqual((stats.worst_trade, stats.best_trade, stats.max_drawdown), (-10, -10, 10))
+        self.assertEqual(stats.profit_factor, 0.0)
+        winner = PerformanceStats()
+        winner.add(10)
+        self.assertIsNone(winner.profit_factor)
+
+
+class TestLoggerAgentPerformance(unittest.TestCase):
+    """Intégration au LoggerAgent"""
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.agent = LoggerAgent()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _trade(self, index, pnl, symbol="BTC/USD"):
+        trade = TradeRequest(trade_id=f"t{index}", symbol=symbol, trade_type=TradeType.MARKET,
+                             side=SignalType.BUY, quantity=0.1, price=100.0,
+                             status=TradeStatus.FILLED, realized_pnl=pnl)
+        self.loop.run_until_complete(self.agent.handle_trade_result(None, "test", trade))
+
+    def test_report_reflects_trades(self):
+        """Le rapport est alimenté par les trades clôturés uniquement"""
+        print("🧪 Test rapport LoggerAgent...")
+        for index, (pnl, symbol) in enumerate([(100, "BTC/USD"), (-50, "ETH/USD"), (None, "BTC/USD"), (30, "BTC/USD")]):
+            self._trade(index, pnl, symbol)
+        report = self.agent.get_performance_report()
+        self.assertEqual(report["summary"]["total_trades"], 3)
+        self.assertEqual(report["summary"]["total_pnl"], 80)
+        self.assertEqual(report["summary"]["max_drawdown"], 50)
+        self.assertEqual(report["symbol_performance"]["BTC/USD"]["trades"], 2)
+        self.assertEqual(report["symbol_performance"]["ETH/USD"]["win_rate"], 0.0)
+        self.assertEqual(len(self.agent.trade_logs), 4)
+        print("✅ Rapport cohérent")
+
+    def test_no_alerts_before_first_closed_trade(self):
+        """Les fills seuls ne déclenchent ni alerte de win rate ni alerte de P&L"""
+        for index in range(3):
+            self._trade(index, None)
+        self.assertEqual(self.agent.alerts, [])
+        self._trade(3, -10)
+        self.assertEqual([alert["type"] for alert in self.agent.alerts], ["winrate_alert"])
+
+    def test_trader_closed_trades_feed_stats(self):
+        """Le Trader envoie le fill puis le trade clôturé; seul ce dernier compte"""
+        print("🧪 Test trades clôturés du Trader...")
+        trader = TraderAgent()
+        trader._simulate_execution = lambda signal: asyncio.sleep(0, result=signal.price)
+        sent = []
+
+        class Context:
+            async def send(self, address, message):
+                sent.append(message)
+
+        signal = Signal(symbol="ADA/USD", signal_type=SignalType.BUY, confidence=0.9, price=1.0,
+                        position_size=0.05, stop_loss=0.98, take_profit=1.04)
+        self.loop.run_until_complete(trader.handle_signal(Context(), "strategy", signal))
+        tick = Prediction(symbol="ADA/USD", horizon=60, direction_prob=0.5, volatility=0.01, confidence=0.5,
+                          model_name="test", features_used={"current_price": 1.05})
+        self.loop.run_until_complete(trader.handle_price_update(Context(), "predictor", tick))
+
+        trades = [message for message in sent if isinstance(message, TradeRequest)]
+        self.assertEqual([t.status for t in trades], [TradeStatus.FILLED] * 2 + [TradeStatus.CLOSED] * 2)
+        for trade in trades[::2]:
+            self.loop.run_until_complete(self.agent.handle_trade_result(Context(), "trader", trade))
+        self.assertEqual(self.agent.performance.total_trades, 1)
+        self.assertAlmostEqual(self.agent.performance.total_pnl, 0.05 * 0.05 * trader.capital)
+        self.assertEqual(self.agent.alerts, [])
+        print("✅ Statistiques alimentées par les clôtures")
+
+    def test_report_cost_independent_of_history(self):
+        """Le rapport ne relit pas l'historique des trades"""
+        for pnl in np.random.default_rng(2).normal(0, 10, 2000):
+            self.agent.performance.add(pnl)
+        start = time.perf_counter()
+        for _ in range(1000):
+            self.agent.get_performance_report()
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
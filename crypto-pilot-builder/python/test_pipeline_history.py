@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests de l'historique borné du pipeline
+Vérifie l'éviction, les compteurs O(1) et les index par symbole et par temps
+"""
+
+import sys
+import os
+import unittest
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.pipeline_history import PipelineHistory
+
+
+START = datetime(2024, 1, 1, 12, 0, 0)
+
+
+@dataclass
+class Item:
+    """Résultat de pipeline minimal"""
+    symbol: str
+    timestamp: datetime
+    prediction: Optional[Any] = None
+    strategy_signal: Optional[Any] = None
+    trade_execution: Optional[Any] = None
+
+
+def make_item(index, symbol="BTC/USD", signal=False, trade=False):
+    return Item(
+        symbol=symbol,
+        timestamp=START + timedelta(seconds=index),
+        prediction={"p": index},
+        strategy_signal={"action": "BUY"} if signal else None,
+        trade_execution={"id": index} if trade else None
+    )
+
+
+class TestPipelineHistory(unittest.TestCase):
+    """Tests de PipelineHistory"""
+
+    def test_eviction_keeps_counters_exact(self):
+        """Les compteurs suivent la fenêtre après éviction"""
+        print("🧪 Test éviction et compteurs...")
+        history = PipelineHistory(maxlen=10)
+        history.extend(make_item(i, signal=i % 2 == 0, trade=i % 5 == 0) for i in range(25))
+
+        window = list(history)
+        self.assertEqual(len(history), 10)
+        self.assertEqual(window[0].timestamp, START + timedelta(seconds=15))
+        self.assertEqual(history.counts, {
+            "predictions": 10,
+            "signals": sum(1 for d in window if d.strategy_signal),
+            "trades": sum(1 for d in window if d.trade_execution),
+        })
+        stats = history.get_stats()
+        self.assertEqual((stats["appended"], stats["evicted"]), (25, 15))
+        print(f"✅ Compteurs: {history.counts}")
+
+    def test_latest_per_symbol(self):
+        """Les derniers résultats d'un symbole sans parcourir les autres"""
+        print("🧪 Test index par symbole...")
+        history = PipelineHistory(maxlen=6)
+        for i in range(9):
+            history.append(make_item(i, symbol="BTC/USD" if i % 3 else "ETH/USD"))
+
+        self.assertEqual(history.symbols(), ["BTC/USD", "ETH/USD"])
+        self.assertEqual([d.timestamp.second for d in history.latest(2, "BTC/USD")], [7, 8])
+        self.assertEqual([d.timestamp.second for d in history.latest(symbol="ETH/USD")], [3, 6])
+        self.assertEqual(history.count("ETH/USD"), 2)
+        self.assertEqual(history.latest(5, "SOL/USD"), [])
+        print("✅ Index par symbole cohérent avec la fenêtre")
+
+    def test_since(self):
+        """Requête temporelle par dichotomie, datetime ou epoch"""
+        print("🧪 Test requête temporelle...")
+        history = PipelineHistory(maxlen=100)
+        history.extend(make_item(i, symbol="BTC/USD" if i % 2 else "ETH/USD") for i in range(20))
+
+        recent = history.since(START + timedelta(seconds=15))
+        self.assertEqual([d.timestamp.second for d in recent], [15, 16, 17, 18, 19])
+        btc = history.since(START + timedelta(seconds=15), "BTC/USD")
+        self.assertEqual([d.timestamp.second for d in btc], [15, 17, 19])
+        self.assertEqual(len(history.since(0)), 20)
+        print("✅ Résultats depuis une date")
+
+    def test_sequence_access_and_shrink(self):
+        """Index, slices et réduction de capacité"""
+        print("🧪 Test accès séquence...")
+        history = PipelineHistory(maxlen=50)
+        history.extend(make_item(i) for i in range(30))
+
+        self.assertEqual(history[-1].timestamp.second, 29)
+        self.assertEqual([d.timestamp.second for d in history[-3:]], [27, 28, 29])
+        with self.assertRaises(IndexError):
+            history[30]
+
+        history.maxlen = 5
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history[0].timestamp.second, 25)
+        self.assertEqual(history.count("BTC/USD"), 5)
+        print("✅ Historique réduit à 5 entrées")
+
+    def test_compaction_over_many_appends(self):
+        """Les retraits en tête restent cohérents au fil des compactages"""
+        print("🧪 Test compactage...")
+        history = PipelineHistory(maxlen=100)
+        for i in range(5000):
+            history.append(make_item(i, symbol=("BTC/USD", "ETH/USD")[i % 2]))
+
+        self.assertEqual(len(history), 100)
+        self.assertLess(len(history._log._items), 300)
+        self.assertEqual(history[0].timestamp, START + timedelta(seconds=4900))
+        self.assertEqual(history.count("BTC/USD") + history.count("ETH/USD"), 100)
+        print("✅ Mémoire bornée après 5000 ajouts")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests des indicateurs du PredictorAgent sur un flux multi-timeframe
+Vérifie que les clôtures 5m/15m/1h ne se mêlent pas à l'état alimenté par les bougies 1m
+"""
+
+import sys
+import os
+import asyncio
+import random
+import unittest
+from unittest.mock import AsyncMock
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.agents.models.market_data import MarketData
+from pipeline.agents.trading.predictor import PredictorAgent
+from pipeline.utils.candle_builder import MultiTimeframeCandleBuilder
+from pipeline.utils.incremental_indicators import IncrementalIndicators
+from pipeline.utils.price_history import PriceHistoryStore
+
+PAIR = "BTC/USD"
+
+
+def hour_of_ticks(seed: int = 11):
+    """Un tick toutes les 15 s pendant une heure, plus le tick qui ferme la bougie 1h"""
+    rng = random.Random(seed)
+    start_ms = 1_700_000_000_000 - (1_700_000_000_000 % 3_600_000)
+    price = 50000.0
+    ticks = []
+    for i in range(241):
+        price *= 1 + rng.uniform(-0.002, 0.002)
+        ticks.append((start_ms + i * 15_000, price, rng.uniform(0.5, 2.0)))
+    return ticks
+
+
+class TestPredictorTimeframes(unittest.TestCase):
+    """Tests des états d'indicateurs par (symbole, timeframe)"""
+
+    def setUp(self):
+        # Les agents uAgent exigent une boucle courante à leur création
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.agent = PredictorAgent()
+        self.agent.history_store = PriceHistoryStore()
+        self.agent._generate_prediction = AsyncMock(return_value=None)
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def test_hour_of_ticks_matches_single_timeframe_feed(self):
+        """Une heure de ticks sur 1m/5m/15m/1h donne les mêmes indicateurs 1m qu'un flux 1m seul"""
+        print("🧪 Test flux multi-timeframe vs flux 1m seul...")
+        builder = MultiTimeframeCandleBuilder(("1m", "5m", "15m", "1h"))
+        reference = IncrementalIndicators()
+        closes = {}
+
+        for timestamp_ms, price, volume in hour_of_ticks():
+            for timeframe, ohlcv in builder.add_tick(PAIR, price, volume, timestamp_ms).items():
+                closes[timeframe] = closes.get(timeframe, 0) + 1
+                if timeframe == "1m":
+                    reference.update(ohlcv.close, ohlcv.volume)
+                message = MarketData(symbol=PAIR, timeframe=timeframe, ohlcv=[ohlcv], features={})
+                self.loop.run_until_complete(self.agent.handle_market_data(None, "collector", message))
+
+        self.assertEqual(closes, {"1m": 60, "5m": 12, "15m": 4, "1h": 1})
+        engine = self.agent.indicator_engine
+        self.assertEqual(engine.tick_count((PAIR, "1m")), 60)
+        self.assertEqual(engine.tick_count((PAIR, "1h")), 1)
+        self.assertEqual(engine.snapshot((PAIR, "1m")), reference.snapshot())
+        self.assertEqual(self.agent._get_technical_indicators(PAIR, [], "1m"), reference.snapshot())
+        self.assertEqual(self.agent.history_store.length(PAIR, "5m"), 12)
+        print("✅ Indicateurs 1m identiques, un état par timeframe")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
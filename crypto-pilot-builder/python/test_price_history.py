@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests de l'historique des prix partagé
+Vérifie les buffers circulaires et le registre par symbole/timeframe
+"""
+
+import sys
+import os
+import threading
+import unittest
+from datetime import datetime
+
+import numpy as np
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.price_history import RingBuffer, PriceHistoryStore
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Tests du buffer circulaire"""
+
+    def test_keeps_last_values_in_order(self):
+        """Le buffer conserve les `capacity` dernières valeurs dans l'ordre"""
+        print("🧪 Test ordre et écrasement...")
+        buffer = RingBuffer(5)
+        for value in range(12):
+            buffer.append(value)
+
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual(buffer.last().tolist(), [7, 8, 9, 10, 11])
+        self.assertEqual(buffer.last(3).tolist(), [9, 10, 11])
+        self.assertEqual(buffer.last(50).tolist(), [7, 8, 9, 10, 11])
+        self.assertEqual(buffer.latest(), 11)
+        print("✅ Dernières valeurs conservées")
+
+    def test_windows_are_read_only_views(self):
+        """Les fenêtres sont des vues sans copie en lecture seule"""
+        print("🧪 Test des vues sans copie...")
+        buffer = RingBuffer(4)
+        buffer.extend([1.0, 2.0, 3.0, 4.0, 5.0, 6.0])
+        window = buffer.last(2)
+
+        self.assertIsNotNone(window.base)
+        with self.assertRaises(ValueError):
+            window[0] = 0.0
+        buffer.append(7.0)
+        self.assertEqual(window.tolist(), [5.0, 6.0])  # Valide pendant capacity - N ajouts
+        print("✅ Vues stables et protégées")
+
+    def test_block_extend_matches_append(self):
+        """extend par blocs (avec retour au début) équivaut à des append successifs"""
+        for chunks in ([3, 4], [2, 9], [5], [1, 1, 6]):
+            blocks, single = RingBuffer(5), RingBuffer(5)
+            value = 0
+            for size in chunks:
+                values = list(range(value, value + size))
+                value += size
+                blocks.extend(values)
+                for item in values:
+                    single.append(item)
+                self.assertEqual(blocks.last().tolist(), single.last().tolist(), f"blocs {chunks}")
+                self.assertEqual(blocks.latest(), single.latest())
+        blocks.extend([])
+        self.assertEqual(len(blocks), 5)
+
+
+class TestPriceHistoryStore(unittest.TestCase):
+    """Tests du registre partagé"""
+
+    def test_symbols_and_timeframes_are_isolated(self):
+        """Chaque couple symbole/timeframe a son propre historique"""
+        print("🧪 Test isolation symbole/timeframe...")
+        store = PriceHistoryStore(capacity=3)
+        store.extend("BTC/USD", [1, 2, 3, 4], volumes=[10, 20, 30, 40])
+        store.append("BTC/USD", 100, timeframe="5m")
+        store.append("ETH/USD", 50)
+
+        self.assertEqual(store.last_prices("BTC/USD").tolist(), [2, 3, 4])
+        self.assertEqual(store.last_volumes("BTC/USD", 2).tolist(), [30, 40])
+        self.assertEqual(store.last_prices("BTC/USD", timeframe="5m").tolist(), [100])
+        self.assertEqual(store.symbols(), ["BTC/USD", "ETH/USD"])
+        self.assertEqual(store.length("SOL/USD"), 0)
+        self.assertEqual(store.last_prices("SOL/USD").tolist(), [])
+        print("✅ Historiques isolés")
+
+    def test_records_and_clear(self):
+        """to_records sérialise la fenêtre et clear vide un symbole"""
+        print("🧪 Test sérialisation et effacement...")
+        store = PriceHistoryStore(capacity=10)
+        now = datetime.utcnow().replace(microsecond=0)
+        store.append("BTC/USD", 50000.0, None, now)
+        store.append("ETH/USD", 3000.0, 1.5)
+
+        records = store.to_records("BTC/USD")
+        self.assertEqual(records, [{"timestamp": now, "price": 50000.0, "volume": None}])
+
+        store.clear("BTC/USD")
+        self.assertEqual(store.length("BTC/USD"), 0)
+        self.assertEqual(store.latest_price("ETH/USD"), 3000.0)
+        print("✅ Sérialisation et effacement conformes")
+
+    def test_clear_one_timeframe(self):
+        """Effacer une série (ex: relevés du dashboard) conserve les autres timeframes du symbole"""
+        store = PriceHistoryStore(capacity=10)
+        store.extend("BTC/USD", [1.0, 2.0, 3.0])
+        store.append("BTC/USD", 50000.0, timeframe="dashboard")
+
+        store.clear("BTC/USD", "dashboard")
+        self.assertEqual(store.length("BTC/USD", "dashboard"), 0)
+        self.assertEqual(store.last_prices("BTC/USD").tolist(), [1.0, 2.0, 3.0])
+
+    def test_extend_arrays(self):
+        """Les colonnes NumPy sont ajoutées comme avec extend"""
+        print("🧪 Test ajout de colonnes NumPy...")
+        arrays, lists = PriceHistoryStore(capacity=4), PriceHistoryStore(capacity=4)
+        prices = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+        volumes = np.array([10.0, 20.0, 30.0, 40.0, 50.0])
+        timestamps = np.arange(5, dtype=np.float64) * 60
+        arrays.extend_arrays("BTC/USD", prices, volumes=volumes, timestamps=timestamps)
+        lists.extend("BTC/USD", prices.tolist(), volumes=volumes.tolist(), timestamps=timestamps.tolist())
+
+        self.assertEqual(arrays.last_prices("BTC/USD").tolist(), lists.last_prices("BTC/USD").tolist())
+        self.assertEqual(arrays.to_records("BTC/USD"), lists.to_records("BTC/USD"))
+
+        arrays.extend_arrays("ETH/USD", np.array([7.0, 8.0]), timeframe="5m")
+        self.assertTrue(np.isnan(arrays.last_volumes("ETH/USD", timeframe="5m")).all())
+        self.assertEqual(arrays.length("ETH/USD", "5m"), 2)
+        with self.assertRaises(ValueError):
+            arrays.extend_arrays("BTC/USD", prices, volumes=volumes[:2])
+        print("✅ Colonnes ajoutées par blocs")
+
+    def test_symbols_during_concurrent_appends(self):
+        """symbols() reste sûr pendant que d'autres threads créent des historiques"""
+        print("🧪 Test symbols() concurrent...")
+        store = PriceHistoryStore(capacity=4)
+        errors = []
+
+        def writer(offset):
+            for i in range(2000):
+                store.append(f"SYM{offset + i}/USD", 1.0, timeframe="1m")
+
+        def reader():
+            try:
+                for _ in range(2000):
+                    store.symbols("1m")
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(n * 2000,)) for n in range(2)]
+        threads.append(threading.Thread(target=reader))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(store.symbols("1m")), 4000)
+        print("✅ Lecture des symboles protégée par le verrou")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
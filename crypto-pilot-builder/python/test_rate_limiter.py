@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Tests du limiteur de débit et du circuit breaker
+Vérifie le token bucket, les priorités, le Retry-After et la sûreté multi-thread
+"""
+
+import sys
+import os
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.rate_limiter import (
+    DEFAULT_ACQUIRE_TIMEOUT, HostRateLimiter, Priority, RateLimiterRegistry, RateLimitTimeout,
+    parse_retry_after, priority_scope, rate_limited_get, rate_limited_request, rate_limiter
+)
+from pipeline.utils.circuit_breaker import CircuitBreaker, CircuitBreakerOpen
+
+
+class TestHostRateLimiter(unittest.TestCase):
+    """Tests du token bucket par hôte"""
+
+    def test_burst_then_rate(self):
+        """La rafale est immédiate, la suite suit le débit configuré"""
+        print("🧪 Test rafale puis débit...")
+        limiter = HostRateLimiter("api.test", rate=50.0, burst=5)
+        start = time.monotonic()
+        for _ in range(10):
+            limiter.acquire()
+        elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 5 / 50.0 * 0.8)
+        self.assertLess(elapsed, 1.0)
+        print(f"✅ 10 jetons en {elapsed:.3f}s")
+
+    def test_trading_calls_beat_dashboard_calls(self):
+        """Les appels trading en attente passent avant les appels dashboard"""
+        print("🧪 Test priorités...")
+        limiter = HostRateLimiter("api.test", rate=20.0, burst=1)
+        limiter.acquire()  # Vide la rafale
+        order = []
+
+        async def call(name, priority, delay):
+            await asyncio.sleep(delay)
+            await limiter.acquire_async(priority)
+            order.append(name)
+
+        async def scenario():
+            await asyncio.gather(
+                call("dashboard-1", Priority.DASHBOARD, 0),
+                call("dashboard-2", Priority.DASHBOARD, 0),
+                call("trading", Priority.TRADING, 0.001),
+            )
+
+        asyncio.run(scenario())
+        self.assertEqual(order[0], "trading")
+        print(f"✅ Ordre de service: {order}")
+
+    def test_priority_from_context(self):
+        """Sans priorité explicite, celle du contexte est utilisée"""
+        print("🧪 Test priorité de contexte...")
+        limiter = HostRateLimiter("api.test", rate=1.0, burst=0)
+        with priority_scope(Priority.TRADING):
+            ticket = limiter._enqueue(None)
+        self.assertEqual(ticket[0], Priority.TRADING)
+        self.assertEqual(limiter._enqueue(None)[0], Priority.DEFAULT)
+        print("✅ Priorité héritée du contexte")
+
+    def test_retry_after_blocks_and_halves_rate(self):
+        """Un 429 bloque l'hôte pendant Retry-After et réduit le débit (AIMD)"""
+        print("🧪 Test Retry-After et backoff adaptatif...")
+        limiter = HostRateLimiter("api.test", rate=10.0, burst=5)
+        limiter.record_response(429, "0.2")
+
+        self.assertAlmostEqual(limiter.effective_rate, 5.0)
+        with self.assertRaises(RateLimitTimeout):
+            limiter.acquire(timeout=0.05)
+
+        start = time.monotonic()
+        limiter.acquire(timeout=2.0)
+        self.assertGreaterEqual(time.monotonic() - start, 0.1)
+
+        for _ in range(20):
+            limiter.record_response(200)
+        self.assertAlmostEqual(limiter.effective_rate, 10.0)
+        print("✅ Blocage puis récupération progressive du débit")
+
+    def test_parse_retry_after(self):
+        """Retry-After en secondes ou en date HTTP"""
+        print("🧪 Test parsing Retry-After...")
+        self.assertEqual(parse_retry_after("30"), 30.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("bientôt"))
+        self.assertAlmostEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0), 10.0)
+        print("✅ Formats Retry-After gérés")
+
+    def test_retry_after_is_capped(self):
+        """Un Retry-After démesuré est plafonné à MAX_BACKOFF"""
+        print("🧪 Test plafond du Retry-After...")
+        for retry_after in ("99999", "Fri, 01 Jan 2100 00:00:00 GMT"):
+            limiter = HostRateLimiter("api.test", rate=10.0, burst=5)
+            limiter.record_response(429, retry_after)
+            self.assertLessEqual(limiter.get_state()["blocked_for"], HostRateLimiter.MAX_BACKOFF)
+        print("✅ Blocage plafonné")
+
+    def test_registry_per_host(self):
+        """Un limiteur par hôte, limites connues appliquées"""
+        print("🧪 Test registre par hôte...")
+        registry = RateLimiterRegistry()
+        coingecko = registry.for_url("https://api.coingecko.com/api/v3/simple/price")
+        self.assertIs(coingecko, registry.for_host("api.coingecko.com"))
+        self.assertEqual(coingecko.rate, 0.5)
+        self.assertIsNot(coingecko, registry.for_url("https://li.quest/v1/tokens"))
+        print("✅ Limiteurs isolés par hôte")
+
+
+class TestRateLimitedGet(unittest.TestCase):
+    """Tests de l'attente bornée des appels bloquants"""
+
+    def test_wait_is_bounded_by_request_timeout(self):
+        """Hôte bloqué par un Retry-After: l'appel échoue au bout du timeout de la requête"""
+        print("🧪 Test attente bornée de rate_limited_get...")
+        url = "https://throttled.test/prices"
+        rate_limiter.for_url(url).record_response(429, "60")
+        with mock.patch("pipeline.utils.rate_limiter.requests.get", side_effect=AssertionError("réseau")):
+            for timeout in (0.1, (0.1, 30)):
+                start = time.monotonic()
+                with self.assertRaises(RateLimitTimeout):
+                    rate_limited_get(url, timeout=timeout)
+                self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(rate_limiter.for_url(url).stats["timeouts"], 2)
+        print("✅ RateLimitTimeout levée après le timeout de la requête")
+
+    def test_default_acquire_timeout(self):
+        """Sans timeout de requête, l'attente reste bornée par DEFAULT_ACQUIRE_TIMEOUT"""
+        with mock.patch.object(rate_limiter, "acquire") as acquire, \
+                mock.patch("pipeline.utils.rate_limiter.requests.get") as get:
+            get.return_value.status_code = 200
+            get.return_value.headers = {}
+            rate_limited_get("https://free.test/prices")
+            rate_limited_get("https://free.test/prices", acquire_timeout=2.0, timeout=10)
+        self.assertEqual([c.args[2] for c in acquire.call_args_list], [DEFAULT_ACQUIRE_TIMEOUT, 2.0])
+
+    def test_async_wait_is_bounded(self):
+        """rate_limited_request: attente bornée par le timeout de la requête puis de la session"""
+        print("🧪 Test attente bornée de rate_limited_request...")
+        url = "https://throttled-async.test/prices"
+        rate_limiter.for_url(url).record_response(429, "60")
+        session = mock.Mock(timeout=mock.Mock(total=0.1))
+        session.request.side_effect = AssertionError("réseau")
+
+        async def run(**kwargs):
+            start = time.monotonic()
+            with self.assertRaises(RateLimitTimeout):
+                await rate_limited_request(session, "GET", url, **kwargs)
+            self.assertLess(time.monotonic() - start, 1.0)
+
+        asyncio.run(run())
+        asyncio.run(run(timeout=mock.Mock(total=0.1)))
+        asyncio.run(run(timeout=0.1))
+        self.assertEqual(rate_limiter.for_url(url).stats["timeouts"], 3)
+        print("✅ RateLimitTimeout levée sans bloquer indéfiniment")
+
+
+class TestCircuitBreakerThreadSafety(unittest.TestCase):
+    """Tests du circuit breaker synchrone et multi-thread"""
+
+    def test_sync_function_is_supported(self):
+        """Une fonction synchrone décorée reste synchrone"""
+        print("🧪 Test circuit breaker synchrone...")
+        breaker = CircuitBreaker(fail_max=2, reset_timeout=60)
+
+        @breaker
+        def fetch():
+            return [1, 2, 3]
+
+        @breaker
+        def failing():
+            raise ValueError("boom")
+
+        self.assertEqual(fetch(), [1, 2, 3])
+        for _ in range(2):
+            with self.assertRaises(ValueError):
+                failing()
+        with self.assertRaises(CircuitBreakerOpen):
+            fetch()
+        print("✅ Circuit ouvert après 2 échecs")
+
+    def test_concurrent_failures_are_counted(self):
+        """Les échecs concurrents sont tous comptés"""
+        print("🧪 Test compteurs multi-thread...")
+        breaker = CircuitBreaker(fail_max=10_000, reset_timeout=60)
+
+        def worker():
+            for _ in range(100):
+                breaker._on_failure()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(breaker.fail_count, 800)
+        print("✅ 800 échecs comptés sans perte")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
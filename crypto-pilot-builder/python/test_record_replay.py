@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Tests du record/replay des API amont
+Vérifie l'enregistrement, le rejeu par clé, le rythme horloge et le rejeu des complétions ASI:One
+"""
+
+import sys
+import os
+import asyncio
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mcp_serveur import crypto_tools
+from pipeline.utils.asi_model import ASIOneModel
+from pipeline.utils.rate_limiter import rate_limited_get, rate_limited_request
+from pipeline.utils.record_replay import ReplayedError, ReplayMiss, traffic_recorder
+
+
+class FakeRequestsResponse:
+    """Réponse requests minimale"""
+
+    def __init__(self, url, payload, status_code=200):
+        self.url = url
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    @property
+    def text(self):
+        return str(self._payload)
+
+
+class FakeAiohttpResponse:
+    """Réponse aiohttp minimale"""
+
+    def __init__(self, payload, status=200):
+        self.status = status
+        self.headers = {}
+        self._payload = payload
+
+    async def json(self):
+        return self._payload
+
+    async def text(self):
+        return str(self._payload)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """Session aiohttp qui compte les requêtes"""
+
+    def __init__(self):
+        self.calls = []
+
+    def request(self, method, url, params=None, **kwargs):
+        self.calls.append((method, url, params))
+        return FakeAiohttpResponse({"ids": params["ids"], "price": 100 + len(self.calls)})
+
+
+class TestRecordReplay(unittest.TestCase):
+    """Tests de TrafficRecorder"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="traffic_")
+        self.tape = os.path.join(self.directory, "tape.jsonl")
+
+    def tearDown(self):
+        traffic_recorder.stop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_sync_record_then_replay_offline(self):
+        """Les réponses requests enregistrées sont rejouées sans réseau"""
+        print("🧪 Test record/replay synchrone...")
+        url = "https://min-api.cryptocompare.com/data/v2/news/"
+
+        def fake_get(request_url, params=None, **kwargs):
+            return FakeRequestsResponse(request_url, {"Data": [{"id": params["page"]}]})
+
+        traffic_recorder.start_recording(self.tape, seed=7)
+        with mock.patch("pipeline.utils.rate_limiter.requests.get", side_effect=fake_get):
+            recorded = [rate_limited_get(url, params={"page": page}).json() for page in (1, 2)]
+        self.assertEqual(traffic_recorder.stop()["recorded"], 2)
+
+        traffic_recorder.start_replay(self.tape)
+        with mock.patch("pipeline.utils.rate_limiter.requests.get", side_effect=AssertionError("réseau")):
+            second = rate_limited_get(url, params={"page": 2})
+            first = rate_limited_get(url, params={"page": 1})
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual([first.json(), second.json()], recorded)
+        self.assertEqual(traffic_recorder.get_stats()["fallbacks"], 0)
+        print("✅ Réponses rejouées par clé exacte")
+
+    def test_crypto_tools_under_record_and_replay(self):
+        """Les outils MCP (raise_for_status, json) fonctionnent en enregistrement et en rejeu"""
+        print("🧪 Test crypto_tools en record/replay...")
+        prices = iter([FakeRequestsResponse("https://api.coingecko.com/api/v3/simple/price",
+                                            {"bitcoin": {"usd": 65000}}),
+                       FakeRequestsResponse("https://api.coingecko.com/api/v3/simple/price",
+                                            "rate limited", status_code=429)])
+
+        traffic_recorder.start_recording(self.tape)
+        with mock.patch("pipeline.utils.rate_limiter.requests.get", side_effect=lambda *a, **k: next(prices)):
+            recorded = [crypto_tools.get_crypto_price("bitcoin"), crypto_tools.get_crypto_price("bitcoin")]
+        traffic_recorder.stop()
+
+        traffic_recorder.start_replay(self.tape)
+        with mock.patch("pipeline.utils.rate_limiter.requests.get", side_effect=AssertionError("réseau")):
+            replayed = [crypto_tools.get_crypto_price("bitcoin"), crypto_tools.get_crypto_price("bitcoin")]
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(recorded[0], "The current price of Bitcoin is 65000 USD.")
+        self.assertTrue(recorded[1].startswith("CoinGecko API error: 429 Client Error"))
+        print("✅ Réponses et erreurs HTTP identiques au rejeu")
+
+    def test_async_record_then_replay(self):
+        """Les réponses aiohttp enregistrées sont rejouées dans le même ordre par clé"""
+        print("🧪 Test record/replay asynchrone...")
+        url = "https://api.coingecko.com/api/v3/simple/price"
+        session = FakeSession()
+
+        async def fetch_all():
+            return [(await rate_limited_request(session, "GET", url, params={"ids": ids})).json()
+                    for ids in ("bitcoin", "ethereum", "bitcoin")]
+
+        traffic_recorder.start_recording(self.tape)
+        recorded = asyncio.run(fetch_all())
+        traffic_recorder.stop()
+
+        traffic_recorder.start_replay(self.tape)
+        replayed = asyncio.run(fetch_all())
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(len(session.calls), 3)  # Aucune requête supplémentaire au rejeu
+        print("✅ 3 réponses rejouées sans requête")
+
+    def test_errors_misses_and_fallback(self):
+        """Erreur enregistrée relevée à l'identique, repli par service, mode strict"""
+        print("🧪 Test erreurs et repli...")
+        traffic_recorder.start_recording(self.tape)
+
+        def failing():
+            raise ConnectionError("timeout")
+
+        with self.assertRaises(ConnectionError):
+            traffic_recorder.exchange_sync("api.test", "GET /a", failing)
+        traffic_recorder.exchange_sync("api.test", "GET /b", lambda: {"value": 1})
+        traffic_recorder.stop()
+
+        traffic_recorder.start_replay(self.tape)
+        with self.assertRaises(ReplayedError):
+            traffic_recorder.exchange_sync("api.test", "GET /a", failing)
+        self.assertEqual(traffic_recorder.exchange_sync("api.test", "GET /c", failing), {"value": 1})
+        with self.assertRaises(ReplayMiss):
+            traffic_recorder.exchange_sync("api.test", "GET /d", failing)
+        self.assertEqual(traffic_recorder.get_stats()["fallbacks"], 1)
+
+        traffic_recorder.start_replay(self.tape, strict=True)
+        with self.assertRaises(ReplayMiss):
+            traffic_recorder.exchange_sync("api.test", "GET /c", failing)
+        print("✅ Erreurs et ratés gérés")
+
+    def test_wall_clock_pacing(self):
+        """À vitesse 1.0 la réponse arrive à l'instant enregistré, au plus vite sinon"""
+        print("🧪 Test rythme horloge...")
+
+        def slow():
+            time.sleep(0.2)
+            return "ok"
+
+        traffic_recorder.start_recording(self.tape)
+        traffic_recorder.exchange_sync("api.test", "GET /slow", slow)
+        traffic_recorder.stop()
+
+        traffic_recorder.start_replay(self.tape, speed=2.0)
+        start = time.monotonic()
+        traffic_recorder.exchange_sync("api.test", "GET /slow", slow)
+        self.assertGreaterEqual(time.monotonic() - start, 0.08)
+
+        traffic_recorder.start_replay(self.tape)
+        start = time.monotonic()
+        traffic_recorder.exchange_sync("api.test", "GET /slow", slow)
+        self.assertLess(time.monotonic() - start, 0.05)
+        print("✅ Rejeu au rythme demandé")
+
+    def test_asi_completion_replayed_without_api_key(self):
+        """Une complétion ASI:One enregistrée est rejouée même sans clé API"""
+        print("🧪 Test rejeu ASI:One...")
+        completion = {"choices": [{"message": {"content": '{"direction_probability": 0.81, "confidence": 0.9}'}}]}
+        recording_model = ASIOneModel(api_key="test")
+        recording_model._post_chat_completion = mock.AsyncMock(return_value=completion)
+
+        args = ([100.0, 101.0, 102.0], [10.0, 11.0, 12.0], {"rsi": 55.0}, "BTC/USD")
+        traffic_recorder.start_recording(self.tape)
+        recorded = asyncio.run(recording_model.predict_price_direction(*args))
+        traffic_recorder.stop()
+
+        traffic_recorder.start_replay(self.tape)
+        with mock.patch.dict(os.environ, {"ASI_ONE_API_KEY": ""}):
+            offline_model = ASIOneModel()
+        self.assertTrue(offline_model.simulation_mode)
+        replayed = asyncio.run(offline_model.predict_price_direction(*args))
+        self.assertEqual(replayed["direction_probability"], recorded["direction_probability"])
+        self.assertEqual(replayed["direction_probability"], 0.81)
+        self.assertEqual(traffic_recorder.get_stats()["replayed"], 1)
+        print("✅ Prédiction rejouée à l'identique")
+
+    def test_seed_drives_recorder_rng_only(self):
+        """La graine de la bande alimente traffic_recorder.rng sans réinitialiser le random global"""
+        print("🧪 Test générateur du magnétophone...")
+        random.seed(123)
+        expected_global = random.Random(123).random()
+        traffic_recorder.start_recording(self.tape, seed=42)
+        recorded = [traffic_recorder.rng.random() for _ in range(3)]
+        traffic_recorder.stop()
+        self.assertEqual(random.random(), expected_global)
+
+        traffic_recorder.start_replay(self.tape)
+        self.assertEqual([traffic_recorder.rng.random() for _ in range(3)], recorded)
+        print("✅ Replis simulés reproductibles, random global intact")
+
+    def test_import_does_not_configure_recorder(self):
+        """L'import du module ne lit pas PIPELINE_TRAFFIC_MODE (aucune bande écrasée)"""
+        print("🧪 Test configuration différée du record/replay...")
+        env = dict(os.environ, PIPELINE_TRAFFIC_MODE="record", PIPELINE_TRAFFIC_FILE=self.tape)
+        code = "from pipeline.utils.record_replay import traffic_recorder; print(traffic_recorder.active)"
+        output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+        self.assertEqual(output.strip(), "False")
+        self.assertFalse(os.path.exists(self.tape))
+
+        with mock.patch.dict(os.environ, env):
+            traffic_recorder.configure_from_env()
+        self.assertTrue(traffic_recorder.recording)
+        self.assertTrue(os.path.exists(self.tape))
+        print("✅ Magnétophone configuré seulement à la demande")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
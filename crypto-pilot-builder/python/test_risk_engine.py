@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Tests du moteur de risque de portefeuille
+Vérifie les corrélations incrémentales, les limites orientées, le redimensionnement et le drawdown
+"""
+
+import sys
+import os
+import asyncio
+import time
+import unittest
+
+import numpy as np
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.agents.models.prediction import Prediction
+from pipeline.agents.models.signal import Signal
+from pipeline.agents.models.trade import TradeRequest, TradeStatus, TradeType
+from pipeline.agents.trading.strategy import StrategyAgent
+from pipeline.agents.trading.trader import TraderAgent
+from pipeline.utils.risk_engine import PortfolioRiskEngine
+from pipeline.utils.trading_rules import LONG, SHORT
+
+
+def correlated_prices(samples=300, seed=0):
+    """BTC et ETH très corrélés, DOGE indépendant"""
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, 0.01, samples)
+    returns = {
+        "BTC": common + rng.normal(0, 0.002, samples),
+        "ETH": common + rng.normal(0, 0.002, samples),
+        "DOGE": rng.normal(0, 0.01, samples),
+    }
+    return {symbol: 100 * np.cumprod(1 + r) for symbol, r in returns.items()}
+
+
+def filled(signal):
+    """Confirmation d'exécution d'un signal, telle que l'envoie le Trader"""
+    return TradeRequest(trade_id=f"trade_{signal.symbol}", symbol=signal.symbol, trade_type=TradeType.MARKET,
+                        side=signal.signal_type, quantity=signal.position_size, price=signal.price,
+                        stop_loss=signal.stop_loss, take_profit=signal.take_profit, status=TradeStatus.FILLED)
+
+
+class RecordingContext:
+    """Contexte uAgent minimal: mémorise les messages envoyés"""
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, address, message):
+        self.sent.append(message)
+
+    def pop(self, model):
+        messages = [m for m in self.sent if isinstance(m, model)]
+        self.sent = [m for m in self.sent if not isinstance(m, model)]
+        return messages
+
+
+class TestPortfolioRiskEngine(unittest.TestCase):
+    """Tests de PortfolioRiskEngine"""
+
+    def setUp(self):
+        self.prices = correlated_prices()
+
+    def _feed(self, engine, start=0, end=300):
+        for t in range(start, end):
+            engine.update_prices({symbol: series[t] for symbol, series in self.prices.items()})
+
+    def test_incremental_matches_numpy(self):
+        """Les corrélations incrémentales égalent np.corrcoef sur la fenêtre"""
+        print("🧪 Test corrélations incrémentales...")
+        engine = PortfolioRiskEngine(window=50)
+        self._feed(engine, end=237)
+        returns = {s: np.diff(p[:237]) / p[:236] for s, p in self.prices.items()}
+        window = np.vstack([returns[s][-50:] for s in ("BTC", "ETH", "DOGE")])
+        expected = np.corrcoef(window)[0, 1:]
+        np.testing.assert_allclose(engine.correlations("BTC", ["ETH", "DOGE"]), expected, atol=1e-9)
+        print(f"✅ corr(BTC, ETH) = {expected[0]:.3f}")
+
+    def test_oriented_correlation_limit(self):
+        """Un achat corrélé à un achat détenu est refusé, une couverture est acceptée"""
+        print("🧪 Test limite de corrélation...")
+        engine = PortfolioRiskEngine(window=100, correlation_limit=0.7)
+        self._feed(engine)
+        engine.open_position("BTC", LONG)
+
+        rejected = engine.evaluate("ETH", LONG, 0.05)
+        self.assertFalse(rejected.allowed)
+        self.assertEqual((rejected.reason, rejected.correlated_with), ("correlation_limit", "BTC"))
+        self.assertTrue(engine.evaluate("ETH", SHORT, 0.05).allowed)
+        self.assertTrue(engine.evaluate("DOGE", LONG, 0.05).allowed)
+        print("✅ Limites orientées respectées")
+
+    def test_resize_policy(self):
+        """En mode resize la taille est réduite selon l'excès de corrélation"""
+        engine = PortfolioRiskEngine(window=100, correlation_limit=0.7, policy="resize")
+        self._feed(engine)
+        engine.open_position("BTC", LONG)
+        decision = engine.evaluate("ETH", LONG, 0.1)
+        self.assertTrue(decision.allowed)
+        self.assertEqual(decision.reason, "correlation_resized")
+        self.assertAlmostEqual(decision.size, round(0.1 * (1 - decision.max_correlation) / 0.3, 4))
+        self.assertLess(decision.size, 0.1)
+
+    def test_max_drawdown_blocks_signals(self):
+        """Au-delà du drawdown maximal tous les signaux sont refusés"""
+        engine = PortfolioRiskEngine(max_drawdown=0.1, initial_capital=1000)
+        engine.record_pnl(200)
+        engine.record_pnl(-100)
+        self.assertTrue(engine.evaluate("BTC", LONG, 0.05).allowed)
+        engine.record_pnl(-30)
+        self.assertEqual(engine.evaluate("BTC", LONG, 0.05).reason, "max_drawdown")
+
+    def test_per_symbol_updates_and_growth(self):
+        """Les prix symbole par symbole forment des échantillons; l'univers s'agrandit"""
+        print("🧪 Test flux par symbole...")
+        engine = PortfolioRiskEngine(window=100, capacity=2)
+        for t in range(200):
+            for symbol, series in self.prices.items():
+                engine.update_price(symbol, series[t])
+        self.assertEqual(engine.get_stats()["symbols"], 3)
+        self.assertGreater(engine.correlations("BTC", ["ETH"])[0], 0.9)
+
+        engine.open_position("BTC", LONG)
+        engine.open_position("DOGE", SHORT)
+        start = time.perf_counter()
+        for _ in range(1000):
+            engine.evaluate("ETH", LONG, 0.05)
+        print(f"✅ {(time.perf_counter() - start) * 1e3:.1f} µs par évaluation")
+
+    def test_strategy_agent_blocks_correlated_signal(self):
+        """StrategyAgent n'envoie pas un achat ETH quand BTC est détenu"""
+        print("🧪 Test intégration StrategyAgent...")
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            agent = StrategyAgent()
+            sent = []
+
+            async def capture(ctx, signal):
+                sent.append(signal)
+
+            agent._send_to_trader = capture
+            for t in range(150):
+                agent.risk_engine.update_prices({s: p[t] for s, p in self.prices.items()})
+
+            def prediction(symbol, t):
+                return Prediction(symbol=symbol, horizon=60, direction_prob=0.9, volatility=0.01, confidence=0.9,
+                                  model_name="test", features_used={"current_price": self.prices[symbol][t]})
+
+            loop.run_until_complete(agent.handle_prediction(None, "test", prediction("BTC", 150)))
+            self.assertEqual(agent.risk_engine.positions, {})  # Pas de position avant le fill
+            loop.run_until_complete(agent.handle_trade_result(None, "trader", filled(sent[0])))
+            loop.run_until_complete(agent.handle_prediction(None, "test", prediction("ETH", 150)))
+            loop.run_until_complete(agent.handle_prediction(None, "test", prediction("DOGE", 150)))
+            self.assertEqual([signal.symbol for signal in sent], ["BTC", "DOGE"])
+            self.assertEqual(agent.risk_engine.get_stats()["rejected"], 1)
+        finally:
+            loop.close()
+        print("✅ Signal corrélé bloqué")
+
+
+class TestTradeLifecycle(unittest.TestCase):
+    """Aller-retour Strategy → Trader → Strategy: ouverture au fill, libération à la clôture"""
+
+    def setUp(self):
+        # Les agents uAgent exigent une boucle courante à leur création
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.strategy = StrategyAgent()
+        self.trader = TraderAgent()
+        self.trader._simulate_execution = lambda signal: asyncio.sleep(0, result=signal.price)
+        self.ctx = RecordingContext()
+
+    def tearDown(self):
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_open_then_close_round_trip(self):
+        """La position n'existe qu'entre le fill et la clôture, avec le P&L réalisé"""
+        print("🧪 Test aller-retour ouverture/clôture...")
+        prediction = Prediction(symbol="ADA/USD", horizon=60, direction_prob=0.9, volatility=0.01,
+                                confidence=0.9, model_name="test", features_used={"current_price": 1.0})
+        self.run_async(self.strategy.handle_prediction(self.ctx, "predictor", prediction))
+        signals = self.ctx.pop(Signal)
+        self.assertEqual(len(signals), 1)
+        self.assertEqual(self.strategy.risk_engine.positions, {})
+
+        # Fill: envoyé au Strategy et au Logger, la position est ouverte
+        self.run_async(self.trader.handle_signal(self.ctx, "strategy", signals[0]))
+        fills = self.ctx.pop(TradeRequest)
+        self.assertEqual([t.status for t in fills], [TradeStatus.FILLED] * 2)
+        self.run_async(self.strategy.handle_trade_result(self.ctx, "trader", fills[0]))
+        self.assertEqual(self.strategy.risk_engine.positions, {"ADA/USD": LONG})
+        self.assertIn("ADA/USD", self.strategy.open_trades)
+
+        # Take profit franchi: le trade clôturé porte son P&L réalisé
+        exit_price = signals[0].take_profit + 0.01
+        tick = prediction.copy(update={"features_used": {"current_price": exit_price}})
+        self.run_async(self.trader.handle_price_update(self.ctx, "predictor", tick))
+        closes = self.ctx.pop(TradeRequest)
+        self.assertEqual([t.status for t in closes], [TradeStatus.CLOSED] * 2)
+        pnl = (exit_price - 1.0) * signals[0].position_size * self.trader.capital
+        self.assertAlmostEqual(closes[0].realized_pnl, pnl)
+        self.assertEqual(closes[0].price, exit_price)
+
+        self.run_async(self.strategy.handle_trade_result(self.ctx, "trader", closes[0]))
+        self.assertEqual(self.strategy.risk_engine.positions, {})
+        self.assertEqual(self.strategy.open_trades, {})
+        self.assertAlmostEqual(self.strategy.daily_pnl, pnl)
+        self.assertEqual(self.strategy.daily_trades, 1)
+        print("✅ Position ouverte au fill et libérée à la clôture")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
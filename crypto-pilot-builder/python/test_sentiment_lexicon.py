@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests du score de sentiment par lexique compilé
+Vérifie les mots entiers, les expressions, la négation et le mode par lots
+"""
+
+import sys
+import os
+import time
+import unittest
+from datetime import datetime
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.sentiment_lexicon import SentimentLexicon, sentiment_lexicon
+from services.news_service import NewsItem, NewsService
+
+
+class TestSentimentLexicon(unittest.TestCase):
+    """Tests de SentimentLexicon"""
+
+    def test_whole_words_and_phrases(self):
+        """Mots entiers seulement; expressions avec espace ou tiret"""
+        print("🧪 Test mots et expressions...")
+        self.assertEqual(sentiment_lexicon.raw_score("Prices rose again in Banff"), 0)  # ni "gain" ni "ban"
+        self.assertEqual(sentiment_lexicon.raw_score("A sell-off, then a sell off in a bear market"), -2)
+        self.assertEqual(sentiment_lexicon.raw_score("Bullish breakout after the upgrade"), 3)
+        print("✅ Termes reconnus")
+
+    def test_inflected_forms(self):
+        """Pluriels, passés et participes comptent comme le terme, chacun une fois par texte"""
+        print("🧪 Test formes fléchies...")
+        self.assertEqual(sentiment_lexicon.raw_score("Bitcoin surges as ETF gains approval"), 2)
+        self.assertEqual(sentiment_lexicon.raw_score("Prices crashed after regulators banned trading"), -2)
+        self.assertEqual(sentiment_lexicon.raw_score("Bitcoin rallies"), 1)
+        self.assertEqual(sentiment_lexicon.raw_score("Rally, rallied, rallying: the rally continues"), 1)
+        self.assertEqual(sentiment_lexicon.raw_score("Hacks and losses in bear markets"), -3)
+        self.assertEqual(sentiment_lexicon.raw_score("Again, the bank wasn't risky"), 0)  # ni "gain", "ban", "risk"
+        self.assertGreater(sentiment_lexicon.score("Bitcoin rallies"), 0)
+        print("✅ Formes fléchies reconnues")
+
+    def test_negation(self):
+        """Une négation proche inverse le terme"""
+        self.assertEqual(sentiment_lexicon.raw_score("There was no hack and the launch was not a failure"), 3)
+        self.assertEqual(sentiment_lexicon.raw_score("The project isn't bullish"), -1)
+        self.assertEqual(sentiment_lexicon.raw_score("Not that anyone cared much about it, the rally continued"), 1)
+        self.assertEqual(sentiment_lexicon.raw_score("Bitcoin won’t rally and ETH doesn't crash"), 0)
+
+    def test_ordinary_words_are_not_negations(self):
+        """"won" et "don" employés comme mots ordinaires n'inversent rien"""
+        self.assertEqual(sentiment_lexicon.raw_score("The team won bullish support"), 1)
+        self.assertEqual(sentiment_lexicon.raw_score("Don Smith praised the rally"), 1)
+        self.assertEqual(sentiment_lexicon.raw_score("Investors don a bullish mood"), 1)
+        self.assertEqual(sentiment_lexicon.score_many(["South Korea won the hack case"]),
+                         [sentiment_lexicon.score("South Korea won the hack case")])
+        self.assertLess(sentiment_lexicon.raw_score("South Korea won the hack case"), 0)
+
+    def test_score_scale(self):
+        """Échelle historique: (pos - neg) / mots × 15, bornée"""
+        self.assertEqual(sentiment_lexicon.score("bullish market today with rally and ban"), 1.0)
+        self.assertAlmostEqual(sentiment_lexicon.score(" ".join(["word"] * 29) + " rally"), 15 / 30)
+        self.assertEqual(sentiment_lexicon.score(""), 0.0)
+
+    def test_batch_matches_single(self):
+        """Le mode par lots donne les mêmes scores, sans fuite entre documents"""
+        print("🧪 Test mode par lots...")
+        texts = ["Bitcoin rally continues without concern", "bear", "market crash fears", None,
+                 "no", "hack confirmed", "Adoption and growth " * 20]
+        self.assertEqual(sentiment_lexicon.score_many(texts), [sentiment_lexicon.score(t) for t in texts])
+        print("✅ Scores identiques")
+
+    def test_custom_weights(self):
+        lexicon = SentimentLexicon({"to the moon": 2.0, "rug pull": -3.0})
+        self.assertEqual(lexicon.raw_score("Is it going to the moon or is it a rug-pull?"), -1.0)
+
+    def test_backlog_speed(self):
+        """500 articles en quelques millisecondes"""
+        print("🧪 Test de débit...")
+        article = ("Ethereum developers announced an upgrade and a new partnership. Analysts see no crash "
+                   "despite regulation concerns and a brief sell-off in the bear market. ") * 6
+        articles = [article + str(i) for i in range(500)]
+        start = time.perf_counter()
+        scores = sentiment_lexicon.score_many(articles)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(len(scores), 500)
+        self.assertLess(elapsed, 0.2)
+        print(f"✅ 500 articles en {elapsed * 1000:.1f} ms")
+
+    def test_news_service_batch(self):
+        service = NewsService()
+        items = [NewsItem(id=str(i), title=title, content="", source="test", published_at=datetime.now(), url="")
+                 for i, title in enumerate(["Bullish rally", "Exchange hack"])]
+        self.assertEqual(service.analyze_sentiment_batch(items), [service.analyze_sentiment(n) for n in items])
+        self.assertGreater(service.analyze_sentiment(items[0]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
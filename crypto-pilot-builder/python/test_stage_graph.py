@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests de l'ordonnanceur d'étapes en graphe
+Vérifie le parallélisme, le démarrage au plus tôt, les échecs et la validation du graphe
+"""
+
+import sys
+import os
+import asyncio
+import time
+import unittest
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.stage_graph import StageGraph, StageGraphError
+
+
+def sleeper(delay, value):
+    """Étape asynchrone qui attend `delay` secondes puis retourne `value`"""
+    async def stage(**inputs):
+        await asyncio.sleep(delay)
+        return value
+    return stage
+
+
+class TestStageGraph(unittest.TestCase):
+    """Tests de StageGraph"""
+
+    def test_independent_stages_run_in_parallel(self):
+        """Latence = chemin critique, pas la somme des étapes"""
+        print("🧪 Test étapes parallèles...")
+        graph = StageGraph("test")
+        graph.add_stage("market", sleeper(0.1, {"BTC/USD": 1.0}))
+        graph.add_stage("news", sleeper(0.1, {"BTC": 0.5}))
+
+        async def aggregate(market, news):
+            return {"market": market, "news": news}
+
+        graph.add_stage("aggregate", aggregate, inputs=("market", "news"))
+        run = asyncio.run(graph.run())
+
+        self.assertTrue(run.ok)
+        self.assertEqual(run.results["aggregate"], {"market": {"BTC/USD": 1.0}, "news": {"BTC": 0.5}})
+        self.assertLess(run.total_seconds, 0.18)
+        print(f"✅ 2 × 100ms en {run.total_seconds * 1000:.0f}ms")
+
+    def test_downstream_starts_when_its_inputs_are_ready(self):
+        """Une étape démarre dès que ses propres entrées sont prêtes"""
+        print("🧪 Test démarrage au plus tôt...")
+        graph = StageGraph("test")
+        graph.add_stage("fast", sleeper(0.01, 1))
+        graph.add_stage("slow", sleeper(0.15, 2))
+        graph.add_stage("after_fast", sleeper(0.01, 3), inputs=("fast",))
+        run = asyncio.run(graph.run())
+
+        start_after_fast = run.timings["after_fast"][0]
+        end_slow = run.timings["slow"][1]
+        self.assertLess(start_after_fast, end_slow)
+        print("✅ after_fast n'attend pas slow")
+
+    def test_failure_skips_dependents_unless_optional(self):
+        """Un échec annule les dépendantes, sauf si l'entrée est optionnelle"""
+        print("🧪 Test échec et entrée optionnelle...")
+
+        async def broken():
+            raise RuntimeError("API news indisponible")
+
+        async def aggregate(market, news):
+            return (market, news)
+
+        graph = StageGraph("test")
+        graph.add_stage("market", sleeper(0, "prix"))
+        graph.add_stage("news", broken)
+        graph.add_stage("aggregate", aggregate, inputs=("market", "news"), optional=("news",))
+        graph.add_stage("sentiment_report", sleeper(0, "rapport"), inputs=("news",))
+        graph.add_stage("report_archive", sleeper(0, "archive"), inputs=("sentiment_report",))
+        run = asyncio.run(graph.run())
+
+        self.assertEqual(run.results["aggregate"], ("prix", None))
+        self.assertIn("news", run.errors)
+        self.assertEqual(sorted(run.skipped), ["report_archive", "sentiment_report"])
+        print("✅ Fusion sans news, dépendantes strictes ignorées")
+
+    def test_sync_stage_runs_in_thread(self):
+        """Les étapes synchrones ne bloquent pas la boucle"""
+        print("🧪 Test étapes synchrones...")
+
+        def blocking_fetch():
+            time.sleep(0.1)
+            return "news"
+
+        graph = StageGraph("test")
+        graph.add_stage("news", blocking_fetch)
+        graph.add_stage("market", sleeper(0.1, "prix"))
+        run = asyncio.run(graph.run())
+
+        self.assertEqual(run.results, {"news": "news", "market": "prix"})
+        self.assertLess(run.total_seconds, 0.18)
+        print("✅ Étape bloquante exécutée dans un thread")
+
+    def test_invalid_graphs_are_rejected(self):
+        """Entrée inconnue, doublon et cycle sont détectés"""
+        print("🧪 Test validation du graphe...")
+        graph = StageGraph("test")
+        graph.add_stage("a", sleeper(0, 1), inputs=("b",))
+        graph.add_stage("b", sleeper(0, 1), inputs=("a",))
+        with self.assertRaises(StageGraphError):
+            graph.topological_order()
+        with self.assertRaises(StageGraphError):
+            graph.add_stage("a", sleeper(0, 1))
+        with self.assertRaises(StageGraphError):
+            StageGraph().add_stage("x", sleeper(0, 1), inputs=("missing",)).topological_order()
+        print("✅ Graphes invalides refusés")
+
+    def test_critical_path(self):
+        """Le chemin critique est la plus longue chaîne de dépendances"""
+        print("🧪 Test chemin critique...")
+        graph = StageGraph("test")
+        for name, inputs in [("market", ()), ("news", ()), ("aggregate", ("market", "news")),
+                             ("symbols", ("aggregate",))]:
+            graph.add_stage(name, sleeper(0, None), inputs=inputs)
+        path, total = graph.critical_path({"market": 0.2, "news": 0.8, "aggregate": 0.01, "symbols": 0.5})
+
+        self.assertEqual(path, ["news", "aggregate", "symbols"])
+        self.assertAlmostEqual(total, 1.31)
+        print(f"✅ Chemin critique: {' → '.join(path)}")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
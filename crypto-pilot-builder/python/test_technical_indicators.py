@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Tests des indicateurs techniques
+Vérifie que les moteurs optimisés donnent les mêmes valeurs que TechnicalIndicators
+"""
+
+import sys
+import os
+import random
+import unittest
+import warnings
+
+import numpy as np
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.utils.technical_indicators import TechnicalIndicators
+from pipeline.utils.incremental_indicators import IncrementalIndicators, IndicatorEngine
+from pipeline.utils.batch_indicators import BatchIndicators
+
+
+def generate_series(length: int, seed: int = 42):
+    """Génère une série de prix/volumes réaliste (marche aléatoire)"""
+    rng = random.Random(seed)
+    prices, volumes = [], []
+    price = 50000.0
+    for i in range(length):
+        price *= 1 + rng.uniform(-0.01, 0.01)
+        if i % 29 == 0 and prices:
+            price = prices[-1]  # Tick plat
+        prices.append(price)
+        volumes.append(rng.uniform(1e5, 1e6))
+    return prices, volumes
+
+
+class TestIncrementalIndicators(unittest.TestCase):
+    """Tests du moteur d'indicateurs incrémental"""
+
+    def assertIndicatorsEqual(self, actual, expected, tick):
+        self.assertEqual(list(actual.keys()), list(expected.keys()), f"tick {tick}")
+        for key, value in expected.items():
+            self.assertAlmostEqual(actual[key], value, delta=1e-7 * max(1.0, abs(value)),
+                                   msg=f"{key} au tick {tick}")
+
+    def test_matches_batch_without_volume(self):
+        """Chaque tick donne les mêmes valeurs que calculate_all_indicators"""
+        print("🧪 Test incrémental vs batch (prix seuls)...")
+        prices, _ = generate_series(300)
+        state = IncrementalIndicators()
+
+        for i, price in enumerate(prices):
+            actual = state.update(price)
+            expected = TechnicalIndicators.calculate_all_indicators(prices[:i + 1])
+            self.assertIndicatorsEqual(actual, expected, i)
+
+        print("✅ Indicateurs identiques sur 300 ticks")
+
+    def test_matches_batch_with_volume(self):
+        """Les indicateurs de volume (SMA, ratio, PVT) sont identiques"""
+        print("🧪 Test incrémental vs batch (prix + volumes)...")
+        prices, volumes = generate_series(300, seed=7)
+        state = IncrementalIndicators()
+
+        for i, (price, volume) in enumerate(zip(prices, volumes)):
+            actual = state.update(price, volume)
+            expected = TechnicalIndicators.calculate_all_indicators(prices[:i + 1], volumes[:i + 1])
+            self.assertIndicatorsEqual(actual, expected, i)
+
+        print("✅ Indicateurs de volume identiques")
+
+    def test_long_history_does_not_drift(self):
+        """La resynchronisation borne la dérive des sommes glissantes"""
+        print("🧪 Test de dérive sur un long historique...")
+        prices, volumes = generate_series(2500, seed=3)
+        state = IncrementalIndicators()
+        for price, volume in zip(prices, volumes):
+            actual = state.update(price, volume)
+
+        expected = TechnicalIndicators.calculate_all_indicators(prices, volumes)
+        self.assertIndicatorsEqual(actual, expected, len(prices) - 1)
+        print("✅ Pas de dérive après 2500 ticks")
+
+    def test_engine_isolates_symbols(self):
+        """Chaque symbole a son propre état"""
+        print("🧪 Test du registre par symbole...")
+        btc, _ = generate_series(60, seed=1)
+        eth, _ = generate_series(40, seed=2)
+        engine = IndicatorEngine()
+
+        engine.warm_up("BTC/USD", btc)
+        engine.warm_up("ETH/USD", eth)
+
+        self.assertEqual(engine.tick_count("BTC/USD"), 60)
+        self.assertEqual(engine.tick_count("ETH/USD"), 40)
+        self.assertIndicatorsEqual(engine.snapshot("ETH/USD"),
+                                   TechnicalIndicators.calculate_all_indicators(eth), 39)
+        self.assertEqual(engine.snapshot("SOL/USD"), {})
+        print("✅ États isolés par symbole")
+
+    def test_update_many_matches_updates(self):
+        """update_many (tableaux NumPy, volumes NaN ignorés) équivaut à des update successifs"""
+        prices, volumes = generate_series(120, seed=5)
+        engine = IndicatorEngine()
+        volumes_array = np.array(volumes)
+        volumes_array[10] = np.nan
+        actual = engine.update_many("BTC/USD", np.array(prices), volumes_array)
+
+        state = IncrementalIndicators()
+        for i, (price, volume) in enumerate(zip(prices, volumes)):
+            expected = state.update(price, None if i == 10 else volume)
+        self.assertIndicatorsEqual(actual, expected, len(prices) - 1)
+        self.assertEqual(engine.tick_count("BTC/USD"), 120)
+
+    def test_wilder_rsi(self):
+        """Le RSI de Wilder reste borné et diffère de la moyenne simple"""
+        print("🧪 Test du RSI de Wilder...")
+        prices, _ = generate_series(200, seed=11)
+        state = IncrementalIndicators(wilder_rsi=True)
+        for price in prices:
+            indicators = state.update(price)
+
+        self.assertGreaterEqual(indicators["rsi"], 0.0)
+        self.assertLessEqual(indicators["rsi"], 100.0)
+        self.assertNotAlmostEqual(indicators["rsi"], TechnicalIndicators.calculate_rsi(prices))
+        print(f"✅ RSI Wilder: {indicators['rsi']:.2f}")
+
+
+class TestBatchIndicators(unittest.TestCase):
+    """Tests du calcul vectorisé multi-symboles"""
+
+    SYMBOLS = ["BTC/USD", "ETH/USD", "ADA/USD", "DOT/USD", "SOL/USD"]
+
+    def assertRowMatches(self, batch, row, expected):
+        self.assertEqual(list(batch.keys()), list(expected.keys()))
+        for key, value in expected.items():
+            self.assertAlmostEqual(float(batch[key][row]), value, delta=1e-9 * max(1.0, abs(value)),
+                                   msg=f"{key} ligne {row}")
+
+    def test_matches_per_symbol_computation(self):
+        """Chaque ligne donne le résultat de calculate_all_indicators"""
+        print("🧪 Test batch vs calcul par symbole...")
+        series = [generate_series(120, seed=i) for i in range(len(self.SYMBOLS))]
+        prices = [p for p, _ in series]
+        volumes = [v for _, v in series]
+
+        batch = BatchIndicators.calculate_all_indicators(prices, volumes)
+        for row in range(len(self.SYMBOLS)):
+            expected = TechnicalIndicators.calculate_all_indicators(prices[row], volumes[row])
+            self.assertRowMatches(batch, row, expected)
+
+        print(f"✅ {len(self.SYMBOLS)} symboles identiques")
+
+    def test_short_histories(self):
+        """Les valeurs par défaut des historiques courts sont respectées"""
+        print("🧪 Test des historiques courts...")
+        for length in (1, 2, 13, 14, 15, 20, 26, 34, 35):
+            prices = [generate_series(length, seed=i)[0] for i in range(3)]
+            batch = BatchIndicators.calculate_all_indicators(prices)
+            for row in range(3):
+                self.assertRowMatches(batch, row, TechnicalIndicators.calculate_all_indicators(prices[row]))
+
+        self.assertEqual(BatchIndicators.calculate_all_indicators([[]]), {})
+        print("✅ Historiques courts conformes")
+
+    def test_momentum_with_zero_previous_close(self):
+        """Une clôture précédente nulle donne un momentum de 0, sans avertissement numpy"""
+        print("🧪 Test momentum avec clôture précédente nulle...")
+        prices = [[1.0, 2.0, 0.0, 0.0], [1.0, 2.0, 0.0, 5.0], [1.0, 2.0, 3.0, 4.0]]
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", RuntimeWarning)
+            batch = BatchIndicators.calculate_all_indicators(prices)
+
+        self.assertEqual(batch["momentum"][:2].tolist(), [0.0, 0.0])
+        self.assertAlmostEqual(float(batch["momentum"][2]), 100 / 3)
+        print("✅ Momentum fini pour toutes les lignes")
+
+    def test_indicators_by_symbol(self):
+        """Le format par symbole est compatible avec calculate_all_indicators"""
+        print("🧪 Test du format par symbole...")
+        prices = [generate_series(60, seed=i)[0] for i in range(2)]
+        result = BatchIndicators.indicators_by_symbol(["BTC/USD", "ETH/USD"], prices)
+
+        self.assertEqual(set(result.keys()), {"BTC/USD", "ETH/USD"})
+        self.assertIsInstance(result["ETH/USD"]["rsi"], float)
+        with self.assertRaises(ValueError):
+            BatchIndicators.indicators_by_symbol(["BTC/USD"], prices)
+        print("✅ Format par symbole validé")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
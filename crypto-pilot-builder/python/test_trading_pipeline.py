@@ -12,6 +12,9 @@ from datetime import datetime
 # Ajouter le répertoire parent au path Python
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+# Le test démarre le vrai pipeline: pas de journal d'événements dans logs/
+os.environ.setdefault("PIPELINE_EVENT_LOG_DIR", "")
+
 from services.trading_pipeline_service import trading_pipeline_service
 from config.trading_pipeline_config import PIPELINE_CONFIG
 
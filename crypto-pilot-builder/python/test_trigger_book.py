@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests du carnet de déclencheurs stop loss / take profit
+Vérifie les niveaux fixes, les stops suiveurs, les paires OCO et l'intégration au TraderAgent
+"""
+
+import sys
+import os
+import asyncio
+import random
+import time
+import unittest
+
+# Ajouter le répertoire parent au path Python
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from pipeline.agents.models.prediction import Prediction
+from pipeline.agents.models.signal import Signal, SignalType
+from pipeline.agents.trading.trader import TraderAgent
+from pipeline.utils.trading_rules import LONG, SHORT
+from pipeline.utils.trigger_book import ABOVE, BELOW, TriggerBook
+
+
+class TestTriggerBook(unittest.TestCase):
+    """Tests de TriggerBook"""
+
+    def test_fixed_levels_fire_once(self):
+        """Seuls les niveaux franchis se déclenchent, une seule fois"""
+        print("🧪 Test niveaux fixes...")
+        book = TriggerBook()
+        stops = [book.add_level("BTC", level, BELOW) for level in (90, 95, 98)]
+        book.add_level("BTC", 110, ABOVE, "take_profit")
+        book.add_level("ETH", 95, BELOW)
+
+        self.assertEqual(book.on_price("BTC", 99), [])
+        fired = book.on_price("BTC", 94)
+        self.assertEqual({e.trigger.trigger_id for e in fired}, {stops[1].trigger_id, stops[2].trigger_id})
+        self.assertEqual(book.on_price("BTC", 94), [])
+        self.assertEqual([e.trigger.kind for e in book.on_price("BTC", 111)], ["take_profit"])
+        self.assertEqual(len(book), 2)
+        print("✅ Niveaux franchis déclenchés une fois")
+
+    def test_oco_bracket(self):
+        """Le déclenchement d'un membre OCO annule l'autre"""
+        print("🧪 Test OCO...")
+        book = TriggerBook()
+        oco = book.add_bracket("BTC", LONG, stop_loss=98, take_profit=104)
+        short_oco = book.add_bracket("ETH", SHORT, stop_loss=102, take_profit=96)
+        self.assertEqual([e.trigger.kind for e in book.on_price("BTC", 104.5)], ["take_profit"])
+        self.assertEqual(book.on_price("BTC", 90), [])
+        self.assertEqual([e.trigger.kind for e in book.on_price("ETH", 103)], ["stop_loss"])
+        self.assertEqual(len(book), 0)
+        self.assertEqual(book.cancel_oco(oco) + book.cancel_oco(short_oco), 0)
+        print("✅ Paires OCO exclusives")
+
+    def test_trailing_stops(self):
+        """Le stop suiveur monte avec le plus haut et ne redescend jamais"""
+        print("🧪 Test stops suiveurs...")
+        book = TriggerBook()
+        tight = book.add_trailing_stop("BTC", 100, 0.02)
+        loose = book.add_trailing_stop("BTC", 100, 0.05)
+        short = book.add_trailing_stop("ETH", 100, 0.03, direction=SHORT)
+
+        for price in (101, 105, 110, 109):
+            self.assertEqual(book.on_price("BTC", price), [])
+        self.assertAlmostEqual(tight.current_level, 110 * 0.98)
+        self.assertAlmostEqual(loose.current_level, 110 * 0.95)
+        fired = book.on_price("BTC", 107)
+        self.assertEqual([e.trigger.trigger_id for e in fired], [tight.trigger_id])
+        self.assertEqual(book.on_price("BTC", 105), [])
+        self.assertEqual([e.trigger.trigger_id for e in book.on_price("BTC", 104)], [loose.trigger_id])
+
+        book.on_price("ETH", 90)
+        self.assertAlmostEqual(short.current_level, 90 * 1.03)
+        self.assertEqual(book.on_price("ETH", 92), [])
+        self.assertEqual(len(book.on_price("ETH", 93)), 1)
+        print("✅ Stops suiveurs ajustés et déclenchés")
+
+    def test_matches_linear_scan(self):
+        """Mêmes déclenchements qu'un parcours linéaire sur une marche aléatoire"""
+        print("🧪 Test équivalence parcours linéaire...")
+        rng = random.Random(5)
+        book = TriggerBook()
+        reference = {}
+        for _ in range(2000):
+            long_side = rng.random() < 0.5
+            trail = rng.choice([None, rng.uniform(0.01, 0.05)])
+            level = rng.uniform(90, 110)
+            if trail:
+                trigger = book.add_trailing_stop("BTC", 100, trail, LONG if long_side else SHORT)
+                reference[trigger.trigger_id] = ["trail", long_side, trail, 100.0]
+            else:
+                trigger = book.add_level("BTC", level, BELOW if long_side else ABOVE)
+                reference[trigger.trigger_id] = ["fixed", long_side, level, None]
+
+        price = 100.0
+        for _ in range(3000):
+            price *= 1 + rng.gauss(0, 0.004)
+            expected = set()
+            for trigger_id, (kind, long_side, value, extreme) in reference.items():
+                if kind == "fixed":
+                    hit = price <= value if long_side else price >= value
+                else:
+                    hit = price <= extreme * (1 - value) if long_side else price >= extreme * (1 + value)
+                if hit:
+                    expected.add(trigger_id)
+            for trigger_id in expected:
+                del reference[trigger_id]
+            for entry in reference.values():
+                if entry[0] == "trail":
+                    entry[3] = max(entry[3], price) if entry[1] else min(entry[3], price)
+            self.assertEqual({e.trigger.trigger_id for e in book.on_price("BTC", price)}, expected)
+        print(f"✅ {2000 - len(reference)} déclenchements identiques")
+
+    def test_tick_cost_independent_of_positions(self):
+        """Un tick sans franchissement reste rapide avec beaucoup de positions"""
+        book = TriggerBook()
+        for i in range(50000):
+            book.add_bracket("BTC", LONG, stop_loss=50 - i * 1e-4, take_profit=150 + i * 1e-4)
+        start = time.perf_counter()
+        for _ in range(10000):
+            book.on_price("BTC", 100.0)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+
+class TestTraderTriggers(unittest.TestCase):
+    """Intégration au TraderAgent"""
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.trader = TraderAgent()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def _price(self, price):
+        prediction = Prediction(symbol="BTC/USD", horizon=60, direction_prob=0.5, volatility=0.01,
+                                confidence=0.8, model_name="test", features_used={"current_price": price})
+        self.loop.run_until_complete(self.trader.handle_price_update(None, "test", prediction))
+
+    def test_take_profit_closes_trade(self):
+        """Un prix au-delà de l'objectif ferme la position et désarme son stop"""
+        print("🧪 Test intégration TraderAgent...")
+
+        async def fill(signal):
+            return signal.price
+
+        self.trader._simulate_execution = fill
+        signal = Signal(symbol="BTC/USD", signal_type=SignalType.BUY, confidence=0.8, price=100.0,
+                        position_size=0.05, stop_loss=98.0, take_profit=104.0)
+        self.assertIsNotNone(self.loop.run_until_complete(self.trader._execute_trade(signal)))
+        self.assertEqual(len(self.trader.trigger_book), 2)
+
+        self._price(101.0)
+        self.assertIn("BTC/USD", self.trader.open_trades)
+        self._price(104.5)
+        self.assertNotIn("BTC/USD", self.trader.open_trades)
+        self.assertEqual(len(self.trader.trigger_book), 0)
+        self.assertGreater(self.trader.total_pnl, 0)
+        print("✅ Position fermée au take profit")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)